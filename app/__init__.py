@@ -2,16 +2,17 @@
 
 # Python Imports
 from sys import argv
+from argparse import ArgumentTypeError
 from logging import Logger, getLogger
-from typing import AnyStr, Optional
+from typing import AnyStr, AsyncIterator, Optional, Sequence, Tuple
 
 # Third-Party Imports
 
 # Local Imports
 from app.config import settings
-from app.core.pdfs import parse_pdfs
 from app.utils.callables.decorators import entry_point, meta
 from app.utils.callables.meta_mixin import SimpleCallableMetaInfo
+from app.utils.profiling import NULL_PROFILER, Profiler
 
 # Constants
 LOG: Logger = getLogger(__name__)
@@ -73,6 +74,294 @@ def arguments(meta: SimpleCallableMetaInfo) -> None:
         help="The excel template cell where the output data should start to be written to. \
               Should be an excel cell format, eg. B4 [default: %(default)s]",
     )
+    meta.parser.add_argument(
+        "-m",
+        "--metrics",
+        dest="metrics",
+        action="store_true",
+        default=False,
+        help="Whether to write per-file and per-stage timings and counters to \
+              'metrics.json' in the output directory [default: %(default)s]",
+    )
+    meta.parser.add_argument(
+        "-p",
+        "--profile",
+        dest="profile",
+        action="store_true",
+        default=False,
+        help="Whether to profile each input pdf with cProfile, writing a '.pstats' \
+              file and a hotspot summary per pdf [default: %(default)s]",
+    )
+    meta.parser.add_argument(
+        "-pout",
+        "--profile-out",
+        dest="profile_out",
+        type=str,
+        action="store",
+        default=None,
+        help="The directory where the profiles are written to, implies --profile \
+              [default: <output dir>/profiles]",
+    )
+    meta.parser.add_argument(
+        "-ptop",
+        "--profile-top",
+        dest="profile_top",
+        type=int,
+        action="store",
+        default=30,
+        help="The number of hotspots to include in the profile summaries [default: %(default)s]",
+    )
+    meta.parser.add_argument(
+        "-pmem",
+        "--profile-memory",
+        dest="profile_memory",
+        action="store_true",
+        default=False,
+        help="Whether to also trace memory allocations with tracemalloc while \
+              profiling, this slows down parsing considerably [default: %(default)s]",
+    )
+    meta.parser.add_argument(
+        "-t",
+        "--trace",
+        dest="trace",
+        action="store_true",
+        default=False,
+        help="Whether to capture the layout pipeline step outputs of each input pdf, \
+              ie. lines, intersection points, rects and rows, to 'traces/' in the \
+              output directory, for rendering with PDFBBoxHighlighter.highlight_trace \
+              [default: %(default)s]",
+    )
+    meta.parser.add_argument(
+        "-f",
+        "--format",
+        dest="output_format",
+        type=str,
+        nargs="+",
+        choices=["excel", "csv", "parquet", "sqlite"],
+        action="store",
+        default=["excel"],
+        help="The output format(s), the Excel template, one CSV or Parquet file \
+              per pdf type, parquet needs pyarrow, and/or a 'results.sqlite' store \
+              where reports are upserted [default: %(default)s]",
+    )
+    meta.parser.add_argument(
+        "-jl",
+        "--jsonl",
+        dest="jsonl",
+        type=str,
+        metavar="<jsonl_path>",
+        action="store",
+        default=None,
+        help="The JSON Lines file to stream the raw match results to as each pdf \
+              is parsed, or '-' for the standard output [default: %(default)s]",
+    )
+    meta.parser.add_argument(
+        "-jlr",
+        "--jsonl-records",
+        dest="jsonl_records",
+        type=str,
+        choices=["document", "element"],
+        action="store",
+        default="document",
+        help="Whether to write one JSON record per pdf or per matched element \
+              [default: %(default)s]",
+    )
+    meta.parser.add_argument(
+        "-rx",
+        "--render-excel",
+        dest="render_excel",
+        action="store_true",
+        default=False,
+        help="Whether to render 'output.xlsx' from the 'results.sqlite' store in \
+              the output directory, after parsing the pdfs if any, only writing \
+              the rows changed since it was last rendered [default: %(default)s]",
+    )
+    meta.parser.add_argument(
+        "-inc",
+        "--incremental",
+        dest="incremental",
+        action="store_true",
+        default=False,
+        help="Whether to skip the pdfs unchanged since recorded in the output \
+              directory 'manifest.jsonl', appending the others to its outputs, eg. \
+              to resume an interrupted batch [default: %(default)s]",
+    )
+    meta.parser.add_argument(
+        "-w",
+        "--watch",
+        dest="watch",
+        action="store_true",
+        default=False,
+        help="Whether to keep watching the pdfs directory, parsing in a process \
+              pool the pdfs already in it and then each pdf written to it, skipping \
+              those unchanged since recorded in the output directory \
+              'manifest.jsonl', until interrupted [default: %(default)s]",
+    )
+    meta.parser.add_argument(
+        "-wp",
+        "--watch-polling",
+        dest="watch_polling",
+        action="store_true",
+        default=False,
+        help="Whether to watch the pdfs directory by listing it periodically, \
+              eg. for network shares, rather than with inotify where available \
+              [default: %(default)s]",
+    )
+    meta.parser.add_argument(
+        "-srv",
+        "--serve",
+        dest="serve",
+        action="store_true",
+        default=False,
+        help="Whether to serve a local HTTP API parsing the pdfs posted to \
+              '/parse', as a body or as a JSON {\"path\": ...}, into their rows and \
+              match result, in a pool of started worker processes, with '/health' \
+              and '/metrics' endpoints, until interrupted [default: %(default)s]",
+    )
+    meta.parser.add_argument(
+        "-sp",
+        "--serve-port",
+        dest="serve_port",
+        type=int,
+        metavar="<port>",
+        action="store",
+        default=8765,
+        help="The local port to serve on [default: %(default)s]",
+    )
+    meta.parser.add_argument(
+        "-ss",
+        "--serve-socket",
+        dest="serve_socket",
+        type=str,
+        metavar="<socket_path>",
+        action="store",
+        default=None,
+        help="The Unix socket to serve on instead of the local port \
+              [default: %(default)s]",
+    )
+    meta.parser.add_argument(
+        "-sw",
+        "--serve-warmup",
+        dest="serve_warmup",
+        type=str,
+        nargs="*",
+        metavar="<pdf_path>",
+        action="store",
+        default=None,
+        help="The pdfs each worker process parses once started, so that the \
+              fonts and CMaps they use are loaded before the first request, \
+              none to skip the warmup [default: the bundled sample reports]",
+    )
+    meta.parser.add_argument(
+        "-sr",
+        "--serve-root",
+        dest="serve_root",
+        type=str,
+        metavar="<root_dir>",
+        action="store",
+        default=None,
+        help="The directory the pdfs posted by path must be under, pdfs are \
+              only parsed from the posted content when not set \
+              [default: %(default)s]",
+    )
+    meta.parser.add_argument(
+        "-spool",
+        "--spool-dir",
+        dest="spool_dir",
+        type=str,
+        metavar="<spool_dir>",
+        action="store",
+        default=None,
+        help="The spool directory, eg. on a share, of a work queue run by several \
+              machines, to queue the pdfs to, if any, and to run the queued pdfs \
+              of, one worker process per CPU, until none is left \
+              [default: %(default)s]",
+    )
+    meta.parser.add_argument(
+        "-spm",
+        "--spool-merge",
+        dest="spool_merge",
+        action="store_true",
+        default=False,
+        help="Whether to merge the rows parsed by every machine of the spool \
+              directory to the output directory, once its queue is drained \
+              [default: %(default)s]",
+    )
+    meta.parser.add_argument(
+        "-mw",
+        "--max-workers",
+        dest="max_workers",
+        type=int,
+        metavar="<workers>",
+        action="store",
+        default=None,
+        help="The number of worker processes parsing the pdfs when watching, \
+              serving or running a spool directory [default: the CPU count]",
+    )
+    meta.parser.add_argument(
+        "-sh",
+        "--shard",
+        dest="shard",
+        type=_shard,
+        metavar="<index>/<count>",
+        action="store",
+        default=None,
+        help="The 1-based shard of the pdfs to parse out of a number of shards, \
+              eg. '2/4', each shard taking a disjoint, stable slice of the \
+              pdfs, to a 'shard_<index>_of_<count>' subdirectory of the \
+              output directory [default: %(default)s]",
+    )
+    meta.parser.add_argument(
+        "-msh",
+        "--merge-shards",
+        dest="merge_shards",
+        action="store_true",
+        default=False,
+        help="Whether to merge the shard subdirectories of the output directory \
+              into its outputs, in pdf path order, after parsing the pdfs if any \
+              [default: %(default)s]",
+    )
+    meta.parser.add_argument(
+        "-ft",
+        "--file-timeout",
+        dest="file_timeout",
+        type=float,
+        metavar="<seconds>",
+        action="store",
+        default=None,
+        help="The time parsing the pages of a pdf may take before it is stopped \
+              and copied to the 'error' directory with the reason, the batch \
+              going on [default: %(default)s]",
+    )
+    meta.parser.add_argument(
+        "-pt",
+        "--page-timeout",
+        dest="page_timeout",
+        type=float,
+        metavar="<seconds>",
+        action="store",
+        default=None,
+        help="The time parsing a single page may take before its pdf is stopped \
+              [default: %(default)s]",
+    )
+    meta.parser.add_argument(
+        "-mm",
+        "--max-memory",
+        dest="max_memory",
+        type=int,
+        metavar="<MiB>",
+        action="store",
+        default=None,
+        help="The resident memory parsing a pdf may add to its process before it \
+              is stopped [default: %(default)s]",
+    )
+
+
+def _shard(value: str) -> Tuple[int, int]:
+    index, _, count = value.partition("/")
+    if not (index.isdigit() and count.isdigit() and 1 <= int(index) <= int(count)):
+        raise ArgumentTypeError(f"invalid shard '{value}', expected <index>/<count>")
+    return int(index), int(count)
 
 
 @entry_point(argv)
@@ -85,21 +374,151 @@ def main(
     no_gui: bool = False,
     excel_template: Optional[str] = settings().excel_template,
     excel_template_cell: Optional[str] = settings().excel_template_start_cell,
+    metrics: bool = False,
+    profile: bool = False,
+    profile_out: Optional[str] = None,
+    profile_top: int = 30,
+    profile_memory: bool = False,
+    trace: bool = False,
+    output_format: Sequence[str] = ("excel",),
+    render_excel: bool = False,
+    jsonl: Optional[str] = None,
+    jsonl_records: str = "document",
+    incremental: bool = False,
+    watch: bool = False,
+    watch_polling: bool = False,
+    serve: bool = False,
+    serve_port: int = 8765,
+    serve_socket: Optional[str] = None,
+    serve_warmup: Optional[Sequence[str]] = None,
+    serve_root: Optional[str] = None,
+    spool_dir: Optional[str] = None,
+    spool_merge: bool = False,
+    max_workers: Optional[int] = None,
+    shard: Optional[Tuple[int, int]] = None,
+    merge_shards: bool = False,
+    file_timeout: Optional[float] = None,
+    page_timeout: Optional[float] = None,
+    max_memory: Optional[int] = None,
 ) -> None:
     LOG.debug("Running main application entry point...")
 
     if no_gui:
         LOG.debug("Running in command line mode...")
-        [
-            _
-            for _ in parse_pdfs(
-                pdfs_path=pdfs_path,
-                out_dir=out_dir,
-                split=split,
-                excel_template=excel_template,
-                excel_template_cell=excel_template_cell,
+        # Imported here so that the GUI and --help do not load the parsing stack
+        from app.core.pdfs import parse_pdfs
+        from app.utils.watchdog import ParseBudget
+
+        profiler: Profiler = NULL_PROFILER
+        if profile or profile_out is not None:
+            profiler = Profiler(
+                profile_out if profile_out is not None else f"{out_dir}/profiles",
+                top=profile_top,
+                memory=profile_memory,
+            )
+        budget: ParseBudget = ParseBudget(
+            file_timeout,
+            page_timeout,
+            max_memory * 2**20 if max_memory is not None else None,
+        )
+        if serve:
+            from app.core.server import SERVER_WARMUP, serve as serve_pdfs
+
+            try:
+                serve_pdfs(
+                    out_dir,
+                    excel_template,
+                    excel_template_cell,
+                    port=serve_port,
+                    socket_path=serve_socket,
+                    max_workers=max_workers,
+                    warmup=serve_warmup if serve_warmup is not None else SERVER_WARMUP,
+                    budget=budget,
+                    root=serve_root,
+                )
+            except KeyboardInterrupt:
+                LOG.info("Stopped serving")
+        elif spool_dir is not None:
+            from app.core.spool import merge_spool, run_spool
+
+            run_spool(
+                spool_dir,
+                pdfs_path,
+                excel_template,
+                excel_template_cell,
+                max_workers,
+                budget=budget,
             )
-        ]
+            if spool_merge:
+                merge_spool(
+                    spool_dir,
+                    out_dir,
+                    excel_template,
+                    excel_template_cell,
+                    output_format,
+                )
+        elif watch:
+            from asyncio import run
+            from app.core.pdfs import aparse_pdfs
+            from app.core.watch import watch_pdfs
+
+            try:
+                run(
+                    _drain(
+                        aparse_pdfs(
+                            watch_pdfs(pdfs_path, polling=watch_polling),
+                            out_dir,
+                            split,
+                            excel_template,
+                            excel_template_cell,
+                            executor="process",
+                            max_workers=max_workers,
+                            trace=trace,
+                            output_format=output_format,
+                            jsonl=jsonl,
+                            jsonl_records=jsonl_records,
+                            incremental=True,
+                            budget=budget,
+                        )
+                    )
+                )
+            except KeyboardInterrupt:
+                LOG.info("Stopped watching '%s'", pdfs_path)
+        elif pdfs_path is not None or not (render_excel or merge_shards):
+            shard_dir: AnyStr = out_dir
+            if shard is not None:
+                from app.core.shards import shard_out_dir
+
+                shard_dir = shard_out_dir(out_dir, shard)
+            [
+                _
+                for _ in parse_pdfs(
+                    pdfs_path=pdfs_path,
+                    out_dir=shard_dir,
+                    split=split,
+                    excel_template=excel_template,
+                    excel_template_cell=excel_template_cell,
+                    metrics=metrics,
+                    profiler=profiler,
+                    trace=trace,
+                    output_format=output_format,
+                    jsonl=jsonl,
+                    jsonl_records=jsonl_records,
+                    incremental=incremental,
+                    shard=shard,
+                    budget=budget,
+                )
+            ]
+        if merge_shards:
+            from app.core.shards import merge_shards as merge_shard_outputs
+
+            merge_shard_outputs(
+                out_dir, excel_template, excel_template_cell, output_format
+            )
+        if render_excel:
+            from app.core.store import render_excel as render_store_excel
+
+            render_store_excel(out_dir, excel_template, excel_template_cell)
     else:
         LOG.debug("Running in GUI mode...")
         from app.gui.window import Window
@@ -109,4 +528,6 @@ def main(
     LOG.debug("Finished running main application entry point...")
 
 
-main()
+async def _drain(events: AsyncIterator) -> None:
+    async for _ in events:
+        pass
@@ -2,7 +2,7 @@
 
 # Python Imports
 from logging import Logger, getLogger
-from typing import Annotated, Optional, Tuple, Type
+from typing import Annotated, Literal, Optional, Tuple, Type
 
 # Third-Party Imports
 from pydantic import Field
@@ -34,6 +34,8 @@ class AppSettings(BaseSettings, MetaProperties):
     no_gui: Annotated[Optional[bool], Field(False)]
     excel_template: Annotated[Optional[str], Field(None)]
     excel_template_start_cell: Annotated[Optional[str], Field(None)]
+    gui_executor: Annotated[Literal["sync", "thread", "process"], Field("process")]
+    gui_max_workers: Annotated[Optional[int], Field(None)]
 
 
 class TomlSettings(BaseSettings, MetaProperties):
@@ -54,8 +56,3 @@ class TomlSettings(BaseSettings, MetaProperties):
         case_sensitive=False,
         extra="ignore",
     )
-
-
-toml = TomlSettings()
-print(f"toml:\n{toml.model_dump_json(indent = 2)}")
-t = 1
\ No newline at end of file
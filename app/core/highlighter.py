@@ -2,14 +2,15 @@
 
 # Python Imports
 import os
+from concurrent.futures import ProcessPoolExecutor
 from logging import Logger, getLogger
-from tempfile import TemporaryDirectory
-from typing import Iterator, List, Tuple
+from tempfile import TemporaryDirectory, gettempdir
+from threading import Lock
+from typing import Any, AnyStr, Callable, Dict, Iterator, List, Self, Tuple
 
 # Third-Party Imports
-from PIL import Image
+from PIL import Image, ImageDraw
 from pdf2image import convert_from_path
-from matplotlib import patches, pyplot as plt
 from pdfminer.high_level import extract_pages
 from pdfminer.layout import (
     LTPage,
@@ -23,81 +24,314 @@ from pdfminer.layout import (
 )
 
 # Local Imports
-from app.utils.files import create_dir
-from app.utils.paths import is_valid_dir, remove_extension
+from app.model.pdfs import PDFLTTrace
+from app.utils.files import create_dir, file_digest
+from app.utils.paths import is_valid_dir, is_valid_file, remove_extension
+from app.utils.pdfs import PDFUtils
 
 # Constants
 LOG: Logger = getLogger(__name__)
+_POPPLER_PATH: str = "C:\\Users\\squil\\Desktop\\poppler-24.07.0\\Library\\bin"
+_OVERLAY_ALPHA: int = 191  # 0.75
+_PNG_COMPRESS_LEVEL: int = 1
+Color = Tuple[int, int, int]
+BBoxOverlay = Tuple[Tuple[int, int, int, int], Color, int]
+_TRACE_COLORS: Dict[str, Color] = {
+    "PDFLTLine": (0, 0, 255),  # blue
+    "PDFLTPointIntersect": (255, 0, 255),  # magenta
+    "PDFLTRect": (255, 0, 0),  # red
+    "PDFLTTextBox": (255, 255, 0),  # yellow
+    "PDFLTCurve": (0, 0, 0),  # black
+}
+# Alternating colors, so that neighbouring groups, eg. rows, stand out
+_TRACE_GROUP_COLORS: List[Color] = [
+    (255, 0, 0),  # red
+    (0, 160, 0),  # green
+    (0, 0, 255),  # blue
+    (255, 128, 0),  # orange
+    (160, 0, 255),  # purple
+    (0, 192, 192),  # teal
+]
+_TRACE_POINT_SIZE: float = 2.0  # In PDF points
+
+
+class PDFPageRasterCache(object):
+    """On disk cache of rendered PDF page images.
+
+    Page images are keyed by the file content hash, the page number and the
+    resolution, so they are reused across calls and highlighter instances, and
+    renamed or copied files are not rendered again. The first miss for a file
+    renders all of its pages in a single poppler invocation.
+
+    Parameters
+    ----------
+    cache_dir : str, optional
+        the directory holding the page images, by default a directory in the
+        system temporary directory
+    poppler_path : str, optional
+        the poppler binaries directory, poppler is looked up in the `PATH` if
+        the directory does not exist, by default the development poppler path
+    thread_count : int, optional
+        the number of poppler processes each render is split into, by default 4
+    """
+
+    def __init__(
+        self: Self,
+        cache_dir: str | None = None,
+        poppler_path: str | None = _POPPLER_PATH,
+        thread_count: int = 4,
+    ) -> None:
+        self.cache_dir: str = cache_dir or os.path.join(gettempdir(), "pdf-rasters")
+        self.poppler_path: str | None = (
+            poppler_path if poppler_path and is_valid_dir(poppler_path) else None
+        )
+        self.thread_count: int = max(1, thread_count)
+        self._hashes: Dict[Tuple[str, int, int], str] = {}
+        self._lock: Lock = Lock()
+
+    def file_hash(self: Self, pdf_path: str) -> str:
+        """Returns the content hash of a PDF file.
+
+        Hashes are memoized by file path, modification time and size, so a file
+        is only read again once it changes.
+
+        Parameters
+        ----------
+        pdf_path : str
+            the PDF file path
+
+        Returns
+        -------
+        str
+            the hexadecimal SHA-1 digest of the file content
+        """
+        stat: os.stat_result = os.stat(pdf_path)
+        key: Tuple[str, int, int] = (
+            os.path.abspath(pdf_path),
+            stat.st_mtime_ns,
+            stat.st_size,
+        )
+        with self._lock:
+            digest: str | None = self._hashes.get(key)
+        if digest is not None:
+            return digest
+
+        digest = file_digest(pdf_path)
+        with self._lock:
+            self._hashes[key] = digest
+        return digest
+
+    def page_image_path(self: Self, pdf_path: str, page_number: int, dpi: int) -> str:
+        """Returns the image path of a rendered PDF page, rendering on a miss.
+
+        Parameters
+        ----------
+        pdf_path : str
+            the PDF file path
+        page_number : int
+            the page number, starting at 1
+        dpi : int
+            the image resolution
+
+        Returns
+        -------
+        str
+            the page image path
+        """
+        img_path: str = self._page_image_path(pdf_path, page_number, dpi)
+        if not is_valid_file(img_path):
+            self.render(pdf_path, dpi)
+        return img_path
+
+    def render(self: Self, pdf_path: str, dpi: int) -> List[str]:
+        """Renders the pages of a PDF file that are not cached yet.
+
+        Missing pages are rendered in a single poppler invocation, spanning
+        from the first to the last missing page.
+
+        Parameters
+        ----------
+        pdf_path : str
+            the PDF file path
+        dpi : int
+            the image resolution
+
+        Returns
+        -------
+        List[str]
+            the image paths of all the pages
+        """
+        img_paths: List[str] = [
+            self._page_image_path(pdf_path, page_number, dpi)
+            for page_number in range(1, PDFUtils.page_count(pdf_path) + 1)
+        ]
+        missing: List[int] = [
+            page_number
+            for page_number, img_path in enumerate(img_paths, start=1)
+            if not is_valid_file(img_path)
+        ]
+        if len(missing) == 0:
+            return img_paths
+
+        LOG.debug(
+            "Rendering pages %d to %d of '%s' at %d dpi...",
+            missing[0],
+            missing[-1],
+            pdf_path,
+            dpi,
+        )
+        out_dir: str = os.path.dirname(img_paths[0])
+        create_dir(out_dir, raise_error=True)
+        # Renders into a scratch directory first, then moves the images into
+        # place, so a concurrent or interrupted render never leaves partial
+        # images in the cache
+        with TemporaryDirectory(dir=out_dir) as temp_dir:
+            rendered: List[str] = convert_from_path(
+                pdf_path,
+                dpi=dpi,
+                output_folder=temp_dir,
+                first_page=missing[0],
+                last_page=missing[-1],
+                fmt="png",
+                paths_only=True,
+                thread_count=self.thread_count,
+                poppler_path=self.poppler_path,
+            )
+            # Poppler names images after the page number, so sorting the paths
+            # sorts them by page
+            for page_number, rendered_path in enumerate(
+                sorted(rendered), start=missing[0]
+            ):
+                os.replace(rendered_path, img_paths[page_number - 1])
+        return img_paths
+
+    def _page_image_path(self: Self, pdf_path: str, page_number: int, dpi: int) -> str:
+        return os.path.join(
+            self.cache_dir, self.file_hash(pdf_path), f"{dpi}", f"{page_number}.png"
+        )
 
 
 class PDFBBoxHighlighter(object):
+    """Draws the bounding boxes of PDF layout elements over the page images.
+
+    Boxes are painted straight onto the cached page images, and the overlay
+    images of a file are written in parallel worker processes.
+
+    Parameters
+    ----------
+    cache : PDFPageRasterCache, optional
+        the page image cache, by default a cache in the system temporary
+        directory
+    max_workers : int, optional
+        the maximum number of worker processes writing overlay images, 1 writes
+        them in the calling process, by default the number of CPUs
+    """
+
+    def __init__(
+        self: Self,
+        cache: PDFPageRasterCache | None = None,
+        max_workers: int | None = None,
+    ) -> None:
+        self.cache: PDFPageRasterCache = cache or PDFPageRasterCache()
+        self.max_workers: int = max(1, max_workers or os.cpu_count() or 1)
+
     def highlight_bbox_pdf(
         self, pdf_path: str, out_dir: str, dpi: int = 500, preload: bool = False
     ) -> None:
         try:
-            pdf_pages_iter: Iterator[LTPage] = extract_pages(pdf_path)
-
-            if preload:
-                with TemporaryDirectory() as temp_dir:
-                    pdf_page_img_paths_iter: Iterator[str] = iter(
-                        convert_from_path(
-                            pdf_path,
-                            dpi=dpi,
-                            output_folder=temp_dir,
-                            paths_only=True,
-                            thread_count=4,
-                            poppler_path="C:\\Users\\squil\\Desktop\\poppler-24.07.0\\Library\\bin",
-                        )
+            # All pages are rendered anyway, `preload` is kept for compatibility
+            pdf_page_img_paths: List[str] = self.cache.render(pdf_path, dpi)
+            pdf_name: str = remove_extension(os.path.basename(pdf_path))
+
+            # Pages are interleaved across workers, each extracting the layout
+            # of and writing its own pages
+            page_numbers: List[int] = list(range(1, len(pdf_page_img_paths) + 1))
+            workers: int = min(self.max_workers, len(page_numbers)) or 1
+            self._map(
+                _highlight_pdf_pages,
+                [
+                    (
+                        pdf_path,
+                        page_numbers[i::workers],
+                        pdf_page_img_paths[i::workers],
+                        f"{out_dir}/{pdf_name}",
+                        dpi,
                     )
-                    while (pdf_page := next(pdf_pages_iter, None)) is not None:
-                        self._highlight_bbox_pdf_page_with_image(
-                            pdf_path,
-                            next(pdf_page_img_paths_iter),
-                            pdf_page,
-                            out_dir,
-                            dpi,
-                        )
-            else:
-                while (pdf_page := next(pdf_pages_iter, None)) is not None:
-                    self.highlight_bbox_pdf_page(pdf_path, pdf_page, out_dir, dpi)
+                    for i in range(workers)
+                ],
+            )
         except Exception as e:
             LOG.error(
                 f"Error while highlighting bounding boxes for pdf '{pdf_path}':\n {e}"
             )
             raise e
 
-    def highlight_bbox_pdf_page(
-        self, pdf_path: str, pdf_page: LTPage, out_dir: str, dpi: int = 500
+    def highlight_trace(
+        self: Self,
+        trace: PDFLTTrace | AnyStr,
+        out_dir: str,
+        steps: List[str] | None = None,
+        pages: List[int] | None = None,
+        dpi: int = 150,
     ) -> None:
+        """Draws the layout pipeline step outputs captured in a trace.
+
+        Writes an image per traced page and step to
+        `<out_dir>/<pdf name>/<step>/<page>.png`. Shapes are coloured by kind,
+        or by group, eg. row, when grouped, and intersection points are drawn as
+        small squares.
+
+        Parameters
+        ----------
+        trace : PDFLTTrace | AnyStr
+            the trace, or the path of a trace dumped during a parse
+        out_dir : str
+            the output directory
+        steps : List[str], optional
+            the step names to draw, eg. "decompose", "points", "intersect",
+            "compose" or "rows", by default all the traced steps
+        pages : List[int], optional
+            the page numbers to draw, by default all the traced pages
+        dpi : int, optional
+            the image resolution, by default 150
+        """
+        if not isinstance(trace, PDFLTTrace):
+            trace = PDFLTTrace.load(trace)
         try:
-            page_number: int = pdf_page.pageid
+            pdf_page_img_paths: List[str] = self.cache.render(trace.name, dpi)
+            pdf_name: str = remove_extension(os.path.basename(trace.name))
 
-            with TemporaryDirectory() as temp_dir:
-                pdf_page_img_paths_iter: Iterator[str] = iter(
-                    convert_from_path(
-                        pdf_path,
-                        dpi=dpi,
-                        output_folder=temp_dir,
-                        first_page=page_number,
-                        last_page=page_number,
-                        paths_only=True,
-                        thread_count=1,
-                        poppler_path="C:\\Users\\squil\\Desktop\\poppler-24.07.0\\Library\\bin",
+            self._map(
+                _write_overlays,
+                [
+                    (
+                        pdf_page_img_paths[page["page"] - 1],
+                        [
+                            (
+                                _trace_overlays(shapes, page["bbox"], dpi),
+                                f"{out_dir}/{pdf_name}/{step}/{page['page']}.png",
+                            )
+                            for step, shapes in page["steps"].items()
+                            if steps is None or step in steps
+                        ],
                     )
-                )
-                self._draw_bbox_pdf_page_with_image(
-                    next(pdf_page_img_paths_iter),
-                    pdf_page,
-                    out_dir,
-                    remove_extension(os.path.basename(pdf_path)),
-                    dpi,
-                )
+                    for page in trace.pages
+                    if pages is None or page["page"] in pages
+                ],
+            )
         except Exception as e:
             LOG.error(
-                f"Error while highlighting bounding boxes for pdf '{pdf_path}':\n {e}"
+                f"Error while highlighting trace for pdf '{trace.name}':\n {e}"
             )
             raise e
 
+    def highlight_bbox_pdf_page(
+        self, pdf_path: str, pdf_page: LTPage, out_dir: str, dpi: int = 500
+    ) -> None:
+        self.highlight_bbox_pdf_elements(
+            pdf_path, pdf_page.pageid, pdf_page.height, pdf_page._objs, out_dir, dpi
+        )
+
     def highlight_bbox_pdf_elements(
         self,
         pdf_path: str,
@@ -109,62 +343,36 @@ class PDFBBoxHighlighter(object):
         individual: bool = False,
     ) -> None:
         try:
-            with TemporaryDirectory() as temp_dir:
-                pdf_page_img_paths_iter: Iterator[str] = iter(
-                    convert_from_path(
-                        pdf_path,
-                        dpi=dpi,
-                        output_folder=temp_dir,
-                        first_page=page_number,
-                        last_page=page_number,
-                        paths_only=True,
-                        thread_count=1,
-                        poppler_path="C:\\Users\\squil\\Desktop\\poppler-24.07.0\\Library\\bin",
-                    )
-                )
-                pdf_page_img_path: str = next(pdf_page_img_paths_iter)
-                if not individual:
-                    self._draw_bbox_pdf_elements_with_image(
-                        pdf_page_img_path,
-                        page_number,
-                        page_height,
-                        pdf_elements,
-                        out_dir,
-                        remove_extension(os.path.basename(pdf_path)),
-                        dpi,
-                    )
-                else:
-                    for i, element in enumerate(pdf_elements):
-                        self._draw_bbox_pdf_elements_with_image(
-                            pdf_page_img_path,
-                            page_number,
-                            page_height,
-                            [element],
-                            f"{out_dir}/{i}",
-                            f"{remove_extension(os.path.basename(pdf_path))}_{i}",
-                            dpi,
-                        )
-        except Exception as e:
-            LOG.error(
-                f"Error while highlighting bounding boxes for pdf '{pdf_path}':\n {e}"
+            pdf_page_img_path: str = self.cache.page_image_path(
+                pdf_path, page_number, dpi
             )
-            raise e
+            pdf_name: str = remove_extension(os.path.basename(pdf_path))
 
-    def _highlight_bbox_pdf_page_with_image(
-        self,
-        pdf_path: str,
-        pdf_page_img_path: str,
-        pdf_page: LTPage,
-        out_dir: str,
-        dpi: int = 500,
-    ) -> None:
-        try:
-            self._draw_bbox_pdf_page_with_image(
-                pdf_page_img_path,
-                pdf_page,
-                out_dir,
-                remove_extension(os.path.basename(pdf_path)),
-                dpi,
+            if not individual:
+                _write_overlays(
+                    pdf_page_img_path,
+                    [
+                        (
+                            _bbox_overlays(page_height, pdf_elements, dpi),
+                            f"{out_dir}/{pdf_name}/{page_number}.png",
+                        )
+                    ],
+                )
+                return
+
+            outputs: List[Tuple[List[BBoxOverlay], str]] = [
+                (
+                    _bbox_overlays(page_height, [element], dpi),
+                    f"{out_dir}/{i}/{pdf_name}_{i}/{page_number}.png",
+                )
+                for i, element in enumerate(pdf_elements)
+            ]
+            # Splits the elements in one job per worker, so that each worker
+            # loads the page image once
+            workers: int = min(self.max_workers, len(outputs)) or 1
+            self._map(
+                _write_overlays,
+                [(pdf_page_img_path, outputs[i::workers]) for i in range(workers)],
             )
         except Exception as e:
             LOG.error(
@@ -172,115 +380,189 @@ class PDFBBoxHighlighter(object):
             )
             raise e
 
-    def _draw_bbox_pdf_page_with_image(
-        self,
-        pdf_page_img_path: str,
-        pdf_page: LTPage,
-        out_dir: str,
-        pdf_name: str,
-        dpi: int = 500,
-    ) -> None:
-        self._draw_bbox_pdf_elements_with_image(
+    def _map(self: Self, fn: Callable[..., Any], jobs: List[Tuple[Any, ...]]) -> None:
+        if self.max_workers == 1 or len(jobs) <= 1:
+            for job in jobs:
+                fn(*job)
+            return
+
+        with ProcessPoolExecutor(max_workers=min(self.max_workers, len(jobs))) as pool:
+            # Consumes the results to re-raise worker errors
+            for _ in pool.map(fn, *zip(*jobs)):
+                pass
+
+
+def _highlight_pdf_pages(
+    pdf_path: str,
+    page_numbers: List[int],
+    pdf_page_img_paths: List[str],
+    out_dir: str,
+    dpi: int,
+) -> None:
+    """Writes the overlay images of the layout elements of some PDF pages.
+
+    Parameters
+    ----------
+    pdf_path : str
+        the PDF file path
+    page_numbers : List[int]
+        the page numbers, starting at 1
+    pdf_page_img_paths : List[str]
+        the page image paths, per page number
+    out_dir : str
+        the overlay images directory
+    dpi : int
+        the page images resolution
+    """
+    pdf_pages_iter: Iterator[LTPage] = extract_pages(
+        pdf_path, page_numbers=[page_number - 1 for page_number in page_numbers]
+    )
+    # Page ids count the extracted pages only, hence zipping the page numbers
+    for page_number, pdf_page, pdf_page_img_path in zip(
+        page_numbers, pdf_pages_iter, pdf_page_img_paths
+    ):
+        _write_overlays(
             pdf_page_img_path,
-            pdf_page.pageid,
-            pdf_page.height,
-            pdf_page._objs,
-            out_dir,
-            pdf_name,
-            dpi,
+            [
+                (
+                    _bbox_overlays(pdf_page.height, pdf_page._objs, dpi),
+                    f"{out_dir}/{page_number}.png",
+                )
+            ],
         )
 
-    def _draw_bbox_pdf_elements_with_image(
-        self,
-        pdf_page_img_path: str,
-        page_number: int,
-        page_height: float,
-        pdf_elements: List[LTComponent],
-        out_dir: str,
-        pdf_name: str,
-        dpi: int = 500,
-    ) -> None:
-        try:
-            # https://stackoverflow.com/questions/68003007/how-to-extract-text-boxes-from-a-pdf-and-convert-them-to-image
-            pdf_page_img: Image.Image = Image.open(pdf_page_img_path)
-            plt.axis("off")
-            plt.imshow(pdf_page_img)  # , interpolation='none'
 
-            self._draw_bbox_pdf_elements(page_height, pdf_elements, dpi)
+def _bbox_overlays(
+    page_height: float, pdf_elements: List[LTComponent], dpi: int = 500
+) -> List[BBoxOverlay]:
+    adjusted_dpi: float = dpi / 72  # Convert PDF points to inches
+    page_height = int(page_height * adjusted_dpi)
+    overlays: List[BBoxOverlay] = []
 
-            if not is_valid_dir(f"{out_dir}/{pdf_name}"):
-                create_dir(f"{out_dir}/{pdf_name}", raise_error=False)
-            plt.savefig(
-                f"{out_dir}/{pdf_name}/{page_number}.png", dpi=dpi, bbox_inches="tight"
-            )
+    for element in pdf_elements:
+        # Correction PDF --> PIL
+        startY: int = page_height - int(element.y1 * adjusted_dpi)
+        endY: int = page_height - int(element.y0 * adjusted_dpi)
+        startX = int(element.x0 * adjusted_dpi)
+        endX = int(element.x1 * adjusted_dpi)
 
-            plt.cla()
-            plt.clf()
-            plt.close()
-        finally:
-            plt.close("all")
+        edgecolor: Color | None = None
+        if isinstance(element, LTRect):
+            edgecolor = (255, 0, 0)  # red
+        elif isinstance(element, LTTextContainer):
+            edgecolor = (255, 255, 0)  # yellow
+        elif isinstance(element, LTLine):
+            if element.height < 2:
+                edgecolor = (0, 0, 255)  # blue
+            else:
+                edgecolor = (0, 255, 0)  # green
+        elif isinstance(element, LTImage):
+            edgecolor = (0, 255, 255)  # cyan
+        elif isinstance(element, LTFigure):
+            edgecolor = (255, 0, 255)  # magenta
+        elif isinstance(element, LTCurve):
+            edgecolor = (0, 0, 0)  # black
 
-    def _draw_bbox_pdf_elements(
-        self, page_height: float, pdf_elements: List[LTComponent], dpi: int = 500
-    ) -> None:
-        adjusted_dpi: float = dpi / 72  # Convert PDF points to inches
-        vertical_shift = 5
-        page_height = int(page_height * adjusted_dpi)
-
-        for element in pdf_elements:
-            # Correction PDF --> PIL
-            startY: int = page_height - int(element.y1 * adjusted_dpi) - vertical_shift
-            endY: int = page_height - int(element.y0 * adjusted_dpi) - vertical_shift
-            startX = int(element.x0 * adjusted_dpi)
-            endX = int(element.x1 * adjusted_dpi)
-            rectWidth: int = endX - startX
-            rectHeight: int = endY - startY
-
-            edgecolor: Tuple[float, float, float] | None = None
-            if isinstance(element, LTRect):
-                edgecolor = (1, 0, 0)  # red
-            elif isinstance(element, LTTextContainer):
-                edgecolor = (1, 1, 0)  # yellow
-            elif isinstance(element, LTLine):
-                if element.height < 2:
-                    edgecolor = (0, 0, 1)  # blue
-                else:
-                    edgecolor = (0, 1, 0)  # green
-                # edgecolor = tuple(
-                #     c / 256 for c in numpy.random.choice(range(256), size=3)
-                # )  # blue
-            elif isinstance(element, LTImage):
-                edgecolor = (0, 1, 1)  # cyan
-            elif isinstance(element, LTFigure):
-                edgecolor = (1, 0, 1)  # magenta
-            elif isinstance(element, LTCurve):
-                edgecolor = (0, 0, 0)  # black
-
-            if edgecolor:
-
-                def make_rgb_transparent(
-                    rgb: Tuple[float, float, float],
-                    bg_rgb: Tuple[float, float, float],
-                    alpha: float,
-                ) -> Tuple[float, float, float, float]:
-                    return [
-                        alpha * c1 + (1 - alpha) * c2 for (c1, c2) in zip(rgb, bg_rgb)
-                    ]
-
-                facecolor: Tuple[float, float, float, float] = make_rgb_transparent(
-                    edgecolor, (1, 1, 1), 0.75
+        if edgecolor:
+            overlays.append(
+                (
+                    (
+                        startX,
+                        startY,
+                        endX if endX > startX else startX + 10,
+                        endY if endY > startY else startY + 10,
+                    ),
+                    edgecolor,
+                    max(1, round(getattr(element, "linewidth", 1) * adjusted_dpi)),
                 )
+            )
+    return overlays
 
-                plt.gca().add_patch(
-                    patches.Rectangle(
-                        (startX, startY),
-                        rectWidth if rectWidth > 0 else 10,
-                        rectHeight if rectHeight > 0 else 10,
-                        linewidth=element.linewidth
-                        if hasattr(element, "linewidth")
-                        else 1,
-                        edgecolor=edgecolor,
-                        facecolor=facecolor,
-                        alpha=0.75,
-                    )
-                )
+
+def _trace_overlays(
+    shapes: List[List[Any]], page_bbox: List[float], dpi: int = 150
+) -> List[BBoxOverlay]:
+    adjusted_dpi: float = dpi / 72  # Convert PDF points to inches
+    point_size: int = max(1, int(_TRACE_POINT_SIZE * adjusted_dpi))
+    overlays: List[BBoxOverlay] = []
+
+    for kind, group, x0, y0, x1, y1 in shapes:
+        # Correction PDF --> PIL, relative to the page origin
+        startX: int = int((x0 - page_bbox[0]) * adjusted_dpi)
+        endX: int = int((x1 - page_bbox[0]) * adjusted_dpi)
+        startY: int = int((page_bbox[3] - y1) * adjusted_dpi)
+        endY: int = int((page_bbox[3] - y0) * adjusted_dpi)
+
+        if kind == "PDFLTPointIntersect":
+            box: Tuple[int, int, int, int] = (
+                startX - point_size,
+                startY - point_size,
+                startX + point_size,
+                startY + point_size,
+            )
+        else:
+            box = (startX, startY, max(startX, endX), max(startY, endY))
+        overlays.append(
+            (
+                box,
+                _TRACE_GROUP_COLORS[group % len(_TRACE_GROUP_COLORS)]
+                if group is not None
+                else _TRACE_COLORS.get(kind, (0, 255, 255)),  # cyan
+                1,
+            )
+        )
+    return overlays
+
+
+def _write_overlays(
+    pdf_page_img_path: str, outputs: List[Tuple[List[BBoxOverlay], str]]
+) -> None:
+    """Writes overlay images of a page, one per output.
+
+    Boxes are alpha composited onto the page image one at a time, only over
+    the area they cover, and each area is restored once its output is written,
+    so the page image is loaded once for all the outputs.
+
+    Parameters
+    ----------
+    pdf_page_img_path : str
+        the page image path
+    outputs : List[Tuple[List[BBoxOverlay], str]]
+        the boxes to draw and the image path to write them to, per output
+    """
+    with Image.open(pdf_page_img_path) as pdf_page_img:
+        page_img: Image.Image = pdf_page_img.convert("RGB")
+
+    for overlays, out_path in outputs:
+        restore: List[Tuple[Image.Image, Tuple[int, int]]] = []
+        for box, edgecolor, linewidth in overlays:
+            # Clips the box to the page, keeping the outline inside it
+            x0, y0 = max(0, box[0]), max(0, box[1])
+            x1, y1 = min(page_img.width, box[2] + 1), min(page_img.height, box[3] + 1)
+            if x1 <= x0 or y1 <= y0:
+                continue
+
+            area: Image.Image = page_img.crop((x0, y0, x1, y1))
+            restore.append((area, (x0, y0)))
+            layer: Image.Image = Image.new("RGBA", area.size)
+            ImageDraw.Draw(layer).rectangle(
+                (box[0] - x0, box[1] - y0, box[2] - x0, box[3] - y0),
+                fill=(*_blend(edgecolor), _OVERLAY_ALPHA),
+                outline=(*edgecolor, _OVERLAY_ALPHA),
+                width=linewidth,
+            )
+            page_img.paste(
+                Image.alpha_composite(area.convert("RGBA"), layer).convert("RGB"),
+                (x0, y0),
+            )
+
+        create_dir(os.path.dirname(out_path), raise_error=True)
+        page_img.save(out_path, compress_level=_PNG_COMPRESS_LEVEL)
+        # Restores in reverse order, as later boxes may overlap earlier ones
+        for area, position in reversed(restore):
+            page_img.paste(area, position)
+
+
+def _blend(color: Color, alpha: float = 0.75) -> Color:
+    # Lightens the color towards white, as the box fill
+    return tuple(round(alpha * c + (1 - alpha) * 255) for c in color)
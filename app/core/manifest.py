@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+
+# Python Imports
+import os
+import json
+from logging import Logger, getLogger
+from typing import IO, Any, AnyStr, Dict, Literal, Optional, Self
+
+# Third-Party Imports
+
+# Local Imports
+from app.model.pdfs import PDFType
+from app.utils.files import file_digest
+from app.utils.paths import is_valid_file, make_path
+
+# Constants
+LOG: Logger = getLogger(__name__)
+MANIFEST_FILE_NAME: str = "manifest.jsonl"
+ManifestStatus = Literal["done", "error"]
+ManifestEntry = Dict[str, Any]
+
+
+class BatchManifest(object):
+    """The processed files of an output directory.
+
+    Records, for each processed file, its path, size, modification time,
+    content hash, status and the range of rows it was written to in the output
+    of its PDF type, so that a later batch over the same output directory can
+    skip the files that did not change and resume where an interrupted batch
+    stopped.
+
+    Entries are appended to a JSON Lines file as files are processed, the last
+    entry of a file superseding the previous ones, so that recording a file
+    does not rewrite the whole manifest.
+
+    Parameters
+    ----------
+    out_dir : AnyStr
+        the output directory
+    """
+
+    def __init__(self: Self, out_dir: AnyStr) -> None:
+        self.path: str = make_path(f"{out_dir}/{MANIFEST_FILE_NAME}")
+        self.entries: Dict[str, ManifestEntry] = {}
+        self.rows: Dict[PDFType, int] = {}
+        self._file: IO[str] | None = None
+
+    def load(self: Self) -> Self:
+        """Loads the entries of a previous batch, if any.
+
+        Returns
+        -------
+        Self
+            the manifest
+        """
+        if not is_valid_file(self.path):
+            return self
+        lines: int = 0
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry: ManifestEntry = json.loads(line)
+                except json.JSONDecodeError:
+                    # The last line is incomplete when a batch was killed
+                    # while writing it
+                    LOG.warning("Skipping malformed entry of '%s'", self.path)
+                    continue
+                lines += 1
+                self.entries[entry["path"]] = entry
+                if entry.get("rows") is not None:
+                    pdf_type: PDFType = entry["rows"]["type"]
+                    self.rows[pdf_type] = max(
+                        self.rows.get(pdf_type, 0), entry["rows"]["end"]
+                    )
+        if lines > 2 * len(self.entries):
+            self._compact()
+        LOG.debug("Loaded %d entries from '%s'", len(self.entries), self.path)
+        return self
+
+    def open(self: Self, append: bool = True) -> None:
+        if not append:
+            self.entries.clear()
+            self.rows.clear()
+        self._file = open(self.path, "a" if append else "w", encoding="utf-8")
+        if append and self._file.tell() > 0:
+            # Terminates a line left incomplete by a killed batch
+            with open(self.path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self._file.write("\n")
+
+    def close(self: Self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self: Self) -> Self:
+        self.open()
+        return self
+
+    def __exit__(self: Self, *args: Any) -> None:
+        self.close()
+
+    def is_unchanged(self: Self, file_path: str) -> bool:
+        """Whether a file was processed and has not changed since.
+
+        Files are compared by size and modification time first, and by content
+        hash when these differ, eg. when copied again, in which case the entry
+        is updated with the new modification time.
+
+        Parameters
+        ----------
+        file_path : str
+            the file path
+
+        Returns
+        -------
+        bool
+            whether the file can be skipped
+        """
+        entry: ManifestEntry | None = self.entries.get(os.path.abspath(file_path))
+        if entry is None or entry["status"] != "done":
+            return False
+        stat: os.stat_result = os.stat(file_path)
+        if stat.st_size != entry["size"]:
+            return False
+        if stat.st_mtime_ns == entry["mtime_ns"]:
+            return True
+        if file_digest(file_path) != entry["hash"]:
+            return False
+        self._append(entry | {"mtime_ns": stat.st_mtime_ns})
+        return True
+
+    def record(
+        self: Self,
+        file_path: str,
+        status: ManifestStatus,
+        pdf_type: Optional[PDFType] = None,
+        rows: int = 0,
+    ) -> ManifestEntry:
+        """Records a processed file.
+
+        Parameters
+        ----------
+        file_path : str
+            the file path
+        status : ManifestStatus
+            whether the file was written to the output or failed
+        pdf_type : PDFType, optional
+            the PDF type of the file, by default None
+        rows : int, optional
+            the number of rows written to the output, by default 0
+
+        Returns
+        -------
+        ManifestEntry
+            the recorded entry
+        """
+        stat: os.stat_result = os.stat(file_path)
+        entry: ManifestEntry = {
+            "path": os.path.abspath(file_path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "hash": file_digest(file_path),
+            "status": status,
+            "rows": None,
+        }
+        if status == "done" and pdf_type is not None:
+            start: int = self.rows.get(pdf_type, 0)
+            entry["rows"] = {"type": pdf_type, "start": start, "end": start + rows}
+            self.rows[pdf_type] = start + rows
+        self._append(entry)
+        return entry
+
+    def remove(self: Self, file_path: str) -> Optional[ManifestEntry]:
+        """Removes a file, eg. one that changed and is parsed again.
+
+        The rows recorded after the rows of the file, in the output of its PDF
+        type, are moved up to fill their range, as the outputs remove them, see
+        `OutputSink.remove`, and the manifest is rewritten.
+
+        Parameters
+        ----------
+        file_path : str
+            the file path
+
+        Returns
+        -------
+        ManifestEntry | None
+            the removed entry, if any
+        """
+        entry: ManifestEntry | None = self.entries.pop(
+            os.path.abspath(file_path), None
+        )
+        if entry is None:
+            return None
+        if entry.get("rows") is not None:
+            pdf_type: PDFType = entry["rows"]["type"]
+            start: int = entry["rows"]["start"]
+            removed: int = entry["rows"]["end"] - start
+            for other in self.entries.values():
+                rows: Dict[str, Any] | None = other.get("rows")
+                if (
+                    rows is not None
+                    and rows["type"] == pdf_type
+                    and rows["start"] >= start
+                ):
+                    other["rows"] = rows | {
+                        "start": rows["start"] - removed,
+                        "end": rows["end"] - removed,
+                    }
+            self.rows[pdf_type] = max(
+                (
+                    other["rows"]["end"]
+                    for other in self.entries.values()
+                    if other.get("rows") is not None
+                    and other["rows"]["type"] == pdf_type
+                ),
+                default=0,
+            )
+        reopen: bool = self._file is not None
+        self.close()
+        self._compact()
+        if reopen:
+            self._file = open(self.path, "a", encoding="utf-8")
+        return entry
+
+    def _append(self: Self, entry: ManifestEntry) -> None:
+        self.entries[entry["path"]] = entry
+        if self._file is not None:
+            self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._file.flush()
+
+    def _compact(self: Self) -> None:
+        tmp_path: str = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for entry in self.entries.values():
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.path)
+
+    def __repr__(self: Self) -> str:
+        return f"BatchManifest(path={self.path!r}, entries={len(self.entries)})"
+
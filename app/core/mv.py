@@ -27,21 +27,29 @@ from pdfminer.layout import (
 
 # Local Imports
 from app.model.pdfs import (
+    NULL_TRACE,
     PDFLTComponent,
     PDFLTComponentStyle,
+    PDFLTComposeStep,
     PDFLTComposer,
     PDFLTCurve,
+    PDFLTDecomposeStep,
+    PDFLTGridIntersections,
+    PDFLTIntersectStep,
     PDFLTMatchException,
     PDFLTMatchState,
     PDFLTParams,
-    PDFLTIntersections,
+    PDFLTPipeline,
+    PDFLTPipelineContext,
+    PDFLTTrace,
     PDFLTLine,
-    PDFLTDecomposer,
     PDFLTRect,
+    PDFLTRowsStep,
     PDFLTTextBox,
     PDFType,
     PDFLTMatchResult,
 )
+from app.utils.metrics import NULL_METRICS, Metrics
 
 # Constants
 LOG: Logger = getLogger(__name__)
@@ -216,21 +224,39 @@ class MVLTComposer(PDFLTComposer):
         self._assign_components_to_rects(crosses, rects)
 
 
+PIPELINE: PDFLTPipeline = (
+    PDFLTPipeline()
+    .step(PDFLTDecomposeStep())
+    .step(PDFLTIntersectStep(PDFLTGridIntersections))
+    .step(PDFLTComposeStep(MVLTComposer))
+    .step(PDFLTRowsStep())
+)
+
+
 def match_mv_pdf(
     pdf_pages: Iterator[LTPage],
     match_result: PDFLTMatchResult,
     df: DataFrame,
+    metrics: Metrics = NULL_METRICS,
+    trace: PDFLTTrace = NULL_TRACE,
 ) -> Generator[PDFLTMatchResult | Exception, None, None]:
-    LOG.debug(f"Matching {PDFType.MV} PDF...")
+    LOG.debug("Matching %s PDF...", PDFType.MV)
 
     try:
         state: PDFLTMatchState = {"task": "", "element": "", "subelement": ""}
-        while (pdf_page := next(pdf_pages, None)) is not None:
-            LOG.debug(f"Matching page {pdf_page.pageid}...")
-            _match_mv_pdf_page(pdf_page, state, match_result)
+        while True:
+            # pdfminer parses lazily, so layout analysis happens on `next`
+            with metrics.time("pdfminer"):
+                pdf_page: LTPage | None = next(pdf_pages, None)
+            if pdf_page is None:
+                break
+            LOG.debug("Matching page %d...", pdf_page.pageid)
+            metrics.count("pages")
+            _match_mv_pdf_page(pdf_page, state, match_result, metrics, trace)
             yield match_result
 
-        _fill_dataframe(match_result, df)
+        with metrics.time("fill"):
+            _fill_dataframe(match_result, df)
     except Exception as e:
         LOG.error(f"Error parsing {PDFType.MV} PDF:\n{e}")
         yield e
@@ -686,26 +712,18 @@ def _match_mv_pdf_page_n(
 
 
 def _match_mv_pdf_page(
-    pdf_page: LTPage, match_state: PDFLTMatchState, match_result: PDFLTMatchResult
+    pdf_page: LTPage,
+    match_state: PDFLTMatchState,
+    match_result: PDFLTMatchResult,
+    metrics: Metrics = NULL_METRICS,
+    trace: PDFLTTrace = NULL_TRACE,
 ) -> PDFLTMatchResult:
     params: PDFLTParams = PDFLTParams(position_tol=1.5)
-    decomposer: PDFLTDecomposer = PDFLTDecomposer(params)
-    intersects: PDFLTIntersections = PDFLTIntersections(params)
-    composer: PDFLTComposer = MVLTComposer(params)
-
-    lines: List[PDFLTLine] = decomposer.fit(pdf_page).predict()
-    rects: List[PDFLTRect] = intersects.fit(lines).predict()
-    layout: List[PDFLTRect] = composer.fit(rects).predict(pdf_page)
-
-    # Group y0 related rects into the same line
-    lines: List[List[PDFLTRect]] = []
-    for lt in layout:
-        if len(lines) == 0:
-            lines.append([lt])
-        elif abs(lt.y0 - lines[-1][0].y0) <= params.position_tol:
-            lines[-1].append(lt)
-        else:
-            lines.append([lt])
+    lines: List[List[PDFLTRect]]
+    context: PDFLTPipelineContext
+    lines, context = PIPELINE.run(pdf_page, params, trace)
+    metrics.add_timers(context.timings)
+    metrics.add_counters(context.counters)
 
     # Remove the last 2 lines containing the footer
     # Remove the first 2 lines containing the header
@@ -718,15 +736,16 @@ def _match_mv_pdf_page(
         # Line will either be page title or grayed-out page number, eg.'[1/8]'
         line: List[PDFLTRect] | None = next(lines_iter, None)
 
-        if pdf_page.pageid == 1:
-            # Match the first page
-            _match_mv_pdf_page_1(line, lines_iter, match_result)
-        else:
-            # Skips the grayed-out page number, eg.'[2/8]'
-            line = next(lines_iter, None)
+        with metrics.time("match"):
+            if pdf_page.pageid == 1:
+                # Match the first page
+                _match_mv_pdf_page_1(line, lines_iter, match_result)
+            else:
+                # Skips the grayed-out page number, eg.'[2/8]'
+                line = next(lines_iter, None)
 
-            # Match the rest of the pages
-            _match_mv_pdf_page_n(line, lines_iter, match_state, match_result)
+                # Match the rest of the pages
+                _match_mv_pdf_page_n(line, lines_iter, match_state, match_result)
         return match_result
     except StopIteration:
         raise PDFLTMatchException("PDF is not in the expected format")
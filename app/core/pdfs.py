@@ -1,14 +1,65 @@
 # -*- coding: utf-8 -*-
 
 # Python Imports
-from os.path import basename
+import os
+import re
+import csv
+import sys
+import json
+from abc import ABC, abstractmethod
+from os import cpu_count, sep
+from os.path import basename, commonpath, dirname, relpath
 from shutil import copyfile
+from asyncio import (
+    ALL_COMPLETED,
+    AbstractEventLoop,
+    CancelledError,
+    Future as AsyncFuture,
+    Queue as AsyncQueue,
+    Task,
+    get_running_loop,
+    wait,
+    wrap_future,
+)
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from functools import partial
+from hashlib import sha1
+from heapq import heappop, heappush
 from logging import getLogger, Logger
+from os.path import getsize
+from time import perf_counter
+from multiprocessing import Event as MPEvent, Queue as MPQueue
 from pathlib import Path
-from typing import Generator, Iterator, Tuple, AnyStr, Dict, List
+from queue import Empty, Full, Queue
+from threading import Event
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterable,
+    Callable,
+    Generator,
+    IO,
+    Iterator,
+    Literal,
+    Optional,
+    Self,
+    Sequence,
+    Set,
+    Tuple,
+    AnyStr,
+    Dict,
+    List,
+    get_args,
+)
 
 # Third-Party Imports
-from pandas import DataFrame, ExcelWriter
+from openpyxl import Workbook, load_workbook
+from pandas import DataFrame, ExcelWriter, concat
 from pypdf import PageObject, PdfReader
 from pdfminer.high_level import extract_pages
 from pdfminer.layout import LTPage, LAParams
@@ -17,16 +68,58 @@ from pdfminer.layout import LTPage, LAParams
 from app.config import settings
 from app.core import preventive
 from app.core import mv
+from app.core.manifest import BatchManifest, ManifestEntry, ManifestStatus
 from app.core.mv import match_mv_pdf
 from app.core.preventive import match_prev_pdf
-from app.model.pdfs import PDFType, PDFLTMatchException, PDFLTMatchResult
+from app.model.pdfs import (
+    NULL_TRACE,
+    PDFType,
+    PDFLTMatchException,
+    PDFLTMatchResult,
+    PDFLTTrace,
+)
 from app.utils.paths import is_valid_dir, is_valid_file, make_path, remove_extension
 from app.utils.files import create_dir, is_pdf_file
-from app.utils.pdfs import PDFUtils, PDFFormFields
+from app.utils.pdfs import PageCountKey, PDFUtils, PDFFormFields
 from app.utils.excel import ExcelUtils, ExcelCell
+from app.utils.metrics import NULL_METRICS, Metrics
+from app.utils.profiling import NULL_PROFILER, Profiler
+from app.utils.watchdog import BudgetExceeded, ParseBudget, Watchdog
 
 # Constants
 LOG: Logger = getLogger(__name__)
+ExecutorType = Literal["thread", "process"]
+OutputFormat = Literal["excel", "csv", "parquet", "sqlite"]
+OUTPUT_FORMATS: Tuple[OutputFormat, ...] = get_args(OutputFormat)
+JSONLinesRecords = Literal["document", "element"]
+FileCallback = Callable[[str, PDFLTMatchResult | Exception], None]
+MetricsCallback = Callable[[str, Metrics], None]
+_AsyncMessage = Tuple[int, int, Any]
+_ASYNC_EVENT: int = 0
+_ASYNC_DONE: int = 1
+_ASYNC_METRICS: int = 2
+_ASYNC_POLL_INTERVAL: float = 0.1
+_COST_WORKERS: int = 4
+_COST_WAIT: float = 0.1
+_COLUMNS: Dict[PDFType, List[str]] = {
+    PDFType.PREVENTIVE: preventive.COLUMNS,
+    PDFType.MV: mv.COLUMNS,
+}
+_ASYNC_CHANNEL: Tuple[Queue, Event] | None = None
+_ROW_GROUP_SIZE: int = 10_000
+_ManifestRecord = Tuple[str, ManifestStatus, Optional[PDFType], int]
+ShardSpec = Tuple[int, int]
+# Parsing seconds per page and per byte, measured on the reference reports
+_PAGE_COSTS: Dict[PDFType, float] = {
+    PDFType.PREVENTIVE: 0.2,
+    PDFType.MV: 0.12,
+    PDFType.UNKNOWN: 0.2,
+}
+_BYTE_COST: float = 4e-6
+_PDF_TYPE_HINTS: Tuple[Tuple[re.Pattern, PDFType], ...] = (
+    (re.compile(r"(?<![a-z])prev", re.IGNORECASE), PDFType.PREVENTIVE),
+    (re.compile(r"(?<![a-z])mv(?![a-z])", re.IGNORECASE), PDFType.MV),
+)
 
 
 def _resolve_pdf_type(first_page: PageObject) -> PDFType:
@@ -41,7 +134,10 @@ def _resolve_pdf_type(first_page: PageObject) -> PDFType:
 
 
 def parse_pdf(
-    pdf_path: str, dataframe: Dict[PDFType, DataFrame]
+    pdf_path: str,
+    dataframe: Dict[PDFType, DataFrame],
+    metrics: Metrics = NULL_METRICS,
+    trace: PDFLTTrace = NULL_TRACE,
 ) -> Generator[PDFLTMatchResult | Exception, None, None]:
     LOG.debug(f"Starting parsing of '{pdf_path}'...")
 
@@ -53,10 +149,11 @@ def parse_pdf(
     LOG.debug(f"File '{pdf_path}' is of PDF type. Proceeding...")
 
     LOG.debug("Resolving PDF type...")
-    pdf_reader = PdfReader(pdf_path)
-    pdf_pages: List[PageObject] = pdf_reader.pages
     match_result: PDFLTMatchResult = {"Tasks": {}}
-    match_result["Type"] = _resolve_pdf_type(pdf_pages[0])
+    with metrics.time("type"):
+        pdf_reader = PdfReader(pdf_path)
+        pdf_pages: List[PageObject] = pdf_reader.pages
+        match_result["Type"] = _resolve_pdf_type(pdf_pages[0])
     LOG.debug(f'Resolved PDF type: {match_result["Type"]}')
 
     # pdf_pages_iter: Iterator[LTPage] = extract_pages(
@@ -89,9 +186,10 @@ def parse_pdf(
         case PDFType.PREVENTIVE:
             # pdf_form_fields: Dict[str, Any] = PDFUtils.load_form_fields(pdf_path)
             # pdf_form_field_raw: List[Any] = PDFUtils.load_form_fields_raw(pdf_path)
-            pdf_form_fields: PDFFormFields | None = PDFUtils.load_form_fields_v2(
-                pdf_path
-            )
+            with metrics.time("form_fields"):
+                pdf_form_fields: PDFFormFields | None = PDFUtils.load_form_fields_v2(
+                    pdf_path
+                )
 
             # fields_with_t: PDFFormFields = sorted([field for field in pdf_form_fields_v2 if 'T' in field and str(field['T']).strip()], key=lambda x: x['T'])
             # fields_without_t: PDFFormFields = [field for field in pdf_form_fields_v2 if 'T' not in field or not str(field['T']).strip()]
@@ -120,13 +218,17 @@ def parse_pdf(
                 match_result,
                 dataframe[PDFType.PREVENTIVE],
                 pdf_form_fields,
+                metrics,
+                trace,
             )
             # LOG.debug(f'{json.dumps(parse_result, indent = 2, default = str)}')
         case PDFType.MV:
             pdf_pages_iter: Iterator[LTPage] = extract_pages(
                 pdf_path, laparams=LAParams(char_margin=1.0)
             )
-            yield from match_mv_pdf(pdf_pages_iter, match_result, dataframe[PDFType.MV])
+            yield from match_mv_pdf(
+                pdf_pages_iter, match_result, dataframe[PDFType.MV], metrics, trace
+            )
             # LOG.debug(f'{json.dumps(parse_result, indent = 2, default = str)}')
         case _:
             LOG.debug("Unknown PDF type")
@@ -137,53 +239,124 @@ def parse_pdf_gen(
     *,
     pdf_path: str,
     out_dir: AnyStr,
-    out_path: AnyStr,
-    excel_cell: ExcelCell,
+    sinks: Sequence["OutputSink"],
     df: Dict[PDFType, DataFrame],
+    metrics: Metrics = NULL_METRICS,
+    trace: PDFLTTrace = NULL_TRACE,
+    budget: Optional[ParseBudget] = None,
 ) -> Generator[Tuple[int, int, PDFLTMatchResult | Exception], None, None]:
-    page_count: int = PDFUtils.page_count(pdf_path)
+    start: float = perf_counter()
+    with metrics.time("page_count"):
+        page_count: int = PDFUtils.page_count(pdf_path)
     page_num = 0
+    records: int = sum([len(d) for d in df.values()])
 
     try:
         file_path: str = make_path(f"{pdf_path}")
         LOG.debug(f"Processing file '{file_path}'...")
 
         page_gen: Generator[PDFLTMatchResult | Exception] = parse_pdf(
-            f"{file_path}", df
+            f"{file_path}", df, metrics, trace
         )
-        while True:
-            try:
-                parse_result: PDFLTMatchResult | Exception = next(page_gen)
-                page_num += 1
-                if isinstance(parse_result, Exception):
-                    raise parse_result
-                yield (page_num, page_count, parse_result)
-            except StopIteration:
-                break
+        with Watchdog(budget, file_path) as watchdog:
+            while True:
+                try:
+                    with watchdog.page():
+                        parse_result: PDFLTMatchResult | Exception = next(page_gen)
+                    page_num += 1
+                    if isinstance(parse_result, Exception):
+                        raise watchdog.error(parse_result)
+                    yield (page_num, page_count, parse_result)
+                except StopIteration:
+                    break
 
         LOG.debug(f"Finished processing file '{file_path}'")
-        LOG.debug(f"Writing parsed result to Excel template '{out_path}'...")
+        metrics.count("records", sum([len(d) for d in df.values()]) - records)
+        _write_sinks(
+            sinks,
+            file_path,
+            parse_result,
+            df[parse_result["Type"]].iloc[records:],
+            metrics,
+        )
+
+        metrics.add_time("wall", perf_counter() - start)
+        yield (page_num, page_count, parse_result)
+
+    except Exception as e:
+        LOG.error(f"Error while parsing file '{file_path}':\n {e}")
+        metrics.count("errors")
+        metrics.add_time("wall", perf_counter() - start)
+        _copy_to_error_dir(file_path, out_dir, e)
+        yield (page_num, page_count, e)
+
+
+def _write_sinks(
+    sinks: Sequence["OutputSink"],
+    file_path: str,
+    match_result: PDFLTMatchResult,
+    rows: DataFrame,
+    metrics: Metrics = NULL_METRICS,
+) -> None:
+    for sink in sinks:
+        sink.write(file_path, match_result, rows, metrics)
+
+
+def _write_excel(
+    out_path: AnyStr,
+    excel_cell: ExcelCell,
+    rows: DataFrame,
+    pdf_type: PDFType,
+    metrics: Metrics = NULL_METRICS,
+    offset: int = 0,
+) -> None:
+    LOG.debug(f"Writing parsed result to Excel template '{out_path}'...")
+    # The workbook is rewritten whole, only its growth was written by this call
+    size: int = getsize(out_path) if metrics.enabled else 0
+    with metrics.time("excel"):
         with ExcelWriter(
             out_path, "openpyxl", if_sheet_exists="overlay", mode="a"
         ) as writer:
-            df[parse_result["Type"]].to_excel(
+            rows.to_excel(
                 excel_writer=writer,
                 index=False,
                 header=False,
-                startrow=excel_cell[1],
+                startrow=excel_cell[1] + offset,
                 startcol=excel_cell[0] - 1 if excel_cell[0] - 1 > 0 else 0,
-                sheet_name=parse_result["Type"],
+                sheet_name=pdf_type,
             )
-        LOG.debug(f"Parsed result written to Excel template '{out_path}'")
+    if metrics.enabled:
+        metrics.count("bytes_written", getsize(out_path) - size)
+    LOG.debug(f"Parsed result written to Excel template '{out_path}'")
 
-        yield (page_num, page_count, parse_result)
 
-    except Exception as e:
-        LOG.error(f"Error while parsing file '{file_path}':\n {e}")
-        error_dir: str = make_path(f"{out_dir}/error")
-        if create_dir(error_dir, raise_error=False):
-            copyfile(f"{file_path}", f"{error_dir}/{basename(file_path)}")
-        yield (page_num, page_count, e)
+def _copy_to_error_dir(
+    file_path: AnyStr, out_dir: AnyStr, error: Optional[Exception] = None
+) -> None:
+    error_dir: str = make_path(f"{out_dir}/error")
+    if create_dir(error_dir, raise_error=False):
+        copyfile(f"{file_path}", f"{error_dir}/{basename(file_path)}")
+        if isinstance(error, BudgetExceeded):
+            # Records why the file was stopped, it may well parse with more time
+            with open(
+                f"{error_dir}/{basename(file_path)}.reason.txt", "w", encoding="utf-8"
+            ) as reason:
+                reason.write(f"{error}\n")
+
+
+def _dump_trace(trace: PDFLTTrace, out_dir: AnyStr, idx: int) -> None:
+    # Named like the profiles, so that a file's trace and profile sort together
+    if not trace.enabled:
+        return
+    trace_dir: str = make_path(f"{out_dir}/traces")
+    trace_path: str = make_path(
+        f"{trace_dir}/{idx:04d}_{remove_extension(basename(trace.name))}.json"
+    )
+    try:
+        create_dir(trace_dir, raise_error=True)
+        trace.dump(trace_path)
+    except OSError as e:
+        LOG.error(f"Error while writing trace to '{trace_path}':\n {e}")
 
 
 def resolve_file_output(
@@ -227,26 +400,114 @@ def resolve_file_output(
     return excel_template_path
 
 
-def resolve_files(
-    pdfs_path: AnyStr | List[AnyStr],
-    out_dir: AnyStr,
-    excel_template: AnyStr,
-    split: bool = False,
-) -> Generator[Tuple[str, str], bool, None]:
-    files: Generator[Tuple[str, str], bool]
+def resolve_files(pdfs_path: AnyStr | List[AnyStr]) -> Iterator[str]:
+    files: Iterator[str]
     if is_valid_dir(pdfs_path):
         LOG.debug(f"Path '{pdfs_path}' is a valid directory")
-        files = Path(pdfs_path).rglob("*.pdf")
+        files = (make_path(f"{f}") for f in Path(pdfs_path).rglob("*.pdf"))
     elif is_valid_file(pdfs_path):
         LOG.debug(f"Path '{pdfs_path}' is a valid file")
         files = (f for f in [make_path(pdfs_path)])
     elif isinstance(pdfs_path, list):
-        LOG.debug(f"Path '{pdfs_path}' is a list of files")
+        # Lazily formatted, the list may hold thousands of paths
+        LOG.debug("Path '%s' is a list of files", pdfs_path)
         files = (make_path(f) for f in pdfs_path)
+    else:
+        raise FileNotFoundError(f"Path '{pdfs_path}' is not a file or directory")
+    yield from files
+
 
-    for f in files:
-        overwrite: bool = yield
-        yield (f, resolve_file_output(f, out_dir, excel_template, split, overwrite))
+def shard_files(files: Sequence[str], shard: ShardSpec) -> List[str]:
+    """Selects the files of a shard of a batch.
+
+    Each file is assigned on its own by rendezvous hashing, to the shard with
+    the highest hash of the shard index and the file path relative to the
+    batch root. Processes sharding the same files, whatever their order or the
+    root they were listed from, so select disjoint shards, of similar sizes on
+    average. Adding or removing files does not move the other files to another
+    shard, and changing the number of shards only moves the files that have to.
+
+    Parameters
+    ----------
+    files : Sequence[str]
+        the files of the batch
+    shard : ShardSpec
+        the 1-based index of the shard and the number of shards
+
+    Returns
+    -------
+    List[str]
+        the files of the shard, in batch order
+
+    Raises
+    ------
+    ValueError
+        when the shard index is not between 1 and the number of shards
+    """
+    index, count = shard
+    if not 1 <= index <= count:
+        raise ValueError(f"Shard {index}/{count} is not a valid shard")
+    if len(files) == 0:
+        return []
+
+    root: str = commonpath(files) if len(files) > 1 else dirname(files[0])
+    selected: List[str] = [
+        f
+        for f in files
+        if _rendezvous_shard(relpath(f, root).replace(sep, "/"), count) == index - 1
+    ]
+    LOG.debug(
+        "Shard %d/%d holds %d of %d files", index, count, len(selected), len(files)
+    )
+    return selected
+
+
+def _rendezvous_shard(key: str, count: int) -> int:
+    # The 0-based shard with the highest hash of the shard and the key
+    return max(
+        range(count), key=lambda k: sha1(f"{k}:{key}".encode("utf-8")).digest()
+    )
+
+
+def estimate_cost(file_path: str) -> float:
+    """Estimates the time it takes to parse a file, without parsing it.
+
+    The estimate grows with the page count, read from the page tree root only,
+    and with the file size, pages costing more for the PDF type hinted by the
+    file name, eg. "WK13_PREV_Y6.pdf", as resolving the type reads the first
+    page. Files that cannot be read are estimated at no cost, as they fail
+    before being parsed.
+
+    Parameters
+    ----------
+    file_path : str
+        the file path
+
+    Returns
+    -------
+    float
+        the estimated parsing time, in seconds
+    """
+    try:
+        page_count: int = PDFUtils.page_count(file_path)
+        size: int = getsize(file_path)
+    except Exception as e:
+        LOG.debug("Could not estimate the cost of '%s':\n %s", file_path, e)
+        return 0.0
+    pdf_type: PDFType = next(
+        (t for hint, t in _PDF_TYPE_HINTS if hint.search(basename(file_path))),
+        PDFType.UNKNOWN,
+    )
+    return page_count * _PAGE_COSTS[pdf_type] + size * _BYTE_COST
+
+
+def _estimate_file(file_path: str) -> Tuple[float, Tuple[PageCountKey, int] | None]:
+    # The page count made for the estimate is handed to the worker parsing the file
+    cost: float = estimate_cost(file_path)
+    try:
+        return cost, PDFUtils.cached_page_count(file_path)
+    except OSError:
+        return cost, None
 
 
 def setup_output(out_dir: str) -> None:
@@ -259,50 +520,1418 @@ def setup_output(out_dir: str) -> None:
         raise e
 
 
+class OutputSink(ABC):
+    """A destination for the parsed rows of a batch.
+
+    Sinks are opened once per batch, written once per parsed file, in input
+    order, and closed once the batch ends, even when it fails.
+
+    Parameters
+    ----------
+    out_dir : AnyStr
+        the directory to write the output to
+    split : bool, optional
+        whether to write one output per PDF, by default False
+    """
+
+    def __init__(self: Self, out_dir: AnyStr, split: bool = False) -> None:
+        self.out_dir: AnyStr = out_dir
+        self.split: bool = split
+
+    @property
+    @abstractmethod
+    def name(self: Self) -> str:
+        pass
+
+    def open(self: Self) -> None:
+        pass
+
+    @abstractmethod
+    def write(
+        self: Self,
+        file_path: str,
+        match_result: PDFLTMatchResult,
+        rows: DataFrame,
+        metrics: Metrics = NULL_METRICS,
+    ) -> None:
+        """Writes the rows parsed from a file.
+
+        Parameters
+        ----------
+        file_path : str
+            the parsed PDF file
+        match_result : PDFLTMatchResult
+            the match result of the file
+        rows : DataFrame
+            the rows parsed from the file, with the columns of its PDF type
+        metrics : Metrics, optional
+            the metrics of the file, by default NULL_METRICS
+        """
+        pass
+
+    def remove(self: Self, pdf_type: PDFType, start: int, end: int) -> None:
+        """Removes rows written to the output, eg. of a file parsed again.
+
+        The rows written after them are moved up to fill their range. Outputs
+        keyed by file, or streamed, keep them, the rows of a file parsed again
+        replacing, or following, its previous rows.
+
+        Parameters
+        ----------
+        pdf_type : PDFType
+            the PDF type of the rows
+        start : int
+            the index of the first row, among the rows of its PDF type written
+            by this and previous batches
+        end : int
+            the index following the last row
+        """
+        pass
+
+    @property
+    def flushed(self: Self) -> bool:
+        """Whether all the rows written so far reached the output."""
+        return True
+
+    def flush(self: Self) -> None:
+        """Writes the buffered rows, if any, to the output."""
+        pass
+
+    def close(self: Self) -> None:
+        pass
+
+    def __enter__(self: Self) -> Self:
+        self.open()
+        return self
+
+    def __exit__(self: Self, *args: Any) -> None:
+        self.close()
+
+    def __repr__(self: Self) -> str:
+        return (
+            f"{self.__class__.__name__}(out_dir={self.out_dir!r}, split={self.split})"
+        )
+
+
+class ExcelSink(OutputSink):
+    """Fills copies of the Excel template.
+
+    Rows are appended below the rows already in the template, or below the
+    rows of the previous files when not split, so each write only touches the
+    rows of a single file. When resuming a batch, rows are appended to the
+    existing output below the rows written by the previous batches.
+
+    Parameters
+    ----------
+    out_dir : AnyStr
+        the directory to write the output to
+    excel_template : AnyStr
+        the Excel template to fill
+    excel_cell : ExcelCell
+        the template cell where data starts
+    start_rows : Dict[PDFType, int], optional
+        the number of rows already in each template sheet, by default None
+    split : bool, optional
+        whether to write one Excel file per PDF, by default False
+    written_rows : Dict[PDFType, int], optional
+        the number of rows written to the output by previous batches, when
+        resuming a batch, by default None
+    """
+
+    def __init__(
+        self: Self,
+        out_dir: AnyStr,
+        excel_template: AnyStr,
+        excel_cell: ExcelCell,
+        start_rows: Optional[Dict[PDFType, int]] = None,
+        split: bool = False,
+        written_rows: Optional[Dict[PDFType, int]] = None,
+    ) -> None:
+        super().__init__(out_dir, split)
+        self.excel_template: AnyStr = excel_template
+        self.excel_cell: ExcelCell = excel_cell
+        self.start_rows: Dict[PDFType, int] = start_rows or {}
+        self.written_rows: Optional[Dict[PDFType, int]] = written_rows
+        self._rows: Dict[PDFType, int] = {
+            k: self.start_rows.get(k, 0) + (written_rows or {}).get(k, 0)
+            for k in {*self.start_rows, *(written_rows or {})}
+        }
+        self._out_path: str | None = None
+
+    @property
+    def name(self: Self) -> str:
+        return "excel"
+
+    def write(
+        self: Self,
+        file_path: str,
+        match_result: PDFLTMatchResult,
+        rows: DataFrame,
+        metrics: Metrics = NULL_METRICS,
+    ) -> None:
+        pdf_type: PDFType = match_result["Type"]
+        if self.split:
+            out_path: str = resolve_file_output(
+                file_path, self.out_dir, self.excel_template, True
+            )
+            _write_excel(
+                out_path,
+                self.excel_cell,
+                rows,
+                pdf_type,
+                metrics,
+                self.start_rows.get(pdf_type, 0),
+            )
+            return
+
+        if self._out_path is None:
+            # Copied on the first write, so that no output is left behind
+            # when no file is parsed
+            self._out_path = resolve_file_output(
+                file_path,
+                self.out_dir,
+                self.excel_template,
+                False,
+                self.written_rows is None,
+            )
+        _write_excel(
+            self._out_path,
+            self.excel_cell,
+            rows,
+            pdf_type,
+            metrics,
+            self._rows.get(pdf_type, 0),
+        )
+        self._rows[pdf_type] = self._rows.get(pdf_type, 0) + len(rows)
+
+    def remove(self: Self, pdf_type: PDFType, start: int, end: int) -> None:
+        # Split outputs are written again from the template with each file
+        if self.split or end <= start:
+            return
+        if self._out_path is None:
+            self._out_path = resolve_file_output(
+                "",
+                self.out_dir,
+                self.excel_template,
+                False,
+                self.written_rows is None,
+            )
+        LOG.debug(
+            "Removing %s rows %d-%d from '%s'", pdf_type, start, end, self._out_path
+        )
+        workbook: Workbook = load_workbook(self._out_path)
+        # Rows are written from the row below the start cell, see `_write_excel`
+        workbook[pdf_type].delete_rows(
+            self.excel_cell[1] + self.start_rows.get(pdf_type, 0) + start + 1,
+            end - start,
+        )
+        workbook.save(self._out_path)
+        self._rows[pdf_type] = self._rows.get(pdf_type, 0) - (end - start)
+
+
+class ColumnarSink(OutputSink):
+    """Writes the rows of each PDF type to a CSV or Parquet file.
+
+    Rows are buffered per PDF type and written in row groups of
+    `row_group_size` rows to `<PDFType>.csv` or `<PDFType>.parquet` in the
+    output directory, or in a directory per PDF when split. Rows are written
+    with the template columns of their PDF type, so that every row group of a
+    file has the same columns. Parquet files hold the columns as strings and
+    need `pyarrow`.
+
+    When appending, eg. when resuming a batch, rows are appended to existing
+    CSV files, while Parquet files, which cannot be appended to, are written
+    next to the existing ones as `<PDFType>.<n>.parquet`.
+
+    Parameters
+    ----------
+    out_dir : AnyStr
+        the directory to write the output to
+    output_format : Literal["csv", "parquet"], optional
+        the file format, by default "csv"
+    split : bool, optional
+        whether to write one set of files per PDF, by default False
+    row_group_size : int, optional
+        the number of rows buffered before being written, by default 10000
+    append : bool, optional
+        whether to append to the existing files, by default False
+    """
+
+    def __init__(
+        self: Self,
+        out_dir: AnyStr,
+        output_format: Literal["csv", "parquet"] = "csv",
+        split: bool = False,
+        row_group_size: int = _ROW_GROUP_SIZE,
+        append: bool = False,
+    ) -> None:
+        super().__init__(out_dir, split)
+        self.output_format: Literal["csv", "parquet"] = output_format
+        self.row_group_size: int = row_group_size
+        self.append: bool = append
+        self._buffers: Dict[PDFType, List[DataFrame]] = {}
+        self._buffered: Dict[PDFType, int] = {}
+        self._files: Dict[str, Any] = {}
+        self._schemas: Dict[PDFType, Any] = {}
+
+    @property
+    def name(self: Self) -> str:
+        return self.output_format
+
+    def open(self: Self) -> None:
+        if self.output_format == "parquet":
+            try:
+                import pyarrow.parquet  # noqa: F401
+            except ImportError as e:
+                raise ImportError(
+                    "Writing Parquet files needs pyarrow, install it with 'pip install pyarrow'"
+                ) from e
+
+    def write(
+        self: Self,
+        file_path: str,
+        match_result: PDFLTMatchResult,
+        rows: DataFrame,
+        metrics: Metrics = NULL_METRICS,
+    ) -> None:
+        pdf_type: PDFType = match_result["Type"]
+        with metrics.time(self.name):
+            if self.split:
+                out_file_dir: str = make_path(
+                    f"{self.out_dir}/{remove_extension(basename(file_path))}"
+                )
+                create_dir(out_file_dir, raise_error=True)
+                out_path: str = self._path(out_file_dir, pdf_type)
+                self._write(out_path, pdf_type, rows)
+                self._files.pop(out_path).close()
+                return
+
+            self._buffers.setdefault(pdf_type, []).append(rows)
+            self._buffered[pdf_type] = self._buffered.get(pdf_type, 0) + len(rows)
+            if self._buffered[pdf_type] >= self.row_group_size:
+                self._flush(pdf_type)
+
+    @property
+    def flushed(self: Self) -> bool:
+        return len(self._buffers) == 0
+
+    def remove(self: Self, pdf_type: PDFType, start: int, end: int) -> None:
+        # Split outputs are written again with each file
+        if self.split or end <= start:
+            return
+        self.flush()
+        out_path: str = self._path(self.out_dir, pdf_type)
+        if out_path in self._files:
+            self._files.pop(out_path).close()
+        # The rows written next are appended to the rewritten output
+        self.append = True
+        LOG.debug(
+            "Removing %s rows %d-%d from '%s'", pdf_type, start, end, out_path
+        )
+        if self.output_format == "parquet":
+            self._remove_parquet(out_path, start, end)
+            return
+        if not is_valid_file(out_path):
+            return
+        tmp_path: str = f"{out_path}.tmp"
+        with (
+            open(out_path, encoding="utf-8", newline="") as src,
+            open(tmp_path, "w", encoding="utf-8", newline="") as dst,
+        ):
+            # Parsed by the csv module, as values may span several lines
+            writer = csv.writer(dst, lineterminator=os.linesep)
+            for i, row in enumerate(csv.reader(src)):
+                # The first line is the header
+                if not start < i <= end:
+                    writer.writerow(row)
+        os.replace(tmp_path, out_path)
+
+    def _remove_parquet(self: Self, out_path: str, start: int, end: int) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        part_paths: List[str] = []
+        if is_valid_file(out_path):
+            part_paths.append(out_path)
+        part: int = 1
+        while is_valid_file(f"{remove_extension(out_path)}.{part}.parquet"):
+            part_paths.append(f"{remove_extension(out_path)}.{part}.parquet")
+            part += 1
+        if len(part_paths) == 0:
+            return
+        # Parts hold the rows of successive batches, they are merged into one
+        table: pa.Table = pa.concat_tables([pq.read_table(p) for p in part_paths])
+        table = pa.concat_tables([table.slice(0, start), table.slice(end)])
+        pq.write_table(table, f"{out_path}.tmp")
+        os.replace(f"{out_path}.tmp", out_path)
+        for part_path in part_paths[1:]:
+            os.remove(part_path)
+
+    def flush(self: Self) -> None:
+        for pdf_type in list(self._buffers):
+            self._flush(pdf_type)
+
+    def close(self: Self) -> None:
+        try:
+            self.flush()
+        finally:
+            for f in self._files.values():
+                f.close()
+            self._files.clear()
+
+    def _path(self: Self, out_dir: AnyStr, pdf_type: PDFType) -> str:
+        return make_path(f"{out_dir}/{pdf_type}.{self.output_format}")
+
+    def _flush(self: Self, pdf_type: PDFType) -> None:
+        buffered: List[DataFrame] = self._buffers.pop(pdf_type, [])
+        self._buffered.pop(pdf_type, None)
+        if len(buffered) > 0:
+            self._write(
+                self._path(self.out_dir, pdf_type), pdf_type, concat(buffered)
+            )
+
+    def _write(self: Self, out_path: str, pdf_type: PDFType, rows: DataFrame) -> None:
+        LOG.debug("Writing %d rows to '%s'...", len(rows), out_path)
+        columns: List[str] = _COLUMNS.get(pdf_type, list(rows.columns))
+        rows = rows.reindex(columns=columns)
+        if self.output_format == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            if pdf_type not in self._schemas:
+                self._schemas[pdf_type] = pa.schema(
+                    [(f"{c}", pa.string()) for c in columns]
+                )
+            schema: pa.Schema = self._schemas[pdf_type]
+            if out_path not in self._files:
+                self._files[out_path] = pq.ParquetWriter(
+                    self._part_path(out_path), schema
+                )
+            self._files[out_path].write_table(
+                pa.Table.from_pandas(
+                    rows.map(_to_str), schema=schema, preserve_index=False
+                )
+            )
+        else:
+            header: bool = out_path not in self._files
+            if header:
+                self._files[out_path] = open(
+                    out_path,
+                    "a" if self.append and not self.split else "w",
+                    encoding="utf-8",
+                    newline="",
+                )
+                # Appended files already have a header
+                header = self._files[out_path].tell() == 0
+            f: IO[str] = self._files[out_path]
+            rows.to_csv(f, index=False, header=header)
+            f.flush()
+
+    def _part_path(self: Self, out_path: str) -> str:
+        if not self.append or self.split or not is_valid_file(out_path):
+            return out_path
+        part: int = 1
+        while is_valid_file(f"{remove_extension(out_path)}.{part}.parquet"):
+            part += 1
+        return f"{remove_extension(out_path)}.{part}.parquet"
+
+
+def _to_str(value: Any) -> str | None:
+    # Values are mixed strings and numbers, missing values are kept as nulls
+    if value is None or value != value:
+        return None
+    return f"{value}"
+
+
+class JSONLinesSink(OutputSink):
+    """Streams the match results as JSON Lines.
+
+    Writes one JSON record per parsed file, holding its whole match result,
+    or one record per matched element, holding the fields of the file, the
+    merged fields of the task and element groups it belongs to and its own
+    fields. Records are flushed after each file, so that other processes can
+    consume them through a pipe while the batch is still being parsed.
+
+    Records are serialised with `orjson` when installed, falling back to the
+    `json` module, values that are not JSON types being written as strings.
+
+    Parameters
+    ----------
+    out_path : AnyStr
+        the JSON Lines file, or "-" for the standard output
+    records : JSONLinesRecords, optional
+        whether to write one record per "document" or per "element", by
+        default "document"
+    append : bool, optional
+        whether to append to the existing file, by default False
+    """
+
+    def __init__(
+        self: Self,
+        out_path: AnyStr,
+        records: JSONLinesRecords = "document",
+        append: bool = False,
+    ) -> None:
+        super().__init__(dirname(out_path) if out_path != "-" else "")
+        self.out_path: AnyStr = out_path
+        self.records: JSONLinesRecords = records
+        self.append: bool = append
+        self._file: IO[bytes] | None = None
+        self._dumps: Callable[[Any], bytes] = _dumps_json
+
+    @property
+    def name(self: Self) -> str:
+        return "jsonl"
+
+    def open(self: Self) -> None:
+        try:
+            import orjson
+
+            self._dumps = partial(
+                orjson.dumps, default=str, option=orjson.OPT_NON_STR_KEYS
+            )
+        except ImportError:
+            self._dumps = _dumps_json
+        if self.out_path == "-":
+            self._file = sys.stdout.buffer
+        else:
+            LOG.debug("Opening JSON Lines output '%s'...", self.out_path)
+            self._file = open(self.out_path, "ab" if self.append else "wb")
+
+    def write(
+        self: Self,
+        file_path: str,
+        match_result: PDFLTMatchResult,
+        rows: DataFrame,
+        metrics: Metrics = NULL_METRICS,
+    ) -> None:
+        with metrics.time(self.name):
+            records: Iterator[Dict[str, Any]] = (
+                _element_records(
+                    file_path,
+                    {k: v for k, v in match_result.items() if k != "Tasks"},
+                    [],
+                    {},
+                    match_result["Tasks"],
+                )
+                if self.records == "element"
+                else iter([{"File": file_path, **match_result}])
+            )
+            self._file.write(b"".join(self._dumps(r) + b"\n" for r in records))
+            self._file.flush()
+
+    def close(self: Self) -> None:
+        if self._file is not None and self._file is not sys.stdout.buffer:
+            self._file.close()
+        self._file = None
+
+
+def _dumps_json(value: Any) -> bytes:
+    return json.dumps(
+        value, ensure_ascii=False, separators=(",", ":"), default=str
+    ).encode("utf-8")
+
+
+def _element_records(
+    file_path: str,
+    document: Dict[str, Any],
+    path: List[str],
+    fields: Dict[str, Any],
+    elements: Dict[str, Any],
+) -> Iterator[Dict[str, Any]]:
+    # Preventive tasks group their elements, records are written for the
+    # leaves only, with the fields of the groups above them
+    for key, element in elements.items():
+        if isinstance(element, dict) and isinstance(element.get("Elements"), dict):
+            yield from _element_records(
+                file_path,
+                document,
+                [*path, key],
+                fields | {k: v for k, v in element.items() if k != "Elements"},
+                element["Elements"],
+            )
+        elif len(path) > 0:
+            yield {
+                "File": file_path,
+                **document,
+                "Path": [*path, key],
+                "Task": fields,
+                "Element": element,
+            }
+
+
+def create_sinks(
+    output_format: OutputFormat | Sequence[OutputFormat],
+    out_dir: AnyStr,
+    split: bool = False,
+    excel_template: AnyStr = settings().excel_template,
+    excel_cell: ExcelCell = (1, 1),
+    start_rows: Optional[Dict[PDFType, int]] = None,
+    jsonl: Optional[AnyStr] = None,
+    jsonl_records: JSONLinesRecords = "document",
+    written_rows: Optional[Dict[PDFType, int]] = None,
+) -> List[OutputSink]:
+    """Creates the sinks of the given output formats.
+
+    Parameters
+    ----------
+    output_format : OutputFormat | Sequence[OutputFormat]
+        the output format, or formats, see `OUTPUT_FORMATS`
+    out_dir : AnyStr
+        the directory to write the output to
+    split : bool, optional
+        whether to write one output per PDF, by default False
+    excel_template : AnyStr, optional
+        the Excel template to fill, by default the configured template
+    excel_cell : ExcelCell, optional
+        the template cell where data starts, by default (1, 1)
+    start_rows : Dict[PDFType, int], optional
+        the number of rows already in each template sheet, by default None
+    jsonl : AnyStr, optional
+        the JSON Lines file to stream the match results to, or "-" for the
+        standard output, by default None
+    jsonl_records : JSONLinesRecords, optional
+        whether to write one JSON record per "document" or per "element", by
+        default "document"
+    written_rows : Dict[PDFType, int], optional
+        the number of rows written to the output by previous batches, when
+        resuming a batch, in which case the sinks append to the existing
+        output, by default None
+
+    Returns
+    -------
+    List[OutputSink]
+        the sinks, in the order of the formats, followed by the JSON Lines sink
+    """
+    formats: Sequence[OutputFormat] = (
+        [output_format] if isinstance(output_format, str) else output_format
+    )
+    sinks: List[OutputSink] = []
+    for f in dict.fromkeys(formats):
+        match f:
+            case "excel":
+                sinks.append(
+                    ExcelSink(
+                        out_dir,
+                        excel_template,
+                        excel_cell,
+                        start_rows,
+                        split,
+                        written_rows,
+                    )
+                )
+            case "csv" | "parquet":
+                sinks.append(
+                    ColumnarSink(out_dir, f, split, append=written_rows is not None)
+                )
+            case "sqlite":
+                # Imported here as the store module builds on this one
+                from app.core.store import SQLiteSink
+
+                sinks.append(SQLiteSink(out_dir))
+            case _:
+                raise ValueError(
+                    f"Unknown output format '{f}', expected one of {OUTPUT_FORMATS}"
+                )
+    if jsonl is not None:
+        sinks.append(JSONLinesSink(jsonl, jsonl_records, written_rows is not None))
+    return sinks
+
+
+def write_outputs(
+    rows: Dict[PDFType, DataFrame],
+    out_dir: AnyStr,
+    excel_template: AnyStr = settings().excel_template,
+    excel_template_cell: ExcelCell = settings().excel_template_start_cell,
+    output_format: OutputFormat | Sequence[OutputFormat] = "excel",
+) -> None:
+    """Writes rows gathered from other outputs, eg. shards, to an output directory.
+
+    Parameters
+    ----------
+    rows : Dict[PDFType, DataFrame]
+        the rows of each PDF type, with the columns of its type
+    out_dir : AnyStr
+        the directory to write the output to
+    excel_template : AnyStr, optional
+        the Excel template to fill, by default the configured template
+    excel_template_cell : ExcelCell, optional
+        the template cell where data starts, by default the configured cell
+    output_format : OutputFormat | Sequence[OutputFormat], optional
+        the output format, or formats, see `OUTPUT_FORMATS`, by default "excel"
+    """
+    setup_output(out_dir)
+    excel_cell: ExcelCell = ExcelUtils.resolve_excel_cell(excel_template_cell)
+    df: Dict[PDFType, DataFrame] = ExcelUtils.read_excel(
+        file_path=excel_template,
+        columns={PDFType.PREVENTIVE: preventive.COLUMNS, PDFType.MV: mv.COLUMNS},
+        sheet_names=[PDFType.PREVENTIVE, PDFType.MV],
+        start_cell=excel_cell,
+    )
+    sinks: List[OutputSink] = create_sinks(
+        output_format,
+        out_dir,
+        False,
+        excel_template,
+        excel_cell,
+        {k: len(v) for k, v in df.items()},
+    )
+    for sink in sinks:
+        with sink:
+            # One write per PDF type, the Excel workbook being rewritten on
+            # each write
+            for pdf_type, type_rows in rows.items():
+                sink.write(f"{out_dir}", {"Type": pdf_type, "Tasks": {}}, type_rows)
+
+
 def parse_pdfs(
     pdfs_path: AnyStr | List[AnyStr],
     out_dir: AnyStr,
     split: bool = False,
     excel_template: AnyStr = settings().excel_template,
     excel_template_cell: ExcelCell = settings().excel_template_start_cell,
+    metrics: bool = False,
+    profiler: Profiler = NULL_PROFILER,
+    on_file: Optional[FileCallback] = None,
+    on_metrics: Optional[MetricsCallback] = None,
+    trace: bool = False,
+    output_format: OutputFormat | Sequence[OutputFormat] = "excel",
+    jsonl: Optional[AnyStr] = None,
+    jsonl_records: JSONLinesRecords = "document",
+    incremental: bool = False,
+    shard: Optional[ShardSpec] = None,
+    budget: Optional[ParseBudget] = None,
 ) -> Generator[Tuple[int, int, PDFLTMatchResult | Exception], None, None]:
     LOG.debug(
         f"Parsing PDFs from '{pdfs_path}' to '{out_dir}' using template '{excel_template}'..."
     )
+    start: float = perf_counter()
+    batch_metrics: Metrics = (
+        Metrics("batch") if metrics or on_metrics is not None else NULL_METRICS
+    )
+    sinks: List[OutputSink] = []
+    manifest: BatchManifest = BatchManifest(out_dir)
+    pending: List[_ManifestRecord] = []
 
     try:
         setup_output(out_dir)
+        if incremental:
+            manifest.load()
 
-        files: Generator[Tuple[str, str], bool] = resolve_files(
-            pdfs_path, out_dir, excel_template, split
-        )
+        files: Iterator[str] = resolve_files(pdfs_path)
+        if shard is not None:
+            files = iter(shard_files(list(files), shard))
 
         LOG.debug(f"Reading Excel template from '{excel_template}'...")
+        excel_cell: ExcelCell = ExcelUtils.resolve_excel_cell(excel_template_cell)
         df: Dict[str, DataFrame] = ExcelUtils.read_excel(
             file_path=excel_template,
             columns={PDFType.PREVENTIVE: preventive.COLUMNS, PDFType.MV: mv.COLUMNS},
             sheet_names=[PDFType.PREVENTIVE, PDFType.MV],
-            start_cell=ExcelUtils.resolve_excel_cell(excel_template_cell),
+            start_cell=excel_cell,
         )
         LOG.debug(f"Excel template read from '{excel_template}'")
 
-        idx = 0
-        while True:
-            try:
-                next(files)
-                f, o = files.send(True if idx == 0 else False)
-                idx += 1
-                yield from parse_pdf_gen(
+        sinks = create_sinks(
+            output_format,
+            out_dir,
+            split,
+            excel_template,
+            excel_cell,
+            {k: len(v) for k, v in df.items()},
+            jsonl,
+            jsonl_records,
+            dict(manifest.rows) if incremental else None,
+        )
+        manifest.open(append=incremental)
+        for sink in sinks:
+            sink.open()
+
+        for idx, f in enumerate(files, 1):
+            if incremental and _is_unchanged_file(manifest, f):
+                LOG.debug("Skipping unchanged file '%s'", f)
+                batch_metrics.count("skipped")
+                continue
+            if incremental:
+                _remove_previous_rows(manifest, sinks, pending, f)
+            file_metrics: Metrics = batch_metrics.child(f"{f}")
+            file_trace: PDFLTTrace = PDFLTTrace(f) if trace else NULL_TRACE
+            # Each file is parsed into empty frames, the sinks only ever
+            # receive the rows of the file being written
+            file_df: Dict[PDFType, DataFrame] = {
+                k: v.iloc[0:0].copy() for k, v in df.items()
+            }
+            with profiler.profile(f"{idx:04d}_{remove_extension(basename(f))}"):
+                # The last event of each file is either its written result
+                # or the error that stopped it
+                event: Tuple[int, int, PDFLTMatchResult | Exception] | None = None
+                for event in parse_pdf_gen(
                     pdf_path=f,
                     out_dir=out_dir,
-                    out_path=o,
-                    excel_cell=ExcelUtils.resolve_excel_cell(excel_template_cell),
-                    df=df,
-                )
-            except StopIteration:
-                break
+                    sinks=sinks,
+                    df=file_df,
+                    metrics=file_metrics,
+                    trace=file_trace,
+                    budget=budget,
+                ):
+                    yield event
+            _dump_trace(file_trace, out_dir, idx)
+            if event is not None:
+                pending.append(_manifest_record(f, event[2], file_df))
+                _record_manifest(manifest, sinks, pending)
+            if on_file is not None and event is not None:
+                on_file(f, event[2])
+            if on_metrics is not None:
+                on_metrics(f, file_metrics)
+            batch_metrics.merge(file_metrics)
+            batch_metrics.count("files")
     except Exception as e:
         LOG.error(
             f"Unexcepted exception while parsing PDFs from {pdfs_path} to {out_dir}:\n {e}"
         )
         yield e
+    finally:
+        _close_sinks(sinks)
+        _record_manifest(manifest, sinks, pending)
+        manifest.close()
+        if metrics:
+            batch_metrics.timers["wall"] = perf_counter() - start
+            try:
+                batch_metrics.dump(make_path(f"{out_dir}/metrics.json"))
+            except OSError as e:
+                LOG.error(f"Error while writing metrics to '{out_dir}':\n {e}")
+
+
+def _manifest_record(
+    file_path: str,
+    result: PDFLTMatchResult | Exception,
+    df: Dict[PDFType, DataFrame],
+) -> _ManifestRecord:
+    if isinstance(result, Exception):
+        return (file_path, "error", None, 0)
+    return (file_path, "done", result["Type"], len(df[result["Type"]]))
+
+
+def _record_manifest(
+    manifest: BatchManifest,
+    sinks: Sequence[OutputSink],
+    pending: List[_ManifestRecord],
+) -> None:
+    # Files are only recorded once their rows reached every output, so that a
+    # resumed batch parses again the files whose rows were still buffered
+    if not all(sink.flushed for sink in sinks):
+        return
+    for record in pending:
+        try:
+            manifest.record(*record)
+        except OSError as e:
+            LOG.error(f"Error while recording '{record[0]}' to the manifest:\n {e}")
+    pending.clear()
+
+
+def _remove_previous_rows(
+    manifest: BatchManifest,
+    sinks: Sequence[OutputSink],
+    pending: List[_ManifestRecord],
+    file_path: str,
+) -> None:
+    # A changed file parsed again replaces its previous rows, rather than
+    # being written twice, the rows buffered so far being written first so
+    # that the recorded row ranges match the outputs
+    if os.path.abspath(file_path) not in manifest.entries and not any(
+        record[0] == file_path for record in pending
+    ):
+        return
+    _flush_sinks(sinks)
+    _record_manifest(manifest, sinks, pending)
+    entry: ManifestEntry | None = manifest.entries.get(os.path.abspath(file_path))
+    if entry is None:
+        return
+    try:
+        if entry.get("rows") is not None:
+            for sink in sinks:
+                sink.remove(
+                    entry["rows"]["type"], entry["rows"]["start"], entry["rows"]["end"]
+                )
+        manifest.remove(file_path)
+    except Exception as e:
+        LOG.error(f"Error while removing the previous rows of '{file_path}':\n {e}")
+
+
+def _filter_unchanged_files(manifest: BatchManifest, files: List[str]) -> List[str]:
+    changed: List[str] = [f for f in files if not _is_unchanged_file(manifest, f)]
+    if len(changed) < len(files):
+        LOG.info("Skipping %d unchanged files", len(files) - len(changed))
+    return changed
+
+
+def _is_unchanged_file(manifest: BatchManifest, file_path: str) -> bool:
+    try:
+        return manifest.is_unchanged(file_path)
+    except OSError as e:
+        # Eg. a file removed since it was listed, which parsing reports
+        LOG.debug("Could not compare file '%s' to the manifest: %s", file_path, e)
+        return False
+
+
+def _resolve_file_list(pdfs_path: AnyStr | List[AnyStr]) -> List[str]:
+    return list(resolve_files(pdfs_path))
+
+
+def _emit(events: Queue, cancelled: Event, message: _AsyncMessage) -> None:
+    # Blocks while the consumer is not draining events (backpressure) but keeps
+    # checking for cancellation so that workers never deadlock on a full queue
+    while True:
+        try:
+            events.put(message, timeout=_ASYNC_POLL_INTERVAL)
+            return
+        except Full:
+            if cancelled.is_set():
+                raise CancelledError()
+
+
+def _init_aparse_worker(events: Queue, cancelled: Event) -> None:
+    global _ASYNC_CHANNEL
+    # Pending events are of no use once the batch is cancelled, so a worker
+    # process must not hang on exit trying to flush them
+    events.cancel_join_thread()
+    _ASYNC_CHANNEL = (events, cancelled)
+
+
+def _aparse_pdf_process_worker(
+    idx: int,
+    pdf_path: str,
+    out_dir: AnyStr,
+    df: Dict[PDFType, DataFrame],
+    metrics: bool = False,
+    trace: bool = False,
+    budget: Optional[ParseBudget] = None,
+    page_count: Optional[Tuple[PageCountKey, int]] = None,
+) -> None:
+    _aparse_pdf_worker(
+        idx,
+        pdf_path,
+        out_dir,
+        df,
+        *_ASYNC_CHANNEL,
+        metrics,
+        trace,
+        budget,
+        page_count,
+    )
+
+
+def _aparse_pdf_worker(
+    idx: int,
+    pdf_path: str,
+    out_dir: AnyStr,
+    df: Dict[PDFType, DataFrame],
+    events: Queue,
+    cancelled: Event,
+    metrics: bool = False,
+    trace: bool = False,
+    budget: Optional[ParseBudget] = None,
+    counted: Optional[Tuple[PageCountKey, int]] = None,
+) -> None:
+    start: float = perf_counter()
+    page_count: int = 0
+    page_num: int = 0
+    file_path: str = pdf_path
+    file_metrics: Metrics = Metrics(pdf_path) if metrics else NULL_METRICS
+    file_trace: PDFLTTrace = (
+        PDFLTTrace(make_path(f"{pdf_path}")) if trace else NULL_TRACE
+    )
+
+    try:
+        if counted is not None:
+            # Counted when estimating the cost, the page count cache of
+            # worker processes would not hold it
+            PDFUtils.cache_page_count(*counted)
+        with file_metrics.time("page_count"):
+            page_count = PDFUtils.page_count(pdf_path)
+        file_path = make_path(f"{pdf_path}")
+        LOG.debug(f"Processing file '{file_path}'...")
+
+        page_gen: Generator[PDFLTMatchResult | Exception] = parse_pdf(
+            f"{file_path}", df, file_metrics, file_trace
+        )
+        try:
+            # Cancellation is checked between pages as pdfminer cannot be
+            # interrupted while laying out a page, unlike by the watchdog
+            with Watchdog(budget, file_path) as watchdog:
+                while not cancelled.is_set():
+                    try:
+                        with watchdog.page():
+                            parse_result: PDFLTMatchResult | Exception = next(
+                                page_gen
+                            )
+                    except StopIteration:
+                        break
+                    page_num += 1
+                    if isinstance(parse_result, Exception):
+                        raise watchdog.error(parse_result)
+                    _emit(
+                        events,
+                        cancelled,
+                        (idx, _ASYNC_EVENT, (page_num, page_count, parse_result)),
+                    )
+        finally:
+            page_gen.close()
+            # Written by the worker, traces are not sent back to the consumer
+            _dump_trace(file_trace, out_dir, idx + 1)
+
+        if cancelled.is_set():
+            raise CancelledError()
+
+        LOG.debug(f"Finished processing file '{file_path}'")
+        if file_metrics.enabled:
+            file_metrics.count("records", sum([len(d) for d in df.values()]))
+            file_metrics.add_time("wall", perf_counter() - start)
+            _emit(events, cancelled, (idx, _ASYNC_METRICS, file_metrics))
+        _emit(
+            events,
+            cancelled,
+            (idx, _ASYNC_DONE, (page_num, page_count, parse_result, df)),
+        )
+    except CancelledError:
+        LOG.debug(f"Cancelled processing of file '{file_path}' at page {page_num}")
+    except Exception as e:
+        LOG.error(f"Error while parsing file '{file_path}':\n {e}")
+        _copy_to_error_dir(file_path, out_dir, e)
+        try:
+            _emit(events, cancelled, (idx, _ASYNC_EVENT, (page_num, page_count, e)))
+            if file_metrics.enabled:
+                file_metrics.count("errors")
+                file_metrics.add_time("wall", perf_counter() - start)
+                _emit(events, cancelled, (idx, _ASYNC_METRICS, file_metrics))
+            _emit(events, cancelled, (idx, _ASYNC_DONE, None))
+        except CancelledError:
+            pass
+
+
+def _flush_sinks(sinks: Sequence[OutputSink]) -> None:
+    for sink in sinks:
+        try:
+            sink.flush()
+        except Exception as e:
+            LOG.error(f"Error while flushing the {sink.name} output:\n {e}")
+
+
+def _close_sinks(sinks: Sequence[OutputSink]) -> None:
+    for sink in sinks:
+        try:
+            sink.close()
+        except Exception as e:
+            LOG.error(f"Error while closing the {sink.name} output:\n {e}")
+
+
+def _warm_aparse_worker() -> None:
+    pass
+
+
+async def _feed_files(files: AsyncIterable[str], arrivals: AsyncQueue) -> None:
+    try:
+        async for f in files:
+            await arrivals.put(make_path(f))
+    except Exception as e:
+        LOG.error(f"Error while streaming PDFs:\n {e}")
+    finally:
+        arrivals.put_nowait(None)
+
+
+def _next_message(events: Queue) -> _AsyncMessage | None:
+    try:
+        return events.get(timeout=_ASYNC_POLL_INTERVAL)
+    except Empty:
+        return None
+
+
+async def aparse_pdfs(
+    pdfs_path: AnyStr | List[AnyStr] | AsyncIterable[str],
+    out_dir: AnyStr,
+    split: bool = False,
+    excel_template: AnyStr = settings().excel_template,
+    excel_template_cell: ExcelCell = settings().excel_template_start_cell,
+    *,
+    executor: ExecutorType = "thread",
+    max_workers: Optional[int] = None,
+    max_pending: int = 64,
+    on_file: Optional[FileCallback] = None,
+    on_metrics: Optional[MetricsCallback] = None,
+    trace: bool = False,
+    output_format: OutputFormat | Sequence[OutputFormat] = "excel",
+    jsonl: Optional[AnyStr] = None,
+    jsonl_records: JSONLinesRecords = "document",
+    incremental: bool = False,
+    shard: Optional[ShardSpec] = None,
+    budget: Optional[ParseBudget] = None,
+) -> AsyncGenerator[Tuple[int, int, PDFLTMatchResult | Exception], None]:
+    """Asynchronous counterpart of `parse_pdfs`.
+
+    Parses the PDFs in a thread or process pool, yielding the same
+    `(page_num, page_count, result)` events as `parse_pdfs` as soon as each page
+    is matched. At most `max_workers` files are parsed concurrently and at most
+    `max_pending` events are buffered before workers block, so a slow consumer
+    throttles parsing. Files are dispatched longest first, as estimated by
+    `estimate_cost`, so that large files do not end a batch parsed by a single
+    worker, while parsed rows are still written to the output sinks in input
+    order, regardless of the order in which files finish. Costs are estimated
+    concurrently with parsing, idle workers waiting up to 0.1s for the
+    estimates, so that a short batch is dispatched longest first while a long
+    one starts without reading every file first. The page counts read for the
+    estimates are handed to the workers, which do not read them again.
+
+    The PDFs may also be streamed, eg. from `watch_pdfs`, in which case files
+    are parsed as they arrive, the worker pool being started upfront and the
+    output sinks being kept open until the stream ends.
+
+    Closing the generator, or cancelling the task iterating it, stops all
+    in-flight parsing at the next page boundary.
+
+    Parameters
+    ----------
+    pdfs_path : AnyStr | List[AnyStr] | AsyncIterable[str]
+        the PDF file, directory, list or stream of PDF files to parse
+    out_dir : AnyStr
+        the directory to write the output to
+    split : bool, optional
+        whether to write one output file per PDF, by default False
+    excel_template : AnyStr, optional
+        the Excel template to fill, by default the configured template
+    excel_template_cell : ExcelCell, optional
+        the template cell where data starts, by default the configured cell
+    executor : ExecutorType, optional
+        whether to parse in a thread or a process pool, by default "thread"
+    max_workers : int, optional
+        the maximum number of files parsed concurrently, by default the CPU count
+    max_pending : int, optional
+        the maximum number of buffered events, by default 64
+    on_file : FileCallback, optional
+        called, in input order, with each file path and its written match result
+        or the error that stopped it, by default None
+    on_metrics : MetricsCallback, optional
+        called, in input order, with each file path and its `Metrics`, after
+        `on_file`, by default None, in which case no metrics are collected
+    trace : bool, optional
+        whether to capture the layout pipeline step outputs of each file to
+        `traces/` in the output directory, by default False
+    output_format : OutputFormat | Sequence[OutputFormat], optional
+        the output format, or formats, see `OUTPUT_FORMATS`, by default "excel"
+    jsonl : AnyStr, optional
+        the JSON Lines file to stream the match results to, or "-" for the
+        standard output, by default None
+    jsonl_records : JSONLinesRecords, optional
+        whether to write one JSON record per "document" or per "element", by
+        default "document"
+    incremental : bool, optional
+        whether to skip the files recorded unchanged in the manifest of the
+        output directory and append to its outputs, by default False
+    shard : ShardSpec, optional
+        the 1-based index of the shard of the files to parse and the number of
+        shards, see `shard_files`, by default None to parse all the files
+    budget : ParseBudget, optional
+        the time and memory limits on parsing each file, enforced by a watchdog
+        in the worker, files exceeding them being copied to `error/` with the
+        reason, by default None for no limits, the memory limit being only
+        enforced with the "process" executor
+
+    Yields
+    ------
+    Tuple[int, int, PDFLTMatchResult | Exception]
+        the page number, page count and match result or error for each page
+
+    Raises
+    ------
+    ValueError
+        when a memory limit is set with the "thread" executor
+    """
+
+    if executor == "thread" and budget is not None and budget.max_memory is not None:
+        # Threads share the resident memory, so files would count each other's
+        raise ValueError(
+            "The memory budget is enforced per process, it requires the "
+            "process executor"
+        )
+    LOG.debug(
+        f"Parsing PDFs asynchronously from '{pdfs_path}' to '{out_dir}' using template '{excel_template}'..."
+    )
+    loop: AbstractEventLoop = get_running_loop()
+    sinks: List[OutputSink] = []
+    manifest: BatchManifest = BatchManifest(out_dir)
+    records: List[_ManifestRecord] = []
+    files: List[str] = []
+    # Streamed files are fed in by a task, the end of the stream being None
+    arrivals: AsyncQueue[str | None] | None = None
+    feeder: Task | None = None
+
+    try:
+        await loop.run_in_executor(None, setup_output, out_dir)
+        if isinstance(pdfs_path, AsyncIterable):
+            arrivals = AsyncQueue()
+            feeder = loop.create_task(_feed_files(pdfs_path, arrivals))
+        else:
+            files = await loop.run_in_executor(None, _resolve_file_list, pdfs_path)
+            if shard is not None:
+                files = await loop.run_in_executor(None, shard_files, files, shard)
+        if incremental:
+            await loop.run_in_executor(None, manifest.load)
+
+        LOG.debug(f"Reading Excel template from '{excel_template}'...")
+        excel_cell: ExcelCell = ExcelUtils.resolve_excel_cell(excel_template_cell)
+        df: Dict[PDFType, DataFrame] = await loop.run_in_executor(
+            None,
+            partial(
+                ExcelUtils.read_excel,
+                file_path=excel_template,
+                columns={
+                    PDFType.PREVENTIVE: preventive.COLUMNS,
+                    PDFType.MV: mv.COLUMNS,
+                },
+                sheet_names=[PDFType.PREVENTIVE, PDFType.MV],
+                start_cell=excel_cell,
+            ),
+        )
+        LOG.debug(f"Excel template read from '{excel_template}'")
+
+        sinks = create_sinks(
+            output_format,
+            out_dir,
+            split,
+            excel_template,
+            excel_cell,
+            {k: len(v) for k, v in df.items()},
+            jsonl,
+            jsonl_records,
+            dict(manifest.rows) if incremental else None,
+        )
+        await loop.run_in_executor(None, partial(manifest.open, append=incremental))
+        if incremental:
+            files = await loop.run_in_executor(
+                None, _filter_unchanged_files, manifest, files
+            )
+        for sink in sinks:
+            await loop.run_in_executor(None, sink.open)
+    except Exception as e:
+        LOG.error(
+            f"Unexpected exception while parsing PDFs from {pdfs_path} to {out_dir}:\n {e}"
+        )
+        _close_sinks(sinks)
+        manifest.close()
+        if feeder is not None:
+            feeder.cancel()
+        yield e
+        return
+
+    if len(files) == 0 and arrivals is None:
+        _close_sinks(sinks)
+        manifest.close()
+        return
+
+    workers: int = max(
+        1,
+        min(
+            max_workers or cpu_count() or 1,
+            len(files) if arrivals is None else sys.maxsize,
+        ),
+    )
+    events: Queue
+    cancelled: Event
+    pool: Executor
+    if executor == "process":
+        events = MPQueue(max_pending)
+        cancelled = MPEvent()
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_aparse_worker,
+            initargs=(events, cancelled),
+        )
+    else:
+        events = Queue(max_pending)
+        cancelled = Event()
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="aparse")
+    if arrivals is not None and executor == "process":
+        # Starts the worker processes before the first file arrives
+        for _ in range(workers):
+            pool.submit(_warm_aparse_worker)
+
+    # Costs are estimated in their own threads, the default executor relays
+    # the worker messages
+    cost_pool: ThreadPoolExecutor = ThreadPoolExecutor(
+        max_workers=_COST_WORKERS, thread_name_prefix="aparse-cost"
+    )
+    estimating: Dict[AsyncFuture, int] = {
+        wrap_future(cost_pool.submit(_estimate_file, f)): i for i, f in enumerate(files)
+    }
+    page_counts: Dict[int, Tuple[PageCountKey, int] | None] = {}
+    # Estimated files to dispatch, the longest first, then in input order
+    pending: List[Tuple[float, int]] = []
+    running: Dict[int, Future] = {}
+    finished: Dict[int, Tuple[int, int, PDFLTMatchResult, Dict] | None] = {}
+    errors: Dict[int, Exception] = {}
+    file_metrics: Dict[int, Metrics] = {}
+    next_flush: int = 0
+
+    try:
+        while next_flush < len(files) or arrivals is not None:
+            if arrivals is not None:
+                # Waits for files when idle, otherwise takes those arrived
+                idle: bool = next_flush == len(files)
+                if idle:
+                    # Buffered rows would otherwise wait for the next files
+                    await loop.run_in_executor(None, _flush_sinks, sinks)
+                    await loop.run_in_executor(
+                        None, _record_manifest, manifest, sinks, records
+                    )
+                while idle or not arrivals.empty():
+                    arrival: str | None = await arrivals.get()
+                    if arrival is None:
+                        arrivals = None
+                        break
+                    if incremental and await loop.run_in_executor(
+                        None, _is_unchanged_file, manifest, arrival
+                    ):
+                        continue
+                    estimating[
+                        wrap_future(cost_pool.submit(_estimate_file, arrival))
+                    ] = len(files)
+                    files.append(arrival)
+                    idle = False
+                if next_flush == len(files):
+                    continue
+
+            if len(estimating) > 0 and len(running) < workers:
+                # Idle workers wait a little for the estimates of other files
+                done: Set[AsyncFuture]
+                done, _ = await wait(
+                    estimating,
+                    timeout=_COST_WAIT if len(pending) == 0 else 0,
+                    return_when=ALL_COMPLETED,
+                )
+                for future in done:
+                    idx: int = estimating.pop(future)
+                    cost: float
+                    counted: Tuple[PageCountKey, int] | None
+                    cost, counted = future.result()
+                    page_counts[idx] = counted
+                    heappush(pending, (-cost, idx))
+
+            while len(pending) > 0 and len(running) < workers:
+                idx: int = heappop(pending)[1]
+                file_df: Dict[PDFType, DataFrame] = {
+                    k: v.iloc[0:0].copy() for k, v in df.items()
+                }
+                running[idx] = (
+                    pool.submit(
+                        _aparse_pdf_process_worker,
+                        idx,
+                        files[idx],
+                        out_dir,
+                        file_df,
+                        on_metrics is not None,
+                        trace,
+                        budget,
+                        page_counts.pop(idx, None),
+                    )
+                    if executor == "process"
+                    else pool.submit(
+                        _aparse_pdf_worker,
+                        idx,
+                        files[idx],
+                        out_dir,
+                        file_df,
+                        events,
+                        cancelled,
+                        on_metrics is not None,
+                        trace,
+                        budget,
+                        page_counts.pop(idx, None),
+                    )
+                )
+
+            message: _AsyncMessage | None = await loop.run_in_executor(
+                None, _next_message, events
+            )
+            if message is None:
+                # No message within the poll interval, checks for crashed workers
+                for idx, future in list(running.items()):
+                    if future.done() and future.exception() is not None:
+                        LOG.error(
+                            f"Worker failed while parsing file '{files[idx]}':\n {future.exception()}"
+                        )
+                        del running[idx]
+                        finished[idx] = None
+                        errors[idx] = future.exception()
+                        yield (0, 0, future.exception())
+            elif message[1] == _ASYNC_EVENT:
+                if isinstance(message[2][2], Exception):
+                    errors[message[0]] = message[2][2]
+                yield message[2]
+            elif message[1] == _ASYNC_METRICS:
+                file_metrics[message[0]] = message[2]
+            else:
+                running.pop(message[0], None)
+                finished[message[0]] = message[2]
+
+            # Writes finished files to the output in input order
+            while next_flush in finished:
+                flushed: int = next_flush
+                result: Tuple | None = finished.pop(flushed)
+                file_path: str = files[flushed]
+                next_flush += 1
+                metrics: Metrics = file_metrics.pop(flushed, None) or Metrics(
+                    file_path
+                )
+                if incremental:
+                    await loop.run_in_executor(
+                        None,
+                        _remove_previous_rows,
+                        manifest,
+                        sinks,
+                        records,
+                        file_path,
+                    )
+                if result is None:
+                    records.append((file_path, "error", None, 0))
+                    if on_file is not None and flushed in errors:
+                        on_file(file_path, errors.pop(flushed))
+                    if on_metrics is not None:
+                        on_metrics(file_path, metrics)
+                    continue
+
+                page_num, page_count, parse_result, file_df = result
+                event: Tuple[int, int, PDFLTMatchResult | Exception]
+                try:
+                    await loop.run_in_executor(
+                        None,
+                        _write_sinks,
+                        sinks,
+                        file_path,
+                        parse_result,
+                        file_df[parse_result["Type"]],
+                        metrics if on_metrics is not None else NULL_METRICS,
+                    )
+                    event = (page_num, page_count, parse_result)
+                except Exception as e:
+                    LOG.error(f"Error while parsing file '{file_path}':\n {e}")
+                    _copy_to_error_dir(file_path, out_dir)
+                    metrics.count("errors")
+                    event = (page_num, page_count, e)
+                records.append(_manifest_record(file_path, event[2], file_df))
+                await loop.run_in_executor(
+                    None, _record_manifest, manifest, sinks, records
+                )
+                yield event
+                if on_file is not None:
+                    on_file(file_path, event[2])
+                if on_metrics is not None:
+                    on_metrics(file_path, metrics)
+    finally:
+        cancelled.set()
+        [future.cancel() for future in running.values()]
+        pool.shutdown(wait=False, cancel_futures=True)
+        cost_pool.shutdown(wait=False, cancel_futures=True)
+        if feeder is not None:
+            feeder.cancel()
+        _close_sinks(sinks)
+        _record_manifest(manifest, sinks, records)
+        manifest.close()
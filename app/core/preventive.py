@@ -20,12 +20,18 @@ from pdfminer.layout import (
 
 # Local Imports
 from app.model.pdfs import (
+    NULL_TRACE,
+    PDFLTComposeStep,
     PDFLTComposer,
-    PDFLTDecomposer,
-    PDFLTIntersections,
-    PDFLTLine,
+    PDFLTDecomposeStep,
+    PDFLTGridIntersections,
+    PDFLTIntersectStep,
     PDFLTMatchException,
+    PDFLTOverlapRowsStep,
     PDFLTParams,
+    PDFLTPipeline,
+    PDFLTPipelineContext,
+    PDFLTTrace,
     PDFLTRect,
     PDFLTTextBox,
     PDFType,
@@ -34,6 +40,7 @@ from app.model.pdfs import (
 )
 from app.model.pdfs import PDFLTContainer, PDFLTComponent
 from app.utils.pdfs import PDFLayoutUtils, PDFUtils, PDFFormFields, PDFFormField
+from app.utils.metrics import NULL_METRICS, Metrics
 from app.utils.types import TypeUtils
 
 # Constants
@@ -65,13 +72,24 @@ COLUMNS: List[str] = [
 ]
 
 
+PIPELINE: PDFLTPipeline = (
+    PDFLTPipeline()
+    .step(PDFLTDecomposeStep())
+    .step(PDFLTIntersectStep(PDFLTGridIntersections))
+    .step(PDFLTComposeStep(PDFLTComposer))
+    .step(PDFLTOverlapRowsStep())
+)
+
+
 def match_prev_pdf(
     pdf_path: str,
     match_result: PDFLTMatchResult,
     df: DataFrame,
     pdf_form_fields: PDFFormFields | None,
+    metrics: Metrics = NULL_METRICS,
+    trace: PDFLTTrace = NULL_TRACE,
 ) -> Generator[PDFLTMatchResult, None, None]:
-    LOG.debug(f"Matching {PDFType.PREVENTIVE} PDF...")
+    LOG.debug("Matching %s PDF...", PDFType.PREVENTIVE)
 
     match_state: PDFLTMatchState = {
         "task": None,
@@ -82,25 +100,30 @@ def match_prev_pdf(
     page_count: int = PDFUtils.page_count(pdf_path)
     page_num: int = 1
     while page_num <= page_count:
-        pdf_page: LTPage = next(
-            extract_pages(
-                pdf_path,
-                page_numbers=[page_num - 1],
-                laparams=LAParams(
-                    char_margin=0.8, line_margin=0.4 if page_num > 1 else 0.2
+        with metrics.time("pdfminer"):
+            pdf_page: LTPage = next(
+                extract_pages(
+                    pdf_path,
+                    page_numbers=[page_num - 1],
+                    laparams=LAParams(
+                        char_margin=0.8, line_margin=0.4 if page_num > 1 else 0.2
+                    ),
                 ),
-            ),
-            None,
-        )
+                None,
+            )
         pdf_page.pageid = page_num
         page_num += 1
 
-        LOG.debug(f"Matching page {pdf_page.pageid}...")
-        _pdf_page(pdf_page, match_state, match_result, pdf_form_fields)
+        LOG.debug("Matching page %d...", pdf_page.pageid)
+        metrics.count("pages")
+        _pdf_page(
+            pdf_page, match_state, match_result, pdf_form_fields, metrics, trace
+        )
 
         yield match_result
 
-    _fill_dataframe(match_result, df)
+    with metrics.time("fill"):
+        _fill_dataframe(match_result, df)
 
 
 def _fill_dataframe(match_result: PDFLTMatchResult, df: DataFrame) -> None:
@@ -960,6 +983,8 @@ def _pdf_page(
     match_state: PDFLTMatchState,
     match_result: PDFLTMatchResult,
     pdf_form_fields: PDFFormFields | None,
+    metrics: Metrics = NULL_METRICS,
+    trace: PDFLTTrace = NULL_TRACE,
 ) -> PDFLTMatchResult:
     underflow: bool = False
     for el in pdf_page:
@@ -968,7 +993,8 @@ def _pdf_page(
             break
     if underflow:
         LOG.warning(
-            f"PDF page {pdf_page.pageid} was parsed with some element's bounding boxes outside the page limits"
+            "PDF page %d was parsed with some element's bounding boxes outside the page limits",
+            pdf_page.pageid,
         )
 
     params: PDFLTParams = PDFLTParams(
@@ -984,75 +1010,11 @@ def _pdf_page(
         min_line_length=6.0 if pdf_page.pageid > 1 else 0.0,
         vertical_overlap=0.55,
     )
-    decomposer: PDFLTDecomposer = PDFLTDecomposer(params)
-    intersects: PDFLTIntersections = PDFLTIntersections(params)
-    composer: PDFLTComposer = PDFLTComposer(params)
-
-    lines: List[PDFLTLine] = decomposer.fit(pdf_page).predict()
-    rects: List[PDFLTRect] = intersects.fit(lines).predict()
-    layout: List[PDFLTRect] = composer.fit(rects).predict(pdf_page)
-
-    layout.sort(key=lambda el: (-el.y0, el.x0))
-
-    # Group y related rects into the same line
-    lines: List[List[PDFLTRect]] = []
-    for lt in layout:
-        if len(lines) == 0:
-            lines.append([lt])
-            continue
-
-        # Computes the coordinates of the previous line and the current rect with a tolerance
-        line_y0: float = min([el.y0 - params.position_tol for el in lines[-1]])
-        line_y1: float = max([el.y1 + params.position_tol for el in lines[-1]])
-        y0: float = lt.y0 - params.position_tol
-        y1: float = lt.y1 + params.position_tol
-
-        # Calculates the vertical overlap percentage between the current rect and the previous line if they overlap at all
-        overlap: float
-        if y1 <= line_y0 or y0 >= line_y1:
-            #               | y1
-            #               |
-            #               | y0
-            # | line_y1
-            # |
-            # | line_y0
-            #
-            # | line_y1
-            # |
-            # | line_y0
-            #               | y1
-            #               |
-            #               | y0
-            #
-            overlap = 0
-        else:
-            #              | y1
-            # | line_y1    |
-            # |            | y0
-            # | line_y0
-            #
-            # | line_y1
-            # |            | y1
-            # | line_y0    |
-            #              | y0
-            #
-            min_y1: float = min(y1, line_y1)
-            max_y0: float = max(y0, line_y0)
-            dy: float = min_y1 - max_y0
-            height: float = line_y1 - line_y0
-            overlap = dy / height
-
-        # if (
-        #     abs(lt.y0 - lines[-1][0].y0) <= params.position_tol
-        #     or abs(lt.y1 - lines[-1][0].y1) <= params.position_tol
-        # ):
-        #     lines[-1].append(lt)
-        if overlap >= params.vertical_overlap:
-            lines[-1].append(lt)
-        else:
-            lines.append([lt])
-    for line in lines:
-        line.sort(key=lambda el: el.x0)
+    lines: List[List[PDFLTRect]]
+    context: PDFLTPipelineContext
+    lines, context = PIPELINE.run(pdf_page, params, trace)
+    metrics.add_timers(context.timings)
+    metrics.add_counters(context.counters)
 
     try:
         # Get lines iterator and fetch first line
@@ -1061,12 +1023,13 @@ def _pdf_page(
         # Fetch first line
         line: List[PDFLTRect] | None = next(lines_iter, None)
 
-        if pdf_page.pageid == 1:
-            # Match the first page
-            _page_1(line, lines_iter, match_result, pdf_form_fields)
-        else:
-            # Match page n
-            _page_n(line, lines_iter, match_state, match_result, pdf_form_fields)
+        with metrics.time("match"):
+            if pdf_page.pageid == 1:
+                # Match the first page
+                _page_1(line, lines_iter, match_result, pdf_form_fields)
+            else:
+                # Match page n
+                _page_n(line, lines_iter, match_state, match_result, pdf_form_fields)
         return match_result
     except StopIteration:
         raise PDFLTMatchException("PDF is not in the expected format")
@@ -1088,7 +1051,7 @@ def parse_preventive_pdf(
         parse_result["BeginningDate"] = str(pdf_form_fields["BEGINNING Date"])
         parse_result["Signature"] = pdf_form_fields["Signature5"] is not None
         parse_result["SignatureSGRE"] = pdf_form_fields["Signature1"] is not None
-        LOG.debug(f"Parsing {PDFType.PREVENTIVE} PDF...")
+        LOG.debug("Parsing %s PDF...", PDFType.PREVENTIVE)
 
         state: PDFLTMatchState = {
             "measure": None,
@@ -1097,7 +1060,7 @@ def parse_preventive_pdf(
             "line_num": 1,
         }
         while (pdf_page := next(pdf_pages, None)) is not None:
-            LOG.debug(f"Parsing page {pdf_page.pageid}...")
+            LOG.debug("Parsing page %d...", pdf_page.pageid)
             _parse_preventive_pdf_page(
                 pdf_page, state, parse_result, pdf_form_fields, pdf_form_fields_raw
             )
@@ -0,0 +1,529 @@
+# -*- coding: utf-8 -*-
+
+# Python Imports
+import os
+import json
+import signal
+import socket
+from os import cpu_count
+from os.path import basename
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from logging import Logger, getLogger
+from socketserver import TCPServer
+from tempfile import TemporaryDirectory
+from threading import Lock
+from time import monotonic, perf_counter
+from typing import Any, AnyStr, Dict, List, Optional, Self, Sequence, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+# Third-Party Imports
+from pandas import DataFrame
+
+# Local Imports
+from app.config import settings
+from app.core import mv, preventive
+from app.core.pdfs import parse_pdf, parse_pdf_gen, setup_output
+from app.model.pdfs import PDFLTMatchException, PDFLTMatchResult, PDFType
+from app.utils.excel import ExcelCell, ExcelUtils
+from app.utils.files import create_dir
+from app.utils.metrics import Metrics
+from app.utils.paths import is_valid_file, make_path
+from app.utils.watchdog import ParseBudget
+
+# Constants
+LOG: Logger = getLogger(__name__)
+SERVER_HOST: str = "127.0.0.1"
+SERVER_PORT: int = 8765
+SERVER_WARMUP: Tuple[str, ...] = (
+    "resources/tests/MV_Y7.pdf",
+    "resources/tests/PREV_Y7.pdf",
+)
+_UPLOAD_DIR: str = "uploads"
+_UPLOAD_NAME: str = "upload.pdf"
+_MAX_UPLOAD_SIZE: int = 256 << 20
+_SERVER_FRAMES: Dict[PDFType, DataFrame] = {}
+ParseResponse = Dict[str, Any]
+
+
+class PDFServer(object):
+    """Parses PDFs on request in a pool of warm worker processes.
+
+    Worker processes are started, and warmed up by parsing sample PDFs so that
+    pdfminer has loaded the fonts and CMaps they use, before the first request,
+    so that each request only pays for parsing its own PDF.
+
+    PDFs are parsed from their content, or, when a root directory is set, from
+    their path, which must be a PDF file under the root.
+
+    Parameters
+    ----------
+    out_dir : AnyStr
+        the directory to copy the PDFs failing to parse to, under `error/`
+    excel_template : AnyStr, optional
+        the Excel template the columns of the parsed rows are read from, by
+        default the configured template
+    excel_template_cell : ExcelCell, optional
+        the template cell where data starts, by default the configured cell
+    max_workers : int, optional
+        the number of worker processes, by default the CPU count
+    warmup : Sequence[str], optional
+        the PDFs each worker parses once started, by default the bundled sample
+        reports, see `SERVER_WARMUP`
+    budget : ParseBudget, optional
+        the time and memory limits on parsing each PDF, PDFs exceeding them
+        failing to parse and being copied to `error/` with the reason, by
+        default None for no limits
+    root : AnyStr, optional
+        the directory the PDFs parsed by path must be under, by default None,
+        in which case PDFs are not parsed by path
+    """
+
+    def __init__(
+        self: Self,
+        out_dir: AnyStr,
+        excel_template: AnyStr = settings().excel_template,
+        excel_template_cell: ExcelCell = settings().excel_template_start_cell,
+        max_workers: Optional[int] = None,
+        warmup: Sequence[str] = SERVER_WARMUP,
+        budget: Optional[ParseBudget] = None,
+        root: Optional[AnyStr] = None,
+    ) -> None:
+        self.out_dir: AnyStr = out_dir
+        self.excel_template: AnyStr = excel_template
+        self.excel_template_cell: ExcelCell = excel_template_cell
+        self.max_workers: int = max(1, max_workers or cpu_count() or 1)
+        self.warmup: Tuple[str, ...] = tuple(warmup)
+        self.budget: Optional[ParseBudget] = budget
+        self.root: Optional[str] = os.path.realpath(root) if root is not None else None
+        self.metrics: Metrics = Metrics("server")
+        self._lock: Lock = Lock()
+        self._pool: ProcessPoolExecutor | None = None
+        self._started: float | None = None
+        self._in_flight: int = 0
+
+    def start(self: Self) -> None:
+        setup_output(self.out_dir)
+        create_dir(make_path(f"{self.out_dir}/{_UPLOAD_DIR}"), raise_error=True)
+        excel_cell: ExcelCell = ExcelUtils.resolve_excel_cell(self.excel_template_cell)
+        df: Dict[PDFType, DataFrame] = ExcelUtils.read_excel(
+            file_path=self.excel_template,
+            columns={PDFType.PREVENTIVE: preventive.COLUMNS, PDFType.MV: mv.COLUMNS},
+            sheet_names=[PDFType.PREVENTIVE, PDFType.MV],
+            start_cell=excel_cell,
+        )
+        frames: Dict[PDFType, DataFrame] = {k: v.iloc[0:0] for k, v in df.items()}
+
+        LOG.debug("Starting %d worker processes...", self.max_workers)
+        start: float = perf_counter()
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_server_worker,
+            initargs=(frames, self.warmup),
+        )
+        # Each submission starts a process while none is idle
+        futures: List[Future] = [
+            self._pool.submit(os.getpid) for _ in range(self.max_workers)
+        ]
+        wait(futures)
+        self._started = monotonic()
+        LOG.info(
+            "Started %d worker processes in %.2fs",
+            self.max_workers,
+            perf_counter() - start,
+        )
+
+    def close(self: Self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        self._started = None
+
+    def __enter__(self: Self) -> Self:
+        self.start()
+        return self
+
+    def __exit__(self: Self, *args: Any) -> None:
+        self.close()
+
+    def parse(self: Self, pdf_path: str, name: Optional[str] = None) -> ParseResponse:
+        """Parses a PDF file.
+
+        Parameters
+        ----------
+        pdf_path : str
+            the PDF file path
+        name : str, optional
+            the file name to respond with, by default the file path
+
+        Returns
+        -------
+        ParseResponse
+            the file name, PDF type, parsed rows and match result
+
+        Raises
+        ------
+        RuntimeError
+            when the server was not started
+        FileNotFoundError
+            when the file does not exist
+        PDFLTMatchException
+            when the file fails to parse
+        """
+        if self._pool is None:
+            raise RuntimeError("The server was not started")
+        if not is_valid_file(pdf_path):
+            raise FileNotFoundError(f"File '{pdf_path}' does not exist")
+
+        with self._lock:
+            self._in_flight += 1
+            self.metrics.count("requests")
+        try:
+            result: PDFLTMatchResult | Exception
+            rows: DataFrame
+            file_metrics: Metrics
+            result, rows, file_metrics = self._pool.submit(
+                _parse_file, pdf_path, self.out_dir, self.budget
+            ).result()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+        with self._lock:
+            self.metrics.merge(file_metrics)
+            self.metrics.count("files")
+        if isinstance(result, Exception):
+            raise PDFLTMatchException(reason=f"{result}") from result
+
+        return {
+            "File": name if name is not None else pdf_path,
+            "Type": result["Type"],
+            "Rows": rows.astype(object).where(rows.notna(), None).to_dict("records"),
+            "Result": result,
+        }
+
+    def parse_path(self: Self, pdf_path: str) -> ParseResponse:
+        """Parses a PDF file under the root directory.
+
+        Parameters
+        ----------
+        pdf_path : str
+            the PDF file path, relative to the root directory or absolute
+
+        Returns
+        -------
+        ParseResponse
+            the file name, PDF type, parsed rows and match result
+
+        Raises
+        ------
+        PermissionError
+            when no root directory is set, or the file is not a PDF file under
+            it
+        """
+        if self.root is None:
+            raise PermissionError("Parsing PDFs by path is disabled")
+        real_path: str = os.path.realpath(os.path.join(self.root, pdf_path))
+        if (
+            os.path.commonpath([self.root, real_path]) != self.root
+            or os.path.splitext(real_path)[1].lower() != ".pdf"
+        ):
+            raise PermissionError(f"File '{pdf_path}' is not a PDF under the root")
+        return self.parse(real_path, pdf_path)
+
+    def parse_bytes(
+        self: Self, content: bytes, name: str = _UPLOAD_NAME
+    ) -> ParseResponse:
+        """Parses the content of a PDF file.
+
+        The content is written to a temporary file under `uploads/` in the
+        output directory, named after `name`, which is removed once parsed.
+
+        Parameters
+        ----------
+        content : bytes
+            the PDF file content
+        name : str, optional
+            the PDF file name, by default "upload.pdf"
+
+        Returns
+        -------
+        ParseResponse
+            the file name, PDF type, parsed rows and match result
+        """
+        name = basename(name) or _UPLOAD_NAME
+        with TemporaryDirectory(dir=make_path(f"{self.out_dir}/{_UPLOAD_DIR}")) as d:
+            pdf_path: str = os.path.join(d, name)
+            with open(pdf_path, "wb") as f:
+                f.write(content)
+            return self.parse(pdf_path, name)
+
+    def health(self: Self) -> Dict[str, Any]:
+        started: float | None = self._started
+        return {
+            "status": "ok" if started is not None else "stopped",
+            "workers": self.max_workers,
+            "uptime": monotonic() - started if started is not None else 0.0,
+        }
+
+    def stats(self: Self) -> Dict[str, Any]:
+        with self._lock:
+            return self.health() | {
+                "in_flight": self._in_flight,
+                "metrics": self.metrics.as_dict(),
+            }
+
+    def __repr__(self: Self) -> str:
+        return (
+            f"PDFServer(out_dir={self.out_dir!r}, max_workers={self.max_workers})"
+        )
+
+
+def _init_server_worker(
+    frames: Dict[PDFType, DataFrame], warmup: Sequence[str]
+) -> None:
+    # Interrupting the server stops it, which then stops its workers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _SERVER_FRAMES.update(frames)
+    for pdf_path in warmup:
+        try:
+            for _ in parse_pdf(pdf_path, _copy_frames()):
+                pass
+        except Exception as e:
+            LOG.warning("Could not warm up with '%s': %s", pdf_path, e)
+
+
+def _copy_frames() -> Dict[PDFType, DataFrame]:
+    return {k: v.copy() for k, v in _SERVER_FRAMES.items()}
+
+
+def _parse_file(
+    pdf_path: str, out_dir: AnyStr, budget: Optional[ParseBudget] = None
+) -> Tuple[PDFLTMatchResult | Exception, DataFrame, Metrics]:
+    df: Dict[PDFType, DataFrame] = _copy_frames()
+    metrics: Metrics = Metrics(pdf_path)
+    result: PDFLTMatchResult | Exception = PDFLTMatchException(
+        reason=f"File '{pdf_path}' has no pages"
+    )
+    try:
+        for _, _, result in parse_pdf_gen(
+            pdf_path=pdf_path,
+            out_dir=out_dir,
+            sinks=[],
+            df=df,
+            metrics=metrics,
+            budget=budget,
+        ):
+            pass
+    except Exception as e:
+        # Eg. a file that is not a PDF, failing before it is parsed
+        result = e
+    if isinstance(result, Exception):
+        return result, DataFrame(), metrics
+    return result, df[result["Type"]], metrics
+
+
+class _PDFRequestHandler(BaseHTTPRequestHandler):
+    """Serves `PDFServer` over HTTP.
+
+    - `GET /health` responds with the server status
+    - `GET /metrics` responds with the server status and metrics
+    - `POST /parse` parses the PDF sent as the request body, or the PDF file
+      at the path of a JSON `{"path": ...}` body, under the server root, the
+      file name of a sent PDF being given by the `name` query parameter
+    """
+
+    server: "_PDFHTTPServer"
+
+    def do_GET(self: Self) -> None:
+        match urlsplit(self.path).path:
+            case "/health":
+                self._send_json(HTTPStatus.OK, self.server.pdf_server.health())
+            case "/metrics":
+                self._send_json(HTTPStatus.OK, self.server.pdf_server.stats())
+            case _:
+                self._send_error(HTTPStatus.NOT_FOUND, f"No route '{self.path}'")
+
+    def do_POST(self: Self) -> None:
+        url = urlsplit(self.path)
+        if url.path != "/parse":
+            self._send_error(HTTPStatus.NOT_FOUND, f"No route '{self.path}'")
+            return
+        if self.headers.get("Content-Length") is None:
+            self._send_error(HTTPStatus.LENGTH_REQUIRED, "Content-Length is required")
+            return
+        try:
+            length: int = int(self.headers["Content-Length"])
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._send_error(HTTPStatus.BAD_REQUEST, "Content-Length is not valid")
+            return
+        if length > _MAX_UPLOAD_SIZE:
+            self._send_error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "PDF is too large")
+            return
+        body: bytes = self.rfile.read(length)
+
+        pdf_server: PDFServer = self.server.pdf_server
+        try:
+            if self.headers.get_content_type() == "application/json":
+                pdf_path: Any = json.loads(body).get("path")
+                if not isinstance(pdf_path, str):
+                    raise ValueError("The JSON body has no 'path'")
+                response: ParseResponse = pdf_server.parse_path(pdf_path)
+            else:
+                name: List[str] = parse_qs(url.query).get("name", [_UPLOAD_NAME])
+                response = pdf_server.parse_bytes(body, name[0])
+        except (ValueError, AttributeError) as e:
+            self._send_error(HTTPStatus.BAD_REQUEST, f"{e}")
+        except FileNotFoundError as e:
+            self._send_error(HTTPStatus.NOT_FOUND, f"{e}")
+        except PermissionError as e:
+            self._send_error(HTTPStatus.FORBIDDEN, f"{e}")
+        except PDFLTMatchException as e:
+            self._send_error(HTTPStatus.UNPROCESSABLE_ENTITY, f"{e}")
+        except Exception as e:
+            LOG.error(f"Error while serving '{self.path}':\n {e}")
+            self._send_error(HTTPStatus.INTERNAL_SERVER_ERROR, f"{e}")
+        else:
+            self._send_json(HTTPStatus.OK, response)
+
+    def _send_error(self: Self, status: HTTPStatus, message: str) -> None:
+        self._send_json(status, {"error": message})
+
+    def _send_json(self: Self, status: HTTPStatus, body: Dict[str, Any]) -> None:
+        content: bytes = json.dumps(body, ensure_ascii=False, default=str).encode(
+            "utf-8"
+        )
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", f"{len(content)}")
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self: Self, format: str, *args: Any) -> None:
+        # Unix socket clients have no address to log
+        LOG.debug("%s " + format, self.requestline, *args)
+
+
+class _PDFHTTPServer(ThreadingHTTPServer):
+    pdf_server: PDFServer
+
+
+if hasattr(socket, "AF_UNIX"):
+
+    class _PDFUnixHTTPServer(_PDFHTTPServer):
+        address_family = socket.AF_UNIX
+
+        def server_bind(self: Self) -> None:
+            # Skips the host name lookup of HTTP servers
+            TCPServer.server_bind(self)
+            self.server_name = SERVER_HOST
+            self.server_port = 0
+
+
+def create_http_server(
+    pdf_server: PDFServer,
+    host: str = SERVER_HOST,
+    port: int = SERVER_PORT,
+    socket_path: Optional[str] = None,
+) -> _PDFHTTPServer:
+    """Creates the HTTP server of a `PDFServer`.
+
+    Parameters
+    ----------
+    pdf_server : PDFServer
+        the started PDF server
+    host : str, optional
+        the host to listen on, by default "127.0.0.1"
+    port : int, optional
+        the port to listen on, 0 for any free port, by default 8765
+    socket_path : str, optional
+        the Unix socket to listen on instead of the host and port, by default
+        None
+
+    Returns
+    -------
+    _PDFHTTPServer
+        the HTTP server, listening
+
+    Raises
+    ------
+    OSError
+        when Unix sockets are not supported or the address is in use
+    """
+    http_server: _PDFHTTPServer
+    if socket_path is not None:
+        if not hasattr(socket, "AF_UNIX"):
+            raise OSError("Unix sockets are not supported on this platform")
+        if os.path.exists(socket_path):
+            # Left behind by a server that was killed
+            os.remove(socket_path)
+        http_server = _PDFUnixHTTPServer(socket_path, _PDFRequestHandler)
+    else:
+        http_server = _PDFHTTPServer((host, port), _PDFRequestHandler)
+    http_server.pdf_server = pdf_server
+    return http_server
+
+
+def serve(
+    out_dir: AnyStr,
+    excel_template: AnyStr = settings().excel_template,
+    excel_template_cell: ExcelCell = settings().excel_template_start_cell,
+    host: str = SERVER_HOST,
+    port: int = SERVER_PORT,
+    socket_path: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    warmup: Sequence[str] = SERVER_WARMUP,
+    budget: Optional[ParseBudget] = None,
+    root: Optional[AnyStr] = None,
+) -> None:
+    """Serves a `PDFServer` over HTTP until interrupted.
+
+    Parameters
+    ----------
+    out_dir : AnyStr
+        the directory to copy the PDFs failing to parse to, under `error/`
+    excel_template : AnyStr, optional
+        the Excel template the columns of the parsed rows are read from, by
+        default the configured template
+    excel_template_cell : ExcelCell, optional
+        the template cell where data starts, by default the configured cell
+    host : str, optional
+        the host to listen on, by default "127.0.0.1"
+    port : int, optional
+        the port to listen on, by default 8765
+    socket_path : str, optional
+        the Unix socket to listen on instead of the host and port, by default
+        None
+    max_workers : int, optional
+        the number of worker processes, by default the CPU count
+    warmup : Sequence[str], optional
+        the PDFs each worker parses once started, by default the bundled sample
+        reports, see `SERVER_WARMUP`
+    budget : ParseBudget, optional
+        the time and memory limits on parsing each PDF, by default None for no
+        limits
+    root : AnyStr, optional
+        the directory the PDFs parsed by path must be under, by default None,
+        in which case PDFs are not parsed by path
+    """
+    with PDFServer(
+        out_dir,
+        excel_template,
+        excel_template_cell,
+        max_workers,
+        warmup,
+        budget,
+        root,
+    ) as pdf_server:
+        http_server: _PDFHTTPServer = create_http_server(
+            pdf_server, host, port, socket_path
+        )
+        LOG.info("Serving %r on %s", pdf_server, http_server.server_address)
+        try:
+            http_server.serve_forever()
+        finally:
+            http_server.server_close()
+            if socket_path is not None and os.path.exists(socket_path):
+                os.remove(socket_path)
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+
+# Python Imports
+import os
+import re
+from logging import Logger, getLogger
+from typing import AnyStr, Dict, List, Sequence, Tuple
+
+# Third-Party Imports
+from pandas import DataFrame, concat, read_csv
+
+# Local Imports
+from app.config import settings
+from app.core import mv, preventive
+from app.core.manifest import BatchManifest, ManifestEntry
+from app.core.pdfs import OutputFormat, ShardSpec, write_outputs
+from app.model.pdfs import PDFType
+from app.utils.excel import ExcelCell, ExcelUtils
+from app.utils.paths import is_valid_file, make_path
+
+# Constants
+LOG: Logger = getLogger(__name__)
+_COLUMNS: Dict[PDFType, List[str]] = {
+    PDFType.PREVENTIVE: preventive.COLUMNS,
+    PDFType.MV: mv.COLUMNS,
+}
+_SHARD_DIR_PATTERN: re.Pattern = re.compile(r"shard_(\d+)_of_(\d+)")
+
+
+def shard_out_dir(out_dir: AnyStr, shard: ShardSpec) -> str:
+    """The output directory of a shard of a batch.
+
+    Parameters
+    ----------
+    out_dir : AnyStr
+        the output directory of the batch
+    shard : ShardSpec
+        the 1-based index of the shard and the number of shards
+
+    Returns
+    -------
+    str
+        the output directory of the shard
+    """
+    return make_path(f"{out_dir}/shard_{shard[0]}_of_{shard[1]}")
+
+
+def merge_shards(
+    out_dir: AnyStr,
+    excel_template: AnyStr = settings().excel_template,
+    excel_template_cell: ExcelCell = settings().excel_template_start_cell,
+    output_format: OutputFormat | Sequence[OutputFormat] = "excel",
+) -> int:
+    """Merges the shard outputs of a batch into the output of the batch.
+
+    The rows of each file are located in the Excel, or otherwise CSV, output of
+    its shard by the shard manifest, and written in file path order, so that
+    the merged output does not depend on the number of shards. A file recorded
+    by several shards, eg. when shards of different counts were parsed to the
+    same output directory, is only merged once, from the first shard in shard
+    order, with a warning.
+
+    Parameters
+    ----------
+    out_dir : AnyStr
+        the output directory of the batch, holding the shard output directories
+    excel_template : AnyStr, optional
+        the Excel template to fill, by default the configured template
+    excel_template_cell : ExcelCell, optional
+        the template cell where data starts, by default the configured cell
+    output_format : OutputFormat | Sequence[OutputFormat], optional
+        the output format, or formats, of the merged output, by default "excel"
+
+    Returns
+    -------
+    int
+        the number of merged files
+
+    Raises
+    ------
+    FileNotFoundError
+        when the output directory holds no shard output
+    """
+    shards: Dict[ShardSpec, str] = {}
+    for name in sorted(os.listdir(out_dir)):
+        match: re.Match | None = _SHARD_DIR_PATTERN.fullmatch(name)
+        if match is not None:
+            shards[(int(match[1]), int(match[2]))] = make_path(f"{out_dir}/{name}")
+    if len(shards) == 0:
+        raise FileNotFoundError(f"No shard output found in '{out_dir}'")
+    counts: List[int] = sorted({count for _, count in shards})
+    if len(counts) > 1:
+        LOG.warning("Shards of %s counts are mixed in '%s'", counts, out_dir)
+    for count in counts:
+        missing: List[int] = [
+            index for index in range(1, count + 1) if (index, count) not in shards
+        ]
+        if len(missing) > 0:
+            LOG.warning(
+                "Shards %s of %d are missing from '%s'", missing, count, out_dir
+            )
+
+    excel_cell: ExcelCell = ExcelUtils.resolve_excel_cell(excel_template_cell)
+    start_rows: Dict[PDFType, int] = {
+        k: len(v)
+        for k, v in ExcelUtils.read_excel(
+            file_path=excel_template,
+            columns=_COLUMNS,
+            sheet_names=list(_COLUMNS),
+            start_cell=excel_cell,
+        ).items()
+    }
+    files: List[Tuple[str, PDFType, DataFrame]] = []
+    # The shard each merged file is taken from
+    owners: Dict[str, ShardSpec] = {}
+    for shard, shard_dir in sorted(shards.items()):
+        manifest: BatchManifest = BatchManifest(shard_dir).load()
+        shard_rows: Dict[PDFType, DataFrame] = _read_shard(
+            shard_dir, excel_cell, start_rows
+        )
+        for entry in manifest.entries.values():
+            if entry["status"] != "done" or entry["rows"] is None:
+                continue
+            if entry["path"] in owners:
+                LOG.warning(
+                    "Shards %s and %s both hold '%s', merging it from shard %s",
+                    _shard_name(owners[entry["path"]]),
+                    _shard_name(shard),
+                    entry["path"],
+                    _shard_name(owners[entry["path"]]),
+                )
+                continue
+            owners[entry["path"]] = shard
+            files.append(_file_rows(entry, shard_rows))
+
+    rows: Dict[PDFType, List[DataFrame]] = {}
+    for _, pdf_type, file_rows in sorted(files, key=lambda f: f[0]):
+        rows.setdefault(pdf_type, []).append(file_rows)
+    write_outputs(
+        {k: concat(v, ignore_index=True) for k, v in rows.items()},
+        out_dir,
+        excel_template,
+        excel_template_cell,
+        output_format,
+    )
+    LOG.info(
+        "Merged %d files from %d shards to '%s'", len(files), len(shards), out_dir
+    )
+    return len(files)
+
+
+def _shard_name(shard: ShardSpec) -> str:
+    return f"{shard[0]}/{shard[1]}"
+
+
+def _read_shard(
+    shard_dir: str, excel_cell: ExcelCell, start_rows: Dict[PDFType, int]
+) -> Dict[PDFType, DataFrame]:
+    excel_path: str = make_path(f"{shard_dir}/output.xlsx")
+    if is_valid_file(excel_path):
+        # Rows were written below the rows of the template
+        return {
+            k: v.iloc[start_rows.get(k, 0) :].reset_index(drop=True)
+            for k, v in ExcelUtils.read_excel(
+                file_path=excel_path,
+                columns=_COLUMNS,
+                sheet_names=list(_COLUMNS),
+                start_cell=excel_cell,
+                text=True,
+            ).items()
+        }
+    shard_rows: Dict[PDFType, DataFrame] = {}
+    for pdf_type, columns in _COLUMNS.items():
+        csv_path: str = make_path(f"{shard_dir}/{pdf_type}.csv")
+        if is_valid_file(csv_path):
+            shard_rows[pdf_type] = read_csv(
+                csv_path, dtype=str, keep_default_na=False, na_values=[""]
+            )[columns]
+    return shard_rows
+
+
+def _file_rows(
+    entry: ManifestEntry, shard_rows: Dict[PDFType, DataFrame]
+) -> Tuple[str, PDFType, DataFrame]:
+    pdf_type: PDFType = entry["rows"]["type"]
+    start: int = entry["rows"]["start"]
+    end: int = entry["rows"]["end"]
+    type_rows: DataFrame = shard_rows.get(
+        pdf_type, DataFrame(columns=_COLUMNS[pdf_type])
+    )
+    if end > len(type_rows):
+        raise ValueError(
+            f"The output of '{entry['path']}' is missing rows {len(type_rows)}-{end}"
+        )
+    return entry["path"], pdf_type, type_rows.iloc[start:end]
@@ -0,0 +1,542 @@
+# -*- coding: utf-8 -*-
+
+# Python Imports
+import os
+import json
+from os import cpu_count
+from socket import gethostname
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from hashlib import sha1
+from logging import Logger, getLogger
+from threading import Event, Lock, Thread
+from time import sleep, time
+from typing import (
+    Any,
+    AnyStr,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Self,
+    Sequence,
+    Tuple,
+)
+
+# Third-Party Imports
+from pandas import DataFrame, concat
+
+# Local Imports
+from app.config import settings
+from app.core import mv, preventive
+from app.core.pdfs import (
+    OutputFormat,
+    parse_pdf_gen,
+    resolve_files,
+    setup_output,
+    write_outputs,
+)
+from app.model.pdfs import PDFLTMatchResult, PDFType
+from app.utils.excel import ExcelCell, ExcelUtils
+from app.utils.files import create_dir
+from app.utils.paths import make_path
+from app.utils.watchdog import ParseBudget
+
+# Constants
+LOG: Logger = getLogger(__name__)
+SPOOL_LEASE_TTL: float = 60.0
+_PENDING: str = "pending"
+_RUNNING: str = "running"
+_DONE: str = "done"
+_SHARDS: str = "shards"
+_JOB_EXTENSION: str = ".json"
+_POLL_INTERVAL: float = 2.0
+SpoolJob = Dict[str, Any]
+
+
+class SpoolQueue(object):
+    """A work queue of PDF files in a spool directory shared by several nodes.
+
+    Each queued file is a job file, named after the hash of the file path, that
+    moves between the `pending/`, `running/` and `done/` directories of the
+    spool by renames, which are atomic on a single file system, eg. a NAS share,
+    so that no broker is needed and a job is claimed by a single node.
+
+    A claimed job file is the lease of the node that claimed it, renewed by
+    updating its modification time. Jobs whose lease is not renewed within
+    `lease_ttl` seconds, eg. because their node died, are moved back to
+    `pending/` by any node. Nodes write the rows of each job to their own shard
+    under `shards/`, which `merge_spool` combines once the queue is drained.
+
+    Parameters
+    ----------
+    spool_dir : AnyStr
+        the spool directory
+    lease_ttl : float, optional
+        the number of seconds after which a lease that was not renewed
+        expires, which must exceed the clock skew between nodes, by default 60
+    """
+
+    def __init__(
+        self: Self, spool_dir: AnyStr, lease_ttl: float = SPOOL_LEASE_TTL
+    ) -> None:
+        self.spool_dir: str = make_path(spool_dir)
+        self.lease_ttl: float = lease_ttl
+
+    def setup(self: Self) -> Self:
+        for name in [_PENDING, _RUNNING, _DONE, _SHARDS]:
+            create_dir(self._dir(name), raise_error=True)
+        return self
+
+    def enqueue(self: Self, pdfs_path: AnyStr | List[AnyStr]) -> int:
+        """Queues PDF files.
+
+        Files already pending or running are not queued again, nor are files
+        done that did not change since.
+
+        Parameters
+        ----------
+        pdfs_path : AnyStr | List[AnyStr]
+            the PDF file, directory or list of PDF files to queue
+
+        Returns
+        -------
+        int
+            the number of queued files
+        """
+        queued: int = 0
+        for f in resolve_files(pdfs_path):
+            stat: os.stat_result = os.stat(f)
+            job: SpoolJob = {
+                "path": f,
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+            }
+            name: str = _job_name(f)
+            if any(os.path.exists(self._path(d, name)) for d in [_PENDING, _RUNNING]):
+                continue
+            done: SpoolJob | None = _read_json(self._path(_DONE, name))
+            if done is not None and all(done.get(k) == v for k, v in job.items()):
+                continue
+            _write_json(self._path(_PENDING, name), job)
+            queued += 1
+        LOG.info("Queued %d files to '%s'", queued, self.spool_dir)
+        return queued
+
+    def claim(self: Self) -> Tuple[str, SpoolJob] | None:
+        """Claims a pending job.
+
+        Returns
+        -------
+        Tuple[str, SpoolJob] | None
+            the job name and job, or None when no job is pending
+        """
+        for name in sorted(os.listdir(self._dir(_PENDING))):
+            if not name.endswith(_JOB_EXTENSION):
+                continue
+            pending_path: str = self._path(_PENDING, name)
+            try:
+                # Starts the lease before the job becomes visible as running
+                os.utime(pending_path)
+                os.rename(pending_path, self._path(_RUNNING, name))
+            except OSError:
+                # Claimed by another node meanwhile
+                continue
+            job: SpoolJob | None = _read_json(self._path(_RUNNING, name))
+            if job is not None:
+                return name, job
+        return None
+
+    def renew(self: Self, name: str) -> bool:
+        """Renews the lease of a claimed job.
+
+        Parameters
+        ----------
+        name : str
+            the job name
+
+        Returns
+        -------
+        bool
+            whether the job is still leased, False when it expired and was
+            moved back to pending
+        """
+        try:
+            os.utime(self._path(_RUNNING, name))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def complete(self: Self, name: str, node: str, result: SpoolJob) -> None:
+        """Writes the result of a claimed job to the shard of a node.
+
+        Parameters
+        ----------
+        name : str
+            the job name
+        node : str
+            the node that ran the job
+        result : SpoolJob
+            the job result
+        """
+        _write_json(make_path(f"{self.shard_dir(node)}/{name}"), result)
+        try:
+            os.replace(self._path(_RUNNING, name), self._path(_DONE, name))
+        except FileNotFoundError:
+            # Its shard result is kept, `merge_spool` keeping one per job
+            LOG.warning("Lease of job '%s' expired before it completed", name)
+
+    def requeue_expired(self: Self) -> int:
+        """Moves the running jobs whose lease expired back to pending.
+
+        Returns
+        -------
+        int
+            the number of requeued jobs
+        """
+        requeued: int = 0
+        now: float = time()
+        for name in os.listdir(self._dir(_RUNNING)):
+            running_path: str = self._path(_RUNNING, name)
+            try:
+                if now - os.stat(running_path).st_mtime <= self.lease_ttl:
+                    continue
+                os.rename(running_path, self._path(_PENDING, name))
+            except OSError:
+                continue
+            LOG.warning("Lease of job '%s' expired, requeued", name)
+            requeued += 1
+        return requeued
+
+    def count(self: Self, state: str) -> int:
+        return sum(
+            1 for name in os.listdir(self._dir(state)) if name.endswith(_JOB_EXTENSION)
+        )
+
+    def shard_dir(self: Self, node: str) -> str:
+        return make_path(f"{self.spool_dir}/{_SHARDS}/{node}")
+
+    def results(self: Self) -> List[SpoolJob]:
+        """Reads the job results of every shard.
+
+        When a job ran on several nodes, eg. after its lease expired, or ran
+        again because its file changed, the result of the latest version of the
+        file is kept, ties being broken by node name.
+
+        Returns
+        -------
+        List[SpoolJob]
+            the job results, ordered by file path
+        """
+        results: Dict[str, SpoolJob] = {}
+        shards_dir: str = self._dir(_SHARDS)
+        for node in sorted(os.listdir(shards_dir)):
+            node_dir: str = os.path.join(shards_dir, node)
+            if not os.path.isdir(node_dir):
+                continue
+            for name in sorted(os.listdir(node_dir)):
+                if not name.endswith(_JOB_EXTENSION):
+                    continue
+                result: SpoolJob | None = _read_json(os.path.join(node_dir, name))
+                if result is None:
+                    continue
+                kept: SpoolJob | None = results.get(name)
+                if kept is None or result["mtime_ns"] > kept["mtime_ns"]:
+                    results[name] = result
+        return sorted(results.values(), key=lambda r: r["path"])
+
+    def _dir(self: Self, state: str) -> str:
+        return make_path(f"{self.spool_dir}/{state}")
+
+    def _path(self: Self, state: str, name: str) -> str:
+        return make_path(f"{self.spool_dir}/{state}/{name}")
+
+    def __repr__(self: Self) -> str:
+        return f"SpoolQueue(spool_dir={self.spool_dir!r}, lease_ttl={self.lease_ttl})"
+
+
+class _LeaseKeeper(Thread):
+    """Renews the lease of the job being run by a node."""
+
+    def __init__(self: Self, queue: SpoolQueue) -> None:
+        super().__init__(name="spool-lease", daemon=True)
+        self.queue: SpoolQueue = queue
+        self._job: str | None = None
+        self._lock: Lock = Lock()
+        self._stopped: Event = Event()
+
+    @contextmanager
+    def hold(self: Self, name: str) -> Iterator[None]:
+        with self._lock:
+            self._job = name
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._job = None
+
+    def run(self: Self) -> None:
+        while not self._stopped.wait(self.queue.lease_ttl / 4):
+            with self._lock:
+                if self._job is not None and not self.queue.renew(self._job):
+                    LOG.warning("Lost the lease of job '%s'", self._job)
+
+    def stop(self: Self) -> None:
+        self._stopped.set()
+
+
+def run_spool_node(
+    spool_dir: AnyStr,
+    node: Optional[str] = None,
+    excel_template: AnyStr = settings().excel_template,
+    excel_template_cell: ExcelCell = settings().excel_template_start_cell,
+    lease_ttl: float = SPOOL_LEASE_TTL,
+    wait: bool = True,
+    budget: Optional[ParseBudget] = None,
+) -> int:
+    """Runs the jobs of a spool directory until none is left.
+
+    Parameters
+    ----------
+    spool_dir : AnyStr
+        the spool directory
+    node : str, optional
+        the node name, naming its shard, by default the host name and process
+        id
+    excel_template : AnyStr, optional
+        the Excel template the columns of the rows are read from, by default
+        the configured template
+    excel_template_cell : ExcelCell, optional
+        the template cell where data starts, by default the configured cell
+    lease_ttl : float, optional
+        the number of seconds after which a lease that was not renewed
+        expires, by default 60
+    wait : bool, optional
+        whether to wait for the jobs running on other nodes, which are run
+        again should their lease expire, before returning, by default True
+    budget : ParseBudget, optional
+        the time and memory limits on parsing each file, files exceeding them
+        being copied to `error/` in the node shard with the reason, by default
+        None for no limits
+
+    Returns
+    -------
+    int
+        the number of jobs run
+    """
+    queue: SpoolQueue = SpoolQueue(spool_dir, lease_ttl).setup()
+    node = node or f"{gethostname()}-{os.getpid()}"
+    shard_dir: str = queue.shard_dir(node)
+    setup_output(shard_dir)
+    excel_cell: ExcelCell = ExcelUtils.resolve_excel_cell(excel_template_cell)
+    df: Dict[PDFType, DataFrame] = ExcelUtils.read_excel(
+        file_path=excel_template,
+        columns={PDFType.PREVENTIVE: preventive.COLUMNS, PDFType.MV: mv.COLUMNS},
+        sheet_names=[PDFType.PREVENTIVE, PDFType.MV],
+        start_cell=excel_cell,
+    )
+    LOG.info("Running node '%s' on %r", node, queue)
+
+    jobs: int = 0
+    lease_keeper: _LeaseKeeper = _LeaseKeeper(queue)
+    lease_keeper.start()
+    try:
+        while True:
+            queue.requeue_expired()
+            claimed: Tuple[str, SpoolJob] | None = queue.claim()
+            if claimed is None:
+                if queue.count(_PENDING) == 0 and (
+                    not wait or queue.count(_RUNNING) == 0
+                ):
+                    break
+                sleep(_POLL_INTERVAL)
+                continue
+
+            name, job = claimed
+            with lease_keeper.hold(name):
+                file_df: Dict[PDFType, DataFrame] = {
+                    k: v.iloc[0:0].copy() for k, v in df.items()
+                }
+                result: PDFLTMatchResult | Exception = Exception(
+                    f"File '{job['path']}' was not parsed"
+                )
+                try:
+                    for _, _, result in parse_pdf_gen(
+                        pdf_path=job["path"],
+                        out_dir=shard_dir,
+                        sinks=[],
+                        df=file_df,
+                        budget=budget,
+                    ):
+                        pass
+                except Exception as e:
+                    # Eg. a file removed since it was queued
+                    result = e
+            queue.complete(name, node, _job_result(job, node, result, file_df))
+            jobs += 1
+    finally:
+        lease_keeper.stop()
+    LOG.info("Node '%s' ran %d jobs", node, jobs)
+    return jobs
+
+
+def run_spool(
+    spool_dir: AnyStr,
+    pdfs_path: Optional[AnyStr | List[AnyStr]] = None,
+    excel_template: AnyStr = settings().excel_template,
+    excel_template_cell: ExcelCell = settings().excel_template_start_cell,
+    max_workers: Optional[int] = None,
+    lease_ttl: float = SPOOL_LEASE_TTL,
+    budget: Optional[ParseBudget] = None,
+) -> int:
+    """Queues PDF files to a spool directory, if any, and runs its jobs.
+
+    Runs one node per worker process, each with its own shard.
+
+    Parameters
+    ----------
+    spool_dir : AnyStr
+        the spool directory
+    pdfs_path : AnyStr | List[AnyStr], optional
+        the PDF file, directory or list of PDF files to queue, by default None
+    excel_template : AnyStr, optional
+        the Excel template the columns of the rows are read from, by default
+        the configured template
+    excel_template_cell : ExcelCell, optional
+        the template cell where data starts, by default the configured cell
+    max_workers : int, optional
+        the number of worker processes, by default the CPU count
+    lease_ttl : float, optional
+        the number of seconds after which a lease that was not renewed
+        expires, by default 60
+    budget : ParseBudget, optional
+        the time and memory limits on parsing each file, see `run_spool_node`,
+        by default None for no limits
+
+    Returns
+    -------
+    int
+        the number of jobs run
+    """
+    queue: SpoolQueue = SpoolQueue(spool_dir, lease_ttl).setup()
+    if pdfs_path is not None:
+        queue.enqueue(pdfs_path)
+    workers: int = max(1, max_workers or cpu_count() or 1)
+    node: str = f"{gethostname()}-{os.getpid()}"
+    if workers == 1:
+        return run_spool_node(
+            spool_dir,
+            node,
+            excel_template,
+            excel_template_cell,
+            lease_ttl,
+            budget=budget,
+        )
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return sum(
+            pool.map(
+                run_spool_node,
+                [spool_dir] * workers,
+                [f"{node}.{i}" for i in range(workers)],
+                [excel_template] * workers,
+                [excel_template_cell] * workers,
+                [lease_ttl] * workers,
+                [True] * workers,
+                [budget] * workers,
+            )
+        )
+
+
+def merge_spool(
+    spool_dir: AnyStr,
+    out_dir: AnyStr,
+    excel_template: AnyStr = settings().excel_template,
+    excel_template_cell: ExcelCell = settings().excel_template_start_cell,
+    output_format: OutputFormat | Sequence[OutputFormat] = "excel",
+) -> int:
+    """Merges the shards of a spool directory into a single output.
+
+    Rows are written in file path order, regardless of the node and order in
+    which files were parsed.
+
+    Parameters
+    ----------
+    spool_dir : AnyStr
+        the spool directory
+    out_dir : AnyStr
+        the directory to write the output to
+    excel_template : AnyStr, optional
+        the Excel template to fill, by default the configured template
+    excel_template_cell : ExcelCell, optional
+        the template cell where data starts, by default the configured cell
+    output_format : OutputFormat | Sequence[OutputFormat], optional
+        the output format, or formats, by default "excel"
+
+    Returns
+    -------
+    int
+        the number of merged files
+    """
+    queue: SpoolQueue = SpoolQueue(spool_dir)
+    pending: int = queue.setup().count(_PENDING) + queue.count(_RUNNING)
+    if pending > 0:
+        LOG.warning("Merging '%s' while %d jobs are left", queue.spool_dir, pending)
+
+    rows: Dict[PDFType, List[DataFrame]] = {}
+    results: List[SpoolJob] = queue.results()
+    for result in results:
+        if result.get("error") is not None:
+            LOG.warning("Skipping '%s': %s", result["path"], result["error"])
+            continue
+        rows.setdefault(result["type"], []).append(
+            DataFrame(result["rows"], columns=result["columns"])
+        )
+
+    write_outputs(
+        {k: concat(v, ignore_index=True) for k, v in rows.items()},
+        out_dir,
+        excel_template,
+        excel_template_cell,
+        output_format,
+    )
+    merged: int = sum(len(frames) for frames in rows.values())
+    LOG.info("Merged %d files from '%s' to '%s'", merged, queue.spool_dir, out_dir)
+    return merged
+
+
+def _job_name(file_path: str) -> str:
+    return sha1(file_path.encode("utf-8")).hexdigest() + _JOB_EXTENSION
+
+
+def _job_result(
+    job: SpoolJob,
+    node: str,
+    result: PDFLTMatchResult | Exception,
+    df: Dict[PDFType, DataFrame],
+) -> SpoolJob:
+    if isinstance(result, Exception):
+        return job | {"node": node, "error": f"{result}"}
+    rows: DataFrame = df[result["Type"]]
+    return job | {
+        "node": node,
+        "type": result["Type"],
+        "columns": list(rows.columns),
+        "rows": rows.astype(object).where(rows.notna(), None).values.tolist(),
+    }
+
+
+def _read_json(path: str) -> SpoolJob | None:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _write_json(path: str, value: SpoolJob) -> None:
+    # Written aside then renamed, so that readers never see a partial file
+    tmp_path: str = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(value, f, ensure_ascii=False, default=str)
+    os.replace(tmp_path, path)
@@ -0,0 +1,449 @@
+# -*- coding: utf-8 -*-
+
+# Python Imports
+import sqlite3
+from os.path import abspath, basename
+from shutil import copyfile
+from logging import Logger, getLogger
+from typing import Any, AnyStr, Dict, List, Optional, Self, Sequence, Tuple
+
+# Third-Party Imports
+from pandas import DataFrame, ExcelWriter
+
+# Local Imports
+from app.config import settings
+from app.core import mv, preventive
+from app.core.pdfs import OutputSink
+from app.model.pdfs import PDFLTMatchResult, PDFType
+from app.utils.excel import ExcelCell, ExcelUtils
+from app.utils.metrics import NULL_METRICS, Metrics
+from app.utils.paths import is_valid_file, make_path
+
+# Constants
+LOG: Logger = getLogger(__name__)
+STORE_FILE_NAME: str = "results.sqlite"
+STORE_COLUMNS: Dict[PDFType, List[str]] = {
+    PDFType.PREVENTIVE: preventive.COLUMNS,
+    PDFType.MV: mv.COLUMNS,
+}
+# The natural key of a row is its report and task, MV reports having no task
+# codes their task descriptions are used instead
+STORE_KEYS: Dict[PDFType, Tuple[str, ...]] = {
+    PDFType.PREVENTIVE: ("WTG", "Checklist Code", "Task Code"),
+    PDFType.MV: ("WTG", "Order number", "Task description"),
+}
+STORE_STATUS_COLUMN: str = "Status acc. Doc. / Result"
+_REPORT: str = "Report"
+_OCCURRENCE: str = "Occurrence"
+_FILE: str = "File"
+_SEEN: str = "Seen"
+_CHANGED: str = "Changed"
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _unique(pdf_type: PDFType) -> str:
+    return ", ".join(_quote(c) for c in (*STORE_KEYS[pdf_type], _REPORT, _OCCURRENCE))
+
+
+def _to_sql(value: Any) -> Any:
+    if value is None or value != value:
+        return None
+    if isinstance(value, (str, int, float, bytes)):
+        return value
+    if hasattr(value, "item"):
+        # numpy scalars
+        return value.item()
+    return f"{value}"
+
+
+class ResultStore(object):
+    """SQLite store of the parsed rows.
+
+    Holds one table per PDF type, with the columns of its Excel sheet, where
+    rows are upserted on their natural key, see `STORE_KEYS`, so that parsing
+    a report again updates its rows instead of duplicating them. As a task may
+    hold several rows, eg. one per measure, rows sharing a key are told apart
+    by their order within the report. Reports whose identity could not be
+    parsed, ie. with empty key columns but the task, are told apart by their
+    file name.
+
+    Each ingest is numbered and rows record the last ingest that saw them and
+    the last one that changed them, so that the Excel output can be rendered
+    again by only writing the rows changed since it was last rendered.
+
+    Parameters
+    ----------
+    db_path : AnyStr
+        the SQLite database file, created if it does not exist
+    """
+
+    def __init__(self: Self, db_path: AnyStr) -> None:
+        self.db_path: AnyStr = db_path
+        self.batch: int = 0
+        self._conn: sqlite3.Connection | None = None
+
+    @property
+    def conn(self: Self) -> sqlite3.Connection:
+        if self._conn is None:
+            raise RuntimeError(f"Result store '{self.db_path}' is not open")
+        return self._conn
+
+    def open(self: Self) -> None:
+        if self._conn is not None:
+            return
+        LOG.debug("Opening result store '%s'...", self.db_path)
+        # Written from the thread pools of `aparse_pdfs`, one write at a time
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._create_tables()
+
+    def close(self: Self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self: Self) -> Self:
+        self.open()
+        return self
+
+    def __exit__(self: Self, *args: Any) -> None:
+        self.close()
+
+    def _create_tables(self: Self) -> None:
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS batches "
+            "(id INTEGER PRIMARY KEY, started TEXT DEFAULT CURRENT_TIMESTAMP)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS exports "
+            "(path TEXT PRIMARY KEY, batch INTEGER NOT NULL)"
+        )
+        for pdf_type, columns in STORE_COLUMNS.items():
+            keys: Tuple[str, ...] = STORE_KEYS[pdf_type]
+            # Key columns are never null, as nulls never conflict with each other
+            definitions: List[str] = [
+                f"{_quote(c)} TEXT NOT NULL DEFAULT ''" if c in keys else _quote(c)
+                for c in columns
+            ] + [
+                f"{_quote(_REPORT)} TEXT NOT NULL DEFAULT ''",
+                f"{_quote(_OCCURRENCE)} INTEGER NOT NULL",
+                f"{_quote(_FILE)} TEXT",
+                f"{_quote(_SEEN)} INTEGER NOT NULL",
+                f"{_quote(_CHANGED)} INTEGER NOT NULL",
+                f"UNIQUE ({_unique(pdf_type)})",
+            ]
+            table: str = _quote(pdf_type)
+            self.conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(definitions)})"
+            )
+            self.conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {_quote(f'{pdf_type}_wtg')} "
+                f"ON {table} ({_quote('WTG')})"
+            )
+            self.conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {_quote(f'{pdf_type}_status')} "
+                f"ON {table} ({_quote(STORE_STATUS_COLUMN)})"
+            )
+
+    def begin_batch(self: Self) -> int:
+        """Numbers a new ingest, see `upsert`.
+
+        Returns
+        -------
+        int
+            the ingest number
+        """
+        with self.conn:
+            self.batch = self.conn.execute(
+                "INSERT INTO batches DEFAULT VALUES"
+            ).lastrowid
+        return self.batch
+
+    def upsert(self: Self, pdf_type: PDFType, file_path: str, rows: DataFrame) -> int:
+        """Inserts or updates the rows parsed from a report, in one transaction.
+
+        Parameters
+        ----------
+        pdf_type : PDFType
+            the PDF type of the report
+        file_path : str
+            the parsed PDF file
+        rows : DataFrame
+            the rows parsed from the report, with the columns of its PDF type
+
+        Returns
+        -------
+        int
+            the number of rows upserted
+        """
+        if len(rows) == 0:
+            return 0
+        if self.batch == 0:
+            self.begin_batch()
+
+        columns: List[str] = STORE_COLUMNS[pdf_type]
+        keys: Tuple[str, ...] = STORE_KEYS[pdf_type]
+        frame: DataFrame = rows[columns].astype(object)
+        for key in keys:
+            frame[key] = frame[key].map(lambda v: "" if _to_sql(v) is None else v)
+        unknown: List[bool] = (frame[list(keys[:-1])] == "").all(axis=1).tolist()
+        occurrences: List[int] = (
+            frame.groupby(list(keys), sort=False).cumcount().tolist()
+        )
+
+        report: str = basename(file_path)
+        values: List[Tuple[Any, ...]] = [
+            (
+                *(_to_sql(v) for v in row),
+                report if unknown[i] else "",
+                occurrences[i],
+                file_path,
+                self.batch,
+                self.batch,
+            )
+            for i, row in enumerate(frame.itertuples(index=False))
+        ]
+        with self.conn:
+            self.conn.executemany(self._upsert_sql(pdf_type), values)
+        return len(values)
+
+    def _upsert_sql(self: Self, pdf_type: PDFType) -> str:
+        columns: List[str] = STORE_COLUMNS[pdf_type]
+        keys: Tuple[str, ...] = STORE_KEYS[pdf_type]
+        names: List[str] = [*columns, _REPORT, _OCCURRENCE, _FILE, _SEEN, _CHANGED]
+        values: List[str] = [c for c in columns if c not in keys]
+        # Rows keep the ingest that last changed them, so that unchanged rows
+        # are not written again when rendering the Excel output
+        changed: str = " OR ".join(
+            f"{_quote(c)} IS NOT excluded.{_quote(c)}" for c in values
+        )
+        return (
+            f"INSERT INTO {_quote(pdf_type)} ({', '.join(_quote(c) for c in names)}) "
+            f"VALUES ({', '.join('?' for _ in names)}) "
+            f"ON CONFLICT ({_unique(pdf_type)}) "
+            "DO UPDATE SET "
+            + ", ".join(
+                f"{_quote(c)} = excluded.{_quote(c)}" for c in (*values, _FILE, _SEEN)
+            )
+            + f", {_quote(_CHANGED)} = CASE WHEN {changed or '0'} "
+            f"THEN excluded.{_quote(_CHANGED)} ELSE {_quote(_CHANGED)} END"
+        )
+
+    def read(
+        self: Self, pdf_type: PDFType, since: int = 0
+    ) -> Tuple[List[int], DataFrame]:
+        """Reads the rows of a PDF type, in the order they were first stored.
+
+        Parameters
+        ----------
+        pdf_type : PDFType
+            the PDF type of the rows
+        since : int, optional
+            only reads the rows changed after this ingest, by default 0
+
+        Returns
+        -------
+        Tuple[List[int], DataFrame]
+            the position of each row among all the rows, and the rows
+        """
+        columns: List[str] = STORE_COLUMNS[pdf_type]
+        keys: Tuple[str, ...] = STORE_KEYS[pdf_type]
+        cursor: sqlite3.Cursor = self.conn.execute(
+            f"SELECT * FROM (SELECT ROW_NUMBER() OVER (ORDER BY rowid) - 1 AS pos, "
+            f"{_quote(_CHANGED)}, {', '.join(_quote(c) for c in columns)} "
+            f"FROM {_quote(pdf_type)}) WHERE {_quote(_CHANGED)} > ? ORDER BY pos",
+            (since,),
+        )
+        records: List[Tuple[Any, ...]] = cursor.fetchall()
+        frame: DataFrame = DataFrame(
+            [record[2:] for record in records], columns=columns, dtype=object
+        )
+        for key in keys:
+            frame[key] = frame[key].map(lambda v: None if v == "" else v)
+        return [record[0] for record in records], frame
+
+    def render_excel(
+        self: Self,
+        out_path: AnyStr,
+        excel_template: AnyStr,
+        excel_cell: ExcelCell,
+        start_rows: Optional[Dict[PDFType, int]] = None,
+        full: bool = False,
+    ) -> int:
+        """Renders the stored rows to a copy of the Excel template.
+
+        Only the rows changed since the output was last rendered are written,
+        unless it does not exist or `full` is set, in which case the template
+        is copied again and all the rows are written.
+
+        Parameters
+        ----------
+        out_path : AnyStr
+            the Excel output file
+        excel_template : AnyStr
+            the Excel template to fill
+        excel_cell : ExcelCell
+            the template cell where data starts
+        start_rows : Dict[PDFType, int], optional
+            the number of rows already in each template sheet, by default None
+        full : bool, optional
+            whether to render all the rows, by default False
+
+        Returns
+        -------
+        int
+            the number of rows written
+        """
+        export_path: str = abspath(out_path)
+        row: Tuple[int] | None = self.conn.execute(
+            "SELECT batch FROM exports WHERE path = ?", (export_path,)
+        ).fetchone()
+        since: int = 0 if full or row is None or not is_valid_file(out_path) else row[0]
+        if since == 0:
+            LOG.debug("Copying Excel template to '%s'...", out_path)
+            copyfile(excel_template, out_path)
+        batch: int = self.conn.execute("SELECT MAX(id) FROM batches").fetchone()[0] or 0
+
+        written: int = 0
+        with ExcelWriter(
+            out_path, "openpyxl", if_sheet_exists="overlay", mode="a"
+        ) as writer:
+            for pdf_type in STORE_COLUMNS:
+                positions, frame = self.read(pdf_type, since)
+                for start, end in _runs(positions):
+                    frame.iloc[start:end].to_excel(
+                        excel_writer=writer,
+                        index=False,
+                        header=False,
+                        startrow=excel_cell[1]
+                        + (start_rows or {}).get(pdf_type, 0)
+                        + positions[start],
+                        startcol=excel_cell[0] - 1 if excel_cell[0] - 1 > 0 else 0,
+                        sheet_name=pdf_type,
+                    )
+                written += len(frame)
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO exports (path, batch) VALUES (?, ?)",
+                (export_path, batch),
+            )
+        LOG.debug("Rendered %d changed rows to '%s'", written, out_path)
+        return written
+
+    def __repr__(self: Self) -> str:
+        return f"ResultStore(db_path={self.db_path!r}, batch={self.batch})"
+
+
+def _runs(positions: Sequence[int]) -> List[Tuple[int, int]]:
+    # Slices of consecutive positions, each written with a single call
+    runs: List[Tuple[int, int]] = []
+    start: int = 0
+    for i in range(1, len(positions) + 1):
+        if i == len(positions) or positions[i] != positions[i - 1] + 1:
+            runs.append((start, i))
+            start = i
+    return runs
+
+
+class SQLiteSink(OutputSink):
+    """Upserts the parsed rows into a `ResultStore`.
+
+    Each file is written in its own transaction to `results.sqlite` in the
+    output directory, the split option does not apply to the store.
+
+    Parameters
+    ----------
+    out_dir : AnyStr
+        the directory to write the output to
+    db_path : AnyStr, optional
+        the SQLite database file, by default `results.sqlite` in `out_dir`
+    """
+
+    def __init__(self: Self, out_dir: AnyStr, db_path: Optional[AnyStr] = None) -> None:
+        super().__init__(out_dir)
+        self.store: ResultStore = ResultStore(
+            db_path if db_path is not None else store_path(out_dir)
+        )
+
+    @property
+    def name(self: Self) -> str:
+        return "sqlite"
+
+    def open(self: Self) -> None:
+        self.store.open()
+        self.store.begin_batch()
+
+    def write(
+        self: Self,
+        file_path: str,
+        match_result: PDFLTMatchResult,
+        rows: DataFrame,
+        metrics: Metrics = NULL_METRICS,
+    ) -> None:
+        with metrics.time(self.name):
+            self.store.upsert(match_result["Type"], file_path, rows)
+
+    def close(self: Self) -> None:
+        self.store.close()
+
+
+def store_path(out_dir: AnyStr) -> str:
+    return make_path(f"{out_dir}/{STORE_FILE_NAME}")
+
+
+def render_excel(
+    out_dir: AnyStr,
+    excel_template: AnyStr = settings().excel_template,
+    excel_template_cell: str = settings().excel_template_start_cell,
+    full: bool = False,
+) -> str:
+    """Renders `output.xlsx` from the result store of an output directory.
+
+    Parameters
+    ----------
+    out_dir : AnyStr
+        the output directory holding `results.sqlite`
+    excel_template : AnyStr, optional
+        the Excel template to fill, by default the configured template
+    excel_template_cell : str, optional
+        the template cell where data starts, by default the configured cell
+    full : bool, optional
+        whether to render all the rows instead of the changed ones, by
+        default False
+
+    Returns
+    -------
+    str
+        the rendered Excel file
+
+    Raises
+    ------
+    FileNotFoundError
+        when the output directory holds no result store
+    """
+    db_path: str = store_path(out_dir)
+    if not is_valid_file(db_path):
+        raise FileNotFoundError(f"No result store found at '{db_path}'")
+
+    excel_cell: ExcelCell = ExcelUtils.resolve_excel_cell(excel_template_cell)
+    df: Dict[str, DataFrame] = ExcelUtils.read_excel(
+        file_path=excel_template,
+        columns=STORE_COLUMNS,
+        sheet_names=list(STORE_COLUMNS),
+        start_cell=excel_cell,
+    )
+    out_path: str = make_path(f"{out_dir}/output.xlsx")
+    with ResultStore(db_path) as store:
+        store.render_excel(
+            out_path,
+            excel_template,
+            excel_cell,
+            {k: len(v) for k, v in df.items()},
+            full,
+        )
+    return out_path
@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+
+# Python Imports
+import os
+import sys
+import ctypes
+import select
+import struct
+from abc import ABC, abstractmethod
+from asyncio import AbstractEventLoop, get_running_loop
+from logging import Logger, getLogger
+from pathlib import Path
+from time import monotonic, sleep
+from typing import Any, AnyStr, AsyncGenerator, Dict, List, Set, Tuple, Self
+
+# Third-Party Imports
+
+# Local Imports
+from app.core.pdfs import resolve_files
+from app.utils.files import is_pdf_file
+from app.utils.paths import is_valid_dir, make_path
+
+# Constants
+LOG: Logger = getLogger(__name__)
+_PDF_EXTENSION: str = ".pdf"
+_IN_MODIFY: int = 0x00000002
+_IN_CLOSE_WRITE: int = 0x00000008
+_IN_MOVED_TO: int = 0x00000080
+_IN_CREATE: int = 0x00000100
+_IN_Q_OVERFLOW: int = 0x00004000
+_IN_IGNORED: int = 0x00008000
+_IN_ISDIR: int = 0x40000000
+_IN_WATCH_MASK: int = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+_IN_EVENT: struct.Struct = struct.Struct("iIII")
+_IN_READ_SIZE: int = 64 * 1024
+_POLL_INTERVAL: float = 2.0
+FileStat = Tuple[int, int]
+
+
+class FileWatcher(ABC):
+    """Watches a directory tree for PDF files being created or modified.
+
+    Parameters
+    ----------
+    root : str
+        the directory to watch
+    """
+
+    def __init__(self: Self, root: str) -> None:
+        self.root: str = root
+
+    @abstractmethod
+    def wait(self: Self, timeout: float) -> Set[str]:
+        """Waits for files to be created or modified.
+
+        Parameters
+        ----------
+        timeout : float
+            the maximum number of seconds to wait
+
+        Returns
+        -------
+        Set[str]
+            the paths of the files created or modified since the last call,
+            empty when none were within the timeout
+        """
+        pass
+
+    def close(self: Self) -> None:
+        pass
+
+    def __enter__(self: Self) -> Self:
+        return self
+
+    def __exit__(self: Self, *args: Any) -> None:
+        self.close()
+
+    def __repr__(self: Self) -> str:
+        return f"{type(self).__name__}(root={self.root!r})"
+
+
+class PollingWatcher(FileWatcher):
+    """Watches a directory tree by listing it at each call.
+
+    Works on any file system, eg. network shares that do not report changes,
+    at the cost of listing the whole tree every `interval` seconds.
+
+    Parameters
+    ----------
+    root : str
+        the directory to watch
+    interval : float, optional
+        the minimum number of seconds between listings, by default 2.0
+    """
+
+    def __init__(self: Self, root: str, interval: float = _POLL_INTERVAL) -> None:
+        super().__init__(root)
+        self.interval: float = interval
+        self._scanned: float = monotonic()
+        self._stats: Dict[str, FileStat] = self._scan()
+
+    def wait(self: Self, timeout: float) -> Set[str]:
+        sleep(timeout)
+        if monotonic() - self._scanned < self.interval:
+            return set()
+        self._scanned = monotonic()
+        stats: Dict[str, FileStat] = self._scan()
+        changed: Set[str] = {
+            path for path, stat in stats.items() if self._stats.get(path) != stat
+        }
+        self._stats = stats
+        return changed
+
+    def _scan(self: Self) -> Dict[str, FileStat]:
+        stats: Dict[str, FileStat] = {}
+        for path in Path(self.root).rglob(f"*{_PDF_EXTENSION}"):
+            try:
+                stat: os.stat_result = path.stat()
+            except OSError:
+                continue
+            stats[f"{path}"] = (stat.st_size, stat.st_mtime_ns)
+        return stats
+
+
+class InotifyWatcher(FileWatcher):
+    """Watches a directory tree with Linux inotify.
+
+    Every directory of the tree is watched, directories created or moved into
+    it being watched as they appear.
+
+    Raises
+    ------
+    OSError
+        when inotify is not available or the watch limit is reached
+    """
+
+    def __init__(self: Self, root: str) -> None:
+        super().__init__(root)
+        self._libc: ctypes.CDLL = ctypes.CDLL(None, use_errno=True)
+        self._fd: int = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            self._raise_errno(root)
+        self._dirs: Dict[int, str] = {}
+        try:
+            self._watch_tree(root)
+        except OSError:
+            self.close()
+            raise
+
+    def wait(self: Self, timeout: float) -> Set[str]:
+        changed: Set[str] = set()
+        if not select.select([self._fd], [], [], timeout)[0]:
+            return changed
+        while True:
+            try:
+                data: bytes = os.read(self._fd, _IN_READ_SIZE)
+            except BlockingIOError:
+                return changed
+            offset: int = 0
+            while offset < len(data):
+                wd, mask, _, length = _IN_EVENT.unpack_from(data, offset)
+                offset += _IN_EVENT.size
+                name: bytes = data[offset : offset + length].rstrip(b"\0")
+                offset += length
+                if mask & _IN_Q_OVERFLOW:
+                    LOG.warning("Lost events watching '%s', rescanning", self.root)
+                    changed |= set(resolve_files(self.root))
+                elif mask & _IN_IGNORED:
+                    self._dirs.pop(wd, None)
+                elif wd in self._dirs:
+                    path: str = os.path.join(self._dirs[wd], os.fsdecode(name))
+                    if not mask & _IN_ISDIR:
+                        changed.add(path)
+                    elif mask & (_IN_CREATE | _IN_MOVED_TO):
+                        # Files may be written before the directory is watched
+                        changed |= self._watch_tree(path)
+
+    def close(self: Self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def _watch_tree(self: Self, root: str) -> Set[str]:
+        files: Set[str] = set()
+        for dir_path, _, file_names in os.walk(root):
+            wd: int = self._libc.inotify_add_watch(
+                self._fd, os.fsencode(dir_path), _IN_WATCH_MASK
+            )
+            if wd < 0:
+                self._raise_errno(dir_path)
+            self._dirs[wd] = dir_path
+            files.update(os.path.join(dir_path, name) for name in file_names)
+        return files
+
+    @staticmethod
+    def _raise_errno(path: str) -> None:
+        errno: int = ctypes.get_errno()
+        raise OSError(errno, os.strerror(errno), path)
+
+
+def create_watcher(root: AnyStr, polling: bool = False) -> FileWatcher:
+    """Creates the watcher of a directory tree.
+
+    Parameters
+    ----------
+    root : AnyStr
+        the directory to watch
+    polling : bool, optional
+        whether to poll the directory even where inotify is available, eg. for
+        network shares, by default False
+
+    Returns
+    -------
+    FileWatcher
+        an `InotifyWatcher` on Linux, a `PollingWatcher` otherwise
+    """
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError) as e:
+            LOG.warning("Could not watch '%s' with inotify, polling: %s", root, e)
+    return PollingWatcher(root)
+
+
+async def watch_pdfs(
+    pdfs_path: AnyStr,
+    settle: float = 2.0,
+    interval: float = 0.5,
+    polling: bool = False,
+) -> AsyncGenerator[str, None]:
+    """Streams the PDF files of a directory as they are written to it.
+
+    Yields the PDF files already in the directory, then each PDF file created
+    or modified in it once its size and modification time have not changed for
+    `settle` seconds, so that files still being copied are not parsed. Meant to
+    be passed to `aparse_pdfs`, which with `incremental` skips the files parsed
+    by a previous batch.
+
+    Parameters
+    ----------
+    pdfs_path : AnyStr
+        the directory to watch
+    settle : float, optional
+        the number of seconds a file must not change for, by default 2.0
+    interval : float, optional
+        the number of seconds between checks of the changed files, by default
+        0.5
+    polling : bool, optional
+        whether to poll the directory even where inotify is available, by
+        default False
+
+    Yields
+    ------
+    str
+        the path of each written PDF file
+
+    Raises
+    ------
+    NotADirectoryError
+        when the path is not a directory
+    """
+    if not is_valid_dir(pdfs_path):
+        raise NotADirectoryError(f"Path '{pdfs_path}' is not a directory")
+    loop: AbstractEventLoop = get_running_loop()
+    root: str = make_path(pdfs_path)
+    # Watches before listing, so that files written meanwhile are not missed
+    watcher: FileWatcher = await loop.run_in_executor(
+        None, create_watcher, root, polling
+    )
+    LOG.info("Watching '%s' with %r", root, watcher)
+    # The last stat of each changed file and since when it has not changed
+    candidates: Dict[str, Tuple[FileStat | None, float]] = {}
+
+    try:
+        for f in await loop.run_in_executor(None, lambda: list(resolve_files(root))):
+            yield f
+
+        while True:
+            changed: Set[str] = await loop.run_in_executor(
+                None, watcher.wait, interval
+            )
+            now: float = monotonic()
+            for path in changed:
+                if path.endswith(_PDF_EXTENSION):
+                    candidates[path] = (None, now)
+
+            ready: List[str] = []
+            for path, (last_stat, since) in list(candidates.items()):
+                try:
+                    stat: os.stat_result = os.stat(path)
+                except OSError:
+                    # Removed or renamed while being written
+                    del candidates[path]
+                    continue
+                file_stat: FileStat = (stat.st_size, stat.st_mtime_ns)
+                if file_stat != last_stat:
+                    candidates[path] = (file_stat, now)
+                elif now - since >= settle:
+                    del candidates[path]
+                    ready.append(path)
+            for path in sorted(ready):
+                if is_pdf_file(path):
+                    LOG.debug("File '%s' was written", path)
+                    yield make_path(path)
+                else:
+                    LOG.warning("Ignoring file '%s', it is not a PDF", path)
+    finally:
+        watcher.close()
@@ -17,8 +17,8 @@ from PySide6.QtGui import (QBrush, QColor, QConicalGradient, QCursor,
     QPalette, QPixmap, QRadialGradient, QTransform)
 from PySide6.QtWidgets import (QApplication, QCheckBox, QFrame, QGridLayout,
     QHBoxLayout, QLabel, QLayout, QLineEdit,
-    QListWidget, QListWidgetItem, QMainWindow, QProgressBar,
-    QPushButton, QSizePolicy, QSpacerItem, QWidget)
+    QListView, QMainWindow, QProgressBar, QPushButton,
+    QSizePolicy, QSpacerItem, QWidget)
 
 class Ui_MainWindow(object):
     def setupUi(self, MainWindow):
@@ -61,6 +61,11 @@ class Ui_MainWindow(object):
 
         self.gridLayout.addWidget(self.progressBar, 8, 0, 1, 1)
 
+        self.label_6 = QLabel(self.centralwidget)
+        self.label_6.setObjectName(u"label_6")
+
+        self.gridLayout.addWidget(self.label_6, 9, 0, 1, 1)
+
         self.horizontalLayout = QHBoxLayout()
         self.horizontalLayout.setObjectName(u"horizontalLayout")
         self.horizontalLayout.setSizeConstraint(QLayout.SetDefaultConstraint)
@@ -148,11 +153,14 @@ class Ui_MainWindow(object):
 
         self.gridLayout.addLayout(self.horizontalLayout_2, 1, 0, 1, 1)
 
-        self.listWidget = QListWidget(self.centralwidget)
-        self.listWidget.setObjectName(u"listWidget")
-        self.listWidget.setMaximumSize(QSize(16777215, 16777215))
+        self.listView = QListView(self.centralwidget)
+        self.listView.setObjectName(u"listView")
+        self.listView.setMaximumSize(QSize(16777215, 16777215))
+        self.listView.setLayoutMode(QListView.Batched)
+        self.listView.setBatchSize(500)
+        self.listView.setUniformItemSizes(True)
 
-        self.gridLayout.addWidget(self.listWidget, 6, 0, 1, 1)
+        self.gridLayout.addWidget(self.listView, 6, 0, 1, 1)
 
         self.horizontalLayout_4 = QHBoxLayout()
         self.horizontalLayout_4.setObjectName(u"horizontalLayout_4")
@@ -211,6 +219,14 @@ class Ui_MainWindow(object):
 
         self.horizontalLayout_3.addWidget(self.pushButton_3)
 
+        self.pushButton_6 = QPushButton(self.centralwidget)
+        self.pushButton_6.setObjectName(u"pushButton_6")
+        self.pushButton_6.setEnabled(False)
+        sizePolicy2.setHeightForWidth(self.pushButton_6.sizePolicy().hasHeightForWidth())
+        self.pushButton_6.setSizePolicy(sizePolicy2)
+
+        self.horizontalLayout_3.addWidget(self.pushButton_6)
+
         self.horizontalSpacer_3 = QSpacerItem(40, 20, QSizePolicy.Policy.MinimumExpanding, QSizePolicy.Policy.Minimum)
 
         self.horizontalLayout_3.addItem(self.horizontalSpacer_3)
@@ -224,6 +240,7 @@ class Ui_MainWindow(object):
         self.pushButton.clicked.connect(MainWindow.browse_input_files)
         self.pushButton_2.clicked.connect(MainWindow.browse_out_dir)
         self.pushButton_3.clicked.connect(MainWindow.process)
+        self.pushButton_6.clicked.connect(MainWindow.cancel)
         self.pushButton_4.clicked.connect(MainWindow.browse_template)
         self.pushButton_5.clicked.connect(MainWindow.browse_input_dir)
         self.checkBox.toggled.connect(MainWindow.toggled_split)
@@ -234,6 +251,7 @@ class Ui_MainWindow(object):
     def retranslateUi(self, MainWindow):
         MainWindow.setWindowTitle(QCoreApplication.translate("MainWindow", u"Inspetrio - Informes de Inspecci\u00f3n", None))
         self.label_4.setText("")
+        self.label_6.setText("")
         self.label.setText(QCoreApplication.translate("MainWindow", u"Archivo/Carpeta", None))
         self.pushButton.setText(QCoreApplication.translate("MainWindow", u"Archivos", None))
         self.pushButton_5.setText(QCoreApplication.translate("MainWindow", u"Carpeta", None))
@@ -244,5 +262,6 @@ class Ui_MainWindow(object):
         self.label_3.setText(QCoreApplication.translate("MainWindow", u"Archivos a Processar", None))
         self.checkBox.setText(QCoreApplication.translate("MainWindow", u"Separar", None))
         self.pushButton_3.setText(QCoreApplication.translate("MainWindow", u"Processar", None))
+        self.pushButton_6.setText(QCoreApplication.translate("MainWindow", u"Cancelar", None))
     # retranslateUi
 
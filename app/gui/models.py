@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+
+# Python Imports
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Dict, List, Optional, Self
+
+# Third-Party Imports
+from PySide6.QtCore import QAbstractListModel, QModelIndex, QObject, Qt
+from PySide6.QtGui import QColor, QIcon
+
+# Local Imports
+
+# Constants
+
+
+class PDFFileStatus(Enum):
+    PENDING = 0
+    DONE = 1
+    ERROR = 2
+
+
+@dataclass
+class PDFFileEntry:
+    """A row of a `PDFFileListModel`, either a PDF file or a message."""
+
+    text: str
+    is_file: bool = True
+    status: PDFFileStatus = PDFFileStatus.PENDING
+    message: str = ""
+
+
+class PDFFileListModel(QAbstractListModel):
+    """List model of the PDF files to process.
+
+    Rows are appended in batches, as a background scan finds them, so that
+    views only lay out and render the rows that are visible.
+
+    Parameters
+    ----------
+    icon : QIcon
+        the icon shown next to PDF files
+    parent : QObject, optional
+        the parent object, by default None
+    """
+
+    _COLORS: Dict[PDFFileStatus, QColor | None] = {
+        PDFFileStatus.PENDING: None,
+        PDFFileStatus.DONE: QColor("green"),
+        PDFFileStatus.ERROR: QColor("red"),
+    }
+
+    def __init__(self: Self, icon: QIcon, parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+        self._icon: QIcon = icon
+        self._entries: List[PDFFileEntry] = []
+        self._rows: Dict[str, int] = {}
+        self._file_count: int = 0
+
+    @property
+    def file_count(self: Self) -> int:
+        return self._file_count
+
+    def rowCount(self: Self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._entries)
+
+    def data(self: Self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        if not index.isValid() or index.row() >= len(self._entries):
+            return None
+
+        entry: PDFFileEntry = self._entries[index.row()]
+        if role == Qt.DisplayRole:
+            return entry.text
+        elif role == Qt.DecorationRole:
+            return self._icon if entry.is_file else None
+        elif role == Qt.ForegroundRole:
+            return self._COLORS[entry.status]
+        elif role == Qt.ToolTipRole:
+            return entry.message or None
+        return None
+
+    def append_files(self: Self, file_paths: List[str]) -> None:
+        """Appends a batch of PDF files, skipping the ones already listed.
+
+        Parameters
+        ----------
+        file_paths : List[str]
+            the PDF file paths, normalized with `make_path` off the UI thread,
+            eg. by `ScanWorker`
+        """
+        entries: List[PDFFileEntry] = []
+        for file_path in file_paths:
+            if file_path not in self._rows:
+                self._rows[file_path] = len(self._entries) + len(entries)
+                entries.append(PDFFileEntry(file_path))
+        self._append(entries)
+        self._file_count += len(entries)
+
+    def append_message(self: Self, message: str) -> None:
+        self._append([PDFFileEntry(message, is_file=False)])
+
+    def clear(self: Self) -> None:
+        self.beginResetModel()
+        self._entries = []
+        self._rows = {}
+        self._file_count = 0
+        self.endResetModel()
+
+    def file_paths(self: Self) -> List[str]:
+        return [entry.text for entry in self._entries if entry.is_file]
+
+    def set_status(
+        self: Self, file_path: str, status: PDFFileStatus, message: str = ""
+    ) -> None:
+        """Sets the processing status of a listed PDF file.
+
+        Parameters
+        ----------
+        file_path : str
+            the PDF file path, as listed
+        status : PDFFileStatus
+            the processing status
+        message : str, optional
+            the status message, shown as tooltip, by default ""
+        """
+        row: int | None = self._rows.get(file_path)
+        if row is None:
+            return
+        self._entries[row].status = status
+        self._entries[row].message = message
+        index: QModelIndex = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.ForegroundRole, Qt.ToolTipRole])
+
+    def reset_status(self: Self) -> None:
+        for entry in self._entries:
+            entry.status = PDFFileStatus.PENDING
+            entry.message = ""
+        if len(self._entries) > 0:
+            self.dataChanged.emit(
+                self.index(0),
+                self.index(len(self._entries) - 1),
+                [Qt.ForegroundRole, Qt.ToolTipRole],
+            )
+
+    def _append(self: Self, entries: List[PDFFileEntry]) -> None:
+        if len(entries) == 0:
+            return
+        first: int = len(self._entries)
+        self.beginInsertRows(QModelIndex(), first, first + len(entries) - 1)
+        self._entries += entries
+        self.endInsertRows()
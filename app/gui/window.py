@@ -4,31 +4,32 @@
 import os
 import sys
 import json
-from pathlib import Path
-from typing import Generator, List, Self, Tuple, TypedDict
+from typing import TYPE_CHECKING, List, Self, TypedDict
 
 # Third-Party Imports
 from PySide6 import QtWidgets, QtCore
-from PySide6.QtGui import QIcon
+from PySide6.QtGui import QCloseEvent, QIcon
 from PySide6.QtWidgets import (
     QMainWindow,
     QApplication,
     QFileDialog,
     QDialog,
-    QListWidgetItem,
 )
-from PySide6.QtCore import QDir
+from PySide6.QtCore import QDir, QThreadPool
 
 # Local Imports
 from app.config import settings
-from app.core.pdfs import parse_pdfs
 from app.gui.main_window import Ui_MainWindow
-from app.model.pdfs import PDFLTMatchResult
+from app.gui.models import PDFFileListModel, PDFFileStatus
+from app.gui.workers import ParseStats, ParseWorker, ScanWorker
 from app.utils.paths import is_valid_dir, is_valid_file, make_path
-from app.utils.pdfs import PDFUtils
 from app.utils.types import TypeUtils
 
+if TYPE_CHECKING:
+    from app.model.pdfs import PDFLTMatchResult
+
 # Constants
+_STATS_STAGES: int = 4
 
 
 class Window(QMainWindow, Ui_MainWindow):
@@ -63,11 +64,16 @@ class Window(QMainWindow, Ui_MainWindow):
         self.progressBar.setStyleSheet(self.pgbStyleSheet)
 
         self.pdfIcon = QIcon(self._MAIN_WINDOW_LIST_PDF)
+        self.fileModel = PDFFileListModel(self.pdfIcon, self)
+        self.listView.setModel(self.fileModel)
+        self._files_label: str = self.label_3.text()
 
         self.input_files: List[str] = []
         self.output_dir: str = ""
         self.template_file: str = ""
         self.split: bool = False
+        self._worker: ParseWorker | None = None
+        self._scanner: ScanWorker | None = None
         self._load_memento()
 
     def _load_memento(self) -> None:
@@ -128,7 +134,10 @@ class Window(QMainWindow, Ui_MainWindow):
         self._save_memento()
 
     def _resolve_input_files(self, fnames: List[str]) -> None:
-        has_items: bool = False
+        if self._scanner is not None:
+            # Batches the previous scan already queued are ignored by the slots
+            self._scanner.cancel()
+            self._scanner = None
 
         if fnames and TypeUtils.is_iterable(fnames):
             self.input_files = sorted([make_path(f) for f in fnames])
@@ -142,41 +151,51 @@ class Window(QMainWindow, Ui_MainWindow):
                 fname = make_path(fnames[0])
             self.lineEdit.setText(fname)
 
-            self.listWidget.clear()
-            for fname in self.input_files:
-                if is_valid_dir(fname):
-                    file_names: List[str] = [f for f in Path(fname).rglob("*.pdf")]
-
-                    if len(file_names) > 0:
-                        [
-                            self.listWidget.addItem(
-                                QListWidgetItem(self.pdfIcon, str(f))
-                            )
-                            for f in file_names
-                        ]
-                        has_items = True
-                    else:
-                        self.listWidget.addItem(
-                            QListWidgetItem(
-                                "No se encontraron archivos PDF en el directorio seleccionado."
-                            )
-                        )
-                elif fname.endswith(".pdf"):
-                    self.listWidget.addItem(
-                        QListWidgetItem(self.pdfIcon, make_path(fname))
-                    )
-                    has_items = True
-                else:
-                    self.listWidget.addItem(
-                        QListWidgetItem(
-                            "Archivo no válido. Por favor, seleccione un archivo PDF."
-                        )
-                    )
-
-        if self.lineEdit_2.text() and has_items:
-            self.pushButton_3.setEnabled(True)
-        else:
+            # Directories are scanned in the background, the listed files are
+            # streamed into the model as they are found
+            self.fileModel.clear()
             self.pushButton_3.setEnabled(False)
+            self.label_3.setText(f"{self._files_label} (buscando...)")
+            self._scanner = ScanWorker(self.input_files)
+            self._scanner.signals.found.connect(self.scanned_files)
+            self._scanner.signals.invalid.connect(self.scanned_invalid)
+            self._scanner.signals.finished.connect(self.scanning_finished)
+            QThreadPool.globalInstance().start(self._scanner)
+        else:
+            self._update_process_button()
+
+    @QtCore.Slot(list)
+    def scanned_files(self, file_paths: List[str]) -> None:
+        if not self._is_scanning():
+            return
+        self.fileModel.append_files(file_paths)
+        self.label_3.setText(
+            f"{self._files_label} ({self.fileModel.file_count}, buscando...)"
+        )
+
+    @QtCore.Slot(str)
+    def scanned_invalid(self, message: str) -> None:
+        if self._is_scanning():
+            self.fileModel.append_message(message)
+
+    @QtCore.Slot(int, bool)
+    def scanning_finished(self, count: int, cancelled: bool) -> None:
+        if not self._is_scanning():
+            return
+        self._scanner = None
+        self.label_3.setText(f"{self._files_label} ({self.fileModel.file_count})")
+        self._update_process_button()
+
+    def _is_scanning(self) -> bool:
+        return self._scanner is not None and self.sender() is self._scanner.signals
+
+    def _update_process_button(self) -> None:
+        self.pushButton_3.setEnabled(
+            bool(self.lineEdit_2.text())
+            and self.fileModel.file_count > 0
+            and self._scanner is None
+            and self._worker is None
+        )
 
     @QtCore.Slot()
     def browse_out_dir(self) -> None:
@@ -192,10 +211,7 @@ class Window(QMainWindow, Ui_MainWindow):
             self.lineEdit_2.setText(self.output_dir)
             self._save_memento()
 
-        if self.lineEdit.text():
-            self.pushButton_3.setEnabled(True)
-        else:
-            self.pushButton_3.setEnabled(False)
+        self._update_process_button()
 
     @QtCore.Slot()
     def browse_template(self) -> None:
@@ -220,71 +236,126 @@ class Window(QMainWindow, Ui_MainWindow):
     @QtCore.Slot()
     def process(self) -> None:
         self.label_4.setVisible(False)
+        self.label_6.setText("")
         self.pushButton_3.setEnabled(False)
+        self.pushButton_6.setEnabled(True)
 
         split: bool = self.checkBox.isChecked()
         template: str = self.template_file
 
-        work_count: int = 0
         out_dir: str = self.lineEdit_2.text()
-        items: List[QListWidgetItem] = [
-            self.listWidget.item(x) for x in range(self.listWidget.count())
-        ]
-        pdf_paths: List[str] = []
-        for item in items:
-            pdf_path: str = item.text()
-            pdf_paths.append(pdf_path)
-            page_count: int = PDFUtils.page_count(pdf_path)
-            work_count += page_count
-
-        work: Generator[Tuple[int, int, PDFLTMatchResult]] = parse_pdfs(
-            pdfs_path=pdf_paths,
+        self.fileModel.reset_status()
+
+        self.progressBar.setStyleSheet(self.pgbStyleSheet)
+        # Busy indicator until the worker has counted the pages
+        self.progressBar.setMinimum(0)
+        self.progressBar.setMaximum(0)
+        self.progressBar.setValue(0)
+
+        self._worker = ParseWorker(
+            pdf_paths=self.fileModel.file_paths(),
             out_dir=out_dir,
             split=split,
             excel_template=template if template else settings().excel_template,
+            executor=settings().gui_executor,
+            max_workers=settings().gui_max_workers,
         )
+        self._worker.signals.total.connect(self.progressBar.setMaximum)
+        self._worker.signals.progress.connect(self.progressBar.setValue)
+        self._worker.signals.result.connect(self.processed_file)
+        self._worker.signals.error.connect(self.processing_error)
+        self._worker.signals.stats.connect(self.processing_stats)
+        self._worker.signals.finished.connect(self.processing_finished)
+        QThreadPool.globalInstance().start(self._worker)
 
-        self.progressBar.setStyleSheet(self.pgbStyleSheet)
-        self.progressBar.setMaximum(work_count)
-        self.progressBar.setMinimum(0)
-        self.progressBar.setValue(0)
+    @QtCore.Slot()
+    def cancel(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+        self.pushButton_6.setEnabled(False)
+
+    @QtCore.Slot(str, object)
+    def processed_file(self, file_path: str, result: "PDFLTMatchResult") -> None:
+        self.fileModel.set_status(file_path, PDFFileStatus.DONE)
+
+    @QtCore.Slot(str, str)
+    def processing_error(self, file_path: str, message: str) -> None:
+        self.progressBar.setStyleSheet(
+            self.pgbStyleSheet
+            + """
+            QProgressBar::chunk {
+                background-color: #AA0000;
+            }"""
+        )
+        self.fileModel.set_status(file_path, PDFFileStatus.ERROR, message)
+
+    @QtCore.Slot(object)
+    def processing_stats(self, stats: ParseStats) -> None:
+        parts: List[str] = [
+            f"{stats.pages_per_sec:.1f} págs/s",
+            f"{stats.files_per_sec:.2f} archivos/s",
+            f"{stats.records} filas",
+        ]
+        staged: float = sum(stats.stages.values())
+        if staged > 0:
+            top: List[tuple[str, float]] = sorted(
+                stats.stages.items(), key=lambda s: s[1], reverse=True
+            )[:_STATS_STAGES]
+            parts.append(
+                ", ".join([f"{k} {v / staged:.0%}" for k, v in top])
+            )
+        if stats.eta is not None and stats.pages < stats.total_pages:
+            parts.append(f"Restante: {self._format_seconds(stats.eta)}")
+        if stats.slowest is not None:
+            parts.append(
+                f"Más lento: {os.path.basename(stats.slowest[0])} "
+                f"({self._format_seconds(stats.slowest[1])})"
+            )
+        self.label_6.setText(" | ".join(parts))
+        self.label_6.setToolTip(
+            "\n".join(
+                [
+                    f"{k}: {v:.2f}s"
+                    for k, v in sorted(stats.stages.items(), key=lambda s: -s[1])
+                ]
+            )
+        )
 
-        error_count: int = 0
-        while True:
-            try:
-                res: Tuple[int, int, PDFLTMatchResult] | Exception = next(work)
-                if isinstance(res[2], Exception):
-                    raise res
-                self.progressBar.setValue(self.progressBar.value() + 1)
-            except StopIteration:
-                break
-            except Exception as _:
-                self.progressBar.setStyleSheet(
-                    self.pgbStyleSheet
-                    + """
-                    QProgressBar::chunk {
-                        background-color: #AA0000;
-                    }"""
-                )
-                self.progressBar.update()
-                error_count += 1
+    @staticmethod
+    def _format_seconds(seconds: float) -> str:
+        minutes, secs = divmod(round(seconds), 60)
+        hours, minutes = divmod(minutes, 60)
+        return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
 
+    @QtCore.Slot(int, int, bool)
+    def processing_finished(self, succeeded: int, failed: int, cancelled: bool) -> None:
+        self._worker = None
         self.label_4.setVisible(True)
 
-        if error_count > 0:
-            self.progressBar.setValue(work_count)
+        if failed > 0:
+            self.progressBar.setValue(self.progressBar.maximum())
             self.label_4.setStyleSheet("color: red;")
         else:
             self.label_4.setStyleSheet("color: green;")
         self.label_4.setText(
-            f"Proceso completado. Éxito: {len(items) - error_count} / Error: {error_count}"
+            f"Proceso {'cancelado' if cancelled else 'completado'}. Éxito: {succeeded} / Error: {failed}"
         )
 
-        if sys.platform.startswith("win"):
+        if not cancelled and sys.platform.startswith("win"):
             # Only works on Windows
-            os.startfile(out_dir)
-
-        self.pushButton_3.setEnabled(True)
+            os.startfile(self.lineEdit_2.text())
+
+        self.pushButton_6.setEnabled(False)
+        self._update_process_button()
+
+    def closeEvent(self, event: QCloseEvent) -> None:
+        # Stops an ongoing batch so that its pools are shut down before exiting
+        if self._scanner is not None:
+            self._scanner.cancel()
+        if self._worker is not None:
+            self._worker.cancel()
+        QThreadPool.globalInstance().waitForDone()
+        super().closeEvent(event)
 
     def _open_file_dialog(
         self,
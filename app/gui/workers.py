@@ -0,0 +1,463 @@
+# -*- coding: utf-8 -*-
+
+# Python Imports
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from logging import Logger, getLogger
+from threading import Event, Thread
+from typing import (
+    TYPE_CHECKING,
+    AsyncGenerator,
+    Dict,
+    Generator,
+    List,
+    Literal,
+    Optional,
+    Self,
+    Tuple,
+)
+
+# Third-Party Imports
+from PySide6.QtCore import QObject, QRunnable, Signal
+
+# Local Imports
+from app.utils.metrics import Metrics
+from app.utils.paths import is_valid_dir, make_path
+
+if TYPE_CHECKING:
+    from app.model.pdfs import PDFLTMatchResult
+
+# Constants
+LOG: Logger = getLogger(__name__)
+WorkerExecutor = Literal["sync", "thread", "process"]
+_SCAN_BATCH_SIZE: int = 500
+_SCAN_BATCH_SECONDS: float = 0.1
+_TOTAL_UPDATE_SECONDS: float = 0.25
+_STATS_UPDATE_SECONDS: float = 0.5
+
+
+class ScanWorkerSignals(QObject):
+    """Signals emitted by a `ScanWorker`, delivered on the receiver's thread.
+
+    Attributes
+    ----------
+    found : Signal(list)
+        a batch of PDF file paths
+    invalid : Signal(str)
+        a message for an input that is not a PDF file nor holds any
+    finished : Signal(int, bool)
+        the PDF file count, and whether the scan was cancelled
+    """
+
+    found = Signal(list)
+    invalid = Signal(str)
+    finished = Signal(int, bool)
+
+
+class ScanWorker(QRunnable):
+    """Lists the PDF files of a selection of files and directories off the UI thread.
+
+    Directories are walked recursively with `os.scandir`, and the files found
+    are emitted in batches, every `_SCAN_BATCH_SIZE` files or
+    `_SCAN_BATCH_SECONDS` seconds, so that views are updated incrementally
+    without flooding the UI thread's event loop. File paths are emitted
+    normalized with `make_path`, as the parsing reports them.
+
+    Parameters
+    ----------
+    input_paths : List[str]
+        the selected files and directories
+    """
+
+    def __init__(self: Self, input_paths: List[str]) -> None:
+        super().__init__()
+        self.signals: ScanWorkerSignals = ScanWorkerSignals()
+        self.input_paths: List[str] = input_paths
+        self._cancelled: Event = Event()
+        self._batch: List[str] = []
+        self._emitted: float = 0.0
+        self._count: int = 0
+
+    @property
+    def cancelled(self: Self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self: Self) -> None:
+        LOG.debug("Cancelling PDF scanning worker...")
+        self._cancelled.set()
+
+    def run(self: Self) -> None:
+        LOG.debug(f"Scanning {len(self.input_paths)} inputs for PDF files...")
+        self._emitted = time.perf_counter()
+        try:
+            for input_path in self.input_paths:
+                if self.cancelled:
+                    break
+                if is_valid_dir(input_path):
+                    count: int = self._count
+                    self._scan_dir(input_path)
+                    if self._count == count and not self.cancelled:
+                        self._flush()
+                        self.signals.invalid.emit(
+                            "No se encontraron archivos PDF en el directorio seleccionado."
+                        )
+                elif input_path.lower().endswith(".pdf"):
+                    self._add(make_path(input_path))
+                else:
+                    self._flush()
+                    self.signals.invalid.emit(
+                        "Archivo no válido. Por favor, seleccione un archivo PDF."
+                    )
+            self._flush()
+        except Exception as e:
+            LOG.error(f"Unexpected exception in PDF scanning worker:\n {e}")
+        finally:
+            LOG.debug(f"Finished scanning, found {self._count} PDF files")
+            self.signals.finished.emit(self._count, self.cancelled)
+
+    def _scan_dir(self: Self, dir_path: str) -> None:
+        # An explicit stack instead of recursion, deep trees are common on shares
+        stack: List[str] = [dir_path]
+        while stack and not self.cancelled:
+            current: str = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    entries: List[os.DirEntry] = sorted(it, key=lambda e: e.name)
+            except OSError as e:
+                LOG.warning(f"Could not scan directory '{current}':\n {e}")
+                continue
+
+            dirs: List[str] = []
+            for entry in entries:
+                try:
+                    # Like `Path.rglob`, directory links are not followed,
+                    # so that link cycles do not make the scan endless
+                    if entry.is_dir(follow_symlinks=False):
+                        dirs.append(entry.path)
+                    elif entry.name.lower().endswith(".pdf") and entry.is_file():
+                        # Normalized here, so that the UI thread keys the
+                        # files by the paths emitted
+                        self._add(make_path(entry.path))
+                except OSError as e:
+                    LOG.warning(f"Could not stat '{entry.path}':\n {e}")
+            stack += reversed(dirs)
+
+    def _add(self: Self, file_path: str) -> None:
+        self._batch.append(file_path)
+        self._count += 1
+        if (
+            len(self._batch) >= _SCAN_BATCH_SIZE
+            or time.perf_counter() - self._emitted >= _SCAN_BATCH_SECONDS
+        ):
+            self._flush()
+
+    def _flush(self: Self) -> None:
+        if len(self._batch) > 0:
+            self.signals.found.emit(self._batch)
+            self._batch = []
+        self._emitted = time.perf_counter()
+
+
+@dataclass
+class ParseStats:
+    """A snapshot of the throughput of a `ParseWorker` batch.
+
+    Attributes
+    ----------
+    elapsed : float
+        the seconds since the batch started
+    pages : int
+        the number of pages parsed
+    total_pages : int
+        the estimated total page count
+    files : int
+        the number of files done, either written or failed
+    total_files : int
+        the number of files in the batch
+    records : int
+        the number of rows written
+    stages : Dict[str, float]
+        the seconds spent in each parsing stage, over the files done
+    slowest : Tuple[str, float] | None
+        the path and wall time of the slowest file done, if any
+    """
+
+    elapsed: float = 0.0
+    pages: int = 0
+    total_pages: int = 0
+    files: int = 0
+    total_files: int = 0
+    records: int = 0
+    stages: Dict[str, float] = field(default_factory=dict)
+    slowest: Tuple[str, float] | None = None
+
+    @property
+    def pages_per_sec(self: Self) -> float:
+        return self.pages / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def files_per_sec(self: Self) -> float:
+        return self.files / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def eta(self: Self) -> float | None:
+        """The estimated seconds left, or None until a page is parsed."""
+        if self.pages == 0:
+            return None
+        return max(self.total_pages - self.pages, 0) / self.pages_per_sec
+
+
+class ParseWorkerSignals(QObject):
+    """Signals emitted by a `ParseWorker`, delivered on the receiver's thread.
+
+    Attributes
+    ----------
+    total : Signal(int)
+        the estimated total page count of the batch, emitted when parsing starts
+        and refined as the pages of each file are counted
+    progress : Signal(int)
+        the number of pages parsed so far
+    result : Signal(str, object)
+        a file path and its `PDFLTMatchResult`, once written to the output
+    error : Signal(str, str)
+        a file path, or an empty string for batch errors, and the error message
+    stats : Signal(object)
+        a `ParseStats` snapshot, emitted after each file and at most every
+        `_STATS_UPDATE_SECONDS` seconds while pages are parsed
+    finished : Signal(int, int, bool)
+        the succeeded and failed file counts, and whether the batch was cancelled
+    """
+
+    total = Signal(int)
+    progress = Signal(int)
+    result = Signal(str, object)
+    error = Signal(str, str)
+    stats = Signal(object)
+    finished = Signal(int, int, bool)
+
+
+class ParseWorker(QRunnable):
+    """Parses a batch of PDFs off the UI thread.
+
+    Meant to be started in a `QThreadPool`. The batch is parsed with
+    `parse_pdfs` in the worker thread itself, or with `aparse_pdfs` in a
+    thread or process pool, so that a batch can use all cores. Cancellation
+    is checked between pages.
+
+    Pages are counted in a background thread while the batch is parsed, the
+    total first estimates one page per file and is then extrapolated from the
+    average page count of the files counted so far.
+
+    Parameters
+    ----------
+    pdf_paths : List[str]
+        the PDF files to parse
+    out_dir : str
+        the directory to write the output to
+    split : bool
+        whether to write one output file per PDF
+    excel_template : str
+        the Excel template to fill
+    executor : WorkerExecutor, optional
+        whether to parse in the worker thread ("sync"), or in a "thread" or
+        "process" pool, by default "process"
+    max_workers : int, optional
+        the maximum number of files parsed concurrently, by default the CPU count
+    """
+
+    def __init__(
+        self: Self,
+        pdf_paths: List[str],
+        out_dir: str,
+        split: bool,
+        excel_template: str,
+        executor: WorkerExecutor = "process",
+        max_workers: Optional[int] = None,
+    ) -> None:
+        super().__init__()
+        self.signals: ParseWorkerSignals = ParseWorkerSignals()
+        self.pdf_paths: List[str] = pdf_paths
+        self.out_dir: str = out_dir
+        self.split: bool = split
+        self.excel_template: str = excel_template
+        self.executor: WorkerExecutor = executor
+        self.max_workers: Optional[int] = max_workers
+        self._cancelled: Event = Event()
+        self._done: Event = Event()
+        self._counted: Event = Event()
+        self._pages: int = 0
+        self._total: int = 0
+        self._succeeded: int = 0
+        self._failed: int = 0
+        self._metrics: Metrics = Metrics("batch")
+        self._files: int = 0
+        self._slowest: Tuple[str, float] | None = None
+        self._start: float = 0.0
+        self._stats_emitted: float = 0.0
+
+    @property
+    def cancelled(self: Self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self: Self) -> None:
+        """Requests the batch to stop at the next page boundary."""
+        LOG.debug("Cancelling PDF parsing worker...")
+        self._cancelled.set()
+
+    def run(self: Self) -> None:
+        LOG.debug(f"Running PDF parsing worker using '{self.executor}' executor...")
+        counter: Thread = Thread(
+            target=self._count_pages, name="PageCounter", daemon=True
+        )
+        self._start = time.perf_counter()
+        try:
+            self._emit_total(len(self.pdf_paths))
+            counter.start()
+            if self.executor == "sync":
+                self._run()
+            else:
+                asyncio.run(self._arun())
+        except Exception as e:
+            LOG.error(f"Unexpected exception in PDF parsing worker:\n {e}")
+            self._failed += 1
+            self.signals.error.emit("", f"{e}")
+        finally:
+            LOG.debug("Finished running PDF parsing worker")
+            self._done.set()
+            if counter.is_alive():
+                counter.join()
+            if not self._counted.is_set() and not self.cancelled:
+                # The batch outran the counting, the parsed pages are the total
+                self._emit_total(max(self._pages, 1))
+            self._emit_stats()
+            self.signals.finished.emit(self._succeeded, self._failed, self.cancelled)
+
+    def _count_pages(self: Self) -> None:
+        counted: int = 0
+        pages: int = 0
+        emitted: float = time.perf_counter()
+        for pdf_path in self.pdf_paths:
+            if self.cancelled or self._done.is_set():
+                return
+            pages += _page_count(pdf_path)
+            counted += 1
+
+            if (
+                counted == len(self.pdf_paths)
+                or time.perf_counter() - emitted >= _TOTAL_UPDATE_SECONDS
+            ):
+                remaining: int = len(self.pdf_paths) - counted
+                estimate: int = pages + round(remaining * pages / counted)
+                # Never below the pages already parsed, the bar would stall
+                self._emit_total(max(estimate, self._pages))
+                emitted = time.perf_counter()
+        self._counted.set()
+
+    def _run(self: Self) -> None:
+        from app.core.pdfs import parse_pdfs
+
+        work: Generator[Tuple[int, int, PDFLTMatchResult | Exception]] = parse_pdfs(
+            pdfs_path=self.pdf_paths,
+            out_dir=self.out_dir,
+            split=self.split,
+            excel_template=self.excel_template,
+            on_file=self._on_file,
+            on_metrics=self._on_metrics,
+        )
+        try:
+            for res in work:
+                if self.cancelled:
+                    break
+                self._on_event(res)
+        finally:
+            work.close()
+
+    async def _arun(self: Self) -> None:
+        from app.core.pdfs import aparse_pdfs
+
+        work: AsyncGenerator[Tuple[int, int, PDFLTMatchResult | Exception]] = (
+            aparse_pdfs(
+                pdfs_path=self.pdf_paths,
+                out_dir=self.out_dir,
+                split=self.split,
+                excel_template=self.excel_template,
+                executor=self.executor,
+                max_workers=self.max_workers,
+                on_file=self._on_file,
+                on_metrics=self._on_metrics,
+            )
+        )
+        try:
+            async for res in work:
+                if self.cancelled:
+                    break
+                self._on_event(res)
+        finally:
+            await work.aclose()
+
+    def _on_event(
+        self: Self, res: "Tuple[int, int, PDFLTMatchResult | Exception] | Exception"
+    ) -> None:
+        if isinstance(res, Exception):
+            # Batch level error, eg. the template could not be read
+            self._failed += 1
+            self.signals.error.emit("", f"{res}")
+        elif not isinstance(res[2], Exception):
+            self._pages += 1
+            self.signals.progress.emit(self._pages)
+            if time.perf_counter() - self._stats_emitted >= _STATS_UPDATE_SECONDS:
+                self._emit_stats()
+
+    def _on_file(
+        self: Self, file_path: str, res: "PDFLTMatchResult | Exception"
+    ) -> None:
+        if isinstance(res, Exception):
+            self._failed += 1
+            self.signals.error.emit(file_path, f"{res}")
+        else:
+            # The written result event repeats the file's last page event
+            self._pages -= 1
+            self._succeeded += 1
+            self.signals.progress.emit(self._pages)
+            self.signals.result.emit(file_path, res)
+
+    def _on_metrics(self: Self, file_path: str, metrics: Metrics) -> None:
+        self._files += 1
+        self._metrics.merge(metrics)
+        wall: float = metrics.timers.get("wall", 0.0)
+        if self._slowest is None or wall > self._slowest[1]:
+            self._slowest = (file_path, wall)
+        self._emit_stats()
+
+    def _emit_total(self: Self, total: int) -> None:
+        self._total = total
+        self.signals.total.emit(total)
+
+    def _emit_stats(self: Self) -> None:
+        self._stats_emitted = time.perf_counter()
+        self.signals.stats.emit(
+            ParseStats(
+                elapsed=self._stats_emitted - self._start,
+                pages=self._pages,
+                total_pages=self._total,
+                files=self._files,
+                total_files=len(self.pdf_paths),
+                records=self._metrics.counters.get("records", 0),
+                # The wall timer spans whole files, the rest are stages
+                stages={k: v for k, v in self._metrics.timers.items() if k != "wall"},
+                slowest=self._slowest,
+            )
+        )
+
+
+def _page_count(pdf_path: str) -> int:
+    from app.utils.pdfs import PDFUtils
+
+    try:
+        return PDFUtils.page_count(pdf_path)
+    except Exception as e:
+        # The file is reported as failed once parsed
+        LOG.warning(f"Could not count the pages of file '{pdf_path}':\n {e}")
+        return 0
@@ -1,14 +1,19 @@
 # -*- coding: utf-8 -*-
 
 # Python Imports
-from abc import ABC
-from math import dist
+import json
+from abc import ABC, abstractmethod
+from math import dist, floor
 from enum import Enum, StrEnum, auto
-from collections import deque
-from dataclasses import dataclass
+from collections import OrderedDict, deque
+from dataclasses import dataclass, replace
+from hashlib import sha1
 from logging import Logger, getLogger
+from threading import Lock
+from time import perf_counter
 from typing import (
     Any,
+    AnyStr,
     Deque,
     Dict,
     Generic,
@@ -18,10 +23,12 @@ from typing import (
     Optional,
     Self,
     Tuple,
+    Type,
     TypeVar,
 )
 
 # Third-Party Imports
+from numpy import array, ndarray, nonzero
 from pdfminer.layout import (
     LTComponent,
     LTPage,
@@ -519,42 +526,6 @@ class PDFLTPointIntersect(object):
         )
 
 
-class PDFLTPipeline(object):
-    def __init__(self: Self) -> None:
-        pass
-
-    def step(self: Self, step: "PDFLTPipelineStep") -> Self:
-        pass
-
-
-FromStepType = TypeVar("FromStepType", bound="Iterable[LTType] | Iterable[PDFLTType]")
-ToStepType = TypeVar("ToStepType", bound="Iterable[PDFLTType]")
-
-
-class PDFLTPipelineStep(Generic[FromStepType, ToStepType], ABC):
-    def __init__(self: Self, params: PDFLTParams) -> None:
-        self._params: PDFLTParams = params
-
-    @property
-    def params(self: Self) -> PDFLTParams:
-        return self._params
-
-    def run(self: Self, step: FromStepType) -> ToStepType:
-        raise NotImplementedError(
-            f"Method '{self.run.__name__}' must be implemented in subclass."
-        )
-
-    def __repr__(self: Self) -> str:
-        """Override the default `__repr__` method to return a custom string representation of the object.
-
-        Returns
-        -------
-        str
-            A custom string representation of the object.
-        """
-        return "<%s>" % (self.__class__.__name__)
-
-
 class PDFLTIntersections(object):
     def __init__(self: Self, params: PDFLTParams) -> None:
         self._config: PDFLTParams = params
@@ -700,6 +671,9 @@ class PDFLTIntersections(object):
                 return
         self._intersects.append(PDFLTPointIntersect(point, (line0, line1)))
 
+    def __len__(self: Self) -> int:
+        return len(self._intersects)
+
     def as_deque(self: Self) -> Deque["PDFLTPointIntersect"]:
         # return deque(sorted(self._intersects, key=lambda x: (x.point.x, -x.point.y)))
         return deque(sorted(self._intersects, key=lambda x: (-x.point.y, x.point.x)))
@@ -899,3 +873,724 @@ class PDFLTComposer(object):
                 remaining.append(cmpt)
 
         return remaining
+
+
+class PDFLTGridIntersections(PDFLTIntersections):
+    """Drop-in replacement for `PDFLTIntersections` producing the same output.
+
+    Candidate line pairs and intersection points are pruned with vectorised
+    bounding box tests and a uniform grid before the original predicates are
+    evaluated, which avoids most of the quadratic work on dense table pages.
+    """
+
+    def __init__(self: Self, params: PDFLTParams) -> None:
+        super().__init__(params)
+        self._cell: float = params.position_tol if params.position_tol > 0 else 1.0
+        self._grid: Dict[Tuple[int, int], List[int]] = {}
+
+    def fit(self: Self, lines: Iterable[PDFLTLine]) -> Self:
+        if not TypeUtils.is_iterable(lines):
+            raise ValueError("lines must be an iterable of 'PDFLTLine' objects.")
+
+        lines = sorted(lines, key=lambda x: -x.y0)
+        if len(lines) == 0:
+            return self
+
+        # Two lines can only intersect within tolerance if their bounding boxes,
+        # grown by the tolerance, overlap
+        margin: float = 2 * self._config.position_tol + 1.0
+        bounds: ndarray = array([(ln.x0, ln.y0, ln.x1, ln.y1) for ln in lines])
+        x0, y0, x1, y1 = bounds[:, 0], bounds[:, 1], bounds[:, 2], bounds[:, 3]
+
+        for i, line0 in enumerate(lines):
+            candidates: ndarray = (
+                nonzero(
+                    (x0[i + 1 :] <= x1[i] + margin)
+                    & (x1[i + 1 :] >= x0[i] - margin)
+                    & (y0[i + 1 :] <= y1[i] + margin)
+                    & (y1[i + 1 :] >= y0[i] - margin)
+                )[0]
+                + i
+                + 1
+            )
+
+            for j in candidates:
+                line1: PDFLTLine = lines[j]
+                if line0.is_close(line1, self._config.position_tol):
+                    continue
+
+                intersect: LineIntersect | None = line0.intersect_param(
+                    line1, self._config.position_tol, self._config.direction_tol
+                )
+
+                if intersect:
+                    self._add(
+                        intersect[0],
+                        line0,
+                        line1,
+                        self._config.position_tol,
+                        self._config.direction_tol,
+                    )
+
+        return self
+
+    def _add(
+        self: Self,
+        point: Point,
+        line0: PDFLTLine,
+        line1: PDFLTLine,
+        position_tolerance: float = 0.0,
+        direction_tolerance: float = 1e-6,
+    ) -> None:
+        # Merges into the earliest added point within tolerance, as the linear scan does
+        cx, cy = self._grid_cell(point)
+        match: int | None = None
+        for gx in (cx - 1, cx, cx + 1):
+            for gy in (cy - 1, cy, cy + 1):
+                for k in self._grid.get((gx, gy), ()):
+                    if (match is None or k < match) and dist(
+                        self._intersects[k].point.point, point
+                    ) <= position_tolerance:
+                        match = k
+
+        if match is not None:
+            self._intersects[match].add_lines(
+                (line0, line1), position_tolerance, direction_tolerance
+            )
+            return
+        self._grid.setdefault((cx, cy), []).append(len(self._intersects))
+        self._intersects.append(PDFLTPointIntersect(point, (line0, line1)))
+
+    def _grid_cell(self: Self, point: Point) -> Tuple[int, int]:
+        return (floor(point[0] / self._cell), floor(point[1] / self._cell))
+
+    def predict(self: Self) -> List[PDFLTRect]:
+        points: List[PDFLTPointIntersect] = list(self.as_deque())
+        px: ndarray = array([p.point.x for p in points], dtype=float)
+        py: ndarray = array([p.point.y for p in points], dtype=float)
+        tol: float = self._config.position_tol
+
+        rects: List[PDFLTRect] = []
+        for k, top_left in enumerate(points):
+            # Points still on the stack are the ones after the top-left point
+            x_points: List[PDFLTPointIntersect] = [
+                points[j]
+                for j in nonzero(
+                    (py[k + 1 :] < top_left.point.y)
+                    & (abs(px[k + 1 :] - top_left.point.x) <= tol)
+                )[0]
+                + k
+                + 1
+                if dist(points[j].point.point, top_left.point.point) > tol
+            ]
+
+            for x_point in x_points:
+                if not top_left.edge_exists_between(
+                    x_point.point.point, PDFLTLineType.VERTICAL, tol
+                ):
+                    continue
+
+                rect: PDFLTRect | None = self._compute_rect_from(
+                    k, top_left, x_point, points, px, py
+                )
+                if rect is not None:
+                    rects.append(rect)
+                    break
+
+        return [
+            rect
+            for rect in rects
+            if rect.width >= self._config.min_rect_width
+            and rect.height >= self._config.min_rect_height
+        ]
+
+    def _compute_rect_from(
+        self: Self,
+        k: int,
+        top_left: PDFLTPointIntersect,
+        btm_left: PDFLTPointIntersect,
+        points: List[PDFLTPointIntersect],
+        px: ndarray,
+        py: ndarray,
+    ) -> PDFLTRect | None:
+        tol: float = self._config.position_tol
+        y_points: List[PDFLTPointIntersect] = [
+            points[j]
+            for j in nonzero(
+                (px[k + 1 :] > top_left.point.x)
+                & (abs(py[k + 1 :] - top_left.point.y) <= tol)
+            )[0]
+            + k
+            + 1
+            if dist(points[j].point.point, top_left.point.point) > tol
+        ]
+
+        for y_point in y_points:
+            if not top_left.edge_exists_between(
+                y_point.point.point, PDFLTLineType.HORIZONTAL, tol
+            ):
+                continue
+
+            # Hypothetical bottom-right point
+            btm_right: Point = (y_point.point.x, btm_left.point.y)
+            if (
+                self._point_exists_from(k, btm_right, points, px, py)
+                and btm_left.edge_exists_between(
+                    btm_right, PDFLTLineType.HORIZONTAL, tol
+                )
+                and y_point.edge_exists_between(btm_right, PDFLTLineType.VERTICAL, tol)
+            ):
+                style: PDFLTComponentStyle = PDFLTComponentStyle(
+                    **{
+                        k: v
+                        for k, v in btm_left.v_lines[0].element.__dict__.items()
+                        if k in PDFLTComponentStyle.__dataclass_fields__
+                    }
+                )
+                return self._create_rect(btm_left.point, y_point.point, style)
+        return None
+
+    def _point_exists_from(
+        self: Self,
+        k: int,
+        point: Point,
+        points: List[PDFLTPointIntersect],
+        px: ndarray,
+        py: ndarray,
+    ) -> bool:
+        tol: float = self._config.position_tol
+        for j in (
+            nonzero(
+                (abs(px[k + 1 :] - point[0]) <= tol + 1.0)
+                & (abs(py[k + 1 :] - point[1]) <= tol + 1.0)
+            )[0]
+            + k
+            + 1
+        ):
+            if dist(points[j].point.point, point) <= tol:
+                return True
+        return False
+
+
+class PDFLTTrace(object):
+    """Per page outputs of the layout pipeline steps for a PDF file.
+
+    Captures the objects each step hands to the next one, eg. the decomposed
+    lines, the merged intersection points, the reconstructed rects and the row
+    groups, as plain bounding boxes tagged with the object kind and the group,
+    eg. the row, they belong to. Traces are small and serializable, so they are
+    captured during a normal parse and rendered later on, on demand.
+
+    Parameters
+    ----------
+    name : str, optional
+        the traced PDF file path, by default ""
+    """
+
+    def __init__(self: Self, name: str = "") -> None:
+        self.name: str = name
+        self.pages: List[Dict[str, Any]] = []
+
+    @property
+    def enabled(self: Self) -> bool:
+        return True
+
+    def page(self: Self, page: LTPage) -> None:
+        self.pages.append(
+            {"page": page.pageid, "bbox": [round(c, 2) for c in page.bbox], "steps": {}}
+        )
+
+    def capture(self: Self, step: str, data: Any) -> None:
+        """Captures the output of pipeline step `step` for the current page.
+
+        Parameters
+        ----------
+        step : str
+            the step name
+        data : Any
+            the step output, layout objects or nested groups of them
+        """
+        if len(self.pages) == 0:
+            return
+        shapes: List[List[Any]] = []
+        self._capture(data, None, shapes)
+        self.pages[-1]["steps"][step] = shapes
+
+    def _capture(
+        self: Self, data: Any, group: int | None, shapes: List[List[Any]]
+    ) -> None:
+        if isinstance(data, (list, tuple, deque)):
+            for i, item in enumerate(data):
+                self._capture(
+                    item, i if isinstance(item, (list, tuple, deque)) else group, shapes
+                )
+            return
+
+        bbox: Tuple[float, float, float, float]
+        if isinstance(data, PDFLTPointIntersect):
+            bbox = (data.point.x, data.point.y, data.point.x, data.point.y)
+        else:
+            bbox = (data.x0, data.y0, data.x1, data.y1)
+        shapes.append([data.__class__.__name__, group, *[round(c, 2) for c in bbox]])
+        # Text boxes children are text lines, which are of no use to debug
+        if isinstance(data, PDFLTContainer) and not isinstance(data, PDFLTTextBox):
+            for child in data.children:
+                self._capture(child, group, shapes)
+
+    def as_dict(self: Self) -> Dict[str, Any]:
+        return {"name": self.name, "pages": self.pages}
+
+    def dump(self: Self, file_path: AnyStr) -> None:
+        """Writes the trace as JSON to `file_path`.
+
+        Parameters
+        ----------
+        file_path : AnyStr
+            the JSON file path
+        """
+        LOG.debug("Writing trace to '%s'...", file_path)
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(self.as_dict(), f, separators=(",", ":"))
+        LOG.debug("Trace written to '%s'", file_path)
+
+    @staticmethod
+    def load(file_path: AnyStr) -> "PDFLTTrace":
+        with open(file_path, "r", encoding="utf-8") as f:
+            data: Dict[str, Any] = json.load(f)
+        trace: PDFLTTrace = PDFLTTrace(data["name"])
+        trace.pages = data["pages"]
+        return trace
+
+    def __repr__(self: Self) -> str:
+        """Override the default `__repr__` method to return a custom string representation of the object.
+
+        Returns
+        -------
+        str
+            A custom string representation of the object.
+        """
+        return "<%s '%s' pages=%d>" % (
+            self.__class__.__name__,
+            self.name,
+            len(self.pages),
+        )
+
+
+class NullPDFLTTrace(PDFLTTrace):
+    """Disabled trace.
+
+    Capturing is a no-op so that the pipeline costs the same as without tracing
+    when tracing is not requested.
+    """
+
+    @property
+    def enabled(self: Self) -> bool:
+        return False
+
+    def page(self: Self, page: LTPage) -> None:
+        pass
+
+    def capture(self: Self, step: str, data: Any) -> None:
+        pass
+
+
+NULL_TRACE: PDFLTTrace = NullPDFLTTrace()
+
+
+class PDFLTPipelineContext(object):
+    def __init__(
+        self: Self, page: LTPage, params: PDFLTParams, trace: PDFLTTrace = NULL_TRACE
+    ) -> None:
+        self.page: LTPage = page
+        self.params: PDFLTParams = params
+        self.trace: PDFLTTrace = trace
+        self.outputs: Dict[str, Any] = {}
+        self.timings: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self._step_counters: Dict[str, int] = {}
+
+    def count(self: Self, key: str, n: int) -> None:
+        self.counters[key] = self.counters.get(key, 0) + n
+        self._step_counters[key] = self._step_counters.get(key, 0) + n
+
+    def __repr__(self: Self) -> str:
+        """Override the default `__repr__` method to return a custom string representation of the object.
+
+        Returns
+        -------
+        str
+            A custom string representation of the object.
+        """
+        return "<%s[%d] %s>" % (
+            self.__class__.__name__,
+            self.page.pageid,
+            list(self.outputs.keys()),
+        )
+
+
+@dataclass
+class PDFLTStepStats(object):
+    calls: int = 0
+    hits: int = 0
+    seconds: float = 0.0
+
+
+FromStepType = TypeVar("FromStepType", bound="Iterable[LTType] | Iterable[PDFLTType]")
+ToStepType = TypeVar("ToStepType", bound="Iterable[PDFLTType]")
+
+
+class PDFLTPipelineStep(Generic[FromStepType, ToStepType], ABC):
+    @property
+    def name(self: Self) -> str:
+        return self.__class__.__name__
+
+    @abstractmethod
+    def run(self: Self, data: FromStepType, context: PDFLTPipelineContext) -> ToStepType:
+        raise NotImplementedError(
+            f"Method '{self.run.__name__}' must be implemented in subclass."
+        )
+
+    def copy(self: Self, data: ToStepType) -> ToStepType:
+        """Copies a step result before handing it to the next step.
+
+        Cached results are shared between pipeline runs, so steps whose results are
+        mutated further down the pipeline must return fresh containers here.
+
+        Parameters
+        ----------
+        data : ToStepType
+            the step result
+
+        Returns
+        -------
+        ToStepType
+            a result safe to hand to the next step
+        """
+        return data
+
+    def __repr__(self: Self) -> str:
+        """Override the default `__repr__` method to return a custom string representation of the object.
+
+        Returns
+        -------
+        str
+            A custom string representation of the object.
+        """
+        return "<%s>" % (self.__class__.__name__)
+
+
+class PDFLTDecomposeStep(PDFLTPipelineStep[Iterable[LTComponent], List[PDFLTLine]]):
+    def __init__(self: Self, decomposer: Type[PDFLTDecomposer] = PDFLTDecomposer) -> None:
+        self._decomposer: Type[PDFLTDecomposer] = decomposer
+
+    @property
+    def name(self: Self) -> str:
+        return "decompose"
+
+    def run(
+        self: Self, data: Iterable[LTComponent], context: PDFLTPipelineContext
+    ) -> List[PDFLTLine]:
+        lines: List[PDFLTLine] = self._decomposer(context.params).fit(data).predict()
+        context.count("lines", len(lines))
+        return lines
+
+    def copy(self: Self, data: List[PDFLTLine]) -> List[PDFLTLine]:
+        return list(data)
+
+
+class PDFLTIntersectStep(PDFLTPipelineStep[List[PDFLTLine], List[PDFLTRect]]):
+    def __init__(
+        self: Self, intersections: Type[PDFLTIntersections] = PDFLTIntersections
+    ) -> None:
+        self._intersections: Type[PDFLTIntersections] = intersections
+
+    @property
+    def name(self: Self) -> str:
+        return "intersect"
+
+    def run(
+        self: Self, data: List[PDFLTLine], context: PDFLTPipelineContext
+    ) -> List[PDFLTRect]:
+        intersects: PDFLTIntersections = self._intersections(context.params).fit(data)
+        rects: List[PDFLTRect] = intersects.predict()
+        if context.trace.enabled:
+            context.trace.capture("points", intersects.as_deque())
+        context.count("intersections", len(intersects))
+        context.count("rects", len(rects))
+        return rects
+
+    def copy(self: Self, data: List[PDFLTRect]) -> List[PDFLTRect]:
+        # The composer assigns children to the rects it is fitted with
+        return [PDFLTRect(rect.element) for rect in data]
+
+
+class PDFLTComposeStep(PDFLTPipelineStep[List[PDFLTRect], List[PDFLTRect]]):
+    def __init__(self: Self, composer: Type[PDFLTComposer] = PDFLTComposer) -> None:
+        self._composer: Type[PDFLTComposer] = composer
+
+    @property
+    def name(self: Self) -> str:
+        return "compose"
+
+    def run(
+        self: Self, data: List[PDFLTRect], context: PDFLTPipelineContext
+    ) -> List[PDFLTRect]:
+        return self._composer(context.params).fit(data).predict(context.page)
+
+    def copy(self: Self, data: List[PDFLTRect]) -> List[PDFLTRect]:
+        return list(data)
+
+
+class PDFLTRowsStep(PDFLTPipelineStep[List[PDFLTRect], List[List[PDFLTRect]]]):
+    """Groups rects whose bottom edges are aligned within tolerance into rows."""
+
+    @property
+    def name(self: Self) -> str:
+        return "rows"
+
+    def run(
+        self: Self, data: List[PDFLTRect], context: PDFLTPipelineContext
+    ) -> List[List[PDFLTRect]]:
+        # Group y0 related rects into the same line
+        lines: List[List[PDFLTRect]] = []
+        for lt in data:
+            if len(lines) == 0:
+                lines.append([lt])
+            elif abs(lt.y0 - lines[-1][0].y0) <= context.params.position_tol:
+                lines[-1].append(lt)
+            else:
+                lines.append([lt])
+        context.count("rows", len(lines))
+        return lines
+
+    def copy(self: Self, data: List[List[PDFLTRect]]) -> List[List[PDFLTRect]]:
+        return [list(line) for line in data]
+
+
+class PDFLTOverlapRowsStep(PDFLTRowsStep):
+    """Groups rects overlapping vertically by at least `vertical_overlap` into rows."""
+
+    def run(
+        self: Self, data: List[PDFLTRect], context: PDFLTPipelineContext
+    ) -> List[List[PDFLTRect]]:
+        params: PDFLTParams = context.params
+        layout: List[PDFLTRect] = sorted(data, key=lambda el: (-el.y0, el.x0))
+
+        # Group y related rects into the same line
+        lines: List[List[PDFLTRect]] = []
+        for lt in layout:
+            if len(lines) == 0:
+                lines.append([lt])
+                continue
+
+            # Computes the coordinates of the previous line and the current rect with a tolerance
+            line_y0: float = min([el.y0 - params.position_tol for el in lines[-1]])
+            line_y1: float = max([el.y1 + params.position_tol for el in lines[-1]])
+            y0: float = lt.y0 - params.position_tol
+            y1: float = lt.y1 + params.position_tol
+
+            # Calculates the vertical overlap percentage between the current rect and the previous line if they overlap at all
+            overlap: float
+            if y1 <= line_y0 or y0 >= line_y1:
+                #               | y1
+                #               |
+                #               | y0
+                # | line_y1
+                # |
+                # | line_y0
+                #
+                # | line_y1
+                # |
+                # | line_y0
+                #               | y1
+                #               |
+                #               | y0
+                #
+                overlap = 0
+            else:
+                #              | y1
+                # | line_y1    |
+                # |            | y0
+                # | line_y0
+                #
+                # | line_y1
+                # |            | y1
+                # | line_y0    |
+                #              | y0
+                #
+                min_y1: float = min(y1, line_y1)
+                max_y0: float = max(y0, line_y0)
+                dy: float = min_y1 - max_y0
+                height: float = line_y1 - line_y0
+                overlap = dy / height
+
+            if overlap >= params.vertical_overlap:
+                lines[-1].append(lt)
+            else:
+                lines.append([lt])
+        for line in lines:
+            line.sort(key=lambda el: el.x0)
+        context.count("rows", len(lines))
+        return lines
+
+
+class PDFLTPipeline(object):
+    """Staged page layout pipeline.
+
+    Runs a page through a sequence of named, swappable steps, each receiving the
+    previous step's result, keeping per-step call counts and timings. When a
+    `cache_size` is given, step results are cached by page content and params
+    so that re-running an identical page skips the unchanged steps. Pipelines
+    are shared by the threads parsing pages at once, so the statistics and the
+    cache are only accessed under a lock.
+
+    Parameters
+    ----------
+    cache_size : int, optional
+        the maximum number of cached step results, by default 0 (disabled)
+    """
+
+    def __init__(self: Self, cache_size: int = 0) -> None:
+        self._steps: List[PDFLTPipelineStep] = []
+        self._stats: Dict[str, PDFLTStepStats] = {}
+        self._cache: OrderedDict[Tuple[str, int], Any] = OrderedDict()
+        self._cache_size: int = cache_size
+        self._lock: Lock = Lock()
+
+    @property
+    def steps(self: Self) -> List[PDFLTPipelineStep]:
+        return list(self._steps)
+
+    @property
+    def stats(self: Self) -> Dict[str, PDFLTStepStats]:
+        with self._lock:
+            return {k: replace(v) for k, v in self._stats.items()}
+
+    def step(self: Self, step: PDFLTPipelineStep) -> Self:
+        if step.name in self._stats:
+            raise ValueError(f"Pipeline already has a step named '{step.name}'.")
+        self._steps.append(step)
+        self._stats[step.name] = PDFLTStepStats()
+        return self
+
+    def replace(self: Self, name: str, step: PDFLTPipelineStep) -> Self:
+        for i, s in enumerate(self._steps):
+            if s.name == name:
+                self._steps[i] = step
+                with self._lock:
+                    self._stats = {
+                        s.name: self._stats.get(s.name, PDFLTStepStats())
+                        if s is not step
+                        else PDFLTStepStats()
+                        for s in self._steps
+                    }
+                    self._cache.clear()
+                return self
+        raise ValueError(f"Pipeline has no step named '{name}'.")
+
+    def run(
+        self: Self, page: LTPage, params: PDFLTParams, trace: PDFLTTrace = NULL_TRACE
+    ) -> Tuple[Any, PDFLTPipelineContext]:
+        """Runs a page through the pipeline steps.
+
+        Parameters
+        ----------
+        page : LTPage
+            the page
+        params : PDFLTParams
+            the pipeline parameters
+        trace : PDFLTTrace, optional
+            the trace capturing each step output, by default disabled
+
+        Returns
+        -------
+        Tuple[Any, PDFLTPipelineContext]
+            the last step output and the run context
+        """
+        context: PDFLTPipelineContext = PDFLTPipelineContext(page, params, trace)
+        trace.page(page)
+        key: str | None = (
+            self._page_key(page, params) if self._cache_size > 0 else None
+        )
+
+        data: Any = page
+        for i, step in enumerate(self._steps):
+            stats: PDFLTStepStats = self._stats[step.name]
+            start: float = perf_counter()
+            context._step_counters = {}
+
+            cached: Tuple[Any, Dict[str, int]] | None = (
+                self._cache_get((key, i)) if key else None
+            )
+            if cached is not None:
+                with self._lock:
+                    stats.hits += 1
+                [context.count(k, n) for k, n in cached[1].items()]
+                data = step.copy(cached[0])
+            elif key:
+                result: Any = step.run(data, context)
+                self._cache_put((key, i), (result, context._step_counters))
+                data = step.copy(result)
+            else:
+                data = step.run(data, context)
+
+            elapsed: float = perf_counter() - start
+            with self._lock:
+                stats.calls += 1
+                stats.seconds += elapsed
+            context.timings[step.name] = elapsed
+            context.outputs[step.name] = data
+            trace.capture(step.name, data)
+
+        return data, context
+
+    def reset_stats(self: Self) -> None:
+        with self._lock:
+            for name in self._stats:
+                self._stats[name] = PDFLTStepStats()
+
+    def _cache_get(self: Self, key: Tuple[str, int]) -> Any:
+        with self._lock:
+            if key not in self._cache:
+                return None
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+    def _cache_put(self: Self, key: Tuple[str, int], value: Any) -> None:
+        with self._lock:
+            self._cache[key] = value
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+    @staticmethod
+    def _page_key(page: LTPage, params: PDFLTParams) -> str:
+        # Fingerprints everything the layout steps read from the page
+        digest = sha1(repr(params.__dict__).encode("utf-8"))
+        for el in page:
+            digest.update(
+                repr(
+                    (
+                        el.__class__.__name__,
+                        el.bbox,
+                        getattr(el, "stroking_color", None),
+                        getattr(el, "non_stroking_color", None),
+                        getattr(el, "linewidth", None),
+                        getattr(el, "pts", None),
+                        el.get_text() if isinstance(el, LTTextBox) else None,
+                    )
+                ).encode("utf-8")
+            )
+        return digest.hexdigest()
+
+    def __repr__(self: Self) -> str:
+        """Override the default `__repr__` method to return a custom string representation of the object.
+
+        Returns
+        -------
+        str
+            A custom string representation of the object.
+        """
+        return "<%s %s>" % (
+            self.__class__.__name__,
+            " -> ".join([s.name for s in self._steps]),
+        )
@@ -58,6 +58,7 @@ class ExcelUtils(Final):
         columns: Dict[str, Sequence[str]],
         sheet_names: Sequence[str],
         start_cell: ExcelCell = (1, 1),
+        text: bool = False,
     ) -> Dict[str, DataFrame]:
         df: Dict[str, DataFrame] = p_read_excel(
             file_path,
@@ -67,6 +68,12 @@ class ExcelUtils(Final):
             skiprows=start_cell[1],
             sheet_name=sheet_names,
             engine="openpyxl",
+            # Text cells are read as is, eg. "195.0" or "N/A", empty cells as NaN
+            **(
+                {"dtype": str, "keep_default_na": False, "na_values": [""]}
+                if text
+                else {}
+            ),
         )
         for k in df.keys():
             if df[k].empty:
@@ -2,6 +2,7 @@
 
 # Python Imports
 import os
+import hashlib
 import logging
 from typing import AnyStr
 
@@ -115,4 +116,22 @@ def is_pdf_file(path: str) -> bool:
         return False
     
     with open(path, 'rb') as file:
-        return file.read(4) == b'%PDF'
\ No newline at end of file
+        return file.read(4) == b'%PDF'
+
+
+def file_digest(path: str) -> str:
+    """Returns the content hash of the file at the given path.
+
+    Parameters
+    ----------
+    path : str
+        the file path
+
+    Returns
+    -------
+    str
+        the hexadecimal SHA-1 digest of the file content
+    """
+
+    with open(path, "rb") as file:
+        return hashlib.file_digest(file, "sha1").hexdigest()
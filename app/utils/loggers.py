@@ -4,9 +4,12 @@
 import os
 import sys
 import json
+import atexit
 import logging
 import logging.config
-from typing import AnyStr, NoReturn, Any
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from typing import AnyStr, List, NoReturn, Any, Optional
 
 # Third-Party Imports
 
@@ -15,39 +18,117 @@ from typing import AnyStr, NoReturn, Any
 # Constants
 LOG: logging.Logger = logging.getLogger(__name__)
 DEFAULT_LOG_FMT = "[%(asctime)s.%(msecs)03d] %(levelname)s - %(message)s"
+_LISTENER: Optional[QueueListener] = None
 
 
-def configure_logging(file_path: AnyStr) -> None:
+class _LazyQueueHandler(QueueHandler):
+    """Queue handler that leaves formatting to the listener thread.
+
+    The default `QueueHandler.prepare` formats each record in the logging
+    thread so that records can be pickled. Records only go through an
+    in-process queue here, so message arguments are formatted by the
+    listener's handlers, off the logging thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def configure_logging(file_path: AnyStr, queue: bool = True) -> None:
     """Configures the logging environment.
 
-    Configures the logging environment by overriding both the `handle` method on
-    all current loggers and the `getLogger` method from `logging` package to
-    perform the same operation on any newly created loggers as to delegate all
-    logging message handling to a separate thread.
+    Loads the logging configuration and, unless `queue` is False, moves the
+    root logger handlers behind a `QueueListener` so that formatting and
+    writing records, to the console or to rotating files, happens in a
+    separate thread, see `stop_logging`.
 
     Parameters
     ----------
-    thread : bool
-        whether to run the logging in a separate thread
+    file_path : AnyStr
+        the logging configuration file path, in `logging.config.dictConfig`
+        JSON format, the default configuration is used if it does not exist
+    queue : bool, optional
+        whether to handle records in a separate thread, by default True
     """
 
+    stop_logging()
     if file_path and os.path.exists(file_path):
         config: dict[str, Any] = {}
         with open(file_path, "rt") as f:
             config = json.load(f)
+        for handler in config.get("handlers", {}).values():
+            # The log directories are not versioned, eg. `logs/`
+            if os.path.dirname(handler.get("filename", "")):
+                os.makedirs(os.path.dirname(handler["filename"]), exist_ok=True)
         logging.config.dictConfig(config)
         LOG.debug(f"Logging configuration loaded from '{file_path}'")
     else:
         logging.basicConfig(
-            format=DEFAULT_LOG_FMT, stream=sys.stdout, level=logging.DEBUG
+            format=DEFAULT_LOG_FMT, stream=sys.stderr, level=logging.DEBUG
         )
         LOG.debug("Logging configuration loaded from default settings")
 
-    # TODO: Apply root logging formatters to all loggers
-    # loggers = [logging.getLogger(name) for name in logging.root.manager.loggerDict]
-    # for dict_logger in loggers:
-    #     setattr(dict_logger, 'handle', _queue)
-    # setattr(logging, 'getLogger', _get_logger)
+    if queue:
+        _start_listener(_detach_root_handlers())
+
+
+def stop_logging() -> None:
+    """Stops the logging thread, if any, handling the pending records.
+
+    The root logger handlers are attached back to the root logger so that
+    records logged afterwards, eg. on interpreter shutdown, are still handled.
+    """
+
+    global _LISTENER
+    if _LISTENER is None:
+        return
+    listener: QueueListener = _LISTENER
+    _LISTENER = None
+    listener.stop()
+
+    root: logging.Logger = logging.getLogger()
+    for handler in [h for h in root.handlers if isinstance(h, _LazyQueueHandler)]:
+        root.removeHandler(handler)
+    for handler in listener.handlers:
+        root.addHandler(handler)
+
+
+def _detach_root_handlers() -> List[logging.Handler]:
+    root: logging.Logger = logging.getLogger()
+    handlers: List[logging.Handler] = list(root.handlers)
+    for handler in handlers:
+        root.removeHandler(handler)
+    return handlers
+
+
+def _start_listener(handlers: List[logging.Handler]) -> None:
+    global _LISTENER
+    if len(handlers) == 0:
+        return
+
+    records: SimpleQueue = SimpleQueue()
+    logging.getLogger().addHandler(_LazyQueueHandler(records))
+    _LISTENER = QueueListener(records, *handlers, respect_handler_level=True)
+    _LISTENER.start()
+
+
+def _detach_listener_after_fork() -> None:
+    # Forked children, eg. process pool workers, inherit the queue handler but
+    # not the listener thread, and may exit without running `atexit` hooks, so
+    # they handle records synchronously instead
+    global _LISTENER
+    if _LISTENER is None:
+        return
+    handlers: List[logging.Handler] = list(_LISTENER.handlers)
+    _LISTENER = None
+    _detach_root_handlers()
+    for handler in handlers:
+        logging.getLogger().addHandler(handler)
+
+
+atexit.register(stop_logging)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_detach_listener_after_fork)
 
 
 def error(*args: Any) -> NoReturn:
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+
+# Python Imports
+import json
+from time import perf_counter
+from contextlib import nullcontext
+from logging import Logger, getLogger
+from typing import Any, AnyStr, ContextManager, Dict, Self
+
+# Third-Party Imports
+
+# Local Imports
+
+# Constants
+LOG: Logger = getLogger(__name__)
+_NULL_TIMER: ContextManager[None] = nullcontext()
+
+
+class Metrics(object):
+    """Timers and counters for a unit of work.
+
+    Accumulates named timers, in seconds, and named counters for a unit of
+    work such as a single PDF file or a whole batch. Child metrics can be
+    created for sub-units and merged back into their parent.
+
+    Parameters
+    ----------
+    name : str, optional
+        the name of the unit of work, by default ""
+    """
+
+    def __init__(self: Self, name: str = "") -> None:
+        self.name: str = name
+        self.timers: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self.children: Dict[str, "Metrics"] = {}
+
+    @property
+    def enabled(self: Self) -> bool:
+        return True
+
+    def count(self: Self, key: str, n: int = 1) -> None:
+        self.counters[key] = self.counters.get(key, 0) + n
+
+    def add_time(self: Self, key: str, seconds: float) -> None:
+        self.timers[key] = self.timers.get(key, 0.0) + seconds
+
+    def add_counters(self: Self, counters: Dict[str, int]) -> None:
+        for key, n in counters.items():
+            self.count(key, n)
+
+    def add_timers(self: Self, timers: Dict[str, float]) -> None:
+        for key, seconds in timers.items():
+            self.add_time(key, seconds)
+
+    def time(self: Self, key: str) -> ContextManager[None]:
+        """Times the enclosed block, adding the elapsed time to timer `key`.
+
+        Parameters
+        ----------
+        key : str
+            the timer name
+
+        Returns
+        -------
+        ContextManager[None]
+            the timing context manager
+        """
+        return _Timer(self, key)
+
+    def child(self: Self, name: str) -> "Metrics":
+        child: Metrics = Metrics(name)
+        self.children[name] = child
+        return child
+
+    def merge(self: Self, other: "Metrics") -> None:
+        self.add_timers(other.timers)
+        self.add_counters(other.counters)
+
+    def as_dict(self: Self) -> Dict[str, Any]:
+        metrics: Dict[str, Any] = {
+            "name": self.name,
+            "timers": dict(sorted(self.timers.items())),
+            "counters": dict(sorted(self.counters.items())),
+        }
+        if "wall" in self.timers and self.timers["wall"] > 0:
+            metrics["rates"] = {
+                f"{key}/sec": n / self.timers["wall"]
+                for key, n in sorted(self.counters.items())
+            }
+        if len(self.children) > 0:
+            metrics["children"] = [c.as_dict() for c in self.children.values()]
+        return metrics
+
+    def dump(self: Self, file_path: AnyStr) -> None:
+        """Writes the metrics, including children, as JSON to `file_path`.
+
+        Parameters
+        ----------
+        file_path : AnyStr
+            the JSON file path
+        """
+        LOG.debug(f"Writing metrics to '{file_path}'...")
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(self.as_dict(), f, indent=2)
+        LOG.debug(f"Metrics written to '{file_path}'")
+
+    def __repr__(self: Self) -> str:
+        """Override the default `__repr__` method to return a custom string representation of the object.
+
+        Returns
+        -------
+        str
+            A custom string representation of the object.
+        """
+        return "<%s '%s' %s %s>" % (
+            self.__class__.__name__,
+            self.name,
+            self.timers,
+            self.counters,
+        )
+
+
+class NullMetrics(Metrics):
+    """Disabled metrics.
+
+    Every operation is a no-op so that instrumented code paths cost next to
+    nothing when metrics are not requested.
+    """
+
+    @property
+    def enabled(self: Self) -> bool:
+        return False
+
+    def count(self: Self, key: str, n: int = 1) -> None:
+        pass
+
+    def add_time(self: Self, key: str, seconds: float) -> None:
+        pass
+
+    def add_counters(self: Self, counters: Dict[str, int]) -> None:
+        pass
+
+    def add_timers(self: Self, timers: Dict[str, float]) -> None:
+        pass
+
+    def time(self: Self, key: str) -> ContextManager[None]:
+        return _NULL_TIMER
+
+    def child(self: Self, name: str) -> "Metrics":
+        return self
+
+    def merge(self: Self, other: "Metrics") -> None:
+        pass
+
+    def dump(self: Self, file_path: AnyStr) -> None:
+        pass
+
+
+class _Timer(object):
+    __slots__ = ("_metrics", "_key", "_start")
+
+    def __init__(self: Self, metrics: Metrics, key: str) -> None:
+        self._metrics: Metrics = metrics
+        self._key: str = key
+        self._start: float = 0.0
+
+    def __enter__(self: Self) -> None:
+        self._start = perf_counter()
+
+    def __exit__(self: Self, *args: Any) -> None:
+        self._metrics.add_time(self._key, perf_counter() - self._start)
+
+
+NULL_METRICS: Metrics = NullMetrics()
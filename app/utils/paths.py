@@ -110,7 +110,7 @@ def is_path(path: str) -> bool:
         default_drive: str = os.environ.get(_HOMEDRIVE, _DEFAULT_HOMEDRIVE) if sys.platform == _WIN_32 else os.path.sep
         if not os.path.isdir(default_drive):
             raise FileNotFoundError(_ERROR_FILE_SYS.format(drive = default_drive))
-        if not os.path.isdir(drive):
+        if drive and not os.path.isdir(drive):
             raise FileNotFoundError(_ERROR_FILE_SYS.format(drive = drive))
 
         for segment in path.split(os.path.sep):
@@ -206,7 +206,7 @@ def make_path(path: str, *args: str) -> str:
     root_ref = False
     if path.startswith('/') or path.startswith('\\'):
         root_ref = True
-        path = path[:2]
+        path = path[1:]
 
     split = None
     if '/' or '\\' in path:
@@ -215,7 +215,7 @@ def make_path(path: str, *args: str) -> str:
     first: str = split[0] if split else path
     path = os.path.join(first + os.sep if first.endswith(_WIN_DRIVE_SEP) else first, *split[1:] if split else [], *args)
     path = os.path.expanduser(path)
-    return ('/' if root_ref else '') + str(Path(path).resolve())
+    return str(Path((os.sep if root_ref else '') + path).resolve())
 
 
 def remove_extension(path: str) -> str:
@@ -1,8 +1,10 @@
 # -*- coding: utf-8 -*-
 
 # Python Imports
+import os
 import re
 from logging import getLogger, Logger
+from threading import Lock
 from typing import (
     Any,
     AnyStr,
@@ -21,6 +23,7 @@ from pdfminer.pdftypes import resolve1, PDFObjRef
 from pdfminer.layout import LTComponent
 from pdfminer.psparser import PSLiteral, PSKeyword
 from pdfminer.utils import decode_text
+from pypdf import PdfReader
 
 # Local Imports
 from app.utils.types import Final, TypeUtils
@@ -31,6 +34,8 @@ PDFField = tuple[str, str]
 Point = Tuple[float, float]
 LineSegment = Tuple[Point, Point]
 LineIntersect = Tuple[Point, float, float, float]
+PageCountKey = Tuple[str, int, int]
+_PAGE_COUNT_CACHE_SIZE: int = 100_000
 
 
 class PDFLTException(Exception):
@@ -93,13 +98,95 @@ PDFFormFields = Dict[str, PDFFormField]
 class PDFUtils(Final):
     ACRO_FORM: str = "AcroForm"
     ACRO_FORM_FIELDS: str = "Fields"
+    _page_counts: Dict[PageCountKey, int] = {}
+    _page_counts_lock: Lock = Lock()
 
     @staticmethod
     def page_count(pdf_path: str) -> int:
-        with open(pdf_path, "rb") as file:
-            parser = PDFParser(file)
-            doc = PDFDocument(parser)
-            return resolve1(doc.catalog["Pages"])["Count"]
+        """Returns the page count of a PDF file.
+
+        Counts are cached by file path, modification time and size, so a file
+        is only read again once it changes. Only the trailer and the page tree
+        root are read, falling back to pdfminer for files pypdf cannot read.
+
+        Parameters
+        ----------
+        pdf_path : str
+            the PDF file path
+
+        Returns
+        -------
+        int
+            the page count
+        """
+        key: PageCountKey = PDFUtils._page_count_key(pdf_path)
+        with PDFUtils._page_counts_lock:
+            count: int | None = PDFUtils._page_counts.get(key)
+        if count is None:
+            count = PDFUtils._read_page_count(pdf_path)
+            PDFUtils.cache_page_count(key, count)
+        return count
+
+    @staticmethod
+    def cached_page_count(pdf_path: str) -> Tuple[PageCountKey, int] | None:
+        """Returns the cached page count of a PDF file, without reading it.
+
+        Parameters
+        ----------
+        pdf_path : str
+            the PDF file path
+
+        Returns
+        -------
+        Tuple[PageCountKey, int] | None
+            the cache key and the page count, or None when the file, as it is
+            now, has not been counted
+        """
+        key: PageCountKey = PDFUtils._page_count_key(pdf_path)
+        with PDFUtils._page_counts_lock:
+            count: int | None = PDFUtils._page_counts.get(key)
+        return (key, count) if count is not None else None
+
+    @staticmethod
+    def cache_page_count(key: PageCountKey, count: int) -> None:
+        """Caches the page count of a PDF file.
+
+        Counts are cached per process, a count made by another process, eg.
+        when scanning the files of a batch, is cached with its key so that it
+        is only used while the file is unchanged.
+
+        Parameters
+        ----------
+        key : PageCountKey
+            the cache key, as returned by `cached_page_count`
+        count : int
+            the page count
+        """
+        with PDFUtils._page_counts_lock:
+            if (
+                key not in PDFUtils._page_counts
+                and len(PDFUtils._page_counts) >= _PAGE_COUNT_CACHE_SIZE
+            ):
+                # Evicts the oldest entry, dicts keep insertion order
+                del PDFUtils._page_counts[next(iter(PDFUtils._page_counts))]
+            PDFUtils._page_counts[key] = count
+
+    @staticmethod
+    def _page_count_key(pdf_path: str) -> PageCountKey:
+        stat: os.stat_result = os.stat(pdf_path)
+        return (os.path.abspath(pdf_path), stat.st_mtime_ns, stat.st_size)
+
+    @staticmethod
+    def _read_page_count(pdf_path: str) -> int:
+        try:
+            reader: PdfReader = PdfReader(pdf_path, strict=False)
+            return int(reader.trailer["/Root"]["/Pages"]["/Count"])
+        except Exception as e:
+            LOG.debug("Could not read page count of '%s' with pypdf:\n %s", pdf_path, e)
+            with open(pdf_path, "rb") as file:
+                parser = PDFParser(file)
+                doc = PDFDocument(parser)
+                return resolve1(doc.catalog["Pages"])["Count"]
 
     @staticmethod
     def load_form_fields(
@@ -143,7 +230,7 @@ class PDFUtils(Final):
                     ]
                 )
             }
-            LOG.debug(f"Loaded PDF form fields: {len(fields)}")
+            LOG.debug("Loaded PDF form fields: %d", len(fields))
             return fields
         
     @staticmethod
@@ -166,7 +253,7 @@ class PDFUtils(Final):
                 PDFUtils.ACRO_FORM_FIELDS
             ]
             fields: List[PDFFormField] = [f.resolve() for f in acro_form]
-            LOG.debug(f"Loaded PDF form fields: {len(fields)}")
+            LOG.debug("Loaded PDF form fields: %d", len(fields))
             
             return {
                 f.get("T"): f
@@ -191,7 +278,7 @@ class PDFUtils(Final):
 
             acro_form: Dict[Any, Any] = resolve1(doc.catalog["AcroForm"])["Fields"]
             fields: List[Any] = [PDFUtils._decode_form_field(f) for f in acro_form]
-            LOG.debug(f"Loaded PDF form fields raw: {len(fields)}")
+            LOG.debug("Loaded PDF form fields raw: %d", len(fields))
             return fields
 
     @staticmethod
@@ -265,7 +352,7 @@ class PDFLayoutUtils(Final):
                 # +-------------------+
                 # If top-right inner box corner is inside the bounding box
                 # The entire box is inside the bounding box.
-                LOG.debug(f"e2 {bbox2}")
+                LOG.debug("e2 %s", bbox2)
                 LOG.debug("The entire box is inside the bounding box.")
             else:
                 #                            +-------------+
@@ -276,7 +363,7 @@ class PDFLayoutUtils(Final):
                 # |       +-------+   |      |       +-------+
                 # +-------------------+      +-------------+
                 # Some part of the box is outside the bounding box (Consider area% cutoff to be inside the bounding box)
-                LOG.debug(f"e2 {bbox2}")
+                LOG.debug("e2 %s", bbox2)
                 LOG.debug("Some part of the box is outside the bounding box")
             return True
         #                                     +-------+                    +-------+
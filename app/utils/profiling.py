@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+
+# Python Imports
+import io
+import tracemalloc
+from cProfile import Profile
+from pstats import SortKey, Stats
+from contextlib import contextmanager, nullcontext
+from logging import Logger, getLogger
+from typing import AnyStr, ContextManager, Generator, List, Self
+
+# Third-Party Imports
+
+# Local Imports
+from app.utils.files import create_dir
+from app.utils.paths import make_path
+
+# Constants
+LOG: Logger = getLogger(__name__)
+_NULL_PROFILE: ContextManager[None] = nullcontext()
+
+
+class Profiler(object):
+    """Per unit of work cProfile, and optionally tracemalloc, profiler.
+
+    Each profiled unit of work, eg. a single PDF file, writes a `<name>.pstats`
+    file, loadable with `pstats` or `snakeviz`, and a `<name>.txt` summary with
+    the top N hotspots to the output directory.
+
+    Parameters
+    ----------
+    out_dir : AnyStr
+        the directory where the profiles are written to
+    top : int, optional
+        the number of hotspots to include in the summaries, by default 30
+    memory : bool, optional
+        whether to also trace memory allocations with tracemalloc, by default False
+    """
+
+    def __init__(
+        self: Self, out_dir: AnyStr, top: int = 30, memory: bool = False
+    ) -> None:
+        self.out_dir: str = make_path(f"{out_dir}")
+        self.top: int = top
+        self.memory: bool = memory
+
+    @property
+    def enabled(self: Self) -> bool:
+        return True
+
+    def profile(self: Self, name: str) -> ContextManager[None]:
+        """Profiles the enclosed block, writing the results as `name`.
+
+        Notes
+        -----
+        When the enclosed block is a generator, the consumer code that runs
+        while the generator is suspended is profiled too.
+
+        Parameters
+        ----------
+        name : str
+            the profile name, used as file name for the outputs
+
+        Returns
+        -------
+        ContextManager[None]
+            the profiling context manager
+        """
+        return self._profile(name)
+
+    @contextmanager
+    def _profile(self: Self, name: str) -> Generator[None, None, None]:
+        LOG.debug(f"Profiling '{name}'...")
+        profile: Profile = Profile()
+        tracing: bool = self.memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            snapshot: tracemalloc.Snapshot | None = None
+            peak: int = 0
+            if tracing:
+                snapshot = tracemalloc.take_snapshot()
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+            try:
+                self._write(name, profile, snapshot, peak)
+            except OSError as e:
+                LOG.error(f"Error while writing profile '{name}':\n {e}")
+
+    def _write(
+        self: Self,
+        name: str,
+        profile: Profile,
+        snapshot: tracemalloc.Snapshot | None,
+        peak: int,
+    ) -> None:
+        create_dir(self.out_dir, raise_error=True)
+        stats_path: str = make_path(f"{self.out_dir}/{name}.pstats")
+        summary_path: str = make_path(f"{self.out_dir}/{name}.txt")
+
+        profile.dump_stats(stats_path)
+
+        summary: io.StringIO = io.StringIO()
+        stats: Stats = Stats(profile, stream=summary)
+        stats.strip_dirs().sort_stats(SortKey.CUMULATIVE).print_stats(self.top)
+        stats.sort_stats(SortKey.TIME).print_stats(self.top)
+
+        if snapshot is not None:
+            summary.write(f"Peak traced memory: {peak / 1024 / 1024:.2f} MiB\n\n")
+            summary.write(f"Top {self.top} allocations by line:\n")
+            lines: List[str] = [
+                f"{s}"
+                for s in snapshot.filter_traces(
+                    [tracemalloc.Filter(False, tracemalloc.__file__)]
+                ).statistics("lineno")[: self.top]
+            ]
+            summary.write("\n".join(lines) + "\n")
+
+        with open(summary_path, "w", encoding="utf-8") as f:
+            f.write(summary.getvalue())
+        LOG.debug(f"Profile '{name}' written to '{stats_path}'")
+
+    def __repr__(self: Self) -> str:
+        """Override the default `__repr__` method to return a custom string representation of the object.
+
+        Returns
+        -------
+        str
+            A custom string representation of the object.
+        """
+        return "<%s '%s' top=%s memory=%s>" % (
+            self.__class__.__name__,
+            self.out_dir,
+            self.top,
+            self.memory,
+        )
+
+
+class NullProfiler(Profiler):
+    """Disabled profiler.
+
+    Profiling is a no-op so that the profiled code paths are not affected when
+    profiling is not requested.
+    """
+
+    def __init__(self: Self) -> None:
+        super().__init__("", top=0, memory=False)
+
+    @property
+    def enabled(self: Self) -> bool:
+        return False
+
+    def profile(self: Self, name: str) -> ContextManager[None]:
+        return _NULL_PROFILE
+
+
+NULL_PROFILER: Profiler = NullProfiler()
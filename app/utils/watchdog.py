@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+
+# Python Imports
+import os
+import sys
+import ctypes
+from contextlib import contextmanager
+from dataclasses import dataclass
+from logging import Logger, getLogger
+from threading import Event, Lock, Thread, get_ident
+from time import perf_counter
+from types import TracebackType
+from typing import Iterator, Optional, Self, Type
+
+try:
+    from resource import RUSAGE_SELF, getrusage
+except ImportError:  # pragma: no cover, Windows
+    getrusage = None
+
+# Third-Party Imports
+
+# Local Imports
+
+# Constants
+LOG: Logger = getLogger(__name__)
+_WATCHDOG_INTERVAL: float = 0.1
+_STATM_PATH: str = "/proc/self/statm"
+_RSS_SCALE: int = 1 if sys.platform == "darwin" else 1024
+
+
+@dataclass(frozen=True)
+class ParseBudget(object):
+    """Limits on the parsing of a single file.
+
+    Parameters
+    ----------
+    file_seconds : float, optional
+        the time parsing all the pages of a file may take, by default None
+    page_seconds : float, optional
+        the time parsing a single page may take, by default None
+    max_memory : int, optional
+        the resident memory, in bytes, parsing a file may add to its process,
+        by default None. The resident memory of the whole process is measured,
+        so the limit only holds when the process parses a single file at once
+    """
+
+    file_seconds: Optional[float] = None
+    page_seconds: Optional[float] = None
+    max_memory: Optional[int] = None
+
+    @property
+    def enabled(self: Self) -> bool:
+        return any(
+            limit is not None
+            for limit in (self.file_seconds, self.page_seconds, self.max_memory)
+        )
+
+
+class BudgetExceeded(Exception):
+    """Raised when parsing a file exceeds its `ParseBudget`."""
+
+
+class _Alarm(BudgetExceeded):
+    # Raised asynchronously, so it cannot carry the reason
+    pass
+
+
+class Watchdog(object):
+    """Enforces a `ParseBudget` on the parsing of a file.
+
+    A watcher thread checks the budget while a page is being parsed, see
+    `page`, and interrupts the parsing thread once it is exceeded. Only the
+    time spent within pages counts towards the budget, so that a consumer
+    pulling pages from a generator is not interrupted. The interruption is
+    raised between Python bytecodes, eg. in the pdfminer layout analysis or
+    the table geometry, not within a C call.
+
+    The interruption is raised in whatever code the parsing thread runs at the
+    time, including finalizers, eg. `ZipFile.__del__`, run by the garbage
+    collector during the page. It is then reported as an unraisable exception
+    and raised again at the next check, but the finalizer does not complete,
+    so a watched thread may leak the resources of the objects collected while
+    it is interrupted. Parsing in worker processes keeps such leaks out of the
+    main process.
+
+    Parameters
+    ----------
+    budget : ParseBudget, optional
+        the budget of the file, by default None for no budget
+    name : str, optional
+        the name of the file, by default ""
+    interval : float, optional
+        the interval between checks, in seconds, by default 0.1
+    """
+
+    def __init__(
+        self: Self,
+        budget: Optional[ParseBudget] = None,
+        name: str = "",
+        interval: float = _WATCHDOG_INTERVAL,
+    ) -> None:
+        self.budget: Optional[ParseBudget] = budget
+        self.name: str = name
+        self.interval: float = interval
+        self.page_num: int = 0
+        self.reason: Optional[str] = None
+        self._elapsed: float = 0.0
+        self._page_start: float = 0.0
+        self._base_rss: int = 0
+        self._armed: bool = False
+        self._thread_id: int = 0
+        self._lock: Lock = Lock()
+        self._closed: Event = Event()
+        self._watcher: Optional[Thread] = None
+
+    @property
+    def enabled(self: Self) -> bool:
+        return self.budget is not None and self.budget.enabled
+
+    def __enter__(self: Self) -> Self:
+        if not self.enabled:
+            return self
+        self._base_rss = resident_memory() or 0
+        self._watcher = Thread(target=self._watch, name="watchdog", daemon=True)
+        self._watcher.start()
+        return self
+
+    def __exit__(
+        self: Self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        if self._watcher is not None:
+            self._closed.set()
+            self._watcher.join()
+            self._watcher = None
+
+    @contextmanager
+    def page(self: Self) -> Iterator[None]:
+        """Watches the parsing of a page by the calling thread.
+
+        Raises
+        ------
+        BudgetExceeded
+            when the budget is exceeded while parsing the page
+        """
+        if not self.enabled:
+            yield
+            return
+
+        with self._lock:
+            self._thread_id = get_ident()
+            self._page_start = perf_counter()
+            self._armed = True
+        try:
+            yield
+        except StopIteration:
+            raise
+        except Exception as e:
+            error: Exception = self.error(e)
+            if error is e:
+                raise
+            raise error from None if isinstance(e, _Alarm) else e
+        finally:
+            while True:
+                try:
+                    self._disarm()
+                    break
+                except _Alarm:
+                    # Raised once the page was parsed, the page is kept
+                    continue
+
+    def error(self: Self, error: Exception) -> Exception:
+        """The error to report for an error raised while parsing a page.
+
+        Parsers may catch the interruption, or wrap it in their own errors, and
+        yield it as a result, so an error raised once the budget is exceeded is
+        reported as exceeding it.
+
+        Parameters
+        ----------
+        error : Exception
+            the error raised, or yielded, while parsing a page
+
+        Returns
+        -------
+        Exception
+            a `BudgetExceeded` with the reason when the budget was exceeded,
+            otherwise the error itself
+        """
+        if self.reason is None or (
+            isinstance(error, BudgetExceeded) and not isinstance(error, _Alarm)
+        ):
+            return error
+        return BudgetExceeded(f"'{self.name}' {self.reason}")
+
+    def _disarm(self: Self) -> None:
+        with self._lock:
+            if not self._armed:
+                return
+            self._armed = False
+            self._elapsed += perf_counter() - self._page_start
+            self.page_num += 1
+            if self.reason is not None:
+                # Clears an interruption raised but not delivered yet
+                _raise_in_thread(self._thread_id, None)
+
+    def _watch(self: Self) -> None:
+        while not self._closed.wait(self.interval):
+            with self._lock:
+                if not self._armed:
+                    continue
+                reason: Optional[str] = self._check()
+                if reason is None:
+                    continue
+                if self.reason is None:
+                    LOG.warning("Interrupting '%s', it %s", self.name, reason)
+                    self.reason = reason
+                # Raised again until the page is left, in case it was caught
+                _raise_in_thread(self._thread_id, _Alarm)
+
+    def _check(self: Self) -> Optional[str]:
+        budget: ParseBudget = self.budget
+        page_elapsed: float = perf_counter() - self._page_start
+        if budget.page_seconds is not None and page_elapsed > budget.page_seconds:
+            return (
+                f"exceeded the page time budget of {budget.page_seconds:g}s "
+                f"on page {self.page_num + 1}"
+            )
+        if (
+            budget.file_seconds is not None
+            and self._elapsed + page_elapsed > budget.file_seconds
+        ):
+            return (
+                f"exceeded the file time budget of {budget.file_seconds:g}s "
+                f"on page {self.page_num + 1}"
+            )
+        if budget.max_memory is not None:
+            rss: Optional[int] = resident_memory()
+            if rss is not None and rss - self._base_rss > budget.max_memory:
+                return (
+                    f"exceeded the memory budget of {budget.max_memory // 2**20} MiB "
+                    f"with {(rss - self._base_rss) // 2**20} MiB on page "
+                    f"{self.page_num + 1}"
+                )
+        return None
+
+    def __repr__(self: Self) -> str:
+        return f"Watchdog(name={self.name!r}, budget={self.budget!r})"
+
+
+def resident_memory() -> Optional[int]:
+    """The resident memory of the current process, in bytes.
+
+    Returns
+    -------
+    int | None
+        the resident memory, the peak resident memory where the current one is
+        not available, or None where neither is available
+    """
+    try:
+        with open(_STATM_PATH, "rb") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    if getrusage is None:
+        return None
+    return getrusage(RUSAGE_SELF).ru_maxrss * _RSS_SCALE
+
+
+def _raise_in_thread(thread_id: int, error: Optional[Type[BaseException]]) -> None:
+    # Raises `error` in the thread at its next bytecode, or clears a pending one
+    ctypes.pythonapi.PyThreadState_SetAsyncExc(
+        ctypes.c_ulong(thread_id), ctypes.py_object(error) if error else None
+    )
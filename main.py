@@ -4,6 +4,7 @@
 from sys import path
 from os.path import dirname, realpath
 from importlib import import_module
+from multiprocessing import freeze_support
 
 # Third-Party Imports
 
@@ -12,6 +13,9 @@ from importlib import import_module
 # Constants
 
 if __name__ == "__main__":
+    # Required by the GUI process pool when running as a frozen executable
+    freeze_support()
+
     # Ensures that the current directory is in the path so that module imports work
     # correctly when running the application
     _file: str = dirname(realpath(__file__))
@@ -19,4 +23,4 @@ if __name__ == "__main__":
         path.append(_file)
     del _file
     
-    import_module("app")
+    import_module("app").main()
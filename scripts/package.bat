@@ -65,6 +65,8 @@ if not exist !NUITKA_RESOURCES_DIR! (
 )
 if not exist !NUITKA_CONFIG_DIR! (
     robocopy !PROJECT_CONFIG_DIR! !NUITKA_CONFIG_DIR! /E
+    rem The packaged application uses the production logging profile
+    move /y !NUITKA_CONFIG_DIR!\logging.prod.json !NUITKA_CONFIG_DIR!\logging.json
 )
 if not exist !NUITKA_TEMPLATES_DIR! (
     robocopy !PROJECT_TEMPLATES_DIR! !NUITKA_TEMPLATES_DIR! /E
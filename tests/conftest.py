@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+
+# Python Imports
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Third-Party Imports
+import pytest
+
+# Local Imports
+
+# Constants
+BENCHMARK_BASELINE: Path = Path(__file__).parent / "benchmark_baseline.json"
+SCALING_RESULTS: pytest.StashKey[List[Dict[str, Any]]] = pytest.StashKey()
+STARTUP_RESULTS: pytest.StashKey[Dict[str, float]] = pytest.StashKey()
+
+# The GUI workers and models are tested without a display
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group: pytest.OptionGroup = parser.getgroup("benchmark")
+    group.addoption(
+        "--benchmark-baseline",
+        dest="benchmark_baseline",
+        action="store",
+        default=f"{BENCHMARK_BASELINE}",
+        help="The JSON baseline the benchmark results are compared against, the \
+              benchmarks fail when it does not exist [default: %(default)s]",
+    )
+    group.addoption(
+        "--benchmark-results",
+        dest="benchmark_results",
+        action="store",
+        default=None,
+        help="Where to write the current benchmark results as JSON, eg. \
+              benchmark_results.json, ignored by git [default: not written]",
+    )
+    group.addoption(
+        "--benchmark-save",
+        dest="benchmark_save",
+        action="store_true",
+        default=False,
+        help="Whether to overwrite the baseline with the current results [default: %(default)s]",
+    )
+    group.addoption(
+        "--benchmark-threshold",
+        dest="benchmark_threshold",
+        type=float,
+        action="store",
+        default=0.25,
+        help="The allowed relative regression over the baseline, eg. 0.25 fails \
+              when a timing or peak RSS grows by more than 25%% [default: %(default)s]",
+    )
+    group.addoption(
+        "--benchmark-min-seconds",
+        dest="benchmark_min_seconds",
+        type=float,
+        action="store",
+        default=0.1,
+        help="The allowed absolute regression in seconds, so that noise in very \
+              short stages is not reported [default: %(default)s]",
+    )
+    group.addoption(
+        "--benchmark-rounds",
+        dest="benchmark_rounds",
+        type=int,
+        action="store",
+        default=1,
+        help="The number of times the corpus is parsed, keeping the best timings \
+              [default: %(default)s]",
+    )
+    group.addoption(
+        "--scaling-rows",
+        dest="scaling_rows",
+        action="store",
+        default="25,50,100,250,500",
+        help="The comma separated synthetic table row counts of the scaling \
+              benchmark [default: %(default)s]",
+    )
+    group.addoption(
+        "--scaling-pages",
+        dest="scaling_pages",
+        action="store",
+        default="1,30,300",
+        help="The comma separated synthetic report page counts of the scaling \
+              benchmark [default: %(default)s]",
+    )
+    group.addoption(
+        "--scaling-results",
+        dest="scaling_results",
+        action="store",
+        default=None,
+        help="Where to write the scaling benchmark results as JSON, eg. \
+              scaling_results.json, ignored by git [default: not written]",
+    )
+    group.addoption(
+        "--startup-rounds",
+        dest="startup_rounds",
+        type=int,
+        action="store",
+        default=5,
+        help="The number of launches of each startup path, keeping the best time \
+              [default: %(default)s]",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.stash[SCALING_RESULTS] = []
+    config.stash[STARTUP_RESULTS] = {}
+
+
+def pytest_terminal_summary(
+    terminalreporter: Any, exitstatus: int, config: pytest.Config
+) -> None:
+    startup: Dict[str, float] = config.stash.get(STARTUP_RESULTS, {})
+    if len(startup) > 0:
+        terminalreporter.section("startup")
+        for path, seconds in startup.items():
+            terminalreporter.write_line(f"{path:>16} {seconds:>8.3f}s")
+
+    results: List[Dict[str, Any]] = config.stash.get(SCALING_RESULTS, [])
+    if len(results) == 0:
+        return
+
+    terminalreporter.section("scaling")
+    for result in results:
+        terminalreporter.write_line(
+            f"{result['layout']} by {result['dimension']}, growth exponent per stage: "
+            + ", ".join(f"{k}={v:.2f}" for k, v in result["exponents"].items())
+        )
+        stages: List[str] = list(result["exponents"])
+        terminalreporter.write_line(
+            f"{result['dimension']:>8} " + " ".join(f"{k:>10}" for k in stages)
+        )
+        for size, timings in result["timings"].items():
+            terminalreporter.write_line(
+                f"{size:>8} " + " ".join(f"{timings[k]:>9.3f}s" for k in stages)
+            )
+
+    if config.getoption("scaling_results") is not None:
+        Path(config.getoption("scaling_results")).write_text(
+            json.dumps(results, indent=2), encoding="utf-8"
+        )
@@ -0,0 +1,372 @@
+# -*- coding: utf-8 -*-
+"""Synthetic checklist page layouts.
+
+Generates pdfminer pages with table grids mimicking the MV and Preventive
+checklist layouts, with any number of rows and columns, either as in-memory
+`LTPage` objects holding `LTRect`, `LTLine` and `LTTextBoxHorizontal` elements,
+or as actual PDF files that can be parsed back with pdfminer.
+
+MV tables are drawn with stroked lines, with vertical lines split per row,
+while Preventive tables are drawn with zero width, or height, filled rects.
+"""
+
+# Python Imports
+from dataclasses import dataclass
+from typing import AnyStr, Dict, Iterable, List, Self, Tuple
+
+# Third-Party Imports
+from pdfminer.layout import (
+    LAParams,
+    LTChar,
+    LTComponent,
+    LTLine,
+    LTPage,
+    LTRect,
+    LTTextBox,
+)
+from pdfminer.pdfcolor import PREDEFINED_COLORSPACE
+from pdfminer.pdffont import PDFFont, PDFType1Font
+from pdfminer.pdfinterp import PDFGraphicState
+from pdfminer.psparser import LIT
+from pypdf import PdfWriter, PageObject
+from pypdf.generic import (
+    ArrayObject,
+    DecodedStreamObject,
+    DictionaryObject,
+    NameObject,
+)
+
+# Local Imports
+from app.model.pdfs import PDFLTParams
+
+# Constants
+_FONT: PDFFont = PDFType1Font(None, {"BaseFont": LIT("Helvetica")})
+_FONT_NAME: str = "/F1"
+_LINE_WIDTH: float = 0.5
+
+
+@dataclass(frozen=True)
+class SyntheticLayout:
+    """A checklist table layout.
+
+    Parameters
+    ----------
+    name : str
+        the layout name
+    width : float
+        the page width
+    height : float
+        the minimum page height, pages grow to fit the table rows
+    x0 : float
+        the table left edge
+    top : float
+        the distance from the table top edge to the page top edge
+    columns : Tuple[float, ...]
+        the default column widths
+    row_height : float
+        the table row height
+    font_size : float
+        the cell text font size
+    rect_lines : bool
+        whether the grid lines are drawn as filled rects instead of lines
+    char_margin : float
+        the pdfminer `LAParams.char_margin` used to group the text
+    line_margin : float
+        the pdfminer `LAParams.line_margin` used to group the text
+    """
+
+    name: str
+    width: float
+    height: float
+    x0: float
+    top: float
+    columns: Tuple[float, ...]
+    row_height: float
+    font_size: float
+    rect_lines: bool
+    char_margin: float
+    line_margin: float
+
+    @property
+    def laparams(self: Self) -> LAParams:
+        return LAParams(char_margin=self.char_margin, line_margin=self.line_margin)
+
+    def column_widths(self: Self, columns: int | None = None) -> List[float]:
+        """Returns the column widths for a table with `columns` columns.
+
+        Parameters
+        ----------
+        columns : int | None, optional
+            the number of columns, the table width is evenly split between
+            them, by default None for the layout's own columns
+
+        Returns
+        -------
+        List[float]
+            the column widths
+        """
+        if columns is None:
+            return list(self.columns)
+        return [sum(self.columns) / columns] * columns
+
+
+MV: SyntheticLayout = SyntheticLayout(
+    name="MV",
+    width=595.28,
+    height=841.89,
+    x0=6.0,
+    top=120.0,
+    columns=(20.0, 180.0, 90.0, 80.0, 80.0, 60.0, 74.0),
+    row_height=28.0,
+    font_size=7.0,
+    rect_lines=False,
+    char_margin=1.0,
+    line_margin=0.5,
+)
+PREVENTIVE: SyntheticLayout = SyntheticLayout(
+    name="Preventive",
+    width=612.0,
+    height=792.0,
+    x0=16.0,
+    top=40.0,
+    columns=(58.0, 163.0, 41.0, 154.0, 39.0, 44.0, 27.0, 26.0, 27.0),
+    row_height=22.0,
+    font_size=6.0,
+    rect_lines=True,
+    char_margin=0.8,
+    line_margin=0.4,
+)
+
+
+def layout_params(layout: SyntheticLayout) -> PDFLTParams:
+    """Returns the pipeline parameters the matchers use for `layout` pages.
+
+    Parameters
+    ----------
+    layout : SyntheticLayout
+        the page layout
+
+    Returns
+    -------
+    PDFLTParams
+        the pipeline parameters
+    """
+    if layout.rect_lines:
+        return PDFLTParams(
+            position_tol=5.0,
+            min_rect_height=6.0,
+            min_rect_width=6.0,
+            min_line_length=6.0,
+            vertical_overlap=0.55,
+        )
+    return PDFLTParams(position_tol=1.5)
+
+
+def generate_page(
+    layout: SyntheticLayout,
+    rows: int,
+    columns: int | None = None,
+    pageid: int = 1,
+) -> LTPage:
+    """Generates an analysed pdfminer page holding a `rows` by `columns` table.
+
+    The text is laid out as characters and grouped into `LTTextBoxHorizontal`
+    elements by pdfminer's own layout analysis, using the layout's parameters,
+    so that the page matches the one pdfminer extracts from `write_pdf` PDFs.
+
+    Parameters
+    ----------
+    layout : SyntheticLayout
+        the page layout
+    rows : int
+        the number of table rows
+    columns : int | None, optional
+        the number of table columns, by default None for the layout's own
+    pageid : int, optional
+        the page number, by default 1
+
+    Returns
+    -------
+    LTPage
+        the page
+    """
+    bbox: Tuple[float, float, float, float] = (
+        0,
+        0,
+        layout.width,
+        _page_height(layout, rows),
+    )
+    graphics: List[LTComponent] = []
+    texts: Dict[float, LTPage] = {}
+    for op in _operations(layout, rows, columns, bbox[3]):
+        if op[0] == "line":
+            _, x0, y0, x1, y1 = op
+            if layout.rect_lines:
+                graphics.append(
+                    LTRect(
+                        _LINE_WIDTH,
+                        (x0, y0, x1, y1),
+                        stroke=False,
+                        fill=True,
+                        non_stroking_color=0,
+                    )
+                )
+            else:
+                graphics.append(LTLine(_LINE_WIDTH, (x0, y0), (x1, y1), stroke=True))
+        else:
+            _, x, y, text = op
+            _add_text(texts.setdefault(y, LTPage(pageid, bbox)), x, y, text, layout.font_size)
+
+    # Grouping text is superlinear in the number of characters and table rows
+    # are too far apart to be grouped together, so each row is analysed alone
+    boxes: List[LTComponent] = []
+    for row in texts.values():
+        row.analyze(layout.laparams)
+        boxes += [el for el in row if isinstance(el, LTTextBox)]
+
+    page: LTPage = LTPage(pageid, bbox)
+    for idx, box in enumerate(boxes):
+        box.index = idx
+        page.add(box)
+    for el in graphics:
+        page.add(el)
+    return page
+
+
+def generate_pages(
+    layout: SyntheticLayout, pages: int, rows: int, columns: int | None = None
+) -> List[LTPage]:
+    """Generates `pages` analysed pdfminer pages, see `generate_page`.
+
+    Returns
+    -------
+    List[LTPage]
+        the pages
+    """
+    return [generate_page(layout, rows, columns, pageid=i + 1) for i in range(pages)]
+
+
+def write_pdf(
+    file_path: AnyStr,
+    layout: SyntheticLayout,
+    pages: int,
+    rows: int,
+    columns: int | None = None,
+) -> None:
+    """Writes a PDF with `pages` pages, each holding a `rows` by `columns` table.
+
+    Parameters
+    ----------
+    file_path : AnyStr
+        the PDF file path
+    layout : SyntheticLayout
+        the page layout
+    pages : int
+        the number of pages
+    rows : int
+        the number of table rows per page
+    columns : int | None, optional
+        the number of table columns, by default None for the layout's own
+    """
+    writer: PdfWriter = PdfWriter()
+    font: DictionaryObject = DictionaryObject(
+        {
+            NameObject("/Type"): NameObject("/Font"),
+            NameObject("/Subtype"): NameObject("/Type1"),
+            NameObject("/BaseFont"): NameObject("/Helvetica"),
+        }
+    )
+    height: float = _page_height(layout, rows)
+    content: bytes = _content_stream(layout, rows, columns, height)
+    for _ in range(pages):
+        page: PageObject = writer.add_blank_page(layout.width, height)
+        page[NameObject("/Resources")] = DictionaryObject(
+            {
+                NameObject("/Font"): DictionaryObject({NameObject(_FONT_NAME): font}),
+                NameObject("/ProcSet"): ArrayObject(
+                    [NameObject("/PDF"), NameObject("/Text")]
+                ),
+            }
+        )
+        stream: DecodedStreamObject = DecodedStreamObject()
+        stream.set_data(content)
+        page.replace_contents(stream)
+    with open(file_path, "wb") as f:
+        writer.write(f)
+
+
+def _page_height(layout: SyntheticLayout, rows: int) -> float:
+    return max(layout.height, layout.top * 2 + rows * layout.row_height)
+
+
+def _operations(
+    layout: SyntheticLayout, rows: int, columns: int | None, height: float
+) -> Iterable[Tuple]:
+    """Yields the table drawing operations, shared by pages and PDFs.
+
+    Yields ('line', x0, y0, x1, y1) for grid lines and ('text', x, y, text)
+    for cell texts, where coordinates are in PDF user space.
+    """
+    widths: List[float] = layout.column_widths(columns)
+    xs: List[float] = [layout.x0]
+    for w in widths:
+        xs.append(xs[-1] + w)
+    top: float = height - layout.top
+
+    for row in range(rows + 1):
+        y: float = top - row * layout.row_height
+        yield ("line", xs[0], y, xs[-1], y)
+
+    for row in range(rows):
+        y1: float = top - row * layout.row_height
+        y0: float = y1 - layout.row_height
+        for x in xs:
+            yield ("line", x, y0, x, y1)
+        for col, x in enumerate(xs[:-1]):
+            text: str = f"{row + 1}" if col == 0 else f"R{row + 1}C{col + 1}"
+            yield (
+                "text",
+                x + 2.0,
+                y0 + (layout.row_height - layout.font_size) / 2,
+                text,
+            )
+
+
+def _add_text(page: LTPage, x: float, y: float, text: str, font_size: float) -> None:
+    for c in text:
+        char: LTChar = LTChar(
+            (1, 0, 0, 1, x, y),
+            _FONT,
+            font_size,
+            1.0,
+            0.0,
+            c,
+            _FONT.char_width(ord(c)),
+            _FONT.char_disp(ord(c)),
+            PREDEFINED_COLORSPACE["DeviceGray"],
+            PDFGraphicState(),
+        )
+        page.add(char)
+        x += char.adv
+
+
+def _content_stream(
+    layout: SyntheticLayout, rows: int, columns: int | None, height: float
+) -> bytes:
+    ops: List[str] = [f"{_LINE_WIDTH} w", "0 g", "0 G"]
+    for op in _operations(layout, rows, columns, height):
+        if op[0] == "line":
+            _, x0, y0, x1, y1 = op
+            if layout.rect_lines:
+                ops.append(f"{x0:.3f} {y0:.3f} {x1 - x0:.3f} {y1 - y0:.3f} re f")
+            else:
+                ops.append(f"{x0:.3f} {y0:.3f} m {x1:.3f} {y1:.3f} l S")
+        else:
+            _, x, y, text = op
+            escaped: str = (
+                text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            )
+            ops.append(
+                f"BT {_FONT_NAME} {layout.font_size} Tf {x:.3f} {y:.3f} Td ({escaped}) Tj ET"
+            )
+    return "\n".join(ops).encode("latin-1")
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""Asynchronous parsing.
+
+Parses copies of a report of the bundled corpus with `aparse_pdfs`, checking
+that a consumer not draining the events blocks the workers on the bounded
+event queue, and that closing the generator, or cancelling the task iterating
+it, mid-batch stops the workers and that no further results arrive.
+"""
+
+# Python Imports
+import asyncio
+import multiprocessing
+import shutil
+import threading
+from pathlib import Path
+from time import monotonic
+from typing import Any, AsyncGenerator, Generator, List
+
+# Third-Party Imports
+import pytest
+
+# Local Imports
+from app.core import pdfs
+from app.core.pdfs import aparse_pdfs
+
+# Constants
+_CORPUS: Path = Path(__file__).parent.parent / "test" / "20241208"
+
+
+def _copy_reports(tmp_path: Path, count: int) -> List[str]:
+    pdf_path: Path = next(_CORPUS.glob("*MV*.pdf"))
+    pdfs_dir: Path = tmp_path / "pdfs"
+    pdfs_dir.mkdir()
+    for i in range(count):
+        shutil.copy2(pdf_path, pdfs_dir / f"{i}.pdf")
+    return [f"{pdfs_dir / f'{i}.pdf'}" for i in range(count)]
+
+
+def _workers_alive(executor: str) -> bool:
+    if executor == "process":
+        return len(multiprocessing.active_children()) > 0
+    return any(t.name.startswith("aparse_") for t in threading.enumerate())
+
+
+async def _wait_workers_stopped(executor: str, timeout: float = 15.0) -> bool:
+    deadline: float = monotonic() + timeout
+    while _workers_alive(executor) and monotonic() < deadline:
+        await asyncio.sleep(0.1)
+    return not _workers_alive(executor)
+
+
+def test_slow_consumers_block_workers(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    files: List[str] = _copy_reports(tmp_path, 2)
+    parse_pdf = pdfs.parse_pdf
+    parsed: List[int] = []
+
+    def counting_parse_pdf(*args: Any) -> Generator[Any, None, None]:
+        for result in parse_pdf(*args):
+            parsed.append(1)
+            yield result
+
+    monkeypatch.setattr(pdfs, "parse_pdf", counting_parse_pdf)
+    events: List[Any] = []
+
+    async def parse() -> int:
+        generator: AsyncGenerator = aparse_pdfs(
+            files, f"{tmp_path / 'out'}", max_workers=1, max_pending=2
+        )
+        events.append(await anext(generator))
+        # The worker fills the event queue, then waits for the consumer
+        await asyncio.sleep(2)
+        blocked: int = len(parsed)
+        async for event in generator:
+            events.append(event)
+        return blocked
+
+    blocked: int = asyncio.run(parse())
+
+    # The first event, the queued ones and the one the worker holds
+    assert blocked <= 1 + 2 + 1
+    assert len(parsed) > blocked
+    # Every page of every file, then the written result of each file
+    assert len(events) == len(files) * (events[0][1] + 1)
+
+
+@pytest.mark.parametrize(
+    "executor, stop",
+    [
+        ("thread", "aclose"),
+        ("process", "aclose"),
+        ("thread", "cancel"),
+        ("process", "cancel"),
+    ],
+)
+def test_stopped_batches_stop_workers(
+    tmp_path: Path, executor: str, stop: str
+) -> None:
+    files: List[str] = _copy_reports(tmp_path, 6)
+    written: List[str] = []
+    first_event: asyncio.Event
+
+    async def consume(generator: AsyncGenerator) -> None:
+        async for _ in generator:
+            first_event.set()
+
+    async def parse() -> bool:
+        nonlocal first_event
+        first_event = asyncio.Event()
+        generator: AsyncGenerator = aparse_pdfs(
+            files,
+            f"{tmp_path / 'out'}",
+            executor=executor,
+            max_workers=2,
+            on_file=lambda path, _: written.append(path),
+            output_format="csv",
+        )
+        if stop == "aclose":
+            await anext(generator)
+            await generator.aclose()
+        else:
+            task: asyncio.Task = asyncio.create_task(consume(generator))
+            await first_event.wait()
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        closed: int = len(written)
+        stopped: bool = await _wait_workers_stopped(executor)
+        await asyncio.sleep(0.5)
+        return stopped and len(written) == closed
+
+    assert asyncio.run(parse())
+    assert len(written) < len(files)
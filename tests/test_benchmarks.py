@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks over the bundled MV and Preventive PDF corpus.
+
+Parses `resources/tests/*.pdf` and `test/20241208/*.pdf` end-to-end with
+`parse_pdfs`, recording per-stage timings, pages/sec and peak RSS, and compares
+them against the committed JSON baseline, failing when a timing or peak RSS
+regresses beyond the configured threshold, or when there is no baseline. The
+corpus is parsed in a fresh interpreter, so that the peak RSS only holds the
+parsing of the corpus. The baseline is overwritten with `--benchmark-save`.
+
+Run with `pytest -m benchmark tests`, see `pytest --help` for the
+`--benchmark-*` options.
+"""
+
+# Python Imports
+import json
+import platform
+import subprocess
+import sys
+from os import cpu_count
+from pathlib import Path
+from typing import Any, Dict, Generator, List
+
+# Third-Party Imports
+import pytest
+
+# Local Imports
+from app.core.pdfs import parse_pdfs
+
+try:
+    from resource import RUSAGE_SELF, getrusage
+except ImportError:  # not available on windows
+    getrusage = None
+
+# Constants
+ROOT: Path = Path(__file__).parent.parent
+CORPUS: List[Path] = sorted(
+    [
+        *(ROOT / "resources" / "tests").glob("*.pdf"),
+        *(ROOT / "test" / "20241208").glob("*.pdf"),
+    ]
+)
+_RSS_SCALE: int = 1 if platform.system() == "Darwin" else 1024
+
+pytestmark = pytest.mark.benchmark
+
+
+def _key(path: Path | str) -> str:
+    return Path(path).resolve().relative_to(ROOT).as_posix()
+
+
+def _peak_rss() -> int | None:
+    if getrusage is None:
+        return None
+    return getrusage(RUSAGE_SELF).ru_maxrss * _RSS_SCALE
+
+
+def _best(current: Dict[str, Any], other: Dict[str, Any]) -> Dict[str, Any]:
+    """Merges two results keeping the lowest of each timing."""
+    best: Dict[str, Any] = dict(current)
+    for key, value in other.items():
+        if key not in best:
+            best[key] = value
+        elif isinstance(value, dict):
+            best[key] = _best(best[key], value)
+        elif isinstance(value, (int, float)) and isinstance(best[key], (int, float)):
+            best[key] = min(best[key], value)
+    return best
+
+
+def _rates(seconds: float, counters: Dict[str, int]) -> Dict[str, float]:
+    return {
+        "pages_per_sec": counters.get("pages", 0) / seconds if seconds > 0 else 0.0,
+        "records_per_sec": counters.get("records", 0) / seconds if seconds > 0 else 0.0,
+    }
+
+
+def _parse_corpus(out_dir: Path) -> Dict[str, Any]:
+    # Parsed in a child process, as the peak RSS of the pytest process holds
+    # the memory of the tests run before
+    result: subprocess.CompletedProcess = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import json, sys; from tests.test_benchmarks import _measure_corpus; "
+            "print(json.dumps(_measure_corpus(sys.argv[1])))",
+            f"{out_dir}",
+        ],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def _measure_corpus(out_dir: str) -> Dict[str, Any]:
+    out_dir: Path = Path(out_dir)
+    errors: List[str] = []
+    for result in parse_pdfs(
+        pdfs_path=[f"{f}" for f in CORPUS], out_dir=f"{out_dir}", metrics=True
+    ):
+        if isinstance(result, Exception):
+            errors.append(f"{result}")
+        elif isinstance(result[2], Exception):
+            errors.append(f"{result[2]}")
+
+    with open(out_dir / "metrics.json", encoding="utf-8") as f:
+        metrics: Dict[str, Any] = json.load(f)
+
+    files: Dict[str, Any] = {}
+    for child in metrics.get("children", []):
+        seconds: float = child["timers"].get("wall", 0.0)
+        files[_key(child["name"])] = {
+            "seconds": seconds,
+            "stages": {k: v for k, v in child["timers"].items() if k != "wall"},
+            "counters": child["counters"],
+            **_rates(seconds, child["counters"]),
+        }
+
+    seconds = metrics["timers"]["wall"]
+    return {
+        "errors": errors,
+        "end_to_end": {
+            "seconds": seconds,
+            "stages": {k: v for k, v in metrics["timers"].items() if k != "wall"},
+            "counters": metrics["counters"],
+            "peak_rss": _peak_rss(),
+            **_rates(seconds, metrics["counters"]),
+        },
+        "files": files,
+    }
+
+
+def _regressions(
+    name: str,
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float,
+    min_seconds: float,
+) -> List[str]:
+    """Lists the timings in `current` that regressed over `baseline`.
+
+    A timing regresses when it grows over the baseline both by more than
+    `threshold` relative to it and by more than `min_seconds`.
+
+    Parameters
+    ----------
+    name : str
+        the name of the measured unit, used in the messages
+    current : Dict[str, Any]
+        the current results with 'seconds' and 'stages' timings
+    baseline : Dict[str, Any]
+        the baseline results with 'seconds' and 'stages' timings
+    threshold : float
+        the allowed relative regression
+    min_seconds : float
+        the allowed absolute regression in seconds
+
+    Returns
+    -------
+    List[str]
+        the regression messages
+    """
+    timings: Dict[str, float] = {"total": current["seconds"], **current["stages"]}
+    base: Dict[str, float] = {"total": baseline["seconds"], **baseline["stages"]}
+    return [
+        f"{name} {k}: {v:.3f}s vs baseline {base[k]:.3f}s (+{(v / base[k] - 1) * 100:.0f}%)"
+        for k, v in timings.items()
+        if k in base
+        and base[k] > 0
+        and v > base[k] * (1 + threshold)
+        and v - base[k] > min_seconds
+    ]
+
+
+@pytest.fixture(scope="session")
+def benchmark_config(pytestconfig: pytest.Config) -> Dict[str, Any]:
+    return {
+        "baseline": Path(pytestconfig.getoption("benchmark_baseline")),
+        "results": pytestconfig.getoption("benchmark_results"),
+        "save": pytestconfig.getoption("benchmark_save"),
+        "threshold": pytestconfig.getoption("benchmark_threshold"),
+        "min_seconds": pytestconfig.getoption("benchmark_min_seconds"),
+        "rounds": max(1, pytestconfig.getoption("benchmark_rounds")),
+    }
+
+
+@pytest.fixture(scope="session")
+def benchmark_baseline(benchmark_config: Dict[str, Any]) -> Dict[str, Any] | None:
+    baseline: Path = benchmark_config["baseline"]
+    if not baseline.is_file():
+        return None
+    with open(baseline, encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="session")
+def benchmark_results(
+    benchmark_config: Dict[str, Any],
+    benchmark_baseline: Dict[str, Any] | None,
+    tmp_path_factory: pytest.TempPathFactory,
+) -> Generator[Dict[str, Any], None, None]:
+    if len(CORPUS) == 0:
+        pytest.skip("No benchmark corpus PDFs found")
+
+    results: Dict[str, Any] = {}
+    for idx in range(benchmark_config["rounds"]):
+        run: Dict[str, Any] = _parse_corpus(tmp_path_factory.mktemp(f"round{idx}"))
+        results = _best(run, results) if results else run
+    for result in [results["end_to_end"], *results["files"].values()]:
+        result.update(_rates(result["seconds"], result["counters"]))
+    results["environment"] = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": cpu_count(),
+        "rounds": benchmark_config["rounds"],
+    }
+
+    yield results
+
+    content: str = json.dumps(results, indent=2)
+    if benchmark_config["results"] is not None:
+        Path(benchmark_config["results"]).write_text(content, encoding="utf-8")
+    if benchmark_config["save"]:
+        benchmark_config["baseline"].write_text(content, encoding="utf-8")
+
+
+def _require_baseline(
+    baseline: Dict[str, Any] | None, benchmark_config: Dict[str, Any]
+) -> None:
+    # Without a baseline nothing would be compared, which must not pass
+    if baseline is not None:
+        return
+    if benchmark_config["save"]:
+        pytest.skip(f"No baseline, recording one at '{benchmark_config['baseline']}'")
+    pytest.fail(
+        f"No baseline at '{benchmark_config['baseline']}', record one with "
+        "--benchmark-save"
+    )
+
+
+def test_corpus_parses(benchmark_results: Dict[str, Any]) -> None:
+    assert benchmark_results["errors"] == []
+    assert set(benchmark_results["files"]) == {_key(f) for f in CORPUS}
+    for name, result in benchmark_results["files"].items():
+        assert result["counters"].get("pages", 0) > 0, name
+        assert result["counters"].get("records", 0) > 0, name
+
+
+def test_end_to_end(
+    benchmark_results: Dict[str, Any],
+    benchmark_baseline: Dict[str, Any] | None,
+    benchmark_config: Dict[str, Any],
+) -> None:
+    _require_baseline(benchmark_baseline, benchmark_config)
+
+    regressions: List[str] = _regressions(
+        "parse_pdfs",
+        benchmark_results["end_to_end"],
+        benchmark_baseline["end_to_end"],
+        benchmark_config["threshold"],
+        benchmark_config["min_seconds"],
+    )
+    assert len(regressions) == 0, "\n".join(regressions)
+
+
+@pytest.mark.parametrize("pdf", CORPUS, ids=[_key(f) for f in CORPUS])
+def test_file(
+    pdf: Path,
+    benchmark_results: Dict[str, Any],
+    benchmark_baseline: Dict[str, Any] | None,
+    benchmark_config: Dict[str, Any],
+) -> None:
+    _require_baseline(benchmark_baseline, benchmark_config)
+    if _key(pdf) not in benchmark_baseline["files"]:
+        pytest.skip(f"'{_key(pdf)}' is not in the baseline")
+
+    regressions: List[str] = _regressions(
+        _key(pdf),
+        benchmark_results["files"][_key(pdf)],
+        benchmark_baseline["files"][_key(pdf)],
+        benchmark_config["threshold"],
+        benchmark_config["min_seconds"],
+    )
+    assert len(regressions) == 0, "\n".join(regressions)
+
+
+def test_peak_rss(
+    benchmark_results: Dict[str, Any],
+    benchmark_baseline: Dict[str, Any] | None,
+    benchmark_config: Dict[str, Any],
+) -> None:
+    _require_baseline(benchmark_baseline, benchmark_config)
+    current: int | None = benchmark_results["end_to_end"]["peak_rss"]
+    baseline: int | None = benchmark_baseline["end_to_end"].get("peak_rss")
+    if current is None or baseline is None:
+        pytest.skip("Peak RSS is not available")
+
+    assert current <= baseline * (1 + benchmark_config["threshold"]), (
+        f"peak RSS {current / 2**20:.1f} MiB vs baseline {baseline / 2**20:.1f} MiB"
+    )
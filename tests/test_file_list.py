@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""GUI file list.
+
+Scans a directory tree with a `ScanWorker` in a `QThreadPool`, checking that
+the PDF files are found off the UI thread, in batches, and appended to a
+`PDFFileListModel` on the UI thread, and checks the rows the model inserts,
+resets and updates.
+"""
+
+# Python Imports
+import threading
+from pathlib import Path
+from typing import Any, List, Tuple
+
+# Third-Party Imports
+import pytest
+from PySide6.QtCore import QModelIndex, QThreadPool, Qt
+from PySide6.QtGui import QIcon
+
+# Local Imports
+from app.gui import workers
+from app.gui.models import PDFFileListModel, PDFFileStatus
+from app.gui.workers import ScanWorker
+from app.utils.paths import make_path
+
+# Constants
+QtBot = pytest.importorskip("pytestqt.qtbot").QtBot
+
+
+def _write_tree(root: Path) -> List[str]:
+    # Files are listed depth first, in name order
+    for path in ("b/d/3.pdf", "b/2.PDF", "b/notes.txt", "a/1.pdf", "c/empty.txt"):
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).write_bytes(b"")
+    return [make_path(f"{root / p}") for p in ("a/1.pdf", "b/2.PDF", "b/d/3.pdf")]
+
+
+def _model(qtbot: QtBot) -> PDFFileListModel:
+    # The qtbot fixture starts the QApplication that icons need
+    return PDFFileListModel(QIcon())
+
+
+def test_files_are_scanned_off_the_ui_thread(qtbot: QtBot, tmp_path: Path) -> None:
+    expected: List[str] = _write_tree(tmp_path)
+    worker: ScanWorker = ScanWorker(
+        [f"{tmp_path}", f"{tmp_path / 'c'}", f"{tmp_path / 'b' / 'notes.txt'}"]
+    )
+    model: PDFFileListModel = _model(qtbot)
+    threads: List[int] = []
+    invalid: List[str] = []
+    worker.signals.found.connect(
+        lambda _: threads.append(threading.get_ident()), Qt.DirectConnection
+    )
+    worker.signals.found.connect(model.append_files)
+    worker.signals.invalid.connect(invalid.append)
+
+    with qtbot.waitSignal(worker.signals.finished, timeout=10_000) as finished:
+        QThreadPool.globalInstance().start(worker)
+    # The queued batches are appended by the UI thread event loop
+    qtbot.waitUntil(lambda: model.file_count == len(expected))
+
+    assert finished.args == [len(expected), False]
+    assert threading.get_ident() not in threads
+    assert model.file_paths() == expected
+    # The directory without PDFs and the text file
+    assert len(invalid) == 2
+
+
+def test_files_are_found_in_batches(
+    qtbot: QtBot, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(workers, "_SCAN_BATCH_SECONDS", 60.0)
+    for i in range(workers._SCAN_BATCH_SIZE + 10):
+        (tmp_path / f"{i:04d}.pdf").write_bytes(b"")
+    worker: ScanWorker = ScanWorker([f"{tmp_path}"])
+    batches: List[List[str]] = []
+    worker.signals.found.connect(batches.append, Qt.DirectConnection)
+
+    with qtbot.waitSignal(worker.signals.finished, timeout=10_000):
+        QThreadPool.globalInstance().start(worker)
+
+    assert [len(batch) for batch in batches] == [workers._SCAN_BATCH_SIZE, 10]
+
+
+def test_cancelled_scans_find_nothing(qtbot: QtBot, tmp_path: Path) -> None:
+    _write_tree(tmp_path)
+    worker: ScanWorker = ScanWorker([f"{tmp_path}"])
+    found: List[List[str]] = []
+    worker.signals.found.connect(found.append, Qt.DirectConnection)
+    worker.cancel()
+
+    with qtbot.waitSignal(worker.signals.finished, timeout=10_000) as finished:
+        QThreadPool.globalInstance().start(worker)
+
+    assert finished.args == [0, True]
+    assert found == []
+
+
+def test_rows_are_inserted_per_batch(qtbot: QtBot) -> None:
+    model: PDFFileListModel = _model(qtbot)
+    inserted: List[Tuple[int, int]] = []
+    model.rowsInserted.connect(lambda _, first, last: inserted.append((first, last)))
+
+    model.append_files(["a.pdf", "b.pdf"])
+    model.append_message("No PDF files")
+    # Listed files are skipped, empty batches insert nothing
+    model.append_files(["b.pdf", "c.pdf", "c.pdf"])
+    model.append_files(["a.pdf"])
+
+    assert inserted == [(0, 1), (2, 2), (3, 3)]
+    assert model.rowCount() == 4
+    assert model.file_count == 3
+    assert model.file_paths() == ["a.pdf", "b.pdf", "c.pdf"]
+    assert model.data(model.index(2)) == "No PDF files"
+    assert model.data(model.index(2), Qt.DecorationRole) is None
+
+
+def test_rows_are_reset_and_updated(qtbot: QtBot) -> None:
+    model: PDFFileListModel = _model(qtbot)
+    model.append_files(["a.pdf", "b.pdf"])
+    changed: List[Tuple[int, int]] = []
+    model.dataChanged.connect(
+        lambda first, last, *_: changed.append((first.row(), last.row()))
+    )
+
+    model.set_status("b.pdf", PDFFileStatus.ERROR, "Unreadable")
+    model.set_status("c.pdf", PDFFileStatus.DONE)
+    assert changed == [(1, 1)]
+    assert model.data(model.index(1), Qt.ToolTipRole) == "Unreadable"
+    assert model.data(model.index(1), Qt.ForegroundRole) is not None
+
+    model.reset_status()
+    assert changed[-1] == (0, 1)
+    assert model.data(model.index(1), Qt.ToolTipRole) is None
+
+    with qtbot.waitSignal(model.modelReset, timeout=1_000):
+        model.clear()
+    assert model.rowCount() == 0
+    assert model.file_count == 0
+    assert model.data(model.index(0)) is None
+    model.append_files(["a.pdf"])
+    assert model.rowCount(QModelIndex()) == 1
+    # A list, its rows have no children
+    assert model.rowCount(model.index(0)) == 0
+
+
+def test_model_is_consistent(qtmodeltester: Any, qtbot: QtBot) -> None:
+    model: PDFFileListModel = _model(qtbot)
+    model.append_files(["a.pdf", "b.pdf"])
+    model.append_message("No PDF files")
+    model.set_status("a.pdf", PDFFileStatus.DONE)
+
+    qtmodeltester.check(model)
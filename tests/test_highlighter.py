@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""Bounding box highlighter.
+
+Renders synthetic checklist PDFs with poppler, so the tests are skipped where
+poppler or the `plot` dependency group are not installed.
+"""
+
+# Python Imports
+import os
+import shutil
+from pathlib import Path
+from typing import List
+
+# Third-Party Imports
+import pytest
+from pdfminer.high_level import extract_pages
+from pdfminer.layout import LTPage
+
+# Local Imports
+from app.core import mv
+from app.model.pdfs import PDFLTTrace
+from tests.synthetic import MV, layout_params, write_pdf
+
+pytest.importorskip("pdf2image")
+from PIL import Image  # noqa: E402
+from app.core.highlighter import (  # noqa: E402
+    PDFBBoxHighlighter,
+    PDFPageRasterCache,
+)
+
+# Constants
+pytestmark = pytest.mark.skipif(
+    shutil.which("pdftoppm") is None, reason="poppler is not installed"
+)
+_DPI: int = 72
+
+
+def test_pages_are_rendered_once(tmp_path: Path) -> None:
+    pdf_path: Path = tmp_path / "mv.pdf"
+    write_pdf(pdf_path, MV, pages=3, rows=10)
+    cache: PDFPageRasterCache = PDFPageRasterCache(f"{tmp_path / 'cache'}")
+
+    img_path: str = cache.page_image_path(f"{pdf_path}", 2, _DPI)
+    img_paths: List[str] = cache.render(f"{pdf_path}", _DPI)
+    assert len(img_paths) == 3 and img_paths[1] == img_path
+    assert all(os.path.isfile(path) for path in img_paths)
+
+    # A copy of the file shares the same cached images
+    mtimes: List[int] = [os.stat(path).st_mtime_ns for path in img_paths]
+    copy_path: Path = tmp_path / "copy.pdf"
+    shutil.copyfile(pdf_path, copy_path)
+    assert cache.render(f"{copy_path}", _DPI) == img_paths
+    assert [os.stat(path).st_mtime_ns for path in img_paths] == mtimes
+
+
+def test_elements_are_highlighted(tmp_path: Path) -> None:
+    pdf_path: Path = tmp_path / "mv.pdf"
+    write_pdf(pdf_path, MV, pages=2, rows=10)
+    cache: PDFPageRasterCache = PDFPageRasterCache(f"{tmp_path / 'cache'}")
+
+    # Pages are written in parallel and in process, with the same result
+    for max_workers in [2, 1]:
+        out_dir: Path = tmp_path / f"{max_workers}"
+        highlighter: PDFBBoxHighlighter = PDFBBoxHighlighter(cache, max_workers)
+        highlighter.highlight_bbox_pdf(f"{pdf_path}", f"{out_dir}", dpi=_DPI)
+        assert sorted(os.listdir(out_dir / "mv")) == ["1.png", "2.png"]
+
+    for page in ["1.png", "2.png"]:
+        with (
+            Image.open(tmp_path / "1" / "mv" / page) as parallel,
+            Image.open(tmp_path / "2" / "mv" / page) as serial,
+        ):
+            # Boxes are coloured, while the page is black and white
+            assert any(len(set(pixel)) > 1 for _, pixel in parallel.getcolors(1 << 16))
+            assert parallel.tobytes() == serial.tobytes()
+
+
+def test_elements_are_highlighted_individually(tmp_path: Path) -> None:
+    pdf_path: Path = tmp_path / "mv.pdf"
+    write_pdf(pdf_path, MV, pages=1, rows=5)
+    highlighter: PDFBBoxHighlighter = PDFBBoxHighlighter(
+        PDFPageRasterCache(f"{tmp_path / 'cache'}"), max_workers=2
+    )
+    pdf_page: LTPage = next(extract_pages(pdf_path))
+
+    highlighter.highlight_bbox_pdf_elements(
+        f"{pdf_path}",
+        pdf_page.pageid,
+        pdf_page.height,
+        pdf_page._objs[:3],
+        f"{tmp_path / 'out'}",
+        dpi=_DPI,
+        individual=True,
+    )
+
+    for i in range(3):
+        assert os.listdir(tmp_path / "out" / f"{i}" / f"mv_{i}") == ["1.png"]
+
+
+def test_trace_is_highlighted(tmp_path: Path) -> None:
+    pdf_path: Path = tmp_path / "mv.pdf"
+    write_pdf(pdf_path, MV, pages=2, rows=10)
+    trace: PDFLTTrace = PDFLTTrace(f"{pdf_path}")
+    for pdf_page in extract_pages(pdf_path, laparams=MV.laparams):
+        mv.PIPELINE.run(pdf_page, layout_params(MV), trace)
+    trace.dump(tmp_path / "trace.json")
+    highlighter: PDFBBoxHighlighter = PDFBBoxHighlighter(
+        PDFPageRasterCache(f"{tmp_path / 'cache'}"), max_workers=2
+    )
+
+    highlighter.highlight_trace(
+        f"{tmp_path / 'trace.json'}", f"{tmp_path / 'out'}", steps=["rows"], pages=[2]
+    )
+
+    assert os.listdir(tmp_path / "out" / "mv") == ["rows"]
+    assert os.listdir(tmp_path / "out" / "mv" / "rows") == ["2.png"]
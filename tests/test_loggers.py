@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""Asynchronous logging setup.
+
+Runs `configure_logging` in fresh interpreters, so that the root logger holds
+only the handlers under test and not the capture handlers of pytest.
+"""
+
+# Python Imports
+import json
+import logging
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict
+
+# Third-Party Imports
+import pytest
+
+# Local Imports
+
+# Constants
+ROOT: Path = Path(__file__).parent.parent
+_SCRIPT: str = """
+import json, logging, sys, threading
+from app.utils.loggers import configure_logging, stop_logging
+
+class Formatted:
+    calls = []
+    def __str__(self):
+        Formatted.calls.append(threading.current_thread().name)
+        return "formatted"
+
+class Recording(logging.Handler):
+    threads = []
+    def emit(self, record):
+        self.format(record)
+        Recording.threads.append(threading.current_thread().name)
+
+handler = Recording()
+logging.getLogger().addHandler(handler)
+configure_logging(sys.argv[1])
+Formatted.calls, Recording.threads = [], []
+
+logging.getLogger("tests").debug("debug %s", Formatted())
+logging.getLogger("tests").info("info %s", Formatted())
+stop_logging()
+logging.getLogger("tests").warning("stopped %s", Formatted())
+
+print(json.dumps({
+    "main": threading.current_thread().name,
+    "formatted": Formatted.calls,
+    "handled": Recording.threads,
+    "restored": logging.getLogger().handlers == [handler],
+}))
+"""
+
+
+def _run(tmp_path: Path, level: str) -> Dict[str, Any]:
+    # An incremental configuration keeps the recording handler on the root
+    config: Path = tmp_path / "logging.json"
+    config.write_text(
+        json.dumps({"version": 1, "incremental": True, "root": {"level": level}}),
+        encoding="utf-8",
+    )
+    result: subprocess.CompletedProcess = subprocess.run(
+        [sys.executable, "-c", _SCRIPT, f"{config}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_records_are_formatted_off_thread(tmp_path: Path) -> None:
+    result: Dict[str, Any] = _run(tmp_path, "DEBUG")
+
+    # Queued records are formatted by the listener thread, once stopped the
+    # handlers are attached back to the root logger and run synchronously
+    assert len(result["formatted"]) == 3
+    assert result["formatted"] == result["handled"]
+    assert all(t != result["main"] for t in result["formatted"][:2])
+    assert result["formatted"][2] == result["main"]
+    assert result["restored"]
+
+
+def test_disabled_levels_are_not_formatted(tmp_path: Path) -> None:
+    result: Dict[str, Any] = _run(tmp_path, "INFO")
+
+    assert len(result["formatted"]) == 2
+    assert len(result["handled"]) == 2
+
+
+@pytest.mark.parametrize("config", ["logging.json", "logging.prod.json"])
+def test_config_profiles(config: str) -> None:
+    with open(ROOT / "config" / config, encoding="utf-8") as f:
+        profile: Dict[str, Any] = json.load(f)
+
+    assert set(profile["root"]["handlers"]) <= set(profile["handlers"])
+    if config == "logging.prod.json":
+        # Per page and per element debug records are dropped by the loggers
+        assert logging.getLevelName(profile["root"]["level"]) > logging.DEBUG
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""Batch manifest.
+
+Records synthetic files to a `BatchManifest` and checks which ones a later batch
+skips, and that an incremental `parse_pdfs` batch only parses the changed files
+of the bundled corpus.
+"""
+
+# Python Imports
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import List
+
+# Third-Party Imports
+from pandas import read_csv, read_excel
+
+# Local Imports
+from app.core.manifest import BatchManifest
+from app.core.pdfs import parse_pdfs
+from app.model.pdfs import PDFType
+
+# Constants
+_CORPUS: Path = Path(__file__).parent.parent / "test" / "20241208"
+
+
+def _write(path: Path, content: bytes, mtime_ns: int) -> None:
+    path.write_bytes(content)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_unchanged_files_are_skipped(tmp_path: Path) -> None:
+    a: Path = tmp_path / "a.pdf"
+    b: Path = tmp_path / "b.pdf"
+    _write(a, b"a", 1_000)
+    _write(b, b"b", 1_000)
+    with BatchManifest(f"{tmp_path}") as manifest:
+        manifest.record(f"{a}", "done", PDFType.MV, 3)
+        manifest.record(f"{b}", "error")
+
+    manifest = BatchManifest(f"{tmp_path}").load()
+    assert manifest.is_unchanged(f"{a}")
+    assert not manifest.is_unchanged(f"{b}")
+    assert manifest.rows == {PDFType.MV: 3}
+
+    # A copy with the same content is still unchanged, other content is not
+    _write(a, b"a", 2_000)
+    assert manifest.is_unchanged(f"{a}")
+    _write(a, b"c", 3_000)
+    assert not manifest.is_unchanged(f"{a}")
+
+
+def test_interrupted_batch_is_resumed(tmp_path: Path) -> None:
+    paths: List[Path] = [tmp_path / f"{i}.pdf" for i in range(3)]
+    for path in paths:
+        _write(path, path.name.encode(), 1_000)
+    with BatchManifest(f"{tmp_path}") as manifest:
+        manifest.record(f"{paths[0]}", "done", PDFType.MV, 2)
+        manifest.record(f"{paths[1]}", "done", PDFType.MV, 5)
+    # A batch killed while recording the last file leaves an incomplete line
+    manifest_path: Path = tmp_path / "manifest.jsonl"
+    content: str = manifest_path.read_text(encoding="utf-8")
+    manifest_path.write_text(content[: len(content) - 20], encoding="utf-8")
+
+    with BatchManifest(f"{tmp_path}").load() as manifest:
+        assert [manifest.is_unchanged(f"{path}") for path in paths] == [
+            True,
+            False,
+            False,
+        ]
+        assert manifest.record(f"{paths[1]}", "done", PDFType.MV, 5)["rows"] == {
+            "type": PDFType.MV,
+            "start": 2,
+            "end": 7,
+        }
+
+    lines: List[str] = manifest_path.read_text(encoding="utf-8").splitlines()
+    assert json.loads(lines[-1])["path"] == os.path.abspath(paths[1])
+
+
+def test_changed_files_are_parsed(tmp_path: Path) -> None:
+    pdfs_dir: Path = tmp_path / "pdfs"
+    pdfs_dir.mkdir()
+    pdf_path: Path = next(_CORPUS.glob("*MV*.pdf"))
+    shutil.copy2(pdf_path, pdfs_dir / "a.pdf")
+    out_dir: Path = tmp_path / "out"
+
+    def parse() -> int:
+        return len(
+            list(
+                parse_pdfs(
+                    f"{pdfs_dir}", f"{out_dir}", output_format="csv", incremental=True
+                )
+            )
+        )
+
+    assert parse() > 0
+    rows: int = len(read_csv(out_dir / "MV.csv"))
+    assert parse() == 0
+
+    shutil.copy2(pdf_path, pdfs_dir / "b.pdf")
+    assert parse() > 0
+    assert len(read_csv(out_dir / "MV.csv")) == 2 * rows
+
+
+def test_removed_rows_are_moved_up(tmp_path: Path) -> None:
+    paths: List[Path] = [tmp_path / f"{i}.pdf" for i in range(3)]
+    for path in paths:
+        _write(path, path.name.encode(), 1_000)
+    with BatchManifest(f"{tmp_path}") as manifest:
+        for path, rows in zip(paths, [2, 5, 3]):
+            manifest.record(f"{path}", "done", PDFType.MV, rows)
+        assert manifest.remove(f"{paths[1]}")["rows"]["start"] == 2
+        manifest.record(f"{paths[1]}", "done", PDFType.MV, 4)
+
+    manifest = BatchManifest(f"{tmp_path}").load()
+    assert [manifest.entries[os.path.abspath(p)]["rows"] for p in paths] == [
+        {"type": PDFType.MV, "start": 0, "end": 2},
+        {"type": PDFType.MV, "start": 5, "end": 9},
+        {"type": PDFType.MV, "start": 2, "end": 5},
+    ]
+    assert manifest.rows == {PDFType.MV: 9}
+
+
+def test_changed_files_replace_their_rows(tmp_path: Path) -> None:
+    pdfs_dir: Path = tmp_path / "pdfs"
+    pdfs_dir.mkdir()
+    pdf_path: Path = next(_CORPUS.glob("*MV*.pdf"))
+    for name in ["a.pdf", "b.pdf"]:
+        shutil.copy2(pdf_path, pdfs_dir / name)
+    out_dir: Path = tmp_path / "out"
+
+    def parse() -> None:
+        for _ in parse_pdfs(
+            f"{pdfs_dir}",
+            f"{out_dir}",
+            output_format=["excel", "csv"],
+            incremental=True,
+        ):
+            pass
+
+    def excel_rows() -> int:
+        return len(
+            read_excel(out_dir / "output.xlsx", sheet_name="MV", header=None)
+            .dropna(how="all")
+        )
+
+    parse()
+    csv_rows: int = len(read_csv(out_dir / "MV.csv"))
+    xlsx_rows: int = excel_rows()
+
+    # Bytes after the end of a PDF are ignored by readers
+    with open(pdfs_dir / "a.pdf", "ab") as f:
+        f.write(b"\n% edited\n")
+    parse()
+
+    assert len(read_csv(out_dir / "MV.csv")) == csv_rows
+    assert excel_rows() == xlsx_rows
+    manifest: BatchManifest = BatchManifest(f"{out_dir}").load()
+    assert manifest.entries[f"{pdfs_dir / 'b.pdf'}"]["rows"]["start"] == 0
+    assert manifest.rows == {PDFType.MV: csv_rows}
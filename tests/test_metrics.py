@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""Parsing metrics.
+
+Accumulates timers and counters in `Metrics` and its children, checking the
+merged and dumped metrics and that `NullMetrics` records nothing, and writes
+synthetic MV rows through the Excel sink, checking that each write only counts
+the bytes it adds to the workbook.
+"""
+
+# Python Imports
+import json
+from pathlib import Path
+from time import sleep
+from typing import Any, Dict
+
+# Third-Party Imports
+from openpyxl import Workbook
+from pandas import DataFrame
+
+# Local Imports
+from app.core import mv
+from app.core.pdfs import ExcelSink
+from app.model.pdfs import PDFLTMatchResult, PDFType
+from app.utils.metrics import NULL_METRICS, Metrics
+
+# Constants
+_MATCH_RESULT: PDFLTMatchResult = {"Type": PDFType.MV, "Tasks": {}}
+
+
+def test_counters_and_timers_accumulate() -> None:
+    metrics: Metrics = Metrics("a.pdf")
+    metrics.count("pages")
+    metrics.count("pages", 2)
+    metrics.add_counters({"pages": 1, "records": 10})
+    metrics.add_time("match", 0.5)
+    metrics.add_timers({"match": 0.25, "excel": 1.0})
+    with metrics.time("pdfminer"):
+        sleep(0.01)
+
+    assert metrics.enabled
+    assert metrics.counters == {"pages": 4, "records": 10}
+    assert metrics.timers["match"] == 0.75
+    assert metrics.timers["excel"] == 1.0
+    assert metrics.timers["pdfminer"] >= 0.01
+
+
+def test_children_are_merged_into_their_parent() -> None:
+    batch: Metrics = Metrics("batch")
+    for name, pages in (("a.pdf", 2), ("b.pdf", 3)):
+        child: Metrics = batch.child(name)
+        child.count("pages", pages)
+        child.add_time("wall", 1.0)
+        batch.merge(child)
+
+    assert list(batch.children) == ["a.pdf", "b.pdf"]
+    assert batch.counters == {"pages": 5}
+    assert batch.timers == {"wall": 2.0}
+    # Children keep their own metrics
+    assert batch.children["b.pdf"].counters == {"pages": 3}
+
+
+def test_metrics_are_dumped_with_rates(tmp_path: Path) -> None:
+    batch: Metrics = Metrics("batch")
+    child: Metrics = batch.child("a.pdf")
+    child.count("pages", 4)
+    batch.merge(child)
+    batch.count("files")
+    batch.add_time("wall", 2.0)
+
+    batch.dump(tmp_path / "metrics.json")
+    with open(tmp_path / "metrics.json", encoding="utf-8") as f:
+        dumped: Dict[str, Any] = json.load(f)
+
+    assert dumped == batch.as_dict()
+    assert dumped["counters"] == {"files": 1, "pages": 4}
+    assert dumped["rates"] == {"files/sec": 0.5, "pages/sec": 2.0}
+    # Without a wall time there are no rates
+    assert dumped["children"] == [
+        {"name": "a.pdf", "timers": {}, "counters": {"pages": 4}}
+    ]
+
+
+def test_null_metrics_record_nothing(tmp_path: Path) -> None:
+    NULL_METRICS.count("pages")
+    NULL_METRICS.add_counters({"records": 1})
+    NULL_METRICS.add_time("wall", 1.0)
+    NULL_METRICS.add_timers({"match": 1.0})
+    with NULL_METRICS.time("pdfminer"):
+        pass
+    NULL_METRICS.merge(NULL_METRICS.child("a.pdf"))
+    NULL_METRICS.dump(tmp_path / "metrics.json")
+
+    assert not NULL_METRICS.enabled
+    assert NULL_METRICS.child("a.pdf") is NULL_METRICS
+    assert NULL_METRICS.counters == {}
+    assert NULL_METRICS.timers == {}
+    assert NULL_METRICS.children == {}
+    assert not (tmp_path / "metrics.json").exists()
+
+
+def test_excel_writes_count_the_bytes_they_add(tmp_path: Path) -> None:
+    template: Path = tmp_path / "template.xlsx"
+    workbook: Workbook = Workbook()
+    workbook.active.title = PDFType.PREVENTIVE
+    workbook.create_sheet(PDFType.MV)
+    workbook.save(template)
+    rows: DataFrame = DataFrame(
+        [[f"{i}.{c}" for c in range(len(mv.COLUMNS))] for i in range(200)],
+        columns=mv.COLUMNS,
+    )
+
+    batch: Metrics = Metrics("batch")
+    (tmp_path / "out").mkdir()
+    with ExcelSink(f"{tmp_path / 'out'}", f"{template}", (2, 3)) as sink:
+        for name in ("a.pdf", "b.pdf", "c.pdf"):
+            file_metrics: Metrics = batch.child(name)
+            sink.write(name, _MATCH_RESULT, rows, file_metrics)
+            batch.merge(file_metrics)
+
+    # The workbook grows by about the same rows on each write
+    written: int = (tmp_path / "out" / "output.xlsx").stat().st_size
+    assert batch.counters["bytes_written"] == written - template.stat().st_size
+    assert batch.children["c.pdf"].counters["bytes_written"] < written / 2
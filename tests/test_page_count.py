@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""Page counts.
+
+Counts the pages of the reports of the bundled corpus with
+`PDFUtils.page_count`, from the trailer and through the pdfminer fallback,
+checking that counts are cached until a file changes, and that the counts
+made when estimating the cost of the files of an asynchronous batch are
+handed to the workers, which do not count the pages again.
+"""
+
+# Python Imports
+import asyncio
+import os
+import shutil
+from pathlib import Path
+from queue import Queue
+from threading import Event
+from typing import Any, Callable, Dict, List
+
+# Third-Party Imports
+import pytest
+from pandas import DataFrame
+from pypdf import PdfReader
+
+# Local Imports
+from app.core import mv, pdfs, preventive
+from app.model.pdfs import PDFType
+from app.utils.pdfs import PDFUtils
+
+# Constants
+_CORPUS: Path = Path(__file__).parent.parent / "test" / "20241208"
+
+
+@pytest.fixture()
+def pdf_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    # Each test starts with an empty cache and a file of its own
+    monkeypatch.setattr(PDFUtils, "_page_counts", {})
+    path: Path = tmp_path / "report.pdf"
+    shutil.copy2(next(_CORPUS.glob("*MV*.pdf")), path)
+    return path
+
+
+@pytest.fixture()
+def reads(monkeypatch: pytest.MonkeyPatch) -> List[str]:
+    reads: List[str] = []
+    read_page_count: Callable[[str], int] = PDFUtils._read_page_count
+
+    def counting_read_page_count(pdf_path: str) -> int:
+        reads.append(pdf_path)
+        return read_page_count(pdf_path)
+
+    monkeypatch.setattr(
+        PDFUtils, "_read_page_count", staticmethod(counting_read_page_count)
+    )
+    return reads
+
+
+def _failing(*args: Any, **kwargs: Any) -> None:
+    raise ValueError("Unreadable")
+
+
+def test_pages_are_counted_from_the_trailer(
+    pdf_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr("app.utils.pdfs.PDFParser", _failing)
+
+    assert PDFUtils.page_count(f"{pdf_path}") == len(PdfReader(pdf_path).pages)
+
+
+def test_pages_are_counted_by_pdfminer_when_pypdf_fails(
+    pdf_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr("app.utils.pdfs.PdfReader", _failing)
+
+    assert PDFUtils.page_count(f"{pdf_path}") == len(PdfReader(pdf_path).pages)
+
+
+def test_counts_are_cached_until_files_change(
+    pdf_path: Path, reads: List[str]
+) -> None:
+    assert PDFUtils.cached_page_count(f"{pdf_path}") is None
+    count: int = PDFUtils.page_count(f"{pdf_path}")
+    assert PDFUtils.page_count(f"{pdf_path}") == count
+    assert len(reads) == 1
+    assert PDFUtils.cached_page_count(f"{pdf_path}")[1] == count
+
+    stat: os.stat_result = os.stat(pdf_path)
+    os.utime(pdf_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert PDFUtils.cached_page_count(f"{pdf_path}") is None
+    assert PDFUtils.page_count(f"{pdf_path}") == count
+    assert len(reads) == 2
+
+
+def test_cached_counts_are_only_used_for_unchanged_files(
+    pdf_path: Path, reads: List[str]
+) -> None:
+    key, count = PDFUtils._page_count_key(f"{pdf_path}"), 99
+    PDFUtils.cache_page_count(key, count)
+    assert PDFUtils.page_count(f"{pdf_path}") == count
+    assert len(reads) == 0
+
+    stat: os.stat_result = os.stat(pdf_path)
+    os.utime(pdf_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert PDFUtils.page_count(f"{pdf_path}") == len(PdfReader(pdf_path).pages)
+    assert len(reads) == 1
+
+
+def test_workers_use_the_counts_they_are_given(
+    pdf_path: Path, reads: List[str], tmp_path: Path
+) -> None:
+    key, count = PDFUtils._page_count_key(f"{pdf_path}"), 99
+    events: Queue = Queue()
+    df: Dict[PDFType, DataFrame] = {
+        PDFType.PREVENTIVE: DataFrame(columns=preventive.COLUMNS),
+        PDFType.MV: DataFrame(columns=mv.COLUMNS),
+    }
+
+    pdfs._aparse_pdf_worker(
+        0, f"{pdf_path}", f"{tmp_path}", df, events, Event(), counted=(key, count)
+    )
+
+    assert len(reads) == 0
+    assert all(events.get()[2][1] == count for _ in range(events.qsize()))
+
+
+def test_scheduled_files_carry_their_counts(
+    pdf_path: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    aparse_pdf_worker: Callable[..., None] = pdfs._aparse_pdf_worker
+    counts: List[Any] = []
+
+    def recording_aparse_pdf_worker(*args: Any) -> None:
+        counts.append(args[-1])
+        aparse_pdf_worker(*args)
+
+    monkeypatch.setattr(pdfs, "_aparse_pdf_worker", recording_aparse_pdf_worker)
+
+    async def parse() -> None:
+        async for _ in pdfs.aparse_pdfs(
+            [f"{pdf_path}"], f"{tmp_path / 'out'}", output_format="csv"
+        ):
+            pass
+
+    asyncio.run(parse())
+
+    assert counts == [
+        (PDFUtils._page_count_key(f"{pdf_path}"), len(PdfReader(pdf_path).pages))
+    ]
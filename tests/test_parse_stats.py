@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""GUI parsing throughput.
+
+Builds `ParseStats` snapshots from fake timings, checking the rates and the
+estimated time left before any page is parsed, while a batch is parsed and
+once it is finished, and the snapshots a `ParseWorker` emits as its clock
+advances.
+"""
+
+# Python Imports
+from types import SimpleNamespace
+from typing import List
+
+# Third-Party Imports
+import pytest
+from PySide6.QtCore import Qt
+
+# Local Imports
+from app.gui import workers
+from app.gui.workers import ParseStats, ParseWorker
+from app.utils.metrics import Metrics
+
+
+def test_eta_is_unknown_until_a_page_is_parsed() -> None:
+    stats: ParseStats = ParseStats(elapsed=5.0, total_pages=100, total_files=10)
+
+    assert stats.eta is None
+    assert stats.pages_per_sec == 0.0
+    assert stats.files_per_sec == 0.0
+    # No time elapsed yet
+    assert ParseStats().pages_per_sec == 0.0
+
+
+def test_eta_extrapolates_the_page_rate() -> None:
+    # A file is still being parsed, none done
+    stats: ParseStats = ParseStats(
+        elapsed=10.0, pages=20, total_pages=100, files=0, total_files=10
+    )
+
+    assert stats.pages_per_sec == 2.0
+    assert stats.files_per_sec == 0.0
+    assert stats.eta == pytest.approx(40.0)
+
+
+def test_eta_is_zero_once_finished() -> None:
+    stats: ParseStats = ParseStats(
+        elapsed=50.0, pages=100, total_pages=100, files=10, total_files=10
+    )
+
+    assert stats.eta == 0.0
+    assert stats.files_per_sec == 0.2
+    # The total is an estimate, which the parsed pages may exceed
+    assert ParseStats(elapsed=50.0, pages=120, total_pages=100).eta == 0.0
+
+
+def test_workers_emit_snapshots_of_their_clock(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    now: List[float] = [100.0]
+    monkeypatch.setattr(workers, "time", SimpleNamespace(perf_counter=lambda: now[0]))
+    worker: ParseWorker = ParseWorker(["a.pdf", "b.pdf"], "out", False, "t.xlsx")
+    emitted: List[ParseStats] = []
+    worker.signals.stats.connect(emitted.append, Qt.DirectConnection)
+
+    worker._start = now[0]
+    worker._emit_total(30)
+    worker._emit_stats()
+    now[0] = 110.0
+    worker._pages = 10
+    metrics: Metrics = Metrics("a.pdf")
+    metrics.count("records", 5)
+    metrics.add_timers({"wall": 10.0, "pdfminer": 6.0})
+    worker._on_metrics("a.pdf", metrics)
+
+    assert [s.eta for s in emitted] == [None, pytest.approx(20.0)]
+    assert emitted[-1].elapsed == 10.0
+    assert emitted[-1].files == 1
+    assert emitted[-1].records == 5
+    assert emitted[-1].stages == {"pdfminer": 6.0}
+    assert emitted[-1].slowest == ("a.pdf", 10.0)
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""GUI parsing worker.
+
+Runs a `ParseWorker` over copies of the MV report of the bundled corpus in a
+`QThreadPool`, checking the total, progress, result and finished signals the
+window is driven by, and that a batch cancelled from a progress slot stops
+before parsing every file.
+"""
+
+# Python Imports
+import shutil
+from pathlib import Path
+from typing import Any, List, Tuple
+
+# Third-Party Imports
+import pytest
+from PySide6.QtCore import QThreadPool
+
+# Local Imports
+from app.config import settings
+from app.gui.workers import ParseStats, ParseWorker
+
+# Constants
+QtBot = pytest.importorskip("pytestqt.qtbot").QtBot
+_CORPUS: Path = Path(__file__).parent.parent / "test" / "20241208"
+_PAGES: int = 8
+
+
+def _copy_reports(tmp_path: Path, count: int) -> List[str]:
+    pdf_path: Path = next(_CORPUS.glob("*MV*.pdf"))
+    pdfs_dir: Path = tmp_path / "pdfs"
+    pdfs_dir.mkdir()
+    for i in range(count):
+        shutil.copy2(pdf_path, pdfs_dir / f"{i}.pdf")
+    return [f"{pdfs_dir / f'{i}.pdf'}" for i in range(count)]
+
+
+def _worker(tmp_path: Path, count: int, executor: str) -> ParseWorker:
+    return ParseWorker(
+        pdf_paths=_copy_reports(tmp_path, count),
+        out_dir=f"{tmp_path / 'out'}",
+        split=False,
+        excel_template=settings().excel_template,
+        executor=executor,
+        max_workers=2,
+    )
+
+
+@pytest.mark.parametrize("executor", ["sync", "thread"])
+def test_batches_report_progress(
+    qtbot: QtBot, tmp_path: Path, executor: str
+) -> None:
+    worker: ParseWorker = _worker(tmp_path, 2, executor)
+    totals: List[int] = []
+    progress: List[int] = []
+    results: List[str] = []
+    stats: List[ParseStats] = []
+    worker.signals.total.connect(totals.append)
+    worker.signals.progress.connect(progress.append)
+    worker.signals.result.connect(lambda path, _: results.append(path))
+    worker.signals.stats.connect(stats.append)
+
+    with qtbot.waitSignal(worker.signals.finished, timeout=120_000) as finished:
+        QThreadPool.globalInstance().start(worker)
+
+    assert finished.args == [2, 0, False]
+    assert sorted(results) == sorted(worker.pdf_paths)
+    # The total starts at a page per file and ends at the counted pages
+    assert totals[0] == 2
+    assert totals[-1] == 2 * _PAGES
+    assert progress[-1] == 2 * _PAGES
+    assert stats[-1].files == 2
+    assert stats[-1].pages == 2 * _PAGES
+
+
+def test_batches_are_cancelled(qtbot: QtBot, tmp_path: Path) -> None:
+    worker: ParseWorker = _worker(tmp_path, 6, "thread")
+    progress: List[int] = []
+    errors: List[Tuple[Any, ...]] = []
+
+    def cancel(pages: int) -> None:
+        progress.append(pages)
+        worker.cancel()
+
+    worker.signals.progress.connect(cancel)
+    worker.signals.error.connect(lambda *args: errors.append(args))
+
+    with qtbot.waitSignal(worker.signals.finished, timeout=120_000) as finished:
+        QThreadPool.globalInstance().start(worker)
+
+    succeeded, failed, cancelled = finished.args
+    assert cancelled
+    assert succeeded < len(worker.pdf_paths)
+    assert failed == 0
+    assert errors == []
+    assert max(progress) < len(worker.pdf_paths) * _PAGES
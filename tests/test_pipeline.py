@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""Layout pipeline.
+
+Runs a pipeline with the MV steps over synthetic pages, see `tests.synthetic`,
+checking the step result cache, the replacement of steps and the statistics
+kept while threads run pages at once, and checks that the grid intersections
+the pipelines use find the same intersections and rects as the linear scan over
+the pages of the bundled corpus.
+"""
+
+# Python Imports
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+# Third-Party Imports
+import pytest
+from pdfminer.high_level import extract_pages
+from pdfminer.layout import LAParams, LTPage
+
+# Local Imports
+from app.core.mv import MVLTComposer
+from app.model.pdfs import (
+    PDFLTComposeStep,
+    PDFLTDecomposeStep,
+    PDFLTGridIntersections,
+    PDFLTIntersections,
+    PDFLTIntersectStep,
+    PDFLTLine,
+    PDFLTParams,
+    PDFLTPipeline,
+    PDFLTPipelineContext,
+    PDFLTRowsStep,
+    PDFLTStepStats,
+)
+from tests.synthetic import MV, generate_page, layout_params
+
+# Constants
+_CORPUS: Path = Path(__file__).parent.parent / "test" / "20241208"
+_STEPS: List[str] = ["decompose", "intersect", "compose", "rows"]
+
+
+def _pipeline(cache_size: int = 0) -> PDFLTPipeline:
+    return (
+        PDFLTPipeline(cache_size)
+        .step(PDFLTDecomposeStep())
+        .step(PDFLTIntersectStep(PDFLTGridIntersections))
+        .step(PDFLTComposeStep(MVLTComposer))
+        .step(PDFLTRowsStep())
+    )
+
+
+def _bbox(rect: Any) -> Tuple[float, float, float, float]:
+    return (rect.x0, rect.y0, rect.x1, rect.y1)
+
+
+def _shapes(rows: List[List[Any]]) -> List[List[Tuple[float, float, float, float]]]:
+    return [[_bbox(rect) for rect in row] for row in rows]
+
+
+def test_identical_pages_hit_the_cache() -> None:
+    pipeline: PDFLTPipeline = _pipeline(cache_size=16)
+    params: PDFLTParams = layout_params(MV)
+
+    rows, context = pipeline.run(generate_page(MV, rows=5), params)
+    cached_rows, cached_context = pipeline.run(generate_page(MV, rows=5), params)
+    pipeline.run(generate_page(MV, rows=6), params)
+
+    stats: Dict[str, PDFLTStepStats] = pipeline.stats
+    assert list(stats) == _STEPS
+    assert all(s.calls == 3 and s.hits == 1 for s in stats.values())
+    assert _shapes(cached_rows) == _shapes(rows)
+    # The counters of cached steps are replayed
+    assert cached_context.counters == context.counters
+
+
+def test_cache_holds_cache_size_results() -> None:
+    pipeline: PDFLTPipeline = _pipeline(cache_size=len(_STEPS))
+    params: PDFLTParams = layout_params(MV)
+
+    pipeline.run(generate_page(MV, rows=5), params)
+    pipeline.run(generate_page(MV, rows=6), params)
+    pipeline.run(generate_page(MV, rows=6), params)
+    pipeline.run(generate_page(MV, rows=5), params)
+
+    # Only the results of the last page fit, evicting the first page
+    assert all(s.hits == 1 for s in pipeline.stats.values())
+
+
+def test_cache_is_disabled_by_default() -> None:
+    pipeline: PDFLTPipeline = _pipeline()
+
+    for _ in range(2):
+        pipeline.run(generate_page(MV, rows=5), layout_params(MV))
+
+    assert all(s.calls == 2 and s.hits == 0 for s in pipeline.stats.values())
+
+
+def test_replaced_steps_reset_their_stats_and_the_cache() -> None:
+    pipeline: PDFLTPipeline = _pipeline(cache_size=16)
+    params: PDFLTParams = layout_params(MV)
+    rows, _ = pipeline.run(generate_page(MV, rows=5), params)
+
+    step: PDFLTIntersectStep = PDFLTIntersectStep(PDFLTIntersections)
+    assert pipeline.replace("intersect", step) is pipeline
+    assert pipeline.steps[1] is step
+    assert pipeline.stats["intersect"] == PDFLTStepStats()
+    assert pipeline.stats["decompose"].calls == 1
+
+    replaced_rows, _ = pipeline.run(generate_page(MV, rows=5), params)
+    assert all(s.hits == 0 for s in pipeline.stats.values())
+    assert _shapes(replaced_rows) == _shapes(rows)
+
+    with pytest.raises(ValueError):
+        pipeline.replace("points", step)
+    with pytest.raises(ValueError):
+        pipeline.step(PDFLTRowsStep())
+
+
+def test_stats_are_kept_across_threads() -> None:
+    pipeline: PDFLTPipeline = _pipeline(cache_size=16)
+    params: PDFLTParams = layout_params(MV)
+    pages: List[LTPage] = [generate_page(MV, rows=5 + i % 2) for i in range(40)]
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda page: pipeline.run(page, params), pages))
+
+    stats: Dict[str, PDFLTStepStats] = pipeline.stats
+    assert all(s.calls == len(pages) for s in stats.values())
+    # Each of the two distinct pages misses at least once
+    assert all(s.hits <= len(pages) - 2 for s in stats.values())
+
+    # Statistics are copies, reset by the pipeline only
+    stats["rows"].calls = 0
+    assert pipeline.stats["rows"].calls == len(pages)
+    pipeline.reset_stats()
+    assert all(s == PDFLTStepStats() for s in pipeline.stats.values())
+
+
+@pytest.mark.parametrize(
+    "pdf_path", sorted(_CORPUS.glob("*.pdf")), ids=lambda path: path.name[:30]
+)
+def test_grid_intersections_match_the_linear_scan(pdf_path: Path) -> None:
+    for pdf_page in extract_pages(pdf_path, laparams=LAParams(char_margin=1.0)):
+        for position_tol in (1.5, 5.0):
+            params: PDFLTParams = PDFLTParams(position_tol=position_tol)
+            context: PDFLTPipelineContext = PDFLTPipelineContext(pdf_page, params)
+            lines: List[PDFLTLine] = PDFLTDecomposeStep().run(pdf_page, context)
+
+            linear: PDFLTIntersections = PDFLTIntersections(params).fit(lines)
+            grid: PDFLTIntersections = PDFLTGridIntersections(params).fit(lines)
+
+            assert [
+                (p.point.point, len(p.v_lines), len(p.h_lines))
+                for p in grid.as_deque()
+            ] == [
+                (p.point.point, len(p.v_lines), len(p.h_lines))
+                for p in linear.as_deque()
+            ]
+            assert [_bbox(r) for r in grid.predict()] == [
+                _bbox(r) for r in linear.predict()
+            ]
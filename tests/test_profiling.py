@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""Parsing profiles.
+
+Parses the MV report of the bundled corpus with `parse_pdfs` under a profiler,
+checking that each file writes a loadable `.pstats` profile and a summary of
+its hotspots, and that the disabled profiler neither writes profiles nor
+changes the parsed rows.
+"""
+
+# Python Imports
+import sys
+import tracemalloc
+from pathlib import Path
+from pstats import Stats
+from typing import Any, List
+
+# Third-Party Imports
+from pandas import DataFrame, read_csv
+
+# Local Imports
+from app.core.pdfs import parse_pdfs
+from app.utils.profiling import NULL_PROFILER, Profiler
+
+# Constants
+_CORPUS: Path = Path(__file__).parent.parent / "test" / "20241208"
+
+
+def _parse(pdf_path: Path, out_dir: Path, profiler: Profiler) -> DataFrame:
+    events: List[Any] = list(
+        parse_pdfs(
+            f"{pdf_path}", f"{out_dir}", profiler=profiler, output_format="csv"
+        )
+    )
+    assert not any(
+        isinstance(e, Exception) or isinstance(e[2], Exception) for e in events
+    )
+    return read_csv(out_dir / "MV.csv", dtype=str)
+
+
+def test_files_are_profiled(tmp_path: Path) -> None:
+    pdf_path: Path = next(_CORPUS.glob("*MV*.pdf"))
+    profiler: Profiler = Profiler(tmp_path / "profiles", top=5, memory=True)
+
+    _parse(pdf_path, tmp_path / "out", profiler)
+
+    name: str = f"0001_{pdf_path.name[: -len('.pdf')]}"
+    assert sorted(p.name for p in (tmp_path / "profiles").iterdir()) == [
+        f"{name}.pstats",
+        f"{name}.txt",
+    ]
+    stats: Stats = Stats(f"{tmp_path / 'profiles' / f'{name}.pstats'}")
+    assert any(func[2] == "parse_pdf_gen" for func in stats.stats)
+    summary: str = (tmp_path / "profiles" / f"{name}.txt").read_text(encoding="utf-8")
+    assert "parse_pdf_gen" in summary
+    assert "Peak traced memory" in summary
+    # Memory is only traced while profiling
+    assert not tracemalloc.is_tracing()
+
+
+def test_disabled_profiler_has_no_effect(tmp_path: Path) -> None:
+    pdf_path: Path = next(_CORPUS.glob("*MV*.pdf"))
+
+    with NULL_PROFILER.profile("a"):
+        assert sys.getprofile() is None
+        assert not tracemalloc.is_tracing()
+    rows: DataFrame = _parse(pdf_path, tmp_path / "out", NULL_PROFILER)
+    profiled: DataFrame = _parse(
+        pdf_path, tmp_path / "profiled", Profiler(tmp_path / "profiles")
+    )
+
+    assert not NULL_PROFILER.enabled
+    assert not (tmp_path / "out" / "profiles").exists()
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "out",
+        "profiled",
+        "profiles",
+    ]
+    assert rows.equals(profiled)
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""Scaling benchmarks of the layout pipeline geometry stages.
+
+Runs the MV and Preventive layout pipelines over synthetic pages, see
+`tests.synthetic`, of growing table sizes and report lengths, and reports how
+each stage grows as a table of timings and a growth exponent per stage, ie.
+the slope of the log-log fit of time over size, where 1 is linear and 2 is
+quadratic growth.
+
+Run with `pytest -m benchmark tests/test_scaling.py`, the sizes are set with
+`--scaling-rows` and `--scaling-pages`.
+"""
+
+# Python Imports
+from math import log
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Third-Party Imports
+import pytest
+from pdfminer.high_level import extract_pages
+from pdfminer.layout import LTPage
+
+# Local Imports
+from app.core import mv, preventive
+from app.model.pdfs import PDFLTPipeline, PDFLTRect
+from tests.conftest import SCALING_RESULTS
+from tests.synthetic import (
+    MV,
+    PREVENTIVE,
+    SyntheticLayout,
+    generate_page,
+    generate_pages,
+    layout_params,
+    write_pdf,
+)
+
+# Constants
+LAYOUTS: List[SyntheticLayout] = [MV, PREVENTIVE]
+PIPELINES: Dict[str, PDFLTPipeline] = {
+    MV.name: mv.PIPELINE,
+    PREVENTIVE.name: preventive.PIPELINE,
+}
+_PAGE_ROWS: int = 25
+
+
+def _sizes(config: pytest.Config, option: str) -> List[int]:
+    return sorted({int(s) for s in config.getoption(option).split(",") if s.strip()})
+
+
+def _texts(lines: List[List[PDFLTRect]]) -> List[List[str | None]]:
+    return [[rect.text for rect in line] for line in lines]
+
+
+def _run(layout: SyntheticLayout, pages: List[LTPage]) -> Dict[str, float]:
+    timings: Dict[str, float] = {}
+    for page in pages:
+        _, context = PIPELINES[layout.name].run(page, layout_params(layout))
+        for key, seconds in context.timings.items():
+            timings[key] = timings.get(key, 0.0) + seconds
+    timings["total"] = sum(timings.values())
+    return timings
+
+
+def _exponents(timings: Dict[int, Dict[str, float]]) -> Dict[str, float]:
+    """Fits the growth exponent of each stage's time over the size."""
+    sizes: List[int] = [s for s in timings if s > 0]
+    if len(sizes) < 2:
+        return {k: 0.0 for k in next(iter(timings.values()), {})}
+
+    exponents: Dict[str, float] = {}
+    for key in timings[sizes[0]]:
+        points = [
+            (log(s), log(timings[s][key])) for s in sizes if timings[s][key] > 0
+        ]
+        if len(points) < 2:
+            exponents[key] = 0.0
+            continue
+        mx: float = sum(x for x, _ in points) / len(points)
+        my: float = sum(y for _, y in points) / len(points)
+        var: float = sum((x - mx) ** 2 for x, _ in points)
+        exponents[key] = (
+            sum((x - mx) * (y - my) for x, y in points) / var if var > 0 else 0.0
+        )
+    return exponents
+
+
+def _report(
+    config: pytest.Config,
+    layout: SyntheticLayout,
+    dimension: str,
+    timings: Dict[int, Dict[str, float]],
+) -> None:
+    config.stash[SCALING_RESULTS].append(
+        {
+            "layout": layout.name,
+            "dimension": dimension,
+            "exponents": _exponents(timings),
+            "timings": {f"{k}": v for k, v in timings.items()},
+        }
+    )
+
+
+@pytest.mark.parametrize("layout", LAYOUTS, ids=[lt.name for lt in LAYOUTS])
+@pytest.mark.parametrize("rows", [1, 12])
+def test_synthetic_page(layout: SyntheticLayout, rows: int) -> None:
+    lines, _ = PIPELINES[layout.name].run(
+        generate_page(layout, rows), layout_params(layout)
+    )
+
+    assert _texts(lines) == [
+        [f"{row}", *[f"R{row}C{col}" for col in range(2, len(layout.columns) + 1)]]
+        for row in range(1, rows + 1)
+    ]
+
+
+@pytest.mark.parametrize("layout", LAYOUTS, ids=[lt.name for lt in LAYOUTS])
+def test_synthetic_pdf(layout: SyntheticLayout, tmp_path: Path) -> None:
+    pdf_path: Path = tmp_path / f"{layout.name}.pdf"
+    write_pdf(f"{pdf_path}", layout, pages=2, rows=12, columns=5)
+
+    pages: List[LTPage] = list(extract_pages(pdf_path, laparams=layout.laparams))
+    assert len(pages) == 2
+    for page in pages:
+        expected, _ = PIPELINES[layout.name].run(
+            generate_page(layout, 12, 5, pageid=page.pageid), layout_params(layout)
+        )
+        lines, _ = PIPELINES[layout.name].run(page, layout_params(layout))
+        assert _texts(lines) == _texts(expected)
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("layout", LAYOUTS, ids=[lt.name for lt in LAYOUTS])
+def test_scaling_rows(layout: SyntheticLayout, pytestconfig: pytest.Config) -> None:
+    timings: Dict[int, Dict[str, float]] = {}
+    for rows in _sizes(pytestconfig, "scaling_rows"):
+        timings[rows] = _run(layout, [generate_page(layout, rows)])
+    _report(pytestconfig, layout, "rows", timings)
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("layout", LAYOUTS, ids=[lt.name for lt in LAYOUTS])
+def test_scaling_pages(layout: SyntheticLayout, pytestconfig: pytest.Config) -> None:
+    timings: Dict[int, Dict[str, Any]] = {}
+    for pages in _sizes(pytestconfig, "scaling_pages"):
+        timings[pages] = _run(layout, generate_pages(layout, pages, _PAGE_ROWS))
+    _report(pytestconfig, layout, "pages", timings)
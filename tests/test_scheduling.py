@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""Longest-job-first scheduling.
+
+Estimates the cost of the reports of the bundled corpus, and parses a short
+and a long report with a single worker, checking that the long report is
+parsed first while the rows are still written in input order, and that
+parsing starts while the cost of a file is still being estimated.
+"""
+
+# Python Imports
+import asyncio
+import shutil
+from pathlib import Path
+from threading import Event
+from typing import List, Tuple
+
+# Third-Party Imports
+import pytest
+from pandas import read_csv
+
+# Local Imports
+from app.core import pdfs
+from app.core.pdfs import aparse_pdfs, estimate_cost
+
+# Constants
+_CORPUS: Path = Path(__file__).parent.parent / "test" / "20241208"
+
+
+def test_costs_are_estimated(tmp_path: Path) -> None:
+    mv_path: Path = next(_CORPUS.glob("*MV*.pdf"))
+    costs: List[float] = [estimate_cost(f"{path}") for path in _CORPUS.glob("*.pdf")]
+
+    assert min(costs) == estimate_cost(f"{mv_path}") > 0
+    (tmp_path / "a.pdf").write_bytes(b"not a pdf")
+    assert estimate_cost(f"{tmp_path / 'a.pdf'}") == 0
+
+
+def test_longest_files_are_parsed_first(tmp_path: Path) -> None:
+    files: List[str] = [
+        f"{next(_CORPUS.glob('*MV*.pdf'))}",
+        f"{next(_CORPUS.glob('*6Y PREVENTIVE*.pdf'))}",
+    ]
+    page_counts: List[int] = []
+    written: List[str] = []
+
+    async def parse() -> None:
+        events = aparse_pdfs(
+            files,
+            f"{tmp_path}",
+            max_workers=1,
+            on_file=lambda path, _: written.append(path),
+            output_format="csv",
+        )
+        async for event in events:
+            page_counts.append(event[1])
+
+    asyncio.run(parse())
+
+    first: Tuple[int, ...] = tuple(dict.fromkeys(page_counts))
+    assert first[0] > first[1]
+    assert written == files
+    assert len(read_csv(tmp_path / "MV.csv")) > 0
+
+
+def test_parsing_starts_before_all_costs_are_estimated(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    files: List[str] = []
+    for name in ["a.pdf", "b.pdf"]:
+        shutil.copy2(next(_CORPUS.glob("*MV*.pdf")), tmp_path / name)
+        files.append(f"{tmp_path / name}")
+    released: Event = Event()
+    estimated: Event = Event()
+
+    def slow_estimate(file_path: str) -> float:
+        if file_path.endswith("b.pdf"):
+            # Eg. a file on a slow share
+            released.wait(5)
+            estimated.set()
+        return estimate_cost(file_path)
+
+    monkeypatch.setattr(pdfs, "estimate_cost", slow_estimate)
+    estimated_first: List[bool] = []
+
+    async def parse() -> None:
+        async for _ in aparse_pdfs(
+            files, f"{tmp_path / 'out'}", max_workers=1, output_format="csv"
+        ):
+            if len(estimated_first) == 0:
+                estimated_first.append(estimated.is_set())
+                released.set()
+
+    asyncio.run(parse())
+
+    assert estimated_first == [False]
+    assert len(read_csv(tmp_path / "out" / "MV.csv")) > 0
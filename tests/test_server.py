@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""Server mode.
+
+Serves a `PDFServer` with one worker process, warmed up with the bundled
+samples, on a free local port and on a Unix socket, posting a report of the
+bundled corpus by path and by content, and requests the server rejects.
+"""
+
+# Python Imports
+import json
+import socket
+from http.client import HTTPConnection, HTTPResponse
+from pathlib import Path
+from threading import Thread
+from typing import Any, Dict, Generator, Tuple
+
+# Third-Party Imports
+import pytest
+
+# Local Imports
+from app.core.server import PDFServer, create_http_server
+
+# Constants
+_CORPUS: Path = Path(__file__).parent.parent / "test" / "20241208"
+
+
+class _UnixHTTPConnection(HTTPConnection):
+    def __init__(self, socket_path: str) -> None:
+        super().__init__("localhost")
+        self.socket_path: str = socket_path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.socket_path)
+
+
+@pytest.fixture(scope="module")
+def pdf_server(
+    tmp_path_factory: pytest.TempPathFactory,
+) -> Generator[PDFServer, None, None]:
+    with PDFServer(
+        f"{tmp_path_factory.mktemp('out')}", max_workers=1, root=f"{_CORPUS}"
+    ) as server:
+        yield server
+
+
+def _request(
+    connection: HTTPConnection,
+    method: str,
+    url: str,
+    body: bytes | None = None,
+    content_type: str = "application/pdf",
+) -> Tuple[int, Dict[str, Any]]:
+    connection.request(method, url, body, {"Content-Type": content_type})
+    response: HTTPResponse = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def test_pdfs_are_parsed_on_request(pdf_server: PDFServer) -> None:
+    http_server = create_http_server(pdf_server, port=0)
+    Thread(target=http_server.serve_forever, daemon=True).start()
+    connection: HTTPConnection = HTTPConnection(*http_server.server_address)
+    pdf_path: Path = next(_CORPUS.glob("*MV*.pdf"))
+
+    try:
+        status, body = _request(connection, "GET", "/health")
+        assert status == 200 and body["status"] == "ok"
+
+        status, by_path = _request(
+            connection,
+            "POST",
+            "/parse",
+            json.dumps({"path": f"{pdf_path}"}).encode(),
+            "application/json",
+        )
+        assert status == 200 and by_path["Type"] == "MV" and len(by_path["Rows"]) > 0
+
+        status, by_content = _request(
+            connection, "POST", "/parse?name=a.pdf", pdf_path.read_bytes()
+        )
+        assert status == 200 and by_content["File"] == "a.pdf"
+        assert by_content["Rows"] == by_path["Rows"]
+
+        status, body = _request(connection, "POST", "/parse", b"not a pdf")
+        assert status == 422 and body["error"] != ""
+
+        # Only PDFs under the server root are parsed by path
+        for path in [f"{_CORPUS.parent}", "../../pyproject.toml", "missing.pdf"]:
+            status, body = _request(
+                connection,
+                "POST",
+                "/parse",
+                json.dumps({"path": path}).encode(),
+                "application/json",
+            )
+            assert status == (404 if path == "missing.pdf" else 403), path
+
+        connection.putrequest("POST", "/parse")
+        connection.putheader("Content-Length", "many")
+        connection.endheaders()
+        response: HTTPResponse = connection.getresponse()
+        assert response.status == 400
+        response.read()
+
+        status, body = _request(connection, "GET", "/metrics")
+        assert body["metrics"]["counters"]["requests"] == 3
+        assert body["in_flight"] == 0
+    finally:
+        connection.close()
+        http_server.shutdown()
+        http_server.server_close()
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="no Unix sockets")
+def test_unix_socket_is_served(pdf_server: PDFServer, tmp_path: Path) -> None:
+    socket_path: str = f"{tmp_path / 'server.sock'}"
+    http_server = create_http_server(pdf_server, socket_path=socket_path)
+    Thread(target=http_server.serve_forever, daemon=True).start()
+    connection: HTTPConnection = _UnixHTTPConnection(socket_path)
+
+    try:
+        status, body = _request(connection, "GET", "/health")
+        assert status == 200 and body["workers"] == 1
+        status, body = _request(connection, "GET", "/missing")
+        assert status == 404
+    finally:
+        connection.close()
+        http_server.shutdown()
+        http_server.server_close()
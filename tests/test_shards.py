@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""Sharded batches.
+
+Shards synthetic files, checking that shards are disjoint, cover the batch, do
+not depend on the order or root of the files and do not move files needlessly,
+and parses copies of a report of the bundled corpus in two shards, merging them
+to CSV, once only when parsed again in three shards.
+"""
+
+# Python Imports
+import logging
+import shutil
+from pathlib import Path
+from typing import List
+
+# Third-Party Imports
+import pytest
+from pandas import DataFrame, read_csv
+
+# Local Imports
+from app.core.pdfs import parse_pdfs, shard_files
+from app.core.shards import merge_shards, shard_out_dir
+
+# Constants
+_CORPUS: Path = Path(__file__).parent.parent / "test" / "20241208"
+
+
+def _write_files(root: Path, sizes: List[int]) -> List[str]:
+    root.mkdir()
+    for i, size in enumerate(sizes):
+        (root / f"{i}.pdf").write_bytes(b"0" * size)
+    return [f"{root / f'{i}.pdf'}" for i in range(len(sizes))]
+
+
+def test_shards_are_disjoint_and_stable(tmp_path: Path) -> None:
+    files: List[str] = _write_files(tmp_path / "a", [1000 + i for i in range(300)])
+    shards: List[List[str]] = [shard_files(files, (i, 3)) for i in range(1, 4)]
+
+    assert sorted(f for shard in shards for f in shard) == sorted(files)
+    sizes: List[int] = [sum(Path(f).stat().st_size for f in s) for s in shards]
+    assert max(sizes) < min(sizes) * 1.3
+
+    # Another process listing the same files elsewhere selects the same shards
+    moved: List[str] = _write_files(tmp_path / "b", [1000 + i for i in range(300)])
+    for i, shard in enumerate(shards, 1):
+        names: List[str] = [Path(f).name for f in shard_files(moved[::-1], (i, 3))]
+        assert sorted(names) == sorted(Path(f).name for f in shard)
+
+    # Removing files does not move the others
+    for i, shard in enumerate(shards, 1):
+        assert shard_files(files[::2], (i, 3)) == [f for f in shard if f in files[::2]]
+    # Adding a shard only moves files to the new shard
+    for i, shard in enumerate(shards, 1):
+        assert set(shard_files(files, (i, 4))) <= set(shard)
+
+    with pytest.raises(ValueError):
+        shard_files(files, (4, 3))
+
+
+def test_shards_are_merged(tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    pdfs_dir: Path = tmp_path / "pdfs"
+    pdfs_dir.mkdir()
+    pdf_path: Path = next(_CORPUS.glob("*MV*.pdf"))
+    for name in ["c.pdf", "a.pdf", "b.pdf"]:
+        shutil.copy2(pdf_path, pdfs_dir / name)
+    out_dir: Path = tmp_path / "out"
+
+    for shard in [(1, 2), (2, 2), None]:
+        shard_dir: str = f"{out_dir / 'all'}"
+        if shard is not None:
+            shard_dir = shard_out_dir(f"{out_dir}", shard)
+        for _ in parse_pdfs(f"{pdfs_dir}", shard_dir, output_format="csv", shard=shard):
+            pass
+    assert merge_shards(f"{out_dir}", output_format="csv") == 3
+
+    merged: DataFrame = read_csv(out_dir / "MV.csv", dtype=str)
+    assert merged.equals(read_csv(out_dir / "all" / "MV.csv", dtype=str))
+
+    # Shards of another count hold the same files again
+    for shard in [(1, 3), (2, 3), (3, 3)]:
+        for _ in parse_pdfs(
+            f"{pdfs_dir}",
+            shard_out_dir(f"{out_dir}", shard),
+            output_format="csv",
+            shard=shard,
+        ):
+            pass
+    with caplog.at_level(logging.WARNING):
+        assert merge_shards(f"{out_dir}", output_format="csv") == 3
+    assert "both hold" in caplog.text
+    assert read_csv(out_dir / "MV.csv", dtype=str).equals(merged)
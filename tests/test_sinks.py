@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""Output sinks.
+
+Writes synthetic MV rows through the Excel and columnar sinks, and a synthetic
+match result through the JSON Lines sink, and reads them back, checking that
+files are appended to in input order, in row groups.
+"""
+
+# Python Imports
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Third-Party Imports
+import pytest
+from openpyxl import Workbook
+from pandas import DataFrame, read_csv
+
+# Local Imports
+from app.core import mv
+from app.core.pdfs import (
+    ColumnarSink,
+    ExcelSink,
+    JSONLinesSink,
+    OutputSink,
+    create_sinks,
+)
+from app.model.pdfs import PDFLTMatchResult, PDFType
+from app.utils.excel import ExcelUtils
+
+# Constants
+_MATCH_RESULT: PDFLTMatchResult = {"Type": PDFType.MV, "Tasks": {}}
+
+
+def _rows(file: int, n: int) -> DataFrame:
+    return DataFrame(
+        [
+            [f"WTG{file:02d}"] + [f"{file}.{i}.{c}" for c in range(1, len(mv.COLUMNS))]
+            for i in range(n)
+        ],
+        columns=mv.COLUMNS,
+    )
+
+
+def _write_template(path: Path) -> None:
+    # Data starts at B4, the MV sheet already holding a row
+    workbook: Workbook = Workbook()
+    workbook.active.title = PDFType.PREVENTIVE
+    workbook.create_sheet(PDFType.MV)["B4"] = "WTG00"
+    workbook.save(path)
+
+
+def test_rows_are_written_in_row_groups(tmp_path: Path) -> None:
+    sink: ColumnarSink = ColumnarSink(f"{tmp_path}", "csv", row_group_size=5)
+    out_path: Path = tmp_path / "MV.csv"
+
+    with sink:
+        sink.write("a.pdf", _MATCH_RESULT, _rows(1, 4))
+        assert not out_path.exists()
+        sink.write("b.pdf", _MATCH_RESULT, _rows(2, 4))
+        assert len(read_csv(out_path)) == 8
+        sink.write("c.pdf", _MATCH_RESULT, _rows(3, 4))
+
+    written: DataFrame = read_csv(out_path)
+    assert list(written.columns) == mv.COLUMNS
+    assert list(written["WTG"]) == ["WTG01"] * 4 + ["WTG02"] * 4 + ["WTG03"] * 4
+    assert not (tmp_path / "Preventive.csv").exists()
+
+
+def test_rows_are_written_per_file_when_split(tmp_path: Path) -> None:
+    with ColumnarSink(f"{tmp_path}", "csv", split=True) as sink:
+        sink.write("dir/a.pdf", _MATCH_RESULT, _rows(1, 2))
+        sink.write("dir/b.pdf", _MATCH_RESULT, _rows(2, 3))
+
+    assert len(read_csv(tmp_path / "a" / "MV.csv")) == 2
+    assert len(read_csv(tmp_path / "b" / "MV.csv")) == 3
+
+
+def test_parquet_rows_are_strings(tmp_path: Path) -> None:
+    pq = pytest.importorskip("pyarrow.parquet")
+    rows: DataFrame = _rows(1, 3)
+    rows["Measures"] = [1.5, None, "2"]
+
+    with ColumnarSink(f"{tmp_path}", "parquet", row_group_size=3) as sink:
+        sink.write("a.pdf", _MATCH_RESULT, rows)
+        # Batches without a column still have the columns of the template
+        sink.write("b.pdf", _MATCH_RESULT, _rows(2, 1).drop(columns=["Measures"]))
+
+    written: DataFrame = pq.read_table(tmp_path / "MV.parquet").to_pandas()
+    assert len(written) == 4
+    assert list(written.columns) == mv.COLUMNS
+    assert list(written["Measures"]) == ["1.5", None, "2", None]
+
+
+def test_excel_rows_are_appended(tmp_path: Path) -> None:
+    template: Path = tmp_path / "template.xlsx"
+    _write_template(template)
+    sink: ExcelSink = ExcelSink(f"{tmp_path}", f"{template}", (2, 3), {PDFType.MV: 1})
+
+    with sink:
+        sink.write("a.pdf", _MATCH_RESULT, _rows(1, 2))
+        sink.write("b.pdf", _MATCH_RESULT, _rows(2, 3))
+
+    written: DataFrame = ExcelUtils.read_excel(
+        file_path=f"{tmp_path / 'output.xlsx'}",
+        columns={PDFType.MV: mv.COLUMNS},
+        sheet_names=[PDFType.MV],
+        start_cell=(2, 3),
+    )[PDFType.MV]
+    assert written.shape == (6, len(mv.COLUMNS))
+    assert list(written["WTG"]) == ["WTG00"] + ["WTG01"] * 2 + ["WTG02"] * 3
+
+
+def test_sinks_are_created_per_format(tmp_path: Path) -> None:
+    sinks: List[OutputSink] = create_sinks(["excel", "csv", "excel"], f"{tmp_path}")
+
+    assert [sink.name for sink in sinks] == ["excel", "csv"]
+    with pytest.raises(ValueError):
+        create_sinks("xml", f"{tmp_path}")
+
+
+def test_match_results_are_streamed(tmp_path: Path) -> None:
+    match_result: PDFLTMatchResult = {
+        "Type": PDFType.PREVENTIVE,
+        "WTG": "WTG01",
+        "OperationalHours": "42.004,0",
+        "Tasks": {
+            "NACELLE": {
+                "WTGSection": "NACELLE",
+                "Elements": {
+                    "ATD01": {
+                        "TaskCode/Name": "ATD01",
+                        "Elements": {"T1": {"Status": "OK"}, "T2": {"Status": "NO OK"}},
+                    }
+                },
+            }
+        },
+    }
+    out_path: Path = tmp_path / "results.jsonl"
+
+    with JSONLinesSink(f"{out_path}") as sink:
+        sink.write("a.pdf", match_result, _rows(1, 0))
+        # Records are flushed once written, before the sink is closed
+        assert json.loads(out_path.read_text(encoding="utf-8")) == {
+            "File": "a.pdf",
+            **match_result,
+        }
+
+    with JSONLinesSink(f"{out_path}", "element") as sink:
+        sink.write("a.pdf", match_result, _rows(1, 0))
+
+    records: List[Dict[str, Any]] = [
+        json.loads(line) for line in out_path.read_text(encoding="utf-8").splitlines()
+    ]
+    assert [record["Path"] for record in records] == [
+        ["NACELLE", "ATD01", "T1"],
+        ["NACELLE", "ATD01", "T2"],
+    ]
+    assert records[1]["OperationalHours"] == "42.004,0"
+    assert records[1]["Task"] == {"WTGSection": "NACELLE", "TaskCode/Name": "ATD01"}
+    assert records[1]["Element"] == {"Status": "NO OK"}
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""Spool directory work queue.
+
+Claims synthetic jobs from a `SpoolQueue`, checking that each job is claimed
+once and requeued once its lease expires, and runs a node over copies of a
+report of the bundled corpus, merging its shard to CSV.
+"""
+
+# Python Imports
+import os
+import shutil
+from pathlib import Path
+from typing import List
+
+# Third-Party Imports
+from pandas import read_csv
+
+# Local Imports
+from app.core.spool import SpoolQueue, merge_spool, run_spool_node
+
+# Constants
+_CORPUS: Path = Path(__file__).parent.parent / "test" / "20241208"
+
+
+def test_jobs_are_claimed_once(tmp_path: Path) -> None:
+    pdfs: List[Path] = [tmp_path / f"{i}.pdf" for i in range(2)]
+    for path in pdfs:
+        path.write_bytes(b"%PDF")
+    queue: SpoolQueue = SpoolQueue(f"{tmp_path / 'spool'}", lease_ttl=60).setup()
+
+    assert queue.enqueue([f"{path}" for path in pdfs]) == 2
+    assert queue.enqueue([f"{path}" for path in pdfs]) == 0
+    first, second = queue.claim(), queue.claim()
+    assert queue.claim() is None
+    assert {first[1]["path"], second[1]["path"]} == {f"{path}" for path in pdfs}
+
+    # The node running the first job died, its lease is not renewed
+    running_path: Path = tmp_path / "spool" / "running" / first[0]
+    os.utime(running_path, (0, 0))
+    assert queue.renew(second[0])
+    assert queue.requeue_expired() == 1
+    assert not queue.renew(first[0])
+    assert queue.claim()[0] == first[0]
+
+
+def test_shards_are_merged(tmp_path: Path) -> None:
+    pdfs_dir: Path = tmp_path / "pdfs"
+    pdfs_dir.mkdir()
+    pdf_path: Path = next(_CORPUS.glob("*MV*.pdf"))
+    for name in ["b.pdf", "a.pdf"]:
+        shutil.copy2(pdf_path, pdfs_dir / name)
+    (pdfs_dir / "c.pdf").write_bytes(b"not a pdf")
+    spool_dir: str = f"{tmp_path / 'spool'}"
+
+    SpoolQueue(spool_dir).setup().enqueue(f"{pdfs_dir}")
+    assert run_spool_node(spool_dir, "node", wait=False) == 3
+    assert merge_spool(spool_dir, f"{tmp_path / 'out'}", output_format="csv") == 2
+
+    rows: int = len(read_csv(tmp_path / "out" / "MV.csv"))
+    assert rows > 0 and rows % 2 == 0
+    # Files failing to parse are recorded with the reason, and not merged
+    errors: List[str] = [
+        result["path"] for result in SpoolQueue(spool_dir).results() if "error" in result
+    ]
+    assert errors == [f"{pdfs_dir / 'c.pdf'}"]
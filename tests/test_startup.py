@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""Startup time of the CLI and GUI launch paths.
+
+Launches fresh interpreters for the CLI (`main.py --help`) and the GUI, up to
+the main window module import, checking that neither loads the parsing stack,
+ie. pandas, openpyxl, pypdf, pdfminer and numpy, which is only imported once a
+batch is parsed.
+
+The benchmark measures the best wall time of `--startup-rounds` launches of
+each path, along with importing the parsing stack itself for reference, and
+reports them as a table. Run with `pytest -m benchmark tests/test_startup.py`.
+"""
+
+# Python Imports
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from time import perf_counter
+from typing import Dict, List
+
+# Third-Party Imports
+import pytest
+
+# Local Imports
+from tests.conftest import STARTUP_RESULTS
+
+# Constants
+ROOT: Path = Path(__file__).parent.parent
+HEAVY_MODULES: List[str] = ["pandas", "openpyxl", "pypdf", "pdfminer", "numpy"]
+LAUNCH_PATHS: Dict[str, str] = {
+    "cli": "import runpy, sys; sys.argv = ['main.py', '--help']; "
+    "runpy.run_path('main.py', run_name='__main__')",
+    "gui": "import app, app.gui.window",
+}
+_REFERENCE_PATHS: Dict[str, str] = {"parsing stack": "import app.core.pdfs"}
+# Prints the loaded top level packages on exit, as `--help` exits early
+_LOADED_MODULES: str = (
+    "import atexit, json, sys; atexit.register(lambda: print(json.dumps("
+    "sorted({m.split('.')[0] for m in sys.modules}))))"
+)
+
+
+def _run(code: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        env={**os.environ, "QT_QPA_PLATFORM": "offscreen"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+@pytest.mark.parametrize("path", LAUNCH_PATHS)
+def test_launch_is_lazy(path: str) -> None:
+    result: subprocess.CompletedProcess = _run(
+        f"{_LOADED_MODULES}; {LAUNCH_PATHS[path]}"
+    )
+    loaded: List[str] = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert [m for m in HEAVY_MODULES if m in loaded] == []
+
+
+@pytest.mark.benchmark
+def test_startup_time(pytestconfig: pytest.Config) -> None:
+    rounds: int = max(1, pytestconfig.getoption("startup_rounds"))
+    for path, code in {**LAUNCH_PATHS, **_REFERENCE_PATHS}.items():
+        seconds: List[float] = []
+        for _ in range(rounds):
+            start: float = perf_counter()
+            _run(code)
+            seconds.append(perf_counter() - start)
+        pytestconfig.stash[STARTUP_RESULTS][path] = min(seconds)
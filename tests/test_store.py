@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""SQLite result store.
+
+Upserts synthetic Preventive rows into a `ResultStore` and renders them to an
+Excel template, checking that ingesting a report again is idempotent and that
+renders only write the changed rows.
+"""
+
+# Python Imports
+from pathlib import Path
+from typing import List
+
+# Third-Party Imports
+from openpyxl import Workbook
+from pandas import DataFrame
+
+# Local Imports
+from app.core import preventive
+from app.core.store import ResultStore
+from app.model.pdfs import PDFType
+from app.utils.excel import ExcelUtils
+
+# Constants
+_EXCEL_CELL = (2, 3)
+
+
+def _rows(wtg: str, code: str, tasks: List[str], status: str = "OK") -> DataFrame:
+    return DataFrame(
+        [
+            {c: None for c in preventive.COLUMNS}
+            | {
+                "WTG": wtg,
+                "Checklist Code": code,
+                "Task Code": task,
+                "Status acc. Doc. / Result": status,
+            }
+            for task in tasks
+        ],
+        columns=preventive.COLUMNS,
+    )
+
+
+def _read(path: Path) -> DataFrame:
+    return ExcelUtils.read_excel(
+        file_path=f"{path}",
+        columns={PDFType.PREVENTIVE: preventive.COLUMNS},
+        sheet_names=[PDFType.PREVENTIVE],
+        start_cell=_EXCEL_CELL,
+    )[PDFType.PREVENTIVE]
+
+
+def _count(store: ResultStore) -> int:
+    query: str = f'SELECT COUNT(*) FROM "{PDFType.PREVENTIVE}"'
+    return store.conn.execute(query).fetchone()[0]
+
+
+def test_reports_are_upserted(tmp_path: Path) -> None:
+    with ResultStore(f"{tmp_path / 'results.sqlite'}") as store:
+        # Tasks with several rows, eg. measures, are kept apart by their order
+        rows: DataFrame = _rows("WTG01", "C1", ["T1", "T1", "T2"])
+        store.begin_batch()
+        store.upsert(PDFType.PREVENTIVE, "a.pdf", rows)
+        store.begin_batch()
+        store.upsert(PDFType.PREVENTIVE, "a.pdf", rows)
+        assert _count(store) == 3
+        assert store.read(PDFType.PREVENTIVE, since=1)[1].empty
+
+        store.upsert(PDFType.PREVENTIVE, "a.pdf", _rows("WTG01", "C1", ["T2"], "NO OK"))
+        positions, changed = store.read(PDFType.PREVENTIVE, since=1)
+        assert positions == [2]
+        assert list(changed["Status acc. Doc. / Result"]) == ["NO OK"]
+
+
+def test_unidentified_reports_are_kept_apart(tmp_path: Path) -> None:
+    with ResultStore(f"{tmp_path / 'results.sqlite'}") as store:
+        store.upsert(PDFType.PREVENTIVE, "a.pdf", _rows(None, None, ["T1"]))
+        store.upsert(PDFType.PREVENTIVE, "b.pdf", _rows(None, None, ["T1"]))
+        store.upsert(PDFType.PREVENTIVE, "b.pdf", _rows(None, None, ["T1"]))
+
+        assert _count(store) == 2
+        assert list(store.read(PDFType.PREVENTIVE)[1]["WTG"]) == [None, None]
+
+
+def test_changed_rows_are_rendered(tmp_path: Path) -> None:
+    template: Path = tmp_path / "template.xlsx"
+    workbook: Workbook = Workbook()
+    workbook.active.title = PDFType.PREVENTIVE
+    workbook.create_sheet(PDFType.MV)
+    workbook.save(template)
+    out_path: Path = tmp_path / "output.xlsx"
+
+    with ResultStore(f"{tmp_path / 'results.sqlite'}") as store:
+        store.begin_batch()
+        store.upsert(PDFType.PREVENTIVE, "a.pdf", _rows("WTG01", "C1", ["T1", "T2"]))
+        store.upsert(PDFType.PREVENTIVE, "b.pdf", _rows("WTG02", "C2", ["T1"]))
+        assert store.render_excel(f"{out_path}", f"{template}", _EXCEL_CELL) == 3
+        assert store.render_excel(f"{out_path}", f"{template}", _EXCEL_CELL) == 0
+
+        store.begin_batch()
+        store.upsert(PDFType.PREVENTIVE, "a.pdf", _rows("WTG01", "C1", ["T2"], "NO OK"))
+        store.upsert(PDFType.PREVENTIVE, "c.pdf", _rows("WTG03", "C3", ["T1"]))
+        assert store.render_excel(f"{out_path}", f"{template}", _EXCEL_CELL) == 2
+
+    rendered: DataFrame = _read(out_path)
+    assert list(rendered["WTG"]) == ["WTG01", "WTG01", "WTG02", "WTG03"]
+    assert list(rendered["Status acc. Doc. / Result"]) == ["OK", "NO OK", "OK", "OK"]
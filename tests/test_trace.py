@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""Layout pipeline traces.
+
+Runs the MV and Preventive layout pipelines over synthetic pages, see
+`tests.synthetic`, capturing the step outputs, and checks that the traces
+match the pipeline outputs and survive a round trip through JSON.
+"""
+
+# Python Imports
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Third-Party Imports
+import pytest
+from pdfminer.layout import LTPage
+
+# Local Imports
+from app.core import mv, preventive
+from app.model.pdfs import PDFLTPipeline, PDFLTPipelineContext, PDFLTTrace
+from tests.synthetic import (
+    MV,
+    PREVENTIVE,
+    SyntheticLayout,
+    generate_page,
+    layout_params,
+)
+
+# Constants
+PIPELINES: Dict[str, PDFLTPipeline] = {
+    MV.name: mv.PIPELINE,
+    PREVENTIVE.name: preventive.PIPELINE,
+}
+
+
+@pytest.mark.parametrize("layout", [MV, PREVENTIVE], ids=lambda layout: layout.name)
+def test_steps_are_traced(layout: SyntheticLayout, tmp_path: Path) -> None:
+    trace: PDFLTTrace = PDFLTTrace(f"{layout.name}.pdf")
+    page: LTPage = generate_page(layout, rows=10)
+
+    rows: List[List[Any]]
+    context: PDFLTPipelineContext
+    rows, context = PIPELINES[layout.name].run(page, layout_params(layout), trace)
+
+    assert len(trace.pages) == 1
+    steps: Dict[str, List[List[Any]]] = trace.pages[0]["steps"]
+    assert list(steps) == ["decompose", "points", "intersect", "compose", "rows"]
+    assert len(steps["decompose"]) == context.counters["lines"]
+    assert len(steps["points"]) == context.counters["intersections"]
+    assert len(steps["intersect"]) == context.counters["rects"]
+    # Rows are grouped, the rects of each row holding their text boxes
+    assert {shape[1] for shape in steps["rows"]} == set(range(len(rows)))
+    assert {shape[0] for shape in steps["rows"]} >= {"PDFLTRect", "PDFLTTextBox"}
+
+    trace.dump(tmp_path / "trace.json")
+    assert PDFLTTrace.load(tmp_path / "trace.json").as_dict() == trace.as_dict()
+
+
+def test_pipeline_is_not_traced_by_default() -> None:
+    _, context = PIPELINES[MV.name].run(generate_page(MV, rows=2), layout_params(MV))
+
+    assert not context.trace.enabled
+    assert context.trace.pages == []
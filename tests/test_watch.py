@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""Watch mode.
+
+Writes PDF files to a watched directory, checking that they are streamed once
+written, and streams the bundled corpus to `aparse_pdfs`, checking that its rows
+are written while the stream is open.
+"""
+
+# Python Imports
+import asyncio
+import os
+from pathlib import Path
+from typing import AsyncGenerator, List
+
+# Third-Party Imports
+from pandas import read_csv
+
+# Local Imports
+from app.core.pdfs import aparse_pdfs
+from app.core.watch import PollingWatcher, watch_pdfs
+
+# Constants
+_CORPUS: Path = Path(__file__).parent.parent / "test" / "20241208"
+_PDF: bytes = b"%PDF-1.4\n" + b"0" * 1024 + b"\n%%EOF\n"
+_TIMEOUT: float = 10.0
+
+
+def test_changed_files_are_polled(tmp_path: Path) -> None:
+    watcher: PollingWatcher = PollingWatcher(f"{tmp_path}", interval=0)
+    assert watcher.wait(0) == set()
+
+    (tmp_path / "a.pdf").write_bytes(_PDF)
+    (tmp_path / "a.txt").write_bytes(_PDF)
+    assert watcher.wait(0) == {f"{tmp_path / 'a.pdf'}"}
+    assert watcher.wait(0) == set()
+
+    with open(tmp_path / "a.pdf", "ab") as f:
+        f.write(b"\n")
+    assert watcher.wait(0) == {f"{tmp_path / 'a.pdf'}"}
+
+
+def test_written_files_are_streamed(tmp_path: Path) -> None:
+    (tmp_path / "a.pdf").write_bytes(_PDF)
+
+    async def watch() -> List[str]:
+        files: AsyncGenerator[str, None] = watch_pdfs(
+            f"{tmp_path}", settle=0.3, interval=0.05
+        )
+        try:
+            streamed: List[str] = [await anext(files)]
+            (tmp_path / "sub").mkdir()
+            # Written in two halves, the file is only streamed once complete
+            with open(tmp_path / "sub" / "b.pdf", "wb") as f:
+                f.write(_PDF[:512])
+                f.flush()
+                await asyncio.sleep(0.1)
+                f.write(_PDF[512:])
+            streamed.append(await asyncio.wait_for(anext(files), _TIMEOUT))
+            assert os.path.getsize(streamed[-1]) == len(_PDF)
+            return streamed
+        finally:
+            await files.aclose()
+
+    assert asyncio.run(watch()) == [
+        f"{tmp_path / 'a.pdf'}",
+        f"{tmp_path / 'sub' / 'b.pdf'}",
+    ]
+
+
+def test_streamed_files_are_parsed(tmp_path: Path) -> None:
+    pdf_path: Path = next(_CORPUS.glob("*MV*.pdf"))
+    out_dir: Path = tmp_path / "out"
+    written: List[int] = []
+
+    async def files() -> AsyncGenerator[str, None]:
+        yield f"{pdf_path}"
+        # Rows are written once the pool is idle, before the stream ends
+        while not (out_dir / "MV.csv").exists():
+            await asyncio.sleep(0.05)
+        written.append(len(read_csv(out_dir / "MV.csv")))
+        yield f"{pdf_path}"
+
+    async def parse() -> None:
+        async for _ in aparse_pdfs(files(), f"{out_dir}", output_format="csv"):
+            pass
+
+    asyncio.run(asyncio.wait_for(parse(), _TIMEOUT * 3))
+    assert len(read_csv(out_dir / "MV.csv")) == 2 * written[0]
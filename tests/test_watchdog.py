@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""Parsing budgets.
+
+Runs busy pages under a `Watchdog`, checking that each budget interrupts them,
+and parses copies of a report of the bundled corpus with a page budget too
+tight for it, checking that each copy is stopped and copied to `error/` with
+the reason while the batch goes on.
+"""
+
+# Python Imports
+import asyncio
+import shutil
+from pathlib import Path
+from time import sleep
+from typing import List
+
+# Third-Party Imports
+import pytest
+
+# Local Imports
+from app.core.pdfs import aparse_pdfs, parse_pdfs
+from app.core.server import PDFServer
+from app.core.spool import SpoolQueue, run_spool_node
+from app.model.pdfs import PDFLTMatchException
+from app.utils.watchdog import BudgetExceeded, ParseBudget, Watchdog
+
+# Constants
+_CORPUS: Path = Path(__file__).parent.parent / "test" / "20241208"
+
+
+def _busy() -> None:
+    while True:
+        pass
+
+
+def test_budgets_are_enforced() -> None:
+    with Watchdog(ParseBudget(page_seconds=0.2), "page") as watchdog:
+        with pytest.raises(BudgetExceeded, match="page time budget"):
+            with watchdog.page():
+                _busy()
+
+    with Watchdog(ParseBudget(file_seconds=0.3), "file") as watchdog:
+        with watchdog.page():
+            sleep(0.2)
+        # Time spent out of pages does not count
+        sleep(0.3)
+        with pytest.raises(BudgetExceeded, match="file time budget of 0.3s on page 2"):
+            with watchdog.page():
+                _busy()
+
+    with Watchdog(ParseBudget(max_memory=16 * 2**20), "memory") as watchdog:
+        with pytest.raises(BudgetExceeded, match="memory budget"):
+            with watchdog.page():
+                chunks: List[bytearray] = [bytearray(2**20) for _ in range(64)]
+                _busy()
+    # No interruption is left pending once out of the page
+    sleep(0.3)
+    assert len(chunks) == 64
+
+
+@pytest.mark.parametrize("executor", ["process", "thread", None])
+def test_slow_files_are_stopped(tmp_path: Path, executor: str | None) -> None:
+    pdfs_dir: Path = tmp_path / "pdfs"
+    pdfs_dir.mkdir()
+    for name in ["a.pdf", "b.pdf"]:
+        shutil.copy2(next(_CORPUS.glob("*MV*.pdf")), pdfs_dir / name)
+    out_dir: Path = tmp_path / "out"
+    budget: ParseBudget = ParseBudget(page_seconds=0.01)
+    errors: List[Exception] = []
+
+    def on_file(_: str, result: Exception) -> None:
+        errors.append(result)
+
+    if executor is None:
+        for _ in parse_pdfs(
+            f"{pdfs_dir}", f"{out_dir}", on_file=on_file, budget=budget
+        ):
+            pass
+    else:
+
+        async def parse() -> None:
+            async for _ in aparse_pdfs(
+                f"{pdfs_dir}",
+                f"{out_dir}",
+                executor=executor,
+                on_file=on_file,
+                budget=budget,
+            ):
+                pass
+
+        asyncio.run(parse())
+
+    assert len(errors) == 2
+    assert all(isinstance(e, BudgetExceeded) for e in errors)
+    for name in ["a.pdf", "b.pdf"]:
+        assert (out_dir / "error" / name).exists()
+        reason: str = (out_dir / "error" / f"{name}.reason.txt").read_text()
+        assert "exceeded the page time budget of 0.01s" in reason
+
+
+def test_memory_budget_requires_processes(tmp_path: Path) -> None:
+    async def parse() -> None:
+        async for _ in aparse_pdfs(
+            f"{_CORPUS}",
+            f"{tmp_path}",
+            executor="thread",
+            budget=ParseBudget(max_memory=2**30),
+        ):
+            pass
+
+    with pytest.raises(ValueError, match="process executor"):
+        asyncio.run(parse())
+
+
+def test_budgets_apply_to_spool_and_server(tmp_path: Path) -> None:
+    pdf_path: Path = next(_CORPUS.glob("*MV*.pdf"))
+    budget: ParseBudget = ParseBudget(page_seconds=0.01)
+    spool_dir: str = f"{tmp_path / 'spool'}"
+
+    SpoolQueue(spool_dir).setup().enqueue([f"{pdf_path}"])
+    assert run_spool_node(spool_dir, "node", wait=False, budget=budget) == 1
+    assert "page time budget" in SpoolQueue(spool_dir).results()[0]["error"]
+
+    with PDFServer(
+        f"{tmp_path / 'out'}", max_workers=1, warmup=(), budget=budget
+    ) as server:
+        with pytest.raises(PDFLTMatchException, match="page time budget"):
+            server.parse(f"{pdf_path}")
+    assert (tmp_path / "out" / "error" / f"{pdf_path.name}.reason.txt").exists()